@@ -0,0 +1,5 @@
+import sys
+
+from ai_seo_auditor.cli import main
+
+sys.exit(main())
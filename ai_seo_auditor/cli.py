@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from ai_seo_auditor.models.scoring import resolve_thresholds, resolve_weights
+from ai_seo_auditor.services import batch_inference, page_snapshots, rescoring
+from ai_seo_auditor.services.llm_service import (
+    configure_endpoints, configure_limiter, configure_ollama, get_limiter_stats, llm_kwargs_from_config,
+    prepare_ollama,
+)
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+_PROJECT_ROOT = _PACKAGE_DIR.parent
+
+
+def load_audit_config() -> dict[str, Any]:
+    """The ``audit:`` section of config.yaml (empty when the file is missing)."""
+    config_path = _PACKAGE_DIR / "config.yaml"
+    if not config_path.exists():
+        return {}
+    with open(config_path, "r") as f:
+        return (yaml.safe_load(f) or {}).get("audit", {})
+
+
+def resolve_session(session: str) -> Path:
+    """Accept a session folder path or a folder name under reports/."""
+    path = Path(session)
+    if not path.is_dir():
+        path = _PROJECT_ROOT / "reports" / session
+    if not path.is_dir():
+        raise SystemExit(f"Session folder not found: {session}")
+    return path
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m ai_seo_auditor", description="AI SEO Auditor tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Offline LLM batch inference for a deferred crawl")
+    batch_commands = batch.add_subparsers(dest="batch_command", required=True)
+
+    run = batch_commands.add_parser("run", help="Run pending LLM requests (resumable)")
+    run.add_argument("session", help="Session folder or its name under reports/")
+    run.add_argument("--concurrency", type=int, default=None, help="Requests in flight (default: llm_batch_concurrency)")
+
+    merge = batch_commands.add_parser("merge", help="Finish page reports and write the site summary")
+    merge.add_argument("session", help="Session folder or its name under reports/")
+
+    reanalyze = commands.add_parser(
+        "reanalyze", help="Re-run the LLM analysis of failed/partial pages from their snapshots (no re-crawl)",
+    )
+    reanalyze.add_argument("session", help="Session folder or its name under reports/")
+    reanalyze.add_argument("--all", action="store_true", help="Re-analyze every page, not only failed and partial ones")
+    reanalyze.add_argument("--model", default=None, help="Model for every endpoint (default: as configured)")
+    reanalyze.add_argument(
+        "--concurrency", type=int, default=None, help="Pages queued at once (default: llm_batch_concurrency)",
+    )
+
+    rescore = commands.add_parser(
+        "rescore", help="Recompute scores and grades of a finished session into a new derived session",
+    )
+    rescore.add_argument("session", help="Session folder or its name under reports/")
+    rescore.add_argument(
+        "--weight", action="append", default=[], metavar="DIMENSION=VALUE",
+        help="Override one score weight (repeatable; weights must still sum to 1.0)",
+    )
+    rescore.add_argument(
+        "--threshold", action="append", default=[], metavar="NAME=V[,V...]",
+        help="Override one score threshold, e.g. ttfb_ms=600,1500 (repeatable)",
+    )
+    rescore.add_argument("--output", default=None, help="Derived session folder (default: <session>_rescored-<timestamp>)")
+    return parser.parse_args(argv)
+
+
+def _parse_overrides(pairs: list[str]) -> dict[str, list[str]]:
+    overrides: dict[str, list[str]] = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep or not value:
+            raise SystemExit(f"Expected NAME=VALUE, got {pair!r}")
+        overrides[name.strip()] = [v.strip() for v in value.split(",")]
+    return overrides
+
+
+def _configure_llm(audit_config: dict[str, Any], model: str | None = None) -> None:
+    """Endpoint pool and adaptive limiter from config, optionally with one
+    model for every endpoint."""
+    endpoints = audit_config.get("llm_endpoints") or None
+    if model:
+        endpoints = [{**entry, "model": model} for entry in endpoints or [{}]]
+    configure_endpoints(
+        endpoints,
+        hedge=bool(audit_config.get("llm_hedge_enabled", False)),
+        hedge_min_samples=int(audit_config.get("llm_hedge_min_samples", 20)),
+        breaker_failure_threshold=int(audit_config.get("llm_breaker_failure_threshold", 3)),
+        breaker_cooldown_seconds=float(audit_config.get("llm_breaker_cooldown_seconds", 30)),
+    )
+    configure_limiter(**(audit_config.get("llm_concurrency") or {}))
+
+
+def _reanalyze(args: argparse.Namespace, audit_config: dict[str, Any], logger: logging.Logger) -> int:
+    session_dir = resolve_session(args.session)
+    _configure_llm(audit_config, args.model)
+    ollama_config = dict(audit_config.get("llm_ollama") or {})
+    ollama = configure_ollama(
+        ollama_config.pop("enabled", None),
+        html_max_chars=int(audit_config.get("html_max_chars", 8000)),
+        text_max_chars=int(audit_config.get("text_max_chars", 2000)),
+        batch_token_budget=None,
+        **ollama_config,
+    )
+    llm_kwargs = llm_kwargs_from_config(audit_config, logger)
+    cascade = llm_kwargs["cascade"]
+
+    async def run() -> dict[str, int]:
+        if ollama is not None:
+            await prepare_ollama((cascade.fast_model,) if cascade else (), logger=logger)
+        return await page_snapshots.reanalyze_session(
+            session_dir,
+            all_pages=args.all,
+            concurrency=args.concurrency or int(audit_config.get("llm_batch_concurrency", 16)),
+            llm_kwargs=llm_kwargs,
+            score_weights=audit_config.get("score_weights"),
+            logger=logger,
+        )
+
+    stats = asyncio.run(run())
+    return 1 if stats["failed"] else 0
+
+
+def _rescore(args: argparse.Namespace, audit_config: dict[str, Any], logger: logging.Logger) -> int:
+    weight_overrides = {k: float(v[0]) for k, v in _parse_overrides(args.weight).items()}
+    threshold_overrides: dict[str, Any] = {
+        k: (v if len(v) > 1 else v[0]) for k, v in _parse_overrides(args.threshold).items()
+    }
+    try:
+        weights = resolve_weights({**(audit_config.get("score_weights") or {}), **weight_overrides})
+        thresholds = resolve_thresholds({**(audit_config.get("score_thresholds") or {}), **threshold_overrides})
+    except (TypeError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    output = Path(args.output) if args.output else None
+    rescoring.rescore_session(resolve_session(args.session), output, weights, thresholds, logger)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+    logger = logging.getLogger(f"ai_seo_auditor.{args.command}")
+    audit_config = load_audit_config()
+    if args.command == "rescore":
+        return _rescore(args, audit_config, logger)
+    if args.command == "reanalyze":
+        return _reanalyze(args, audit_config, logger)
+    session_dir = resolve_session(args.session)
+
+    if args.batch_command == "run":
+        _configure_llm(audit_config)
+        concurrency = args.concurrency or int(audit_config.get("llm_batch_concurrency", 16))
+        stats = asyncio.run(batch_inference.run_requests(
+            session_dir,
+            concurrency=concurrency,
+            timeout_seconds=float(audit_config.get("llm_timeout_seconds", 60)),
+            retry_attempts=int(audit_config.get("llm_retry_attempts", 2)),
+            retry_base_delay=float(audit_config.get("llm_retry_base_delay", 1.0)),
+            logger=logger,
+        ))
+        limiter = get_limiter_stats()
+        logger.info(
+            "Concurrency limit ended at %s (peak %s, %s decreases)",
+            limiter["limit"], limiter["peak_limit"], limiter["decreases"],
+        )
+        return 1 if stats["failed"] else 0
+
+    stats = batch_inference.merge_results(session_dir, logger, audit_config.get("score_weights"))
+    return 1 if stats["failed"] else 0
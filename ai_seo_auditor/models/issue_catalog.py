@@ -0,0 +1,140 @@
+"""Catalogue of the issues the auditor raises itself.
+
+Rule-generated issues carry a stable ``code`` and the ``params`` that vary
+per page, e.g. ``{"code": "title_too_short", "params": {"length": 23}}``.
+Their description is rendered from the catalogue template. The suggested
+fix is not stored with each page; readers take it from here through
+:func:`suggested_fix`. Aggregations group issues by :func:`issue_label`:
+the catalogue title for a coded issue, so every short title counts as one
+issue whatever its length, and the description for an LLM-written issue,
+which has no code.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+
+@dataclass(frozen=True)
+class IssueSpec:
+    severity: str
+    title: str      # param-free label for aggregated views
+    template: str   # description, formatted with the issue's params
+    fix: str
+
+
+ISSUE_CATALOG: dict[str, IssueSpec] = {
+    # On-page SEO (spider)
+    "title_missing": IssueSpec(
+        "high", "Missing <title> tag", "Missing <title> tag",
+        "Add a descriptive <title> element in the <head>.",
+    ),
+    "title_too_short": IssueSpec(
+        "medium", "Title too short", "Title too short ({length} chars, recommended 30-60)",
+        "Expand the title with relevant keywords.",
+    ),
+    "title_too_long": IssueSpec(
+        "medium", "Title too long", "Title too long ({length} chars, recommended 30-60)",
+        "Shorten the title to avoid SERP truncation.",
+    ),
+    "meta_description_missing": IssueSpec(
+        "high", "Missing meta description", "Missing meta description",
+        "Add a <meta name=\"description\"> tag with a compelling 70-160 char summary.",
+    ),
+    "meta_description_short": IssueSpec(
+        "low", "Meta description short", "Meta description short ({length} chars, recommended 70-160)",
+        "Expand to better summarize page content.",
+    ),
+    "meta_description_long": IssueSpec(
+        "low", "Meta description long", "Meta description long ({length} chars, recommended 70-160)",
+        "Shorten to avoid SERP truncation.",
+    ),
+    "h1_missing": IssueSpec(
+        "high", "No H1 heading found", "No H1 heading found",
+        "Add a single H1 heading that describes the page topic.",
+    ),
+    "h1_multiple": IssueSpec(
+        "medium", "Multiple H1 tags", "Multiple H1 tags ({count})",
+        "Use a single H1 per page.",
+    ),
+    "viewport_missing": IssueSpec(
+        "high", "Missing viewport meta tag", "Missing viewport meta tag",
+        'Add <meta name="viewport" content="width=device-width, initial-scale=1">.',
+    ),
+    "html_lang_missing": IssueSpec(
+        "medium", "Missing lang attribute on <html>", "Missing lang attribute on <html>",
+        'Add lang="en" (or appropriate language) to the <html> tag.',
+    ),
+    "open_graph_missing": IssueSpec(
+        "low", "Missing Open Graph tags", "Missing Open Graph tags",
+        "Add og:title and og:description meta tags for social sharing.",
+    ),
+    "noindex": IssueSpec(
+        "high", "Page set to noindex", "Page set to noindex",
+        "Remove noindex from the robots meta tag if this page should be indexed.",
+    ),
+    "images_missing_alt": IssueSpec(
+        "medium", "Images missing alt attribute", "{count} image(s) missing alt attribute",
+        "Add descriptive alt text to all images.",
+    ),
+    "canonical_missing": IssueSpec(
+        "low", "No canonical URL specified", "No canonical URL specified",
+        "Add a <link rel=\"canonical\"> to prevent duplicate content issues.",
+    ),
+    # Readability (spider)
+    "thin_content": IssueSpec(
+        "medium", "Thin content", "Thin content: only {words} words (recommended ≥{minimum})",
+        "Expand page content with substantive, original text.",
+    ),
+    "reading_level_difficult": IssueSpec(
+        "medium", "Very difficult reading level", "Very difficult reading level (FRE {flesch})",
+        "Simplify sentence structure and vocabulary for web audiences.",
+    ),
+    # Dimensions filled by rules instead of the LLM (llm_service.plan_dimensions)
+    "text_content_missing": IssueSpec(
+        "medium", "Page has almost no text content", "Page has almost no text content ({words} words)",
+        "Add substantive, original content that answers the page's search intent.",
+    ),
+    "links_missing": IssueSpec(
+        "medium", "Page has no links", "Page has no links",
+        "Link to related pages with descriptive anchor text.",
+    ),
+    # LLM analysis skipped or failed
+    "llm_skipped": IssueSpec(
+        "low", "LLM analysis skipped", "{reason}: {dimensions} not assessed",
+        "Re-audit this page with LLM analysis enabled.",
+    ),
+    "llm_failed": IssueSpec(
+        "high", "LLM analysis failed", "LLM analysis failed: {error}",
+        "Retry the audit or inspect the LLM service logs.",
+    ),
+    "audit_failed": IssueSpec(
+        "high", "Audit failed", "Audit failed: {error}",
+        "Retry or check logs.",
+    ),
+}
+
+
+def make_issue(code: str, severity: Optional[str] = None, **params: Any) -> dict[str, Any]:
+    """An issue dict for catalogue ``code`` (severity from the catalogue unless given)."""
+    spec = ISSUE_CATALOG[code]
+    return {
+        "severity": severity or spec.severity,
+        "description": spec.template.format(**params),
+        "code": code,
+        "params": params,
+    }
+
+
+def suggested_fix(issue: Mapping[str, Any]) -> str:
+    """The issue's own fix, or the catalogue's for a coded issue."""
+    if issue.get("suggested_fix"):
+        return issue["suggested_fix"]
+    spec = ISSUE_CATALOG.get(issue.get("code") or "")
+    return spec.fix if spec else ""
+
+
+def issue_label(issue: Mapping[str, Any]) -> str:
+    """What aggregations group the issue by (see the module docstring)."""
+    spec = ISSUE_CATALOG.get(issue.get("code") or "")
+    return spec.title if spec else issue.get("description", "")
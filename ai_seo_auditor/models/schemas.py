@@ -1,8 +1,22 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, computed_field, field_validator, model_validator
+from pydantic import BaseModel, Field, computed_field, field_validator, model_serializer, model_validator
 from typing import Any, Dict, List, Literal, Optional
 
+from ai_seo_auditor.models.scoring import (
+    DEFAULT_SCORE_WEIGHTS,
+    THIN_CONTENT_WORDS,
+    compute_letter_grade,
+    overall_score,
+    score_accessibility,
+    score_canonical,
+    score_onpage_seo,
+    score_performance,
+    score_readability,
+    score_schema,
+    score_security,
+)
+
 
 # ---------------------------------------------------------------------------
 # Shared helpers
@@ -17,7 +31,21 @@ class Issue(BaseModel):
         ),
     )
     description: str
-    suggested_fix: str
+    # Empty for coded issues: their fix comes from the issue catalogue
+    suggested_fix: str = ""
+    # Rule-generated issues: catalogue code and the values in the description
+    code: Optional[str] = None
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+    @model_serializer(mode="wrap")
+    def _compact(self, handler: Any) -> Dict[str, Any]:
+        data = handler(self)
+        if self.code is None:
+            data.pop("code", None)
+            data.pop("params", None)
+        elif not self.suggested_fix:
+            data.pop("suggested_fix", None)
+        return data
 
 
 # ---------------------------------------------------------------------------
@@ -103,43 +131,8 @@ class OnPageSeoChecklist(_ScoredModel):
 
     @model_validator(mode="after")
     def auto_score(self) -> OnPageSeoChecklist:
-        """Point-based scoring (max 100):
-        - has_title:               10 pts
-        - title_length_ok:         10 pts
-        - has_meta_description:    10 pts
-        - description_length_ok:    5 pts
-        - single_h1:              10 pts
-        - has_viewport_meta:        5 pts
-        - has_lang_attribute:      10 pts
-        - has_og_tags:              5 pts
-        - robots_allows_indexing:  10 pts
-        - image_alt_coverage:      15 pts (proportional)
-        - has_canonical:           10 pts
-        """
-        s = 0
-        if self.has_title:
-            s += 10
-        if self.title_length_ok:
-            s += 10
-        if self.has_meta_description:
-            s += 10
-        if self.description_length_ok:
-            s += 5
-        if self.single_h1:
-            s += 10
-        if self.has_viewport_meta:
-            s += 5
-        if self.has_lang_attribute:
-            s += 10
-        if self.has_og_tags:
-            s += 5
-        if self.robots_allows_indexing:
-            s += 10
-        # Image alt coverage: proportional 0-15 pts
-        s += round(self.image_alt_coverage_pct / 100.0 * 15)
-        if self.has_canonical:
-            s += 10
-        self.score = min(s, 100)
+        """Point-based checklist score, see :func:`scoring.score_onpage_seo`."""
+        self.score = score_onpage_seo(vars(self))
         return self
 
 
@@ -154,8 +147,7 @@ class SchemaScore(_ScoredModel):
     @model_validator(mode="after")
     def enforce_zero_score_when_no_types(self) -> SchemaScore:
         """If no JSON-LD schemas were detected the score must be 0."""
-        if not self.detected_types and self.score != 0:
-            self.score = 0
+        self.score = score_schema(vars(self))
         return self
 
 
@@ -202,62 +194,8 @@ class PerformanceMetrics(_ScoredModel):
 
     @model_validator(mode="after")
     def auto_score(self) -> PerformanceMetrics:
-        """Score using Web Vitals-aligned thresholds.
-
-        TTFB (25% weight): ≤800ms=100, ≤1800ms=50, >1800ms=0
-        FCP  (25% weight): ≤1800ms=100, ≤3000ms=50, >3000ms=0 (or 50 if unavailable)
-        Page size (25% weight): ≤500KB=100, ≤1MB=75, ≤2MB=50, >2MB=25
-        Resource count (25% weight): ≤30=100, ≤60=75, ≤100=50, >100=25
-        """
-        # TTFB tiers
-        ttfb = self.ttfb_ms
-        if ttfb <= 800:
-            ttfb_score = 100
-        elif ttfb <= 1800:
-            ttfb_score = 50
-        else:
-            ttfb_score = 0
-
-        # FCP tiers
-        fcp = self.fcp_ms
-        if fcp is not None:
-            if fcp <= 1800:
-                fcp_score = 100
-            elif fcp <= 3000:
-                fcp_score = 50
-            else:
-                fcp_score = 0
-        else:
-            fcp_score = 50  # neutral if FCP unavailable
-
-        # Page size tiers
-        ps = self.page_size_bytes
-        if ps <= 500_000:
-            ps_score = 100
-        elif ps <= 1_000_000:
-            ps_score = 75
-        elif ps <= 2_000_000:
-            ps_score = 50
-        else:
-            ps_score = 25
-
-        # Resource count tiers
-        rc = self.resource_count
-        if rc <= 30:
-            rc_score = 100
-        elif rc <= 60:
-            rc_score = 75
-        elif rc <= 100:
-            rc_score = 50
-        else:
-            rc_score = 25
-
-        self.score = round(
-            ttfb_score * 0.25
-            + fcp_score * 0.25
-            + ps_score * 0.25
-            + rc_score * 0.25
-        )
+        """Web Vitals-aligned tiers, see :func:`scoring.score_performance`."""
+        self.score = score_performance(vars(self))
         return self
 
 
@@ -281,33 +219,11 @@ class ReadabilityAnalysis(_ScoredModel):
 
     @model_validator(mode="after")
     def auto_score(self) -> ReadabilityAnalysis:
-        """Map Flesch Reading Ease to audit score.
-        FRE >= 60 → 100 (accessible for general web)
-        FRE 50-59 → 80
-        FRE 40-49 → 60
-        FRE 30-39 → 40
-        FRE < 30  → 20
-        Thin content (<300 words) caps at 50.
-        """
-        if self.word_count < 300:
+        """Flesch Reading Ease bands, thin content (<300 words) capped at 50;
+        see :func:`scoring.score_readability`."""
+        if self.word_count < THIN_CONTENT_WORDS:
             self.thin_content = True
-
-        fre = self.flesch_reading_ease
-        if fre >= 60:
-            s = 100
-        elif fre >= 50:
-            s = 80
-        elif fre >= 40:
-            s = 60
-        elif fre >= 30:
-            s = 40
-        else:
-            s = 20
-
-        if self.thin_content:
-            s = min(s, 50)
-
-        self.score = s
+        self.score = score_readability(vars(self))
         return self
 
 
@@ -325,25 +241,8 @@ class SecurityCheck(_ScoredModel):
 
     @model_validator(mode="after")
     def auto_score(self) -> SecurityCheck:
-        """Score breakdown:
-        - HTTPS: 40 pts
-        - HSTS:  20 pts
-        - CSP:   20 pts
-        - X-Content-Type-Options: 10 pts
-        - No mixed content: 10 pts
-        """
-        s = 0
-        if self.is_https:
-            s += 40
-        if self.has_hsts:
-            s += 20
-        if self.has_csp:
-            s += 20
-        if self.has_x_content_type:
-            s += 10
-        if not self.mixed_content_urls:
-            s += 10
-        self.score = s
+        """Header checklist, see :func:`scoring.score_security`."""
+        self.score = score_security(vars(self))
         return self
 
 
@@ -384,37 +283,9 @@ class AccessibilityAnalysis(_ScoredModel):
 
     @model_validator(mode="after")
     def compute_blended_score(self) -> AccessibilityAnalysis:
-        """Blend deterministic checklist (50%) with LLM qualitative (50%).
-
-        Deterministic checklist (max 100):
-        - has_skip_nav:           15 pts
-        - has_lang_attribute:     15 pts
-        - has_document_title:     10 pts
-        - has_heading_structure:  10 pts
-        - image_alt_coverage:     20 pts (proportional)
-        - form_labels_missing:    10 pts (0 missing = 10, any missing = 0)
-        - no generic link text:   10 pts (0 found = 10, any = 0)
-        - no tabindex misuse:     10 pts (0 misuse = 10, any = 0)
-        """
-        det = 0
-        if self.has_skip_nav:
-            det += 15
-        if self.has_lang_attribute:
-            det += 15
-        if self.has_document_title:
-            det += 10
-        if self.has_heading_structure:
-            det += 10
-        det += round(self.image_alt_coverage_pct / 100.0 * 20)
-        if self.form_labels_missing == 0:
-            det += 10
-        if self.generic_link_text_count == 0:
-            det += 10
-        if self.tabindex_misuse_count == 0:
-            det += 10
-
-        llm = self.llm_score if self.llm_score is not None else det
-        self.score = round(det * 0.5 + llm * 0.5)
+        """Blend deterministic checklist (50%) with LLM qualitative (50%);
+        see :func:`scoring.score_accessibility`."""
+        self.score = score_accessibility(vars(self))
         return self
 
 
@@ -431,26 +302,9 @@ class CanonicalAnalysis(_ScoredModel):
 
     @model_validator(mode="after")
     def auto_score(self) -> CanonicalAnalysis:
-        """Score breakdown:
-        - Canonical present & matches: 50 pts
-        - Canonical present but mismatch: 20 pts
-        - No canonical: 0 pts from this component
-        - No redirect chain (direct access): 30 pts
-        - Short redirect chain (1 hop): 20 pts
-        - Long chain (2+): 0 pts
-        - hreflang present: 20 pts
-        """
-        s = 0
-        if self.canonical_url:
-            s += 50 if self.matches_actual_url else 20
-        chain_len = len(self.redirect_chain)
-        if chain_len == 0:
-            s += 30
-        elif chain_len == 1:
-            s += 20
-        if self.has_hreflang:
-            s += 20
-        self.score = min(s, 100)
+        """Canonical, redirect-chain and hreflang checks, see
+        :func:`scoring.score_canonical`."""
+        self.score = score_canonical(vars(self))
         return self
 
 
@@ -458,29 +312,49 @@ class CanonicalAnalysis(_ScoredModel):
 # Score weights for overall grade
 # ---------------------------------------------------------------------------
 
-DEFAULT_SCORE_WEIGHTS: Dict[str, float] = {
-    "onpage_seo": 0.20,
-    "schema_analysis": 0.10,
-    "content_analysis": 0.15,
-    "link_analysis": 0.15,
-    "performance": 0.10,
-    "readability": 0.10,
-    "security": 0.10,
-    "accessibility": 0.10,
-}
+# DEFAULT_SCORE_WEIGHTS and compute_letter_grade live in ``scoring`` and are
+# re-exported here for existing imports.
 
 
-def compute_letter_grade(score: float) -> str:
-    """Map a 0-100 numeric score to an A-F letter grade."""
-    if score >= 90:
-        return "A"
-    if score >= 80:
-        return "B"
-    if score >= 70:
-        return "C"
-    if score >= 60:
-        return "D"
-    return "F"
+# ---------------------------------------------------------------------------
+# LLM call metadata (recorded per page, not scored)
+# ---------------------------------------------------------------------------
+
+class LlmCallMeta(BaseModel):
+    """How the LLM dimensions of a page were obtained."""
+    status: Literal["ok", "failed"] = "ok"
+    error: Optional[str] = None         # exception type of the last failed attempt
+    endpoint: Optional[str] = None      # pool endpoint that answered
+    model: Optional[str] = None
+    retries: int = 0
+    requests: int = 0                   # request attempts sent, incl. retries, follow-ups and sub-requests
+    queue_wait_ms: Optional[int] = None  # waiting for a concurrency slot, all attempts
+    latency_ms: Optional[int] = None    # last attempt: request sent → response received
+    total_ms: Optional[int] = None      # whole call including retries and backoff
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    tokens_estimated: bool = False      # usage not reported by the server (~4 chars/token)
+    batch_size: int = 1                 # pages sharing the call; tokens are this page's share
+    streamed: bool = False
+    ttft_ms: Optional[int] = None       # time to first streamed token
+    stream_ms: Optional[int] = None     # first token → last consumed token
+    aborted_early: bool = False         # stream cut once all dimensions were complete
+    hedged: bool = False                # a duplicate request was sent to a second endpoint
+    output_mode: Optional[str] = None   # response_format type: json_object or json_schema
+    invalid_outputs: int = 0            # attempts whose output was not a usable JSON object
+    backfilled_dimensions: int = 0      # requested dimensions missing from the answer
+    repaired: bool = False              # output parsed only after json_repair (fences, truncation...)
+    salvaged_dimensions: int = 0        # complete dimensions kept from a repaired output
+    followup_dimensions: int = 0        # dimensions re-requested after a repair
+    # Model cascade: tier ("fast"/"strong") that answered each model-scored
+    # dimension, and the dimensions the fast tier escalated
+    dimension_tiers: Dict[str, str] = Field(default_factory=dict)
+    escalated: List[str] = Field(default_factory=list)
+    prompt_mode: Optional[str] = None   # "single", "split" (per-dimension prompts) or "batch"
+    content_chunks: int = 0             # long page: text chunks scored for content_analysis
+    content_chunks_skipped: int = 0     # chunks left out to stay within the page token cap
+    template_exemplar: Optional[str] = None  # template diff: URL of the exemplar the prompt referenced
+    template_tokens_saved: int = 0      # estimated prompt tokens saved by the template diff
 
 
 # ---------------------------------------------------------------------------
@@ -503,25 +377,17 @@ class PageAudit(BaseModel):
     security: SecurityCheck
     accessibility: AccessibilityAnalysis
     canonical_analysis: CanonicalAnalysis
+    llm_meta: Optional[LlmCallMeta] = None
+    # Who scored each LLM dimension: "llm", "rules" (deterministic fast path),
+    # "default" (backfilled after a failed/incomplete LLM response) or
+    # "skipped" (no LLM call, e.g. the session budget was spent)
+    dimension_sources: Dict[str, str] = Field(default_factory=dict)
 
     @computed_field  # type: ignore[misc]
     @property
     def overall_score(self) -> float:
         """Weighted average of all 8 dimension scores."""
-        scores = {
-            "onpage_seo": self.onpage_seo.score,
-            "schema_analysis": self.schema_analysis.score,
-            "content_analysis": self.content_analysis.score,
-            "link_analysis": self.link_analysis.score,
-            "performance": self.performance.score,
-            "readability": self.readability.score,
-            "security": self.security.score,
-            "accessibility": self.accessibility.score,
-        }
-        total = sum(
-            scores[k] * DEFAULT_SCORE_WEIGHTS[k] for k in DEFAULT_SCORE_WEIGHTS
-        )
-        return round(total, 1)
+        return overall_score({k: getattr(self, k).score for k in DEFAULT_SCORE_WEIGHTS})
 
     @computed_field  # type: ignore[misc]
     @property
@@ -552,13 +418,42 @@ class PageScoreEntry(BaseModel):
 
 class AggregatedIssue(BaseModel):
     description: str
+    code: Optional[str] = None          # catalogue code of a rule-generated issue
     severity: Literal["high", "medium", "low"]
     count: int = 1
     affected_pages: List[str] = Field(default_factory=list)
 
 
+class LlmUsageSummary(BaseModel):
+    """LLM time, tokens and failures across all model-scored pages."""
+    pages: int = 0
+    failed: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    estimated_token_pages: int = 0
+    repaired_outputs: int = 0           # near-valid outputs repaired instead of retried
+    salvaged_dimensions: int = 0
+    followup_requests: int = 0
+    escalated_pages: int = 0            # cascade: pages sent on to the strong model
+    chunked_pages: int = 0              # long pages whose content was map-reduced over chunks
+    # Template diff, by exemplar URL: pages prompted as diffs and prompt tokens saved
+    template_savings: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    # End-to-end LLM time per page (total_ms) by prompt mode: pages, p50, p90, max
+    latency_by_prompt_mode: Dict[str, Dict[str, Optional[float]]] = Field(default_factory=dict)
+    llm_seconds: float = 0.0            # summed call time (batched calls split across pages)
+    latency_ms: Dict[str, Optional[float]] = Field(default_factory=dict)
+    queue_wait_ms: Dict[str, Optional[float]] = Field(default_factory=dict)
+    by_endpoint: Dict[str, int] = Field(default_factory=dict)
+    by_model: Dict[str, int] = Field(default_factory=dict)
+    # Per response-format mode: pages, invalid outputs, backfilled and failed
+    # pages, and fallback_rate — the share of pages that needed any of those
+    by_output_mode: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+
+
 class SiteSummary(BaseModel):
     pages_audited: int = 0
+    partial: bool = False               # checkpoint written while the crawl was still running
     overall_grade: str = "F"
     overall_score: float = 0.0
     dimension_averages: Dict[str, float] = Field(default_factory=dict)
@@ -568,4 +463,6 @@ class SiteSummary(BaseModel):
     best_pages: List[PageScoreEntry] = Field(default_factory=list)
     worst_pages: List[PageScoreEntry] = Field(default_factory=list)
     top_issues: List[AggregatedIssue] = Field(default_factory=list)
+    # Every page, for sessions small enough to list them (see services/site_summary.py)
     pages: List[PageScoreEntry] = Field(default_factory=list)
+    llm_usage: Optional[LlmUsageSummary] = None
@@ -0,0 +1,283 @@
+"""Deterministic dimension scoring as plain functions.
+
+The Pydantic validators in ``schemas`` delegate here, and the crawl hot
+path calls these directly on raw dicts, so a page's scores are computed
+without building (and later re-validating) models. Each function takes a
+mapping with the fields of the matching model; missing keys fall back to
+the model defaults.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+DEFAULT_SCORE_WEIGHTS: Dict[str, float] = {
+    "onpage_seo": 0.20,
+    "schema_analysis": 0.10,
+    "content_analysis": 0.15,
+    "link_analysis": 0.15,
+    "performance": 0.10,
+    "readability": 0.10,
+    "security": 0.10,
+    "accessibility": 0.10,
+}
+
+
+@dataclass(frozen=True)
+class ScoreThresholds:
+    """Tier boundaries of the deterministic scorers and the letter grades.
+
+    Crawls always score with the defaults; ``rescore`` can apply others to a
+    finished session.
+    """
+    # Upper bounds of the TTFB/FCP tiers: good, needs improvement (ms)
+    ttfb_ms: Tuple[float, float] = (800, 1800)
+    fcp_ms: Tuple[float, float] = (1800, 3000)
+    # Upper bounds of the 100/75/50 tiers (anything above scores 25)
+    page_size_bytes: Tuple[float, float, float] = (500_000, 1_000_000, 2_000_000)
+    resource_count: Tuple[float, float, float] = (30, 60, 100)
+    # Lower bounds of the 100/80/60/40 Flesch Reading Ease bands
+    flesch_reading_ease: Tuple[float, float, float, float] = (60, 50, 40, 30)
+    # Readability below this many words is flagged as thin content
+    thin_content_words: int = 300
+    # Lower bounds of the A/B/C/D grades
+    grades: Tuple[float, float, float, float] = (90, 80, 70, 60)
+
+
+DEFAULT_THRESHOLDS = ScoreThresholds()
+THIN_CONTENT_WORDS = DEFAULT_THRESHOLDS.thin_content_words
+
+
+def resolve_weights(overrides: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+    """``DEFAULT_SCORE_WEIGHTS`` updated with ``overrides`` (e.g. the
+    ``score_weights`` config mapping); the result must sum to 1.0."""
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(DEFAULT_SCORE_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown score weight(s): {', '.join(sorted(unknown))}")
+    weights = {k: float(overrides.get(k, w)) for k, w in DEFAULT_SCORE_WEIGHTS.items()}
+    if any(w < 0 for w in weights.values()) or abs(sum(weights.values()) - 1.0) > 1e-6:
+        raise ValueError(f"Score weights must be non-negative and sum to 1.0, got {weights}")
+    return weights
+
+
+def resolve_thresholds(overrides: Optional[Mapping[str, Any]] = None) -> ScoreThresholds:
+    """``DEFAULT_THRESHOLDS`` with ``overrides`` applied (lists become tuples)."""
+    overrides = dict(overrides or {})
+    known = {f.name: f for f in fields(ScoreThresholds)}
+    unknown = set(overrides) - set(known)
+    if unknown:
+        raise ValueError(f"Unknown score threshold(s): {', '.join(sorted(unknown))}")
+    values: Dict[str, Any] = {}
+    for name, value in overrides.items():
+        default = getattr(DEFAULT_THRESHOLDS, name)
+        if isinstance(default, tuple):
+            value = tuple(float(v) for v in (value if isinstance(value, (list, tuple)) else [value]))
+            if len(value) != len(default):
+                raise ValueError(f"Threshold {name} needs {len(default)} values, got {len(value)}")
+        else:
+            value = int(value)
+        values[name] = value
+    return ScoreThresholds(**{**{n: getattr(DEFAULT_THRESHOLDS, n) for n in known}, **values})
+
+
+def compute_letter_grade(score: float, thresholds: ScoreThresholds = DEFAULT_THRESHOLDS) -> str:
+    """Map a 0-100 numeric score to an A-F letter grade."""
+    for grade, bound in zip("ABCD", thresholds.grades):
+        if score >= bound:
+            return grade
+    return "F"
+
+
+def score_onpage_seo(d: Mapping[str, Any]) -> int:
+    """Point-based scoring (max 100):
+    - has_title:               10 pts
+    - title_length_ok:         10 pts
+    - has_meta_description:    10 pts
+    - description_length_ok:    5 pts
+    - single_h1:              10 pts
+    - has_viewport_meta:        5 pts
+    - has_lang_attribute:      10 pts
+    - has_og_tags:              5 pts
+    - robots_allows_indexing:  10 pts
+    - image_alt_coverage:      15 pts (proportional)
+    - has_canonical:           10 pts
+    """
+    s = 0
+    if d.get("has_title"):
+        s += 10
+    if d.get("title_length_ok"):
+        s += 10
+    if d.get("has_meta_description"):
+        s += 10
+    if d.get("description_length_ok"):
+        s += 5
+    if d.get("single_h1"):
+        s += 10
+    if d.get("has_viewport_meta"):
+        s += 5
+    if d.get("has_lang_attribute"):
+        s += 10
+    if d.get("has_og_tags"):
+        s += 5
+    if d.get("robots_allows_indexing", True):
+        s += 10
+    # Image alt coverage: proportional 0-15 pts
+    s += round(d.get("image_alt_coverage_pct", 100.0) / 100.0 * 15)
+    if d.get("has_canonical"):
+        s += 10
+    return min(s, 100)
+
+
+def score_schema(d: Mapping[str, Any]) -> int:
+    """If no JSON-LD schemas were detected the score must be 0."""
+    return d["score"] if d.get("detected_types") else 0
+
+
+def score_performance(d: Mapping[str, Any], thresholds: ScoreThresholds = DEFAULT_THRESHOLDS) -> int:
+    """Score using Web Vitals-aligned thresholds.
+
+    TTFB (25% weight): ≤800ms=100, ≤1800ms=50, >1800ms=0
+    FCP  (25% weight): ≤1800ms=100, ≤3000ms=50, >3000ms=0 (or 50 if unavailable)
+    Page size (25% weight): ≤500KB=100, ≤1MB=75, ≤2MB=50, >2MB=25
+    Resource count (25% weight): ≤30=100, ≤60=75, ≤100=50, >100=25
+    (default ``thresholds``)
+    """
+    # TTFB tiers
+    ttfb = d.get("ttfb_ms", 0)
+    ttfb_score = _tier(ttfb, thresholds.ttfb_ms, (100, 50), 0)
+
+    # FCP tiers
+    fcp = d.get("fcp_ms")
+    if fcp is not None:
+        fcp_score = _tier(fcp, thresholds.fcp_ms, (100, 50), 0)
+    else:
+        fcp_score = 50  # neutral if FCP unavailable
+
+    # Page size tiers
+    ps_score = _tier(d.get("page_size_bytes", 0), thresholds.page_size_bytes, (100, 75, 50), 25)
+
+    # Resource count tiers
+    rc_score = _tier(d.get("resource_count", 0), thresholds.resource_count, (100, 75, 50), 25)
+
+    return round(
+        ttfb_score * 0.25
+        + fcp_score * 0.25
+        + ps_score * 0.25
+        + rc_score * 0.25
+    )
+
+
+def score_readability(d: Mapping[str, Any], thresholds: ScoreThresholds = DEFAULT_THRESHOLDS) -> int:
+    """Map Flesch Reading Ease to audit score.
+    FRE >= 60 → 100 (accessible for general web)
+    FRE 50-59 → 80
+    FRE 40-49 → 60
+    FRE 30-39 → 40
+    FRE < 30  → 20
+    Thin content (<300 words) caps at 50.
+    (default ``thresholds``)
+    """
+    fre = d.get("flesch_reading_ease", 0.0)
+    s = next((band for band, bound in zip((100, 80, 60, 40), thresholds.flesch_reading_ease) if fre >= bound), 20)
+
+    if d.get("word_count", 0) < thresholds.thin_content_words:
+        s = min(s, 50)
+    return s
+
+
+def score_security(d: Mapping[str, Any]) -> int:
+    """Score breakdown:
+    - HTTPS: 40 pts
+    - HSTS:  20 pts
+    - CSP:   20 pts
+    - X-Content-Type-Options: 10 pts
+    - No mixed content: 10 pts
+    """
+    s = 0
+    if d.get("is_https"):
+        s += 40
+    if d.get("has_hsts"):
+        s += 20
+    if d.get("has_csp"):
+        s += 20
+    if d.get("has_x_content_type"):
+        s += 10
+    if not d.get("mixed_content_urls"):
+        s += 10
+    return s
+
+
+def accessibility_checklist_score(d: Mapping[str, Any]) -> int:
+    """Deterministic checklist (max 100):
+    - has_skip_nav:           15 pts
+    - has_lang_attribute:     15 pts
+    - has_document_title:     10 pts
+    - has_heading_structure:  10 pts
+    - image_alt_coverage:     20 pts (proportional)
+    - form_labels_missing:    10 pts (0 missing = 10, any missing = 0)
+    - no generic link text:   10 pts (0 found = 10, any = 0)
+    - no tabindex misuse:     10 pts (0 misuse = 10, any = 0)
+    """
+    det = 0
+    if d.get("has_skip_nav"):
+        det += 15
+    if d.get("has_lang_attribute"):
+        det += 15
+    if d.get("has_document_title"):
+        det += 10
+    if d.get("has_heading_structure"):
+        det += 10
+    det += round(d.get("image_alt_coverage_pct", 100.0) / 100.0 * 20)
+    if d.get("form_labels_missing", 0) == 0:
+        det += 10
+    if d.get("generic_link_text_count", 0) == 0:
+        det += 10
+    if d.get("tabindex_misuse_count", 0) == 0:
+        det += 10
+    return det
+
+
+def score_accessibility(d: Mapping[str, Any]) -> int:
+    """Blend the deterministic checklist (50%) with the LLM's qualitative
+    ``llm_score`` (50%); without an LLM score the checklist counts twice."""
+    det = accessibility_checklist_score(d)
+    llm = d.get("llm_score")
+    llm = llm if llm is not None else det
+    return round(det * 0.5 + llm * 0.5)
+
+
+def score_canonical(d: Mapping[str, Any]) -> int:
+    """Score breakdown:
+    - Canonical present & matches: 50 pts
+    - Canonical present but mismatch: 20 pts
+    - No canonical: 0 pts from this component
+    - No redirect chain (direct access): 30 pts
+    - Short redirect chain (1 hop): 20 pts
+    - Long chain (2+): 0 pts
+    - hreflang present: 20 pts
+    """
+    s = 0
+    if d.get("canonical_url"):
+        s += 50 if d.get("matches_actual_url", True) else 20
+    chain_len = len(d.get("redirect_chain") or ())
+    if chain_len == 0:
+        s += 30
+    elif chain_len == 1:
+        s += 20
+    if d.get("has_hreflang"):
+        s += 20
+    return min(s, 100)
+
+
+def _tier(value: float, upper_bounds: Tuple[float, ...], scores: Tuple[int, ...], above: int) -> int:
+    """Score of the first tier whose upper bound ``value`` does not exceed."""
+    return next((score for score, bound in zip(scores, upper_bounds) if value <= bound), above)
+
+
+def overall_score(
+    dimension_scores: Mapping[str, float],
+    weights: Mapping[str, float] = DEFAULT_SCORE_WEIGHTS,
+) -> float:
+    """Weighted average of the dimension scores, rounded to one decimal."""
+    return round(sum(dimension_scores[k] * weights[k] for k in weights), 1)
@@ -1,24 +1,36 @@
 import hashlib
 import json
+import os
 import re
-from collections import Counter
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Mapping, Optional
 from urllib.parse import urlparse
 
 import scrapy
 from itemadapter import ItemAdapter
+from pydantic import ValidationError
 
 from ai_seo_auditor.models.schemas import (
-    SiteSummary, PageScoreEntry, AggregatedIssue, compute_letter_grade,
-    DEFAULT_SCORE_WEIGHTS,
+    PageAudit, PageScoreEntry, LlmUsageSummary, compute_letter_grade, DEFAULT_SCORE_WEIGHTS,
 )
+from ai_seo_auditor.models.scoring import overall_score, resolve_weights
+from ai_seo_auditor.services.batch_inference import DeferredWorkWriter
+from ai_seo_auditor.services.page_snapshots import SnapshotStore
+from ai_seo_auditor.services.report_writer import ReportWriter, WriterOptions
+from ai_seo_auditor.services.score_table import ScoreTableWriter, pa, score_row
+from ai_seo_auditor.services.session_db import SessionDbWriter, page_rows
+from ai_seo_auditor.services.session_storage import SegmentWriter, StorageOptions
+from ai_seo_auditor.services.site_summary import Reservoir, SiteSummaryBuilder
 
 
 class JsonReportPipeline:
     _invalid_filename_chars = re.compile(r"[<>:\"/\\|?*]+")
     _project_root = Path(__file__).resolve().parents[1]
+    # A partial site summary is written every this many recorded pages
+    summary_checkpoint_pages = 1000
 
     def open_spider(self, spider: scrapy.Spider) -> None:
         # Determine root domain from the first start_url
@@ -31,41 +43,131 @@ class JsonReportPipeline:
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         folder_name = f"{domain}_{timestamp}"
 
-        self.reports_dir = self._project_root / "reports" / folder_name
-        self.reports_dir.mkdir(parents=True, exist_ok=True)
-        self._page_scores: List[PageScoreEntry] = []
-        # Collect all issues across pages for aggregation
-        self._all_issues: List[Dict[str, Any]] = []
+        self.open_session(
+            self._project_root / "reports" / folder_name,
+            spider.logger,
+            score_weights=getattr(spider, "score_weights", None),
+            storage=getattr(spider, "report_storage", None),
+            writer=getattr(spider, "report_writer", None) or WriterOptions(),
+        )
+        self.logger.info(f"Reports will be saved to {self.reports_dir}")
 
-        spider.logger.info(f"Reports will be saved to {self.reports_dir}")
+    def open_session(
+        self,
+        reports_dir: Path,
+        logger: Any,
+        score_weights: Optional[Mapping[str, float]] = None,
+        storage: Optional[StorageOptions] = None,
+        writer: Optional[WriterOptions] = None,
+    ) -> None:
+        """Start collecting pages for ``reports_dir`` (also used outside a crawl).
+
+        ``score_weights`` (the ``score_weights`` config mapping) weighs each
+        page's overall score; the defaults apply when omitted. ``storage``
+        picks per-file or segment storage; by default an existing session
+        keeps its layout and a new one gets per-file reports. ``writer``
+        moves the file writes to a writer thread (inline by default).
+        """
+        self.reports_dir = reports_dir
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+        self.score_weights = resolve_weights(score_weights)
+        # Running site summary aggregates (bounded however many pages)
+        self._summary = SiteSummaryBuilder()
+        self._summary_lock = threading.Lock()
+        self._summary_final = False
+        # LLM usage totals of model-scored pages, plus sampled timings for percentiles
+        self._llm_usage = LlmUsageSummary()
+        self._llm_latencies = Reservoir()
+        self._llm_waits = Reservoir()
+        self._llm_page_times: Dict[str, Reservoir] = {}
+        # Pages whose LLM call was deferred to the offline batch runner
+        self._deferred: Optional[DeferredWorkWriter] = None
+        # Reports and the page inputs kept for re-analysis, written in
+        # batches by a writer thread during a crawl
+        storage = storage or StorageOptions.for_session(reports_dir)
+        self._writer = ReportWriter(
+            reports_dir,
+            SegmentWriter(reports_dir, storage.compression, storage.segment_max_mb)
+            if storage.layout == "segments" else None,
+            SnapshotStore(reports_dir),
+            writer or WriterOptions(threaded=False),
+            logger,
+        )
+        # Columnar score table for analytical reads (needs pyarrow)
+        self._score_table: Optional[ScoreTableWriter] = ScoreTableWriter(reports_dir) if pa is not None else None
+        if self._score_table is None:
+            self.logger.warning("pyarrow is not installed — no score table is written for this session.")
+        # SQLite database of page scores and issues for the API's queries
+        self._session_db: Optional[SessionDbWriter] = None
+        try:
+            self._session_db = SessionDbWriter(reports_dir)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to open the session database: {e}")
 
     def process_item(self, item: Any, spider: scrapy.Spider) -> Any:
         adapter = ItemAdapter(item)
-        url = adapter.get("url", "unknown_url")
-        audit_status = adapter.get("audit_status", "complete")
+        snapshot = adapter.pop("page_snapshot", None)
+        if snapshot is not None:
+            self._writer.submit_snapshot(self._build_safe_filename(adapter["url"]), snapshot)
+        if "deferred_llm" in adapter:
+            if self._deferred is None:
+                self._deferred = DeferredWorkWriter(self.reports_dir)
+            self._deferred.add(self._build_safe_filename(adapter["url"]), adapter["deferred_llm"])
+        else:
+            self.write_page(adapter.asdict())
+        stats = getattr(getattr(spider, "crawler", None), "stats", None)
+        if stats is not None:
+            stats.set_value("report_writer/queue_depth", self._writer.queue_depth)
+        return item
 
+    def write_page(self, report: Dict[str, Any]) -> None:
+        """Validate one page report, write it and add it to the site summary.
+
+        This is the only place a crawled page becomes a :class:`PageAudit`;
+        the spider and LLM service pass plain dicts.
+        """
+        url = report.get("url", "unknown_url")
         safe_name = self._build_safe_filename(url)
-        filename = self.reports_dir / f"{safe_name}.json"
 
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(adapter.asdict(), f, indent=2, ensure_ascii=False, default=str)
+            report = PageAudit.model_validate(report).model_dump(mode="json")
+        except ValidationError as e:
+            self.logger.error(f"Invalid audit report for {url}: {e}")
+            return
+        if self.score_weights != DEFAULT_SCORE_WEIGHTS:
+            # PageAudit's computed overall score always uses the default weights
+            report["overall_score"] = overall_score(
+                {k: report[k]["score"] for k in self.score_weights}, self.score_weights,
+            )
+            report["letter_grade"] = compute_letter_grade(report["overall_score"])
+        try:
+            data = self._writer.encode_report(report)
         except (TypeError, ValueError) as e:
-            spider.logger.error(f"Failed to serialize report for {url}: {e}")
-            return item
+            self.logger.error(f"Failed to serialize report for {url}: {e}")
+            return
+
+        self._writer.submit_report(safe_name, data)
+        self.record_page(report)
+        self.logger.info(f"Saved audit report for {url} ({safe_name})")
+
+    def record_page(self, report: Dict[str, Any]) -> None:
+        """Collect a page's scores and issues for the site summary."""
+        url = report.get("url", "unknown_url")
+        audit_status = report.get("audit_status", "complete")
 
         # Collect per-page scores
-        ops = adapter.get("onpage_seo", {}).get("score", 0)
-        sch = adapter.get("schema_analysis", {}).get("score", 0)
-        cnt = adapter.get("content_analysis", {}).get("score", 0)
-        lnk = adapter.get("link_analysis", {}).get("score", 0)
-        prf = adapter.get("performance", {}).get("score", 0)
-        rda = adapter.get("readability", {}).get("score", 0)
-        sec = adapter.get("security", {}).get("score", 0)
-        a11 = adapter.get("accessibility", {}).get("score", 0)
-        can = adapter.get("canonical_analysis", {}).get("score", 0)
-
-        # Compute overall score using weights
+        ops = report.get("onpage_seo", {}).get("score", 0)
+        sch = report.get("schema_analysis", {}).get("score", 0)
+        cnt = report.get("content_analysis", {}).get("score", 0)
+        lnk = report.get("link_analysis", {}).get("score", 0)
+        prf = report.get("performance", {}).get("score", 0)
+        rda = report.get("readability", {}).get("score", 0)
+        sec = report.get("security", {}).get("score", 0)
+        a11 = report.get("accessibility", {}).get("score", 0)
+        can = report.get("canonical_analysis", {}).get("score", 0)
+
+        # Validated reports carry their computed overall score; otherwise weigh it here
         scores_dict = {
             "onpage_seo": ops,
             "schema_analysis": sch,
@@ -76,19 +178,16 @@ class JsonReportPipeline:
             "security": sec,
             "accessibility": a11,
         }
-        overall = round(sum(scores_dict[k] * DEFAULT_SCORE_WEIGHTS[k] for k in DEFAULT_SCORE_WEIGHTS), 1)
-
-        # Count issues for this page — collect from all dimensions that have issues
-        issues_count = 0
-        for section_key in ("onpage_seo", "content_analysis", "link_analysis", "readability", "accessibility"):
-            section_issues = adapter.get(section_key, {}).get("issues", [])
-            issues_count += len(section_issues)
-            for issue in section_issues:
-                self._all_issues.append({
-                    "description": issue.get("description", ""),
-                    "severity": issue.get("severity", "medium"),
-                    "url": url,
-                })
+        overall = report.get("overall_score")
+        if overall is None:
+            overall = overall_score(scores_dict, self.score_weights)
+
+        # Issues of all dimensions that have them
+        issues = [
+            issue
+            for section_key in ("onpage_seo", "content_analysis", "link_analysis", "readability", "accessibility")
+            for issue in report.get(section_key, {}).get("issues", [])
+        ]
 
         entry = PageScoreEntry(
             url=url,
@@ -104,98 +203,167 @@ class JsonReportPipeline:
             canonical_score=can,
             overall_score=overall,
             letter_grade=compute_letter_grade(overall),
-            issues_count=issues_count,
+            issues_count=len(issues),
         )
-        self._page_scores.append(entry)
+        self._summary.add(entry, issues)
+        page_id = self._build_safe_filename(url)
+        if self._score_table is not None:
+            rows = self._score_table.add(score_row(page_id, report, entry.model_dump()))
+            if rows:
+                table = self._score_table
+                self._writer.submit_task("score table", lambda: table.write_rows(rows))
+        if self._session_db is not None:
+            batch = self._session_db.add(page_rows(page_id, report))
+            if batch:
+                db = self._session_db
+                self._writer.submit_task("session database", lambda: db.write_pages(batch))
+        if report.get("llm_meta"):
+            self._add_llm_meta(report["llm_meta"])
+        if self.summary_checkpoint_pages and self._summary.pages % self.summary_checkpoint_pages == 0:
+            self._checkpoint_summary()
 
-        spider.logger.info(f"Saved audit report for {url} to {filename}")
-        return item
+    def close_session(self) -> dict[str, Any]:
+        """Wait for every queued write, close the storage and return the
+        writer's stats."""
+        stats = self._writer.close()
+        if self._score_table is not None:
+            try:
+                self._score_table.close()
+            except (OSError, ValueError, TypeError) as e:
+                self.logger.error(f"Failed to write the score table: {e}")
+                stats["errors"] += 1
+            self._score_table = None
+        if self._session_db is not None:
+            try:
+                self._session_db.close()
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to write the session database: {e}")
+                stats["errors"] += 1
+            self._session_db = None
+        if stats["errors"]:
+            self.logger.error(f"{stats['errors']} report writes failed, see the errors above")
+        return stats
 
     def close_spider(self, spider: scrapy.Spider) -> None:
+        writer_stats = self.close_session()
+        self.logger.info(
+            f"Report writer: {writer_stats['reports']} page reports ({writer_stats['snapshots']} snapshots, "
+            f"{writer_stats['tasks']} other writes) in {writer_stats['batches']} batches, "
+            f"p90 batch write {writer_stats['batch_write_ms']['p90']} ms, "
+            f"max queue depth {writer_stats['max_queue_depth']}, blocked {writer_stats['blocked_ms']} ms"
+        )
+        stats = getattr(getattr(spider, "crawler", None), "stats", None)
+        if stats is not None:
+            for key, value in writer_stats.items():
+                stats.set_value(f"report_writer/{key}", value)
+        if self._deferred is not None:
+            self._deferred.close()
+            self.logger.info(
+                f"Deferred LLM analysis for {self._deferred.count} pages. Run "
+                f"`python -m ai_seo_auditor batch run {self.reports_dir.name}` and then "
+                f"`python -m ai_seo_auditor batch merge {self.reports_dir.name}` to finish the reports."
+            )
+            return
+        self.write_summary()
+
+    def write_summary(self) -> None:
         """Write an aggregate site summary report."""
         try:
-            if not self._page_scores:
-                spider.logger.warning("No page scores collected — skipping site summary.")
+            if not self._summary.pages:
+                self.logger.warning("No page scores collected — skipping site summary.")
                 return
+            summary = self._summary.build(llm_usage=self._build_llm_usage())
+            summary_path = self._store_summary(self._encode_summary(summary), final=True)
+            self.logger.info(f"Site summary saved to {summary_path}")
+        except Exception as e:
+            self.logger.error(f"Failed to write site summary: {e}", exc_info=True)
 
-            total = len(self._page_scores)
-
-            # Only include complete/partial audits in averages (exclude failed)
-            valid_pages = [p for p in self._page_scores if p.audit_status != "failed"]
-            valid_count = len(valid_pages) or 1  # avoid div-by-zero
-
-            # Dimension averages
-            dim_keys = [
-                ("onpage_seo_score", "onpage_seo"),
-                ("schema_score", "schema_analysis"),
-                ("content_score", "content_analysis"),
-                ("link_score", "link_analysis"),
-                ("performance_score", "performance"),
-                ("readability_score", "readability"),
-                ("security_score", "security"),
-                ("accessibility_score", "accessibility"),
-                ("canonical_score", "canonical_analysis"),
-            ]
-            dimension_averages = {}
-            for attr, label in dim_keys:
-                dimension_averages[label] = round(
-                    sum(getattr(p, attr) for p in valid_pages) / valid_count, 1
-                )
-
-            overall_avg = round(
-                sum(p.overall_score for p in valid_pages) / valid_count, 1
-            )
+    def _checkpoint_summary(self) -> None:
+        """Queue a partial site summary, so a killed crawl still leaves one.
 
-            # Best / worst pages (by overall_score)
-            sorted_pages = sorted(self._page_scores, key=lambda p: p.overall_score)
-            worst_pages = sorted_pages[:3]
-            best_pages = sorted_pages[-3:][::-1]
-
-            # Severity distribution
-            severity_dist: Dict[str, int] = {"high": 0, "medium": 0, "low": 0}
-            for issue in self._all_issues:
-                sev = issue.get("severity", "medium")
-                if sev in severity_dist:
-                    severity_dist[sev] += 1
-
-            # Aggregate top issues — group by description, count occurrences
-            issue_counter: Counter = Counter()
-            issue_severity: Dict[str, str] = {}
-            issue_pages: Dict[str, List[str]] = {}
-            for issue in self._all_issues:
-                desc = issue["description"]
-                issue_counter[desc] += 1
-                issue_severity.setdefault(desc, issue["severity"])
-                issue_pages.setdefault(desc, []).append(issue["url"])
-
-            top_issues = [
-                AggregatedIssue(
-                    description=desc,
-                    severity=issue_severity[desc],
-                    count=count,
-                    affected_pages=list(dict.fromkeys(issue_pages[desc])),  # unique, ordered
-                )
-                for desc, count in issue_counter.most_common(20)
-            ]
-
-            summary = SiteSummary(
-                pages_audited=total,
-                overall_grade=compute_letter_grade(overall_avg),
-                overall_score=overall_avg,
-                dimension_averages=dimension_averages,
-                severity_distribution=severity_dist,
-                best_pages=best_pages,
-                worst_pages=worst_pages,
-                top_issues=top_issues,
-                pages=sorted_pages,
-            )
+        The aggregates are bounded, so this costs the same at any crawl
+        size; LLM usage (percentiles over every page) is left to the final
+        summary.
+        """
+        try:
+            data = self._encode_summary(self._summary.build(partial=True))
+        except (TypeError, ValueError) as e:
+            self.logger.error(f"Failed to serialize the partial site summary: {e}")
+            return
+        self._writer.submit_task("site summary", lambda: self._store_summary(data, final=False))
 
-            summary_path = self.reports_dir / "_site_summary.json"
-            with open(summary_path, "w", encoding="utf-8") as f:
-                json.dump(summary.model_dump(), f, indent=2, ensure_ascii=False, default=str)
-            spider.logger.info(f"Site summary saved to {summary_path}")
-        except Exception as e:
-            spider.logger.error(f"Failed to write site summary: {e}", exc_info=True)
+    @staticmethod
+    def _encode_summary(summary: Any) -> bytes:
+        return json.dumps(summary.model_dump(), indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+    def _store_summary(self, data: bytes, final: bool) -> Path:
+        """Replace the summary file atomically; a checkpoint never overwrites the final summary."""
+        summary_path = self.reports_dir / "_site_summary.json"
+        with self._summary_lock:
+            if self._summary_final and not final:
+                return summary_path
+            tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, summary_path)
+            self._summary_final = self._summary_final or final
+        return summary_path
+
+    def _add_llm_meta(self, meta: Mapping[str, Any]) -> None:
+        """Add one model-scored page's llm_meta to the LLM usage totals."""
+        usage = self._llm_usage
+        batch_size = meta.get("batch_size") or 1
+        usage.pages += 1
+        usage.failed += meta.get("status") == "failed"
+        usage.retries += meta.get("retries") or 0
+        usage.prompt_tokens += meta.get("prompt_tokens") or 0
+        usage.completion_tokens += meta.get("completion_tokens") or 0
+        usage.estimated_token_pages += bool(meta.get("tokens_estimated"))
+        usage.repaired_outputs += bool(meta.get("repaired"))
+        usage.salvaged_dimensions += meta.get("salvaged_dimensions") or 0
+        usage.followup_requests += bool(meta.get("followup_dimensions"))
+        usage.escalated_pages += bool(meta.get("escalated"))
+        usage.chunked_pages += bool(meta.get("content_chunks"))
+        if meta.get("template_exemplar"):
+            savings = usage.template_savings.setdefault(meta["template_exemplar"], {"pages": 0, "tokens_saved": 0})
+            savings["pages"] += 1
+            savings["tokens_saved"] += meta.get("template_tokens_saved", 0)
+        usage.llm_seconds += (meta.get("total_ms") or 0) / 1000 / batch_size
+        if meta.get("latency_ms") is not None:
+            self._llm_latencies.add(meta["latency_ms"])
+        if meta.get("queue_wait_ms") is not None:
+            self._llm_waits.add(meta["queue_wait_ms"])
+        if meta.get("prompt_mode") and meta.get("total_ms") is not None:
+            self._llm_page_times.setdefault(meta["prompt_mode"], Reservoir()).add(meta["total_ms"])
+        for key, field in (("endpoint", usage.by_endpoint), ("model", usage.by_model)):
+            if meta.get(key):
+                field[meta[key]] = field.get(meta[key], 0) + 1
+        if meta.get("output_mode"):
+            mode = usage.by_output_mode.setdefault(meta["output_mode"], {
+                "pages": 0, "invalid_outputs": 0, "backfilled_pages": 0, "failed": 0, "fallbacks": 0,
+            })
+            invalid = meta.get("invalid_outputs") or 0
+            backfilled = bool(meta.get("backfilled_dimensions"))
+            failed = meta.get("status") == "failed"
+            mode["pages"] += 1
+            mode["invalid_outputs"] += invalid
+            mode["backfilled_pages"] += backfilled
+            mode["failed"] += failed
+            mode["fallbacks"] += bool(invalid or backfilled or failed)
+
+    def _build_llm_usage(self) -> Optional[LlmUsageSummary]:
+        """Totals and latency percentiles over the model-scored pages so far."""
+        if not self._llm_usage.pages:
+            return None
+        usage = self._llm_usage.model_copy(deep=True)
+        for mode in usage.by_output_mode.values():
+            mode["fallback_rate"] = round(mode.pop("fallbacks") / mode["pages"], 3)
+        usage.llm_seconds = round(usage.llm_seconds, 1)
+        usage.latency_ms = self._llm_latencies.percentiles((50, 90, 99))
+        usage.queue_wait_ms = self._llm_waits.percentiles((50, 95))
+        usage.latency_by_prompt_mode = {
+            mode: {"pages": times.count, **times.percentiles((50, 90))} for mode, times in self._llm_page_times.items()
+        }
+        return usage
 
     def _build_safe_filename(self, url: str) -> str:
         sanitized = self._invalid_filename_chars.sub("_", url)
@@ -0,0 +1,308 @@
+"""Offline batch inference: crawl now, run the LLM later.
+
+In deferred mode the crawl writes two work files into the session folder:
+
+- ``_llm_requests.jsonl`` — one request per page in the OpenAI Batch API
+  input format (``custom_id``, ``method``, ``url``, ``body``). It can be
+  uploaded to a hosted Batch API as-is or run locally with
+  :func:`run_requests`.
+- ``_llm_context.jsonl`` — the spider-computed dimensions and the rule-filled
+  LLM dimensions for each ``custom_id``.
+
+:func:`run_requests` pushes the requests through the endpoint pool at high
+concurrency and appends to ``_llm_results.jsonl`` in the Batch API output
+format. Pages that already have a successful result are skipped, so an
+interrupted run can simply be restarted. :func:`merge_results` then
+finishes the ``PageAudit`` reports and writes the site summary.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional
+
+import openai
+from pydantic import ValidationError
+
+from ai_seo_auditor.models.schemas import LlmCallMeta
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.llm_endpoints import Endpoint
+from ai_seo_auditor.services.llm_limiter import backoff_delay, retry_after_seconds
+from ai_seo_auditor.services.llm_service import (
+    DEFAULT_DIMENSION_POLICY,
+    DimensionPolicy,
+    PageContext,
+    build_page_request,
+    finalize_page_audit,
+    plan_dimensions,
+)
+from ai_seo_auditor.services.session_storage import iter_reports
+
+REQUESTS_FILE = "_llm_requests.jsonl"
+CONTEXT_FILE = "_llm_context.jsonl"
+RESULTS_FILE = "_llm_results.jsonl"
+
+_BATCH_ENDPOINT_URL = "/v1/chat/completions"
+
+
+def build_deferred_request(
+    ctx: PageContext,
+    policy: DimensionPolicy = DEFAULT_DIMENSION_POLICY,
+    structured_output: Optional[bool] = None,
+) -> Optional[dict[str, Any]]:
+    """Work item for one page, or ``None`` when rules cover every dimension
+    and the page can be finished straight away."""
+    model_dims, rule_data = plan_dimensions(ctx, policy)
+    if not model_dims:
+        return None
+    body = build_page_request(ctx, model_dims, structured_output)
+    return {
+        "body": body,
+        "context": {
+            "output_mode": body["response_format"]["type"],
+            "page": ctx.to_record(include_inputs=False),
+            "model_dims": list(model_dims),
+            "rule_data": rule_data,
+        },
+    }
+
+
+class DeferredWorkWriter:
+    """Appends deferred pages to the request and context work files."""
+
+    def __init__(self, session_dir: Path) -> None:
+        self.session_dir = session_dir
+        self.count = 0
+        self._requests = open(session_dir / REQUESTS_FILE, "a", encoding="utf-8")
+        self._context = open(session_dir / CONTEXT_FILE, "a", encoding="utf-8")
+
+    def add(self, custom_id: str, deferred: dict[str, Any]) -> None:
+        request = {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": _BATCH_ENDPOINT_URL,
+            "body": deferred["body"],
+        }
+        self._requests.write(json.dumps(request, ensure_ascii=False) + "\n")
+        self._context.write(json.dumps({"custom_id": custom_id, **deferred["context"]}, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._requests.close()
+        self._context.close()
+
+
+def _read_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield JSON lines, skipping blanks and a torn last line from a crash."""
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _load_results(path: Path) -> dict[str, dict[str, Any]]:
+    """Latest result line per ``custom_id`` (re-runs append, later lines win)."""
+    return {line["custom_id"]: line for line in _read_jsonl(path) if "custom_id" in line}
+
+
+def _is_success(result: dict[str, Any]) -> bool:
+    response = result.get("response") or {}
+    return result.get("error") is None and response.get("status_code") == 200
+
+
+def _result_content(result: dict[str, Any]) -> dict:
+    """Parse the JSON object the model returned in a Batch API output line."""
+    if not _is_success(result):
+        error = result.get("error") or {}
+        raise ValueError(error.get("message") or "Batch request failed")
+    content = result["response"]["body"]["choices"][0]["message"]["content"]
+    if not content:
+        raise ValueError("Empty response from LLM")
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return data
+
+
+def _result_meta(
+    result: Optional[dict[str, Any]],
+    error: Optional[Exception],
+    output_mode: Optional[str] = None,
+) -> LlmCallMeta:
+    """Model and token usage recorded in a Batch API output line."""
+    meta = LlmCallMeta(
+        status="failed" if error is not None else "ok",
+        error=type(error).__name__ if error is not None else None,
+        output_mode=output_mode,
+    )
+    body = ((result or {}).get("response") or {}).get("body") or {}
+    usage = body.get("usage") or {}
+    meta.model = body.get("model")
+    meta.prompt_tokens = usage.get("prompt_tokens")
+    meta.completion_tokens = usage.get("completion_tokens")
+    return meta
+
+
+async def run_requests(
+    session_dir: Path,
+    *,
+    concurrency: int = 16,
+    timeout_seconds: Optional[float] = None,
+    retry_attempts: Optional[int] = None,
+    retry_base_delay: Optional[float] = None,
+    logger: Optional[logging.Logger] = None,
+) -> dict[str, int]:
+    """Run every request without a successful result through the endpoint pool.
+
+    Each request is sent to the pool endpoint's model (the ``model`` in the
+    body is what a hosted Batch API would use). ``concurrency`` workers keep
+    requests queued; the adaptive limiter decides how many are in flight.
+    Invalid JSON output is retried like in live mode; requests that still
+    fail get an error line and are picked up again by the next run.
+    """
+    timeout_seconds = timeout_seconds if timeout_seconds is not None else llm_service.LLM_TIMEOUT_SECONDS
+    retry_attempts = retry_attempts if retry_attempts is not None else llm_service.LLM_RETRY_ATTEMPTS
+    retry_base_delay = (
+        retry_base_delay if retry_base_delay is not None else llm_service.LLM_RETRY_BASE_DELAY_SECONDS
+    )
+    pool = llm_service._get_pool()
+    limiter = llm_service._get_limiter()
+    done = {cid for cid, result in _load_results(session_dir / RESULTS_FILE).items() if _is_success(result)}
+    pending = (r for r in _read_jsonl(session_dir / REQUESTS_FILE) if r["custom_id"] not in done)
+    stats = {"skipped": len(done), "succeeded": 0, "failed": 0}
+
+    async def send(request: dict[str, Any]) -> dict[str, Any]:
+        async def attempt_on(endpoint: Endpoint) -> Any:
+            body = {**request["body"], "model": endpoint.model}
+            return await endpoint.get_client().chat.completions.create(**body)
+
+        last_error: Optional[Exception] = None
+        for attempt in range(retry_attempts + 1):
+            try:
+                async with limiter.slot():
+                    completion, _, _ = await pool.call(attempt_on, timeout=timeout_seconds)
+                output = {
+                    "status_code": 200,
+                    "request_id": completion.id,
+                    "body": completion.model_dump(),
+                }
+                _result_content({"response": output, "error": None})
+                return {"response": output, "error": None}
+            except (
+                asyncio.TimeoutError,
+                ValueError,
+                KeyError,
+                IndexError,
+                openai.APIError,
+            ) as exc:
+                last_error = exc
+                if logger:
+                    logger.warning(
+                        "Batch request %s failed on attempt %s/%s: %s",
+                        request["custom_id"], attempt + 1, retry_attempts + 1, exc,
+                    )
+                if attempt < retry_attempts:
+                    await asyncio.sleep(backoff_delay(retry_base_delay, attempt, retry_after_seconds(exc)))
+        return {
+            "response": None,
+            "error": {"code": type(last_error).__name__, "message": str(last_error)},
+        }
+
+    with open(session_dir / RESULTS_FILE, "a", encoding="utf-8") as out:
+        async def worker() -> None:
+            for request in pending:
+                result = await send(request)
+                line = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": request["custom_id"], **result}
+                out.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                stats["failed" if result["error"] else "succeeded"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    if logger:
+        logger.info(
+            "Batch run finished: %s succeeded, %s failed, %s already done",
+            stats["succeeded"], stats["failed"], stats["skipped"],
+        )
+    return stats
+
+
+def merge_results(
+    session_dir: Path,
+    logger: Optional[logging.Logger] = None,
+    score_weights: Optional[Mapping[str, float]] = None,
+) -> dict[str, int]:
+    """Finish deferred pages from the batch results and rewrite the site summary.
+
+    Pages without a usable result, or whose answer does not validate, are
+    written as failed audits; re-running :func:`run_requests` and then this
+    function replaces them.
+    """
+    from ai_seo_auditor.pipelines import JsonReportPipeline  # the pipeline imports this module
+
+    logger = logger or logging.getLogger(__name__)
+    results = _load_results(session_dir / RESULTS_FILE)
+    pipeline = JsonReportPipeline()
+    pipeline.open_session(session_dir, logger, score_weights=score_weights)
+
+    contexts = list(_read_jsonl(session_dir / CONTEXT_FILE))
+    deferred_ids = {record["custom_id"] for record in contexts}
+
+    # Pages finished during the crawl still count towards the summary
+    for page_id, _, report in iter_reports(session_dir):
+        if page_id not in deferred_ids:
+            pipeline.record_page(report)
+
+    stats = {"merged": 0, "failed": 0, "missing": 0}
+    for record in contexts:
+        ctx = PageContext.from_record(record["page"])
+        result = results.get(record["custom_id"])
+        llm_data: Optional[dict] = None
+        error: Optional[Exception] = None
+        if result is None:
+            error = ValueError("No batch result for this page")
+            stats["missing"] += 1
+        else:
+            try:
+                llm_data = _result_content(result)
+            except (ValueError, KeyError, IndexError, TypeError) as exc:
+                error = exc
+        model_dims = tuple(record["model_dims"])
+        try:
+            report = finalize_page_audit(
+                ctx,
+                model_dims,
+                record["rule_data"],
+                llm_data,
+                error,
+                _result_meta(result, error, record.get("output_mode")),
+                logger,
+            )
+            pipeline.write_page(report)
+        except (ValidationError, TypeError, ValueError) as exc:
+            # A malformed answer fails only its own page
+            logger.warning("Invalid batch result for %s: %s", ctx.url, exc)
+            report = finalize_page_audit(
+                ctx, model_dims, record["rule_data"], None, exc,
+                _result_meta(result, exc, record.get("output_mode")), logger,
+            )
+            pipeline.write_page(report)
+        stats["failed" if report["audit_status"] == "failed" else "merged"] += 1
+
+    pipeline.write_summary()
+    pipeline.close_session()
+    logger.info(
+        "Merged %s deferred pages (%s failed, %s without results)",
+        stats["merged"] + stats["failed"], stats["failed"], stats["missing"],
+    )
+    return stats
@@ -0,0 +1,82 @@
+"""Chunking and merging for map-reduce content analysis of long pages.
+
+Instead of judging a long article from its first ``text_max_chars``, the
+page text is split into token-bounded chunks (:func:`split_text`), each
+chunk is scored on its own and :func:`reduce_findings` merges the per-chunk
+``content_analysis`` answers into one — without another model call.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+# Issues kept in a merged content_analysis, most severe first
+_MAX_MERGED_ISSUES = 10
+_MAX_NOTE_CHARS = 500
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split ``text`` into chunks of at most ``max_chars``, at sentence
+    boundaries where possible (overlong sentences are cut at whitespace)."""
+    chunks: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def select_chunks(count: int, limit: int) -> list[int]:
+    """Indices of at most ``limit`` of ``count`` chunks, spread evenly from
+    the first to the last so the whole page stays represented."""
+    if limit >= count:
+        return list(range(count))
+    if limit <= 1:
+        return [0]
+    return sorted({round(i * (count - 1) / (limit - 1)) for i in range(limit)})
+
+
+def reduce_findings(findings: list[tuple[dict[str, Any], int]]) -> dict[str, Any]:
+    """Merge per-chunk ``content_analysis`` answers, each weighted by its
+    chunk length, into one.
+
+    The score is the length-weighted mean. The page answers the user intent
+    if any chunk does, and the answer snippet comes from the best-scoring
+    chunk that has one. Issues are de-duplicated by description, keeping
+    the highest severity.
+    """
+    total = sum(weight for _, weight in findings) or 1
+    score = round(sum(f["score"] * weight for f, weight in findings) / total)
+    by_score = sorted((f for f, _ in findings), key=lambda f: f["score"], reverse=True)
+
+    issues: dict[str, dict[str, Any]] = {}
+    for finding, _ in findings:
+        for issue in finding.get("issues") or []:
+            key = " ".join(issue["description"].lower().split())
+            kept = issues.get(key)
+            if kept is None or _SEVERITY_RANK[issue["severity"]] < _SEVERITY_RANK[kept["severity"]]:
+                issues[key] = issue
+    merged_issues = sorted(issues.values(), key=lambda i: _SEVERITY_RANK[i["severity"]])
+
+    notes = [f["content_uniqueness_note"] for f, _ in findings if f.get("content_uniqueness_note")]
+    return {
+        "score": score,
+        "answers_user_intent": any(f.get("answers_user_intent") for f, _ in findings),
+        "content_uniqueness_note": " ".join(dict.fromkeys(notes))[:_MAX_NOTE_CHARS] or None,
+        "answer_snippet": next((f["answer_snippet"] for f in by_score if f.get("answer_snippet")), None),
+        "issues": merged_issues[:_MAX_MERGED_ISSUES],
+    }
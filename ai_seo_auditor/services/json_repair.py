@@ -0,0 +1,125 @@
+"""Repair of near-valid JSON model output.
+
+Completions cut off at ``max_tokens``, wrapped in markdown fences or
+carrying a trailing comma fail ``json.loads`` although nearly all of the
+answer is there. :func:`repair_json` fixes those cases so the complete
+parts can be used instead of repeating the whole call.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ai_seo_auditor.services.json_stream import IncrementalJsonScanner
+
+_TRAILING_FENCE = re.compile(r"\s*```\s*$")
+# Boundaries tried, newest first, when simply closing a truncated document fails
+_MAX_CUT_ATTEMPTS = 64
+
+
+@dataclass
+class RepairedJson:
+    """A repaired top-level object and what had to be done to get it."""
+    data: dict[str, Any]
+    truncated: bool = False     # open strings/containers were closed
+    # Top-level members cut off mid-value and therefore left out of ``data``
+    dropped_keys: list[str] = field(default_factory=list)
+
+
+def repair_json(text: str, keep_truncated: bool = False) -> Optional[RepairedJson]:
+    """Parse ``text`` as a JSON object, tolerating the usual model slips.
+
+    Leading prose and markdown fences are stripped, trailing commas removed
+    and a truncated document closed (unterminated string, arrays, objects).
+    Of a truncated document only the top-level members that were complete
+    are kept, unless ``keep_truncated``. Returns ``None`` when no object can
+    be recovered.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    body = _drop_trailing_commas(text[start:])
+    try:
+        data, _ = json.JSONDecoder().raw_decode(body)
+    except json.JSONDecodeError:
+        pass
+    else:
+        return RepairedJson(data) if isinstance(data, dict) else None
+
+    body = _TRAILING_FENCE.sub("", body)
+    data = _close_truncated(body)
+    if not isinstance(data, dict):
+        return None
+    repaired = RepairedJson(data, truncated=True)
+    if not keep_truncated:
+        scanner = IncrementalJsonScanner()
+        scanner.feed(body)
+        complete = set(scanner.completed_keys)
+        repaired.dropped_keys = [k for k in data if k not in complete]
+        for key in repaired.dropped_keys:
+            del data[key]
+    return repaired
+
+
+def _drop_trailing_commas(text: str) -> str:
+    """``text`` without commas directly before a closing bracket."""
+    out: list[str] = []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> Any:
+    """Parse a truncated document by closing what is open, cutting back to
+    earlier element boundaries until the result parses (``None`` if never)."""
+    closers: list[str] = []
+    in_string = escape = False
+    # (offset, closers) where the document can be cut: inside a fresh
+    # container or just before a separating comma
+    cuts: list[tuple[int, str]] = []
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            cuts.append((i + 1, "".join(reversed(closers))))
+        elif ch in "}]":
+            if not closers or closers[-1] != ch:
+                return None
+            closers.pop()
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(closers))))
+
+    tail = text[:-1] if escape else text
+    candidates = [tail + ('"' if in_string else "") + "".join(reversed(closers))]
+    candidates += [text[:end] + close for end, close in reversed(cuts[-_MAX_CUT_ATTEMPTS:])]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
@@ -0,0 +1,200 @@
+"""Incremental JSON scanning for streamed LLM completions.
+
+The scanner validates a JSON document one chunk at a time without building
+it, so a stream can be aborted as soon as the output can no longer be valid
+(prose, markdown, mismatched brackets, unexpected top-level keys) or as soon
+as every required top-level key has a complete value.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+_WHITESPACE = frozenset(" \t\r\n")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+_LITERALS = ("true", "false", "null")
+
+# Parser expectations
+_VALUE = "value"              # any JSON value
+_KEY_OR_END = "key_or_end"    # object key string or "}"
+_KEY = "key"                  # object key string (after ",")
+_COLON = "colon"
+_COMMA_OR_END = "comma_or_end"
+_VALUE_OR_END = "value_or_end"  # first array element or "]"
+_EOF = "eof"                  # only whitespace allowed
+
+
+class IncrementalJsonScanner:
+    """Push-down validator fed with text chunks.
+
+    ``allowed_keys`` restricts the keys of the top-level object; ``required_keys``
+    defines when the document is "complete enough" (see :attr:`satisfied`).
+    """
+
+    def __init__(
+        self,
+        allowed_keys: Optional[Iterable[str]] = None,
+        required_keys: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.allowed_keys = frozenset(allowed_keys) if allowed_keys is not None else None
+        self.required_keys = frozenset(required_keys or ())
+        self.error: Optional[str] = None
+        self.completed_keys: list[str] = []
+        self.done = False
+        # Offset just past the last complete top-level member value
+        self.last_member_end = 0
+
+        self._stack: list[str] = []   # "{" / "["
+        self._expect = _VALUE
+        self._offset = 0
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._string_buf: list[str] = []
+        self._current_key: Optional[str] = None
+        self._scalar: Optional[str] = None  # "number" or a literal being matched
+        self._scalar_buf: list[str] = []
+
+    @property
+    def invalid(self) -> bool:
+        return self.error is not None
+
+    @property
+    def satisfied(self) -> bool:
+        """True once the document is closed or every required key is complete."""
+        if self.done:
+            return True
+        return bool(self.required_keys) and self.required_keys.issubset(self.completed_keys)
+
+    def feed(self, chunk: str) -> None:
+        for ch in chunk:
+            if self.error is not None:
+                return
+            self._step(ch)
+            self._offset += 1
+
+    # -- internals -----------------------------------------------------------
+
+    def _fail(self, reason: str) -> None:
+        self.error = f"{reason} at offset {self._offset}"
+
+    def _step(self, ch: str) -> None:
+        if self._in_string:
+            self._step_string(ch)
+            return
+        if self._scalar is not None:
+            if self._step_scalar(ch):
+                return
+        if ch in _WHITESPACE:
+            return
+
+        expect = self._expect
+        if expect == _EOF:
+            self._fail(f"unexpected {ch!r} after end of document")
+        elif expect in (_KEY_OR_END, _KEY):
+            if ch == '"':
+                self._begin_string(is_key=True)
+            elif ch == "}" and expect == _KEY_OR_END:
+                self._close("{")
+            else:
+                self._fail(f"expected object key, got {ch!r}")
+        elif expect == _COLON:
+            if ch == ":":
+                self._expect = _VALUE
+            else:
+                self._fail(f"expected ':', got {ch!r}")
+        elif expect == _COMMA_OR_END:
+            top = self._stack[-1]
+            if ch == ",":
+                self._expect = _KEY if top == "{" else _VALUE
+            elif (ch == "}" and top == "{") or (ch == "]" and top == "["):
+                self._close(top)
+            else:
+                self._fail(f"expected ',' or closing bracket, got {ch!r}")
+        else:  # _VALUE / _VALUE_OR_END
+            if ch == "]" and expect == _VALUE_OR_END:
+                self._close("[")
+            else:
+                self._begin_value(ch)
+
+    def _begin_value(self, ch: str) -> None:
+        if not self._stack and ch != "{":
+            self._fail(f"document must start with '{{', got {ch!r}")
+        elif ch == "{":
+            self._stack.append("{")
+            self._expect = _KEY_OR_END
+        elif ch == "[":
+            self._stack.append("[")
+            self._expect = _VALUE_OR_END
+        elif ch == '"':
+            self._begin_string(is_key=False)
+        elif ch in "-0123456789":
+            self._scalar = "number"
+            self._scalar_buf = [ch]
+        elif ch in "tfn":
+            self._scalar = next(lit for lit in _LITERALS if lit[0] == ch)
+            self._scalar_buf = [ch]
+        else:
+            self._fail(f"unexpected {ch!r} where a value was expected")
+
+    def _begin_string(self, *, is_key: bool) -> None:
+        self._in_string = True
+        self._escape = False
+        self._string_is_key = is_key
+        self._string_buf = []
+
+    def _step_string(self, ch: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._end_key("".join(self._string_buf))
+            else:
+                self._end_value()
+            return
+        if self._string_is_key:
+            self._string_buf.append(ch)
+
+    def _step_scalar(self, ch: str) -> bool:
+        """Consume ``ch`` into the current number/literal; False if it ends it."""
+        if self._scalar == "number":
+            if ch in _NUMBER_CHARS:
+                self._scalar_buf.append(ch)
+                return True
+        else:
+            literal = self._scalar or ""
+            if len(self._scalar_buf) < len(literal):
+                if ch != literal[len(self._scalar_buf)]:
+                    self._fail(f"invalid literal near {''.join(self._scalar_buf) + ch!r}")
+                    return True
+                self._scalar_buf.append(ch)
+                return True
+        # The scalar ended on the previous character
+        self._scalar = None
+        self._end_value(end=self._offset)
+        return False
+
+    def _end_key(self, key: str) -> None:
+        if len(self._stack) == 1 and self.allowed_keys is not None and key not in self.allowed_keys:
+            self._fail(f"unexpected top-level key {key!r}")
+            return
+        if len(self._stack) == 1:
+            self._current_key = key
+        self._expect = _COLON
+
+    def _end_value(self, end: Optional[int] = None) -> None:
+        if len(self._stack) == 1 and self._current_key is not None:
+            self.completed_keys.append(self._current_key)
+            self._current_key = None
+            self.last_member_end = end if end is not None else self._offset + 1
+        self._expect = _COMMA_OR_END if self._stack else _EOF
+
+    def _close(self, bracket: str) -> None:
+        self._stack.pop()
+        if not self._stack:
+            self.done = True
+            self._expect = _EOF
+            return
+        self._end_value()
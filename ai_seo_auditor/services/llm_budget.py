@@ -0,0 +1,173 @@
+"""Session LLM budget with importance-ordered admission.
+
+A crawl spends its LLM budget in discovery order unless told otherwise:
+pagination pages found early use tokens before key landing pages found
+late. :class:`LlmBudget` admits pages to LLM analysis a few at a time, the
+most important waiting page first, and stops granting analyses once the
+session's call or token budget is spent. The pages turned away get
+deterministic-only audits.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Mapping, Optional
+
+# Weights of the importance signals, each normalized to 0-1
+IMPORTANCE_WEIGHTS: dict[str, float] = {
+    "depth": 0.35,
+    "inbound_links": 0.25,
+    "sitemap_priority": 0.2,
+    "risk": 0.2,
+}
+# Inbound internal links at which that signal saturates
+_INBOUND_SATURATION = 20
+# sitemaps.org default for URLs without a <priority>
+DEFAULT_SITEMAP_PRIORITY = 0.5
+
+
+def importance_score(
+    depth: int,
+    inbound_links: int,
+    sitemap_priority: Optional[float],
+    deterministic_scores: Mapping[str, int],
+) -> float:
+    """0-1 importance of a page for LLM analysis.
+
+    Shallow pages, pages many other pages link to and pages with a high
+    sitemap priority rank first. So do risky pages, whose deterministic
+    scores are low: their audits matter most.
+    """
+    scores = [s for s in deterministic_scores.values() if isinstance(s, (int, float))]
+    signals = {
+        "depth": 1 / (1 + max(depth, 0)),
+        "inbound_links": min(1.0, math.log1p(inbound_links) / math.log1p(_INBOUND_SATURATION)),
+        "sitemap_priority": DEFAULT_SITEMAP_PRIORITY if sitemap_priority is None else sitemap_priority,
+        "risk": 1 - sum(scores) / (100 * len(scores)) if scores else 0.5,
+    }
+    return round(sum(IMPORTANCE_WEIGHTS[name] * value for name, value in signals.items()), 4)
+
+
+class ImportanceGate:
+    """Lets at most ``capacity`` holders in at a time. A freed turn goes to
+    the waiter whose importance, re-evaluated at that moment, is highest
+    (ties: first come)."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.active = 0
+        self._waiters: list[tuple[int, Callable[[], float], asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def turn(self, importance: Callable[[], float]) -> AsyncIterator[None]:
+        if self.active < self.capacity and not self._waiters:
+            self.active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (next(self._seq), importance, waiter)
+            self._waiters.append(entry)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                elif waiter.done() and not waiter.cancelled():
+                    self._release()  # the turn was handed over just before the cancel
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            entry = max(self._waiters, key=lambda e: (e[1](), -e[0]))
+            self._waiters.remove(entry)
+            if not entry[2].done():
+                entry[2].set_result(None)  # the turn passes on; active stays
+                return
+        self.active -= 1
+
+
+class LlmBudget:
+    """Per-session cap on LLM requests (``max_calls``) and/or tokens
+    (``max_tokens``), enforced at admission.
+
+    A page is granted analysis only if its estimated tokens (and one call)
+    still fit next to what was spent and what is reserved by pages in
+    flight. The actual spend is recorded from the page's ``llm_meta``;
+    retries and follow-ups may therefore overshoot the cap by what the
+    ``concurrency`` pages in flight use beyond their estimates.
+    """
+
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        concurrency: int = 4,
+    ) -> None:
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.gate = ImportanceGate(concurrency)
+        self.calls = 0.0
+        self.tokens = 0
+        self.granted_pages = 0
+        self.skipped_pages = 0
+        self._reserved_calls = 0
+        self._reserved_tokens = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return not self._fits(1)
+
+    @asynccontextmanager
+    async def admit(self, importance: Callable[[], float], estimated_tokens: int) -> AsyncIterator[bool]:
+        """Wait for the page's turn, then yield whether it may use the LLM."""
+        async with self.gate.turn(importance):
+            granted = self._fits(estimated_tokens)
+            if granted:
+                self.granted_pages += 1
+                self._reserved_calls += 1
+                self._reserved_tokens += estimated_tokens
+            else:
+                self.skipped_pages += 1
+            try:
+                yield granted
+            finally:
+                if granted:
+                    self._reserved_calls -= 1
+                    self._reserved_tokens -= estimated_tokens
+
+    def record(self, meta: Optional[Mapping[str, Any]]) -> None:
+        """Add a finished page's LLM requests and tokens to the spend
+        (a batched page is charged its share of the batch's requests)."""
+        if not meta:
+            return
+        self.calls += meta.get("requests", 0) / max(meta.get("batch_size", 1), 1)
+        self.tokens += (meta.get("prompt_tokens") or 0) + (meta.get("completion_tokens") or 0)
+
+    def _fits(self, estimated_tokens: int) -> bool:
+        if self.max_calls is not None and self.calls + self._reserved_calls + 1 > self.max_calls:
+            return False
+        if self.max_tokens is not None and self.tokens + self._reserved_tokens + estimated_tokens > self.max_tokens:
+            return False
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "max_calls": self.max_calls,
+            "max_tokens": self.max_tokens,
+            "calls": round(self.calls, 2),
+            "tokens": self.tokens,
+            "granted_pages": self.granted_pages,
+            "skipped_pages": self.skipped_pages,
+        }
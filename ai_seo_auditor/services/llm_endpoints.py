@@ -0,0 +1,252 @@
+"""Pool of OpenAI-compatible LLM endpoints.
+
+Requests go to the healthy endpoint with the fewest outstanding requests.
+Each endpoint has its own circuit breaker and latency histogram. Optional
+hedging sends a duplicate request to a second endpoint once a call has run
+longer than the pool's observed p95 latency, and the first answer wins.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import openai
+from openai import AsyncOpenAI
+
+T = TypeVar("T")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS: tuple[int, ...] = (250, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 200) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self._recent.append(ms)
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile (0-100) over the recent window, or None without samples."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        idx = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 1) if self.total else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: open after ``failure_threshold`` failures,
+    let one probe through after ``cooldown_seconds`` (half-open), close on success."""
+
+    def __init__(self, failure_threshold: int = 3, cooldown_seconds: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allows(self) -> bool:
+        return self.state != "open"
+
+    @property
+    def reopens_at(self) -> float:
+        return (self.opened_at or 0.0) + self.cooldown_seconds
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.times_opened += 1
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class Endpoint:
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    client: Optional[AsyncOpenAI] = None
+    outstanding: int = 0
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    failures: int = 0
+
+    def get_client(self) -> AsyncOpenAI:
+        """Lazily create the client so it binds to the running event loop.
+
+        SDK-level retries are off: 429s and timeouts must reach the breaker
+        and the adaptive limiter, and our own retry loop handles them.
+        """
+        if self.client is None:
+            self.client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0)
+        return self.client
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "model": self.model,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "latency": self.latency.snapshot(),
+        }
+
+
+def is_endpoint_failure(exc: BaseException) -> bool:
+    """Transport/server problems count against an endpoint's health;
+    bad model output (ValueError, JSON errors) does not."""
+    if isinstance(exc, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.hedge = hedge and len(endpoints) > 1
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyHistogram()
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def pick(self, exclude: tuple[Endpoint, ...] = ()) -> Optional[Endpoint]:
+        """Least-outstanding healthy endpoint. If every breaker is open, probe
+        the endpoint whose cooldown ends first rather than failing the page."""
+        candidates = [e for e in self.endpoints if e not in exclude]
+        if not candidates:
+            return None
+        healthy = [e for e in candidates if e.breaker.allows()]
+        if healthy:
+            return min(healthy, key=lambda e: e.outstanding)
+        if exclude:
+            return None  # never hedge onto an open endpoint
+        return min(candidates, key=lambda e: e.breaker.reopens_at)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a duplicate request is fired, or None."""
+        if not self.hedge or self.latency.samples < self.hedge_min_samples:
+            return None
+        p95 = self.latency.percentile(95)
+        return p95 / 1000 if p95 else None
+
+    async def _run_on(
+        self,
+        endpoint: Endpoint,
+        fn: Callable[[Endpoint], Awaitable[T]],
+        timeout: float,
+    ) -> T:
+        endpoint.outstanding += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(endpoint), timeout=timeout)
+        except asyncio.CancelledError:
+            raise  # hedge loser — says nothing about endpoint health
+        except Exception as exc:
+            if is_endpoint_failure(exc):
+                endpoint.failures += 1
+                endpoint.breaker.record_failure()
+            else:
+                endpoint.breaker.record_success()
+            raise
+        else:
+            elapsed_ms = (time.monotonic() - started) * 1000
+            endpoint.latency.observe(elapsed_ms)
+            self.latency.observe(elapsed_ms)
+            endpoint.breaker.record_success()
+            return result
+        finally:
+            endpoint.outstanding -= 1
+
+    async def call(
+        self,
+        fn: Callable[[Endpoint], Awaitable[T]],
+        timeout: float,
+    ) -> tuple[T, Endpoint, bool]:
+        """Run ``fn`` on the best endpoint; returns ``(result, endpoint, hedged)``."""
+        primary = self.pick()
+        assert primary is not None
+        primary_task = asyncio.ensure_future(self._run_on(primary, fn, timeout))
+        tasks: dict[asyncio.Future[T], Endpoint] = {primary_task: primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait({primary_task}, timeout=delay)
+                secondary = None if done else self.pick(exclude=(primary,))
+                if secondary is not None:
+                    self.hedges_fired += 1
+                    tasks[asyncio.ensure_future(self._run_on(secondary, fn, timeout))] = secondary
+
+            pending = set(tasks)
+            last_exc: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary_task:
+                            self.hedges_won += 1
+                        return task.result(), tasks[task], len(tasks) > 1
+                    last_exc = task.exception()
+            assert last_exc is not None
+            raise last_exc
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "latency": self.latency.snapshot(),
+            "endpoints": {e.name: e.snapshot() for e in self.endpoints},
+        }
@@ -0,0 +1,242 @@
+"""Adaptive (AIMD) concurrency limit for LLM requests.
+
+The limit grows additively (about +1 per round of successful requests)
+while latency stays close to its healthy baseline. It is cut
+multiplicatively on congestion signals: 429/503 responses, timeouts and
+latency spikes. A ``Retry-After`` header pauses all new requests until it
+expires. Retry helpers for jittered backoff live here too.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Optional
+
+import openai
+
+# Never honour a Retry-After longer than this (seconds)
+_MAX_RETRY_AFTER_SECONDS = 300.0
+# Latency samples needed before spikes are judged against the baseline
+_BASELINE_MIN_SAMPLES = 5
+_BASELINE_ALPHA = 0.1
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Seconds requested by a ``Retry-After`` / ``retry-after-ms`` header, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    seconds: Optional[float] = None
+    try:
+        if headers.get("retry-after-ms"):
+            seconds = float(headers["retry-after-ms"]) / 1000
+        elif headers.get("retry-after"):
+            value = headers["retry-after"]
+            try:
+                seconds = float(value)
+            except ValueError:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+    if seconds is None:
+        return None
+    return max(0.0, min(seconds, _MAX_RETRY_AFTER_SECONDS))
+
+
+def backoff_delay(base_delay: float, attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with equal jitter, never shorter than ``retry_after``."""
+    ceiling = base_delay * (2 ** attempt)
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    return max(delay, retry_after or 0.0)
+
+
+def congestion_reason(exc: BaseException) -> Optional[str]:
+    """Why ``exc`` signals an overloaded backend, or None if it does not."""
+    if isinstance(exc, (asyncio.TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(exc, openai.APIStatusError) and exc.status_code in (429, 503):
+        return str(exc.status_code)
+    return None
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight LLM requests.
+
+    With ``adaptive=False`` the limit stays fixed at ``initial_limit``. It
+    still honours ``Retry-After`` pauses.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        adaptive: bool = True,
+        history_size: int = 100,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                f"Need 1 <= min_limit <= initial_limit <= max_limit, got {min_limit}, {initial_limit}, {max_limit}"
+            )
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.adaptive = adaptive
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.peak_limit = initial_limit
+        self.increases = 0
+        self.decreases = 0
+        self.retry_after_pauses = 0
+        self.baseline_ms: Optional[float] = None
+        self.history: deque[dict[str, Any]] = deque(maxlen=history_size)
+
+        self._started = time.monotonic()
+        self._samples = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._waiters: list[asyncio.Future[None]] = []
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self) -> None:
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.in_flight < self.current_limit:
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one in-flight slot for a single request attempt and feed its
+        outcome (latency or congestion error) back into the limit.
+
+        ``cost`` scales the expected latency, e.g. the number of pages in a
+        batched completion, so big requests are not mistaken for spikes.
+        """
+        await self.acquire()
+        started = time.monotonic()
+        saturated = self.in_flight >= self.current_limit
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as exc:
+            self.release()
+            self.record_error(exc, started)
+            raise
+        else:
+            self.release()
+            self.record_success((time.monotonic() - started) * 1000 / max(cost, 1.0), started, saturated)
+
+    def set_capacity(self, capacity: int) -> None:
+        """Start at, and never exceed, ``capacity`` in-flight requests (e.g.
+        the backend's parallel decoding slots)."""
+        self.max_limit = max(self.min_limit, capacity)
+        self.limit = float(self.max_limit)
+        self.peak_limit = max(self.peak_limit, self.current_limit)
+        self._record("capacity")
+        self._wake()
+
+    def record_success(self, latency_ms: float, started: float, saturated: bool = True) -> None:
+        """Fold a successful request's latency into the baseline. The limit
+        only grows when the request used the last free slot, so low demand
+        does not inflate it."""
+        if (
+            self.baseline_ms is not None
+            and self._samples >= _BASELINE_MIN_SAMPLES
+            and latency_ms > self.baseline_ms * self.latency_tolerance
+        ):
+            self._decrease("latency", started)
+            return
+        self._samples += 1
+        if self.baseline_ms is None:
+            self.baseline_ms = latency_ms
+        else:
+            self.baseline_ms += _BASELINE_ALPHA * (latency_ms - self.baseline_ms)
+        if saturated:
+            self._increase()
+
+    def record_error(self, exc: BaseException, started: float) -> None:
+        retry_after = retry_after_seconds(exc)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.retry_after_pauses += 1
+        reason = congestion_reason(exc)
+        if reason is not None:
+            self._decrease(reason, started)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": self.current_limit,
+            "peak_limit": self.peak_limit,
+            "in_flight": self.in_flight,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "retry_after_pauses": self.retry_after_pauses,
+            "baseline_latency_ms": round(self.baseline_ms, 1) if self.baseline_ms is not None else None,
+            "history": list(self.history),
+        }
+
+    # -- internals -----------------------------------------------------------
+
+    def _increase(self) -> None:
+        if not self.adaptive or self.limit >= self.max_limit:
+            return
+        before = self.current_limit
+        self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        if self.current_limit > before:
+            self.increases += 1
+            self.peak_limit = max(self.peak_limit, self.current_limit)
+            self._record("increase")
+            self._wake()
+
+    def _decrease(self, reason: str, started: float) -> None:
+        # Requests sent before the last cut saw the old, higher limit — one
+        # congestion episode should only cut the limit once.
+        if not self.adaptive or started < self._last_decrease:
+            return
+        before = self.current_limit
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self._last_decrease = time.monotonic()
+        if self.current_limit < before:
+            self.decreases += 1
+            self._record(reason)
+
+    def _record(self, reason: str) -> None:
+        self.history.append({
+            "t": round(time.monotonic() - self._started, 1),
+            "limit": self.current_limit,
+            "reason": reason,
+        })
+
+    def _wake(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
@@ -3,18 +3,31 @@ import copy
 import json
 import logging
 import os
-from typing import Any, Optional
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Callable, Optional
+from urllib.parse import urlparse
 
+import httpx
 import openai
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from lxml import etree
+from lxml import html as lxml_html
+from pydantic import ValidationError
 
+from ai_seo_auditor.models.issue_catalog import make_issue
 from ai_seo_auditor.models.schemas import (
-    PageAudit, MetaTags, HeaderStructure, ImageStats,
-    OnPageSeoChecklist,
-    LinkAnalysis, PerformanceMetrics, ReadabilityAnalysis,
-    SecurityCheck, AccessibilityAnalysis, CanonicalAnalysis,
+    PageAudit, LlmCallMeta, SchemaScore, ContentScore, LinkAnalysis, AccessibilityAnalysis,
 )
+from ai_seo_auditor.services.content_chunking import reduce_findings, select_chunks, split_text
+from ai_seo_auditor.services.json_repair import repair_json
+from ai_seo_auditor.services.json_stream import IncrementalJsonScanner
+from ai_seo_auditor.services.llm_endpoints import CircuitBreaker, Endpoint, EndpointPool
+from ai_seo_auditor.services.llm_limiter import AdaptiveLimiter, backoff_delay, retry_after_seconds
+from ai_seo_auditor.services.ollama_profile import OllamaProfile
+from ai_seo_auditor.services.structured_data import schema_score, summarize
+from ai_seo_auditor.services.template_diff import PageDiff, TemplateExemplar, TemplateRegistry, diff_page
 
 # ---------------------------------------------------------------------------
 # Environment / defaults
@@ -48,20 +61,159 @@ LLM_MODEL:    str = _cfg["model"]
 LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
 LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "2"))
 LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "1"))
+LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() in ("1", "true", "yes")
+# Send the response JSON schema as a native ``json_schema`` response format
+# (constrained decoding). Ollama ≥ 0.5 maps it onto its ``format`` grammar;
+# other providers default to plain JSON mode with the schema in the prompt.
+LLM_STRUCTURED_OUTPUT = os.getenv(
+    "LLM_STRUCTURED_OUTPUT", "true" if LLM_PROVIDER == "ollama" else "false"
+).lower() in ("1", "true", "yes")
 
 _JSON_LD_MAX_CHARS = 4000
 _LLM_MAX_TOKENS = 3072
 
-_client: Optional[AsyncOpenAI] = None
+_pool: Optional[EndpointPool] = None
+_limiter: Optional[AdaptiveLimiter] = None
+_ollama: Optional[OllamaProfile] = None
 
 
-def _get_client() -> AsyncOpenAI:
-    """Lazily create the AsyncOpenAI client to avoid binding to
-    the wrong event loop when imported at module level under Twisted."""
-    global _client
-    if _client is None:
-        _client = AsyncOpenAI(base_url=LLM_BASE_URL, api_key=LLM_API_KEY)
-    return _client
+def configure_endpoints(
+    endpoints: Optional[list[dict[str, Any]]] = None,
+    hedge: bool = False,
+    hedge_min_samples: int = 20,
+    breaker_failure_threshold: int = 3,
+    breaker_cooldown_seconds: float = 30.0,
+) -> EndpointPool:
+    """Build the module-wide endpoint pool.
+
+    Each entry of ``endpoints`` needs a ``base_url`` and may override
+    ``api_key``, ``model`` and ``name``; missing values fall back to the
+    active provider defaults. With no entries the pool holds the single
+    provider endpoint.
+    """
+    global _pool
+    entries = endpoints or [{"base_url": LLM_BASE_URL}]
+    pool_endpoints: list[Endpoint] = []
+    for entry in entries:
+        base_url = str(entry.get("base_url") or LLM_BASE_URL)
+        pool_endpoints.append(Endpoint(
+            name=str(entry.get("name") or urlparse(base_url).netloc or base_url),
+            base_url=base_url,
+            api_key=str(entry.get("api_key") or LLM_API_KEY),
+            model=str(entry.get("model") or LLM_MODEL),
+            breaker=CircuitBreaker(breaker_failure_threshold, breaker_cooldown_seconds),
+        ))
+    _pool = EndpointPool(pool_endpoints, hedge=hedge, hedge_min_samples=hedge_min_samples)
+    return _pool
+
+
+def _get_pool() -> EndpointPool:
+    """Lazily create the endpoint pool (and its AsyncOpenAI clients) to avoid
+    binding to the wrong event loop when imported at module level under Twisted."""
+    if _pool is None:
+        return configure_endpoints()
+    return _pool
+
+
+def get_endpoint_stats() -> dict[str, Any]:
+    """Per-endpoint latency histograms, breaker state and hedging counters."""
+    return _pool.snapshot() if _pool is not None else {}
+
+
+def configure_limiter(**options: Any) -> AdaptiveLimiter:
+    """Build the module-wide adaptive concurrency limiter.
+
+    ``options`` are :class:`AdaptiveLimiter` arguments (``initial_limit``,
+    ``min_limit``, ``max_limit``, ``decrease_factor``, ``latency_tolerance``,
+    ``adaptive``). Every LLM request attempt holds one of its slots.
+    """
+    global _limiter
+    _limiter = AdaptiveLimiter(**options)
+    return _limiter
+
+
+def _get_limiter() -> AdaptiveLimiter:
+    if _limiter is None:
+        return configure_limiter()
+    return _limiter
+
+
+def get_limiter_stats() -> dict[str, Any]:
+    """Current concurrency limit, its change history and counters."""
+    return _get_limiter().snapshot()
+
+
+def configure_ollama(
+    enabled: Optional[bool] = None,
+    *,
+    html_max_chars: int = 8000,
+    text_max_chars: int = 2000,
+    batch_token_budget: Optional[int] = None,
+    **options: Any,
+) -> Optional[OllamaProfile]:
+    """Turn the Ollama profile on (by default when ``LLM_PROVIDER=ollama``) or off.
+
+    ``options`` are :class:`OllamaProfile` arguments. The initial ``num_ctx``
+    fits the largest packed prompt: one page with ``html_max_chars`` of HTML
+    and ``text_max_chars`` of text, or a batch of ``batch_token_budget``
+    prompt tokens. Every request then carries the keep-alive and ``num_ctx``.
+    """
+    global _ollama
+    if not (LLM_PROVIDER == "ollama" if enabled is None else enabled):
+        _ollama = None
+        return None
+    profile = OllamaProfile(**options)
+    system_tokens = estimate_tokens(SYSTEM_PROMPT)
+    page_tokens = estimate_tokens(_USER_MSG_TEMPLATE + _PAGE_BLOCK_TEMPLATE + json.dumps(_get_flat_schema()))
+    page_tokens += (html_max_chars + text_max_chars + _JSON_LD_MAX_CHARS) // _CHARS_PER_TOKEN
+    profile.fit_context(system_tokens + page_tokens, _LLM_MAX_TOKENS)
+    if batch_token_budget:
+        profile.fit_context(system_tokens + batch_token_budget, _LLM_BATCH_MAX_TOKENS)
+    profile.context_resizes = 0  # the initial sizing does not count
+    _ollama = profile
+    return profile
+
+
+async def prepare_ollama(
+    extra_models: tuple[str, ...] = (),
+    logger: Optional[logging.Logger] = None,
+) -> int:
+    """Load the model (and ``extra_models``, e.g. the cascade's fast model) on
+    every endpoint, then cap the adaptive limiter at the servers' combined
+    parallel slots. Returns that capacity (0 when nothing was set up).
+    """
+    if _ollama is None:
+        return 0
+    capacity = 0
+    for endpoint in _get_pool().endpoints:
+        try:
+            for model in dict.fromkeys((endpoint.model, *extra_models)):
+                load_ms = await _ollama.warm_up(endpoint.base_url, model)
+                if logger:
+                    logger.info("Ollama model %s loaded on %s (%s ms)", model, endpoint.name, load_ms)
+            slots = await _ollama.detect_parallel_slots(endpoint.base_url, endpoint.model)
+        except (httpx.HTTPError, ValueError) as exc:
+            if logger:
+                logger.warning("Ollama warm-up failed on %s: %s", endpoint.name, exc)
+            continue
+        if logger:
+            logger.info("Ollama on %s decodes %s requests in parallel", endpoint.name, slots)
+        capacity += slots
+    if capacity:
+        _get_limiter().set_capacity(capacity)
+    return capacity
+
+
+def get_ollama_stats() -> dict[str, Any]:
+    """Keep-alive, context size, load times and parallel slots of the Ollama profile."""
+    return _ollama.snapshot() if _ollama is not None else {}
+
+
+def _provider_options(messages: list[dict[str, str]], max_tokens: int) -> dict[str, Any]:
+    """Provider-specific request arguments (the Ollama profile's body fields)."""
+    if _ollama is None:
+        return {}
+    return {"extra_body": _ollama.request_body(_estimate_prompt_tokens(messages), max_tokens)}
 
 
 # ---------------------------------------------------------------------------
@@ -91,6 +243,12 @@ def _build_flat_schema() -> dict[str, Any]:
     """
     schema = copy.deepcopy(PageAudit.model_json_schema())
     defs = schema.pop("$defs", {})
+    # Model-written issues carry their own fix and no catalogue code
+    issue = defs.get("Issue", {})
+    for field in ("code", "params"):
+        issue.get("properties", {}).pop(field, None)
+    issue.get("properties", {}).get("suggested_fix", {}).pop("default", None)
+    issue["required"] = ["severity", "description", "suggested_fix"]
     schema = _resolve_refs(schema, defs)
 
     # Fields the LLM should NOT produce
@@ -136,22 +294,89 @@ def _build_flat_schema() -> dict[str, Any]:
     return schema
 
 
-# Cache the flattened schema — it never changes at runtime.
-_FLAT_SCHEMA: dict[str, Any] | None = None
+# Cache the flattened schemas — they never change at runtime.
+_FLAT_SCHEMAS: dict[tuple[str, ...], dict[str, Any]] = {}
+
+_EXPECTED_DIMENSIONS = ("schema_analysis", "content_analysis", "link_analysis", "accessibility")
+
+
+def _get_flat_schema(dimensions: tuple[str, ...] = _EXPECTED_DIMENSIONS) -> dict[str, Any]:
+    """Flat LLM schema restricted to ``dimensions`` (all four by default)."""
+    if dimensions not in _FLAT_SCHEMAS:
+        schema = _build_flat_schema()
+        schema["properties"] = {
+            k: v for k, v in schema.get("properties", {}).items() if k in dimensions
+        }
+        schema["required"] = [r for r in schema.get("required", []) if r in dimensions]
+        _FLAT_SCHEMAS[dimensions] = schema
+    return _FLAT_SCHEMAS[dimensions]
+
+
+_JSON_OBJECT_FORMAT: dict[str, Any] = {"type": "json_object"}
+
+# Strict response schemas per (dimensions, batched) — see _get_response_format
+_RESPONSE_FORMATS: dict[tuple[tuple[str, ...], bool], dict[str, Any]] = {}
+
+
+def _strict_schema(node: Any) -> Any:
+    """Copy of ``node`` in the subset strict structured outputs accept: every
+    object closed with all its properties required, optional fields as
+    nullable type unions instead of ``anyOf``, and no defaults."""
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    strict = {k: _strict_schema(v) for k, v in node.items() if k != "default"}
+    branches = strict.get("anyOf", [])
+    typed = [b for b in branches if b.get("type") != "null"]
+    if len(branches) == 2 and len(typed) == 1 and isinstance(typed[0].get("type"), str):
+        del strict["anyOf"]
+        strict.update(typed[0])
+        strict["type"] = [typed[0]["type"], "null"]
+    if "properties" in strict:
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
 
+def _get_response_format(
+    dimensions: tuple[str, ...],
+    structured: bool,
+    batched: bool = False,
+) -> dict[str, Any]:
+    """``response_format`` of a completion asking for ``dimensions``.
 
-def _get_flat_schema() -> dict[str, Any]:
-    global _FLAT_SCHEMA
-    if _FLAT_SCHEMA is None:
-        _FLAT_SCHEMA = _build_flat_schema()
-    return _FLAT_SCHEMA
+    With ``structured`` the flat schema is sent as a strict native
+    JSON-schema response format, which the server enforces while decoding;
+    otherwise plain JSON mode, with the schema pasted into the prompt.
+    """
+    if not structured:
+        return _JSON_OBJECT_FORMAT
+    key = (dimensions, batched)
+    if key not in _RESPONSE_FORMATS:
+        schema = _get_batch_schema(dimensions) if batched else _get_flat_schema(dimensions)
+        if batched:
+            schema = {
+                "type": "object",
+                "properties": {"results": {"type": "array", "items": schema}},
+                "required": ["results"],
+            }
+        _RESPONSE_FORMATS[key] = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "page_audit_batch" if batched else "page_audit",
+                "strict": True,
+                "schema": _strict_schema(schema),
+            },
+        }
+    return _RESPONSE_FORMATS[key]
 
 
 # ---------------------------------------------------------------------------
-# Prompts
+# Prompts — assembled per call from the dimensions the model has to score
 # ---------------------------------------------------------------------------
 
-SYSTEM_PROMPT = """\
+_SYSTEM_PREAMBLE = """\
 You are an expert technical SEO auditor. You analyze web pages and output \
 a JSON object that strictly matches the schema provided below. Do NOT \
 include any keys other than those in the schema. Do NOT wrap the JSON in \
@@ -168,16 +393,18 @@ SEVERITY DEFINITIONS for issues:
 - "high"   = blocks indexing or renders page unusable for search/screen readers
 - "medium" = degrades ranking potential or user experience noticeably
 - "low"    = optimization opportunity, nice-to-have improvement
+"""
 
-YOU MUST SCORE EXACTLY 4 DIMENSIONS:
-
-1. schema_analysis — JSON-LD structured data quality.
+_DIMENSION_RUBRICS: dict[str, str] = {
+    "schema_analysis": """\
+schema_analysis — JSON-LD structured data quality.
    RULE: If detected_types is empty, score MUST be 0.
    - List all detected @type values in detected_types.
    - List missing recommended fields for those types in missing_fields.
    - Score above 50 ONLY when valid, relevant structured data is present.
-
-2. content_analysis — user-intent alignment and content quality.
+""",
+    "content_analysis": """\
+content_analysis — user-intent alignment and content quality.
    - answers_user_intent: Does the page provide useful/original content for \
 its apparent topic? (true/false)
    - content_uniqueness_note: Brief assessment — is the content mostly \
@@ -191,58 +418,88 @@ content, or null if none.
      50-69  = thin or partially useful content
      30-49  = mostly boilerplate or navigation
      0-29   = no useful content
-
-3. link_analysis — anchor text quality and link distribution.
+""",
+    "link_analysis": """\
+link_analysis — anchor text quality and link distribution.
    You receive link counts (internal, external, nofollow) as context.
    Score the QUALITATIVE aspects: descriptive vs generic anchor text, \
 appropriate link distribution, any broken or problematic patterns.
    - issues: Array of link quality problems with severity.
-
-4. accessibility — qualitative accessibility assessment.
+""",
+    "accessibility": """\
+accessibility — qualitative accessibility assessment.
    You receive structural stats as context (skip-nav, landmarks, labels, etc.).
    Evaluate semantic HTML usage, ARIA patterns, color contrast hints, \
 form labeling, and any a11y issues visible in the HTML.
    - llm_score: Your qualitative accessibility score (0-100).
    - issues: Array of accessibility problems with severity.
    NOTE: Do NOT include "score" — only "llm_score" and "issues".
+""",
+}
 
-Dimensions you do NOT score (auto-computed by spider — do NOT include):
-- onpage_seo, performance, readability, security, canonical_analysis
-
-EXAMPLE OUTPUT:
-{
-  "schema_analysis": {
-    "score": 0,
-    "detected_types": [],
-    "missing_fields": []
-  },
-  "content_analysis": {
-    "score": 45,
-    "answers_user_intent": false,
-    "content_uniqueness_note": "Page is mostly product listings with minimal descriptive text.",
-    "answer_snippet": null,
-    "issues": [
-      {"severity": "medium", "description": "Content is primarily navigation links with little original text.", "suggested_fix": "Add descriptive category overview text."}
-    ]
-  },
-  "link_analysis": {
-    "score": 60,
-    "issues": [
-      {"severity": "medium", "description": "Most anchor texts are generic ('click here').", "suggested_fix": "Use descriptive anchor text that indicates the link destination."}
-    ]
-  },
-  "accessibility": {
-    "llm_score": 40,
-    "issues": [
-      {"severity": "high", "description": "Images lack alt text.", "suggested_fix": "Add descriptive alt attributes to all informative images."}
-    ]
-  }
+# One-line reminders appended to the user message
+_DIMENSION_CHECKLIST: dict[str, str] = {
+    "schema_analysis": "schema_analysis — JSON-LD quality. If no JSON-LD detected, score MUST be 0.",
+    "content_analysis": "content_analysis — user-intent alignment, content originality, quality.",
+    "link_analysis": "link_analysis — anchor text quality, link distribution (score + issues).",
+    "accessibility": "accessibility — qualitative a11y assessment (llm_score + issues only).",
 }
-"""
 
-_USER_MSG_TEMPLATE = """\
-Analyze this page for SEO: {url}
+_EXAMPLE_OUTPUT: dict[str, Any] = {
+    "schema_analysis": {
+        "score": 0,
+        "detected_types": [],
+        "missing_fields": [],
+    },
+    "content_analysis": {
+        "score": 45,
+        "answers_user_intent": False,
+        "content_uniqueness_note": "Page is mostly product listings with minimal descriptive text.",
+        "answer_snippet": None,
+        "issues": [
+            {"severity": "medium", "description": "Content is primarily navigation links with little original text.", "suggested_fix": "Add descriptive category overview text."},
+        ],
+    },
+    "link_analysis": {
+        "score": 60,
+        "issues": [
+            {"severity": "medium", "description": "Most anchor texts are generic ('click here').", "suggested_fix": "Use descriptive anchor text that indicates the link destination."},
+        ],
+    },
+    "accessibility": {
+        "llm_score": 40,
+        "issues": [
+            {"severity": "high", "description": "Images lack alt text.", "suggested_fix": "Add descriptive alt attributes to all informative images."},
+        ],
+    },
+}
 
+_SPIDER_DIMENSIONS = "onpage_seo, performance, readability, security, canonical_analysis"
+
+
+def _build_system_prompt(dimensions: tuple[str, ...] = _EXPECTED_DIMENSIONS) -> str:
+    """System prompt with rubrics and example output for ``dimensions`` only."""
+    count = len(dimensions)
+    rubrics = "\n".join(
+        f"{i}. {_DIMENSION_RUBRICS[dim]}" for i, dim in enumerate(dimensions, start=1)
+    )
+    not_scored = ", ".join(
+        [d for d in _EXPECTED_DIMENSIONS if d not in dimensions] + [_SPIDER_DIMENSIONS]
+    )
+    example = json.dumps({d: _EXAMPLE_OUTPUT[d] for d in dimensions}, indent=2)
+    return (
+        f"{_SYSTEM_PREAMBLE}\n"
+        f"YOU MUST SCORE EXACTLY {count} DIMENSION{'S' if count != 1 else ''}:\n\n"
+        f"{rubrics}\n"
+        "Dimensions you do NOT score (auto-computed — do NOT include):\n"
+        f"- {not_scored}\n\n"
+        f"EXAMPLE OUTPUT:\n{example}\n"
+    )
+
+
+SYSTEM_PROMPT = _build_system_prompt()
+
+_PAGE_STATS_TEMPLATE = """\
 META TAGS: {meta_tags}
 HEADERS: {headers}
 IMAGE STATS: {image_stats}
@@ -254,107 +511,632 @@ ACCESSIBILITY STATS: skip_nav={has_skip_nav}, aria_landmarks={aria_landmarks}, \
 form_labels_missing={form_labels_missing}, lang_attr={has_lang}, \
 generic_link_texts={generic_links}, tabindex_misuse={tabindex_misuse}, \
 image_alt_coverage={alt_coverage}%
+"""
 
+_PAGE_BLOCK_TEMPLATE = _PAGE_STATS_TEMPLATE + """
 HTML SNIPPET (Cleaned):
 {html}
 
 TEXT CONTENT:
 {text}
+"""
+
+# Template-diff mode: a page of an already analysed template is shown as its
+# differences from the exemplar, next to the exemplar's findings
+_TEMPLATE_DIFF_BLOCK_TEMPLATE = _PAGE_STATS_TEMPLATE + """
+This page shares its template with {exemplar_url}, which was already \
+analyzed. Only what differs from that page is shown below: judge what is \
+new, and keep the exemplar's findings where they concern the shared template.
+
+EXEMPLAR FINDINGS:
+{findings}
+
+MARKUP ONLY ON THIS PAGE:
+{markup_added}
+
+EXEMPLAR MARKUP MISSING HERE:
+{markup_removed}
+
+TEXT ONLY ON THIS PAGE:
+{text_added}
+"""
+_MAX_DIFF_LINES = 150
+
+# Split mode: each dimension's prompt carries only the context it needs
+_DIMENSION_BLOCK_TEMPLATES: dict[str, str] = {
+    "schema_analysis": """\
+JSON-LD: {json_ld}
+""",
+    "content_analysis": """\
+META TAGS: {meta_tags}
+HEADERS: {headers}
+WORD COUNT: {word_count}
+
+TEXT CONTENT:
+{text}
+""",
+    "link_analysis": """\
+LINK STATS: internal={internal_links}, external={external_links}, nofollow={nofollow_count}
+
+LINKS (anchor text -> href):
+{anchors}
+""",
+    "accessibility": """\
+IMAGE STATS: {image_stats}
+ACCESSIBILITY STATS: skip_nav={has_skip_nav}, aria_landmarks={aria_landmarks}, \
+form_labels_missing={form_labels_missing}, lang_attr={has_lang}, \
+generic_link_texts={generic_links}, tabindex_misuse={tabindex_misuse}, \
+image_alt_coverage={alt_coverage}%
+
+FORM AND LANDMARK MARKUP:
+{markup}
+""",
+}
+
+# Elements and attributes kept in the accessibility prompt's compacted markup
+_A11Y_MARKUP_TAGS = frozenset((
+    "header", "nav", "main", "aside", "footer", "section", "form", "fieldset", "legend",
+    "label", "input", "select", "textarea", "button",
+))
+_A11Y_MARKUP_ATTRS = frozenset(("id", "name", "type", "for", "role", "tabindex", "title", "placeholder", "lang"))
+_MAX_PROMPT_ANCHORS = 150
+_MAX_MARKUP_LINES = 150
+
+_USER_MSG_TEMPLATE = """\
+Analyze this page for SEO: {url}
+
+{page_block}
+{output_spec}
+Evaluate exactly these {count} dimension(s):
+{checklist}
+"""
 
+# Output instructions: the pasted schema in JSON mode, or just the keys when
+# the schema is enforced through the response format
+_SCHEMA_SPEC_TEMPLATE = """\
 Return ONLY a JSON object matching the following schema. Do NOT include \
 url, meta_tags, headers, image_stats, onpage_seo, performance, readability, \
 security, or canonical_analysis — they are injected automatically.
 
 {schema}
+"""
 
-Evaluate exactly these 4 dimensions:
-1. schema_analysis — JSON-LD quality. If no JSON-LD detected, score MUST be 0.
-2. content_analysis — user-intent alignment, content originality, quality.
-3. link_analysis — anchor text quality, link distribution (score + issues).
-4. accessibility — qualitative a11y assessment (llm_score + issues only).
+_ENFORCED_SPEC_TEMPLATE = """\
+Return ONLY a JSON object with the keys {keys} (the response schema is \
+enforced). Other dimensions are injected automatically.
 """
 
 
-async def analyze_with_llm(
-    url: str,
-    html: str,
-    json_ld: list[dict],
-    text: str,
-    meta_tags: MetaTags,
-    headers: HeaderStructure,
-    image_stats: ImageStats,
-    onpage_seo: OnPageSeoChecklist,
-    link_analysis: LinkAnalysis,
-    performance: PerformanceMetrics,
-    readability: ReadabilityAnalysis,
-    security: SecurityCheck,
-    accessibility: AccessibilityAnalysis,
-    canonical_analysis: CanonicalAnalysis,
-    timeout_seconds: Optional[float] = None,
-    retry_attempts: Optional[int] = None,
-    retry_base_delay: Optional[float] = None,
-    logger: Optional[logging.Logger] = None,
-) -> PageAudit:
-    """Analyze page content using the configured LLM and return a validated PageAudit.
+def _build_checklist(dimensions: tuple[str, ...]) -> str:
+    return "\n".join(
+        f"{i}. {_DIMENSION_CHECKLIST[dim]}" for i, dim in enumerate(dimensions, start=1)
+    )
 
-    The LLM only produces 4 dimensions: schema_analysis, content_analysis,
-    link_analysis (score+issues), and accessibility (llm_score+issues).
-    All other dimensions are spider-computed and injected post-hoc.
+
+_BATCH_SYSTEM_ADDENDUM = """
+BATCH MODE:
+You will receive several pages, each introduced by a line of the form \
+"=== PAGE <n>: <url> ===". Score every page independently using the rules \
+above. Return ONE JSON object of the form {"results": [...]} with exactly \
+one entry per page, in the same order as the pages were given. Each entry \
+MUST include a "url" key copied verbatim from the page header, plus every \
+dimension listed above.
+"""
+
+_BATCH_USER_MSG_TEMPLATE = """\
+Analyze these {count} pages for SEO.
+
+{page_blocks}
+Return ONLY a JSON object of the form {{"results": [<entry>, ...]}} with one \
+entry per page, in order. {entry_spec}
+"""
+
+_BATCH_SCHEMA_SPEC_TEMPLATE = """\
+Each entry is the page "url" plus an object matching the following schema:
+
+{schema}"""
+
+_BATCH_ENFORCED_SPEC = (
+    'Each entry is the page "url" plus the dimensions above (the response schema is enforced).'
+)
+
+# Map step of chunked content analysis: one compact prompt per chunk
+_CHUNK_USER_MSG_TEMPLATE = """\
+Analyze the content of this page for SEO: {url}
+The page is long; this is part {index} of {count} of its text. Judge this \
+part as one section of the whole page.
+
+TITLE: {title}
+H1: {h1}
+WORD COUNT (whole page): {word_count}
+
+TEXT (part {index} of {count}):
+{text}
+
+{output_spec}"""
+
+# Rough chars-per-token ratio used to size prompts without a tokenizer.
+_CHARS_PER_TOKEN = 4
+
+# Output budget reserved per page in a batched completion, and the hard cap
+# on a batched completion's max_tokens. Together they bound the batch size.
+_LLM_BATCH_TOKENS_PER_PAGE = 1024
+_LLM_BATCH_MAX_TOKENS = 8192
+
+# Defaults for any LLM-scored dimension the model omitted
+_FIELD_DEFAULTS: dict[str, Any] = {
+    "schema_analysis":  {"score": 0, "detected_types": [], "missing_fields": []},
+    "content_analysis": {"score": 0, "answers_user_intent": False, "issues": []},
+    "link_analysis":    {"score": 0, "issues": []},
+    "accessibility":    {"llm_score": 0, "issues": []},
+}
+
+
+# A page report: the PageAudit shape as a plain dict. The crawl passes these
+# around unvalidated; JsonReportPipeline validates each one once before writing.
+PageReport = dict[str, Any]
+
+# Spider-computed sections of a page, each a plain dict with model field names
+_CONTEXT_SECTIONS = (
+    "meta_tags", "headers", "image_stats", "onpage_seo", "link_analysis",
+    "performance", "readability", "security", "accessibility", "canonical_analysis",
+)
+
+
+@dataclass(slots=True)
+class PageContext:
+    """Everything the spider extracted for one page — the input to an LLM call.
+
+    The sections are raw dicts (scores already filled in by
+    :mod:`ai_seo_auditor.models.scoring`), not Pydantic models.
     """
+    url: str
+    html: str
+    json_ld: list[dict]
+    text: str
+    meta_tags: dict[str, Any]
+    headers: dict[str, Any]
+    image_stats: dict[str, Any]
+    onpage_seo: dict[str, Any]
+    link_analysis: dict[str, Any]
+    performance: dict[str, Any]
+    readability: dict[str, Any]
+    security: dict[str, Any]
+    accessibility: dict[str, Any]
+    canonical_analysis: dict[str, Any]
+    # ``structured_data.validate_json_ld`` result, when validated locally
+    structured_data: Optional[dict[str, Any]] = None
+    # Untruncated main-content text, kept for chunked content analysis
+    full_text: Optional[str] = None
 
-    flat_schema = _get_flat_schema()
+    def to_record(self, include_inputs: bool = True) -> dict[str, Any]:
+        """JSON-serializable form. ``include_inputs=False`` drops the raw
+        html/text/json_ld and keeps only what a finished audit needs."""
+        record: dict[str, Any] = {"url": self.url}
+        if include_inputs:
+            record.update(html=self.html, json_ld=self.json_ld, text=self.text)
+        for name in _CONTEXT_SECTIONS:
+            record[name] = getattr(self, name)
+        if self.structured_data is not None:
+            record["structured_data"] = self.structured_data
+        if include_inputs and self.full_text is not None:
+            record["full_text"] = self.full_text
+        return record
 
-    user_msg = _USER_MSG_TEMPLATE.format(
-        url=url,
-        meta_tags=meta_tags.model_dump_json(),
-        headers=headers.model_dump_json(),
-        image_stats=image_stats.model_dump_json(),
-        json_ld=json.dumps(json_ld, indent=2)[:_JSON_LD_MAX_CHARS],
-        html=html,
-        text=text,
-        internal_links=link_analysis.internal_links,
-        external_links=link_analysis.external_links,
-        nofollow_count=link_analysis.nofollow_count,
-        word_count=readability.word_count,
-        has_skip_nav=accessibility.has_skip_nav,
-        aria_landmarks=accessibility.aria_landmark_count,
-        form_labels_missing=accessibility.form_labels_missing,
-        has_lang=accessibility.has_lang_attribute,
-        generic_links=accessibility.generic_link_text_count,
-        tabindex_misuse=accessibility.tabindex_misuse_count,
-        alt_coverage=accessibility.image_alt_coverage_pct,
-        schema=json.dumps(flat_schema, indent=2),
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "PageContext":
+        return cls(
+            url=record["url"],
+            html=record.get("html", ""),
+            json_ld=record.get("json_ld", []),
+            text=record.get("text", ""),
+            **{name: record[name] for name in _CONTEXT_SECTIONS},
+            structured_data=record.get("structured_data"),
+            full_text=record.get("full_text"),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Dimension policy — which LLM dimensions a page actually needs the model for
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DimensionPolicy:
+    """Per-page rules for filling LLM dimensions deterministically.
+
+    - ``validate_json_ld``: the spider checks JSON-LD against the bundled
+      schema.org rules (:mod:`structured_data`); SchemaScore comes from that
+      and the model only sees a one-line summary instead of the raw JSON.
+    - ``skip_schema_without_json_ld``: no JSON-LD means SchemaScore is forced
+      to 0 anyway, so the model is not asked.
+    - ``thin_content_words``: pages with fewer words get a rule-based content
+      score in the rubric's "no useful content" band (0 disables).
+    - ``skip_links_without_anchors``: a page without links scores 0.
+    """
+    validate_json_ld: bool = True
+    skip_schema_without_json_ld: bool = True
+    thin_content_words: int = 50
+    skip_links_without_anchors: bool = True
+
+
+DEFAULT_DIMENSION_POLICY = DimensionPolicy()
+
+
+@dataclass
+class ModelCascade:
+    """Two-tier model cascade: ``fast_model`` (served by the same endpoints)
+    scores a page first; dimensions go on to the endpoints' own, stronger
+    model when the fast answer is missing or fails validation, or when its
+    score lies within ``ambiguous_band`` (inclusive). Pages whose URL
+    matches one of ``important_url_patterns`` (regular expressions) go
+    straight to the strong model.
+    """
+    fast_model: str
+    ambiguous_band: tuple[int, int] = (40, 70)
+    important_url_patterns: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        low, high = self.ambiguous_band
+        self.ambiguous_band = (int(low), int(high))
+        self._important = [re.compile(pattern) for pattern in self.important_url_patterns]
+
+    def is_important(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self._important)
+
+    def is_ambiguous(self, score: Any) -> bool:
+        low, high = self.ambiguous_band
+        return isinstance(score, int) and low <= score <= high
+
+
+@dataclass
+class ContentChunking:
+    """Map-reduce content analysis for long pages.
+
+    When a page's untruncated text (``PageContext.full_text``) is longer
+    than ``threshold_chars``, content_analysis is not taken from the
+    truncated page prompt. The text is split into chunks of about
+    ``chunk_tokens``, each scored concurrently with a compact prompt (at
+    most ``chunk_max_tokens`` of output), and the answers are merged by
+    :func:`content_chunking.reduce_findings`. ``page_token_cap`` bounds the
+    page's estimated prompt and output tokens, main request included; when
+    it allows fewer chunks than the text has, they are picked evenly
+    across the page.
+    """
+    threshold_chars: int = 6000
+    chunk_tokens: int = 1500
+    chunk_max_tokens: int = 768
+    page_token_cap: int = 24000
+
+    def applies(self, ctx: PageContext) -> bool:
+        return ctx.full_text is not None and len(ctx.full_text) > self.threshold_chars
+
+
+def llm_kwargs_from_config(audit_config: dict[str, Any], logger: Optional[logging.Logger] = None) -> dict[str, Any]:
+    """LLM call options from the ``audit_config.yaml`` keys, as accepted by
+    :func:`analyze_page` and :func:`analyze_batch_with_llm`."""
+    return {
+        "timeout_seconds": float(audit_config.get("llm_timeout_seconds", 60)),
+        "retry_attempts": int(audit_config.get("llm_retry_attempts", 2)),
+        "retry_base_delay": float(audit_config.get("llm_retry_base_delay", 1.0)),
+        "stream": bool(audit_config.get("llm_stream", False)),
+        # None → LLM_STRUCTURED_OUTPUT (on for Ollama)
+        "structured_output": audit_config.get("llm_structured_output"),
+        "cascade": ModelCascade(**audit_config["llm_cascade"]) if audit_config.get("llm_cascade") else None,
+        "split_dimensions": bool(audit_config.get("llm_split_dimensions", False)),
+        "chunking": ContentChunking(**audit_config["llm_chunking"]) if audit_config.get("llm_chunking") else None,
+        "templates": TemplateRegistry() if audit_config.get("llm_template_diff", False) else None,
+        "policy": DimensionPolicy(**(audit_config.get("llm_dimension_policy") or {})),
+        "logger": logger,
+    }
+
+
+def plan_dimensions(
+    ctx: PageContext,
+    policy: DimensionPolicy = DEFAULT_DIMENSION_POLICY,
+) -> tuple[tuple[str, ...], dict[str, dict]]:
+    """Split the LLM dimensions into those the model must score and those
+    filled in by rules. Returns ``(model_dimensions, rule_data)``."""
+    rule_data: dict[str, dict] = {}
+
+    if policy.validate_json_ld and ctx.structured_data is not None:
+        rule_data["schema_analysis"] = schema_score(ctx.structured_data)
+    elif policy.skip_schema_without_json_ld and not ctx.json_ld:
+        rule_data["schema_analysis"] = {"score": 0, "detected_types": [], "missing_fields": []}
+
+    word_count = ctx.readability["word_count"]
+    if word_count < policy.thin_content_words:
+        rule_data["content_analysis"] = {
+            "score": round(29 * word_count / policy.thin_content_words),
+            "answers_user_intent": False,
+            "content_uniqueness_note": f"Only {word_count} words of text — too thin to assess.",
+            "answer_snippet": None,
+            "issues": [make_issue("text_content_missing", "high" if word_count == 0 else None, words=word_count)],
+        }
+
+    links = ctx.link_analysis
+    if policy.skip_links_without_anchors and links["internal_links"] + links["external_links"] == 0:
+        rule_data["link_analysis"] = {
+            "score": 0,
+            "issues": [make_issue("links_missing")],
+        }
+
+    model_dims = tuple(d for d in _EXPECTED_DIMENSIONS if d not in rule_data)
+    return model_dims, rule_data
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) for prompt budgeting."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def _build_page_block(ctx: PageContext) -> str:
+    """Render the per-page context section shared by single and batched prompts."""
+    return _PAGE_BLOCK_TEMPLATE.format(**_page_fields(ctx), html=ctx.html, text=ctx.text)
+
+
+def _build_dimension_block(ctx: PageContext, dim: str) -> str:
+    """Render the context one dimension's split-mode prompt needs."""
+    extra: dict[str, str] = {}
+    if dim == "content_analysis":
+        extra["text"] = ctx.text
+    elif dim == "link_analysis":
+        extra["anchors"] = _anchor_list(ctx.html)
+    elif dim == "accessibility":
+        extra["markup"] = _a11y_markup(ctx.html)
+    return _DIMENSION_BLOCK_TEMPLATES[dim].format(**_page_fields(ctx), **extra)
+
+
+def _parse_snippet(html: str) -> Optional[Any]:
+    if not html.strip():
+        return None
+    try:
+        return lxml_html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _anchor_list(html: str) -> str:
+    """One ``anchor text -> href`` line per link of the HTML snippet."""
+    root = _parse_snippet(html)
+    lines = []
+    for anchor in root.iter("a") if root is not None else ():
+        text = " ".join(anchor.text_content().split())[:80]
+        lines.append(f"{text or '(no text)'} -> {anchor.get('href', '')}")
+        if len(lines) >= _MAX_PROMPT_ANCHORS:
+            break
+    return "\n".join(lines) or "(no links)"
+
+
+def _a11y_markup(html: str) -> str:
+    """Landmark and form elements of the HTML snippet as bare opening tags
+    (accessibility-relevant attributes only, plus label/button text)."""
+    root = _parse_snippet(html)
+    lines = []
+    for el in root.iter() if root is not None else ():
+        if not isinstance(el.tag, str):
+            continue
+        if el.tag not in _A11Y_MARKUP_TAGS and el.get("role") is None and el.get("tabindex") is None:
+            continue
+        attrs = "".join(
+            f' {k}="{v}"' for k, v in el.attrib.items() if k in _A11Y_MARKUP_ATTRS or k.startswith("aria-")
+        )
+        text = " ".join(el.text_content().split())[:60] if el.tag in ("label", "button", "legend") else ""
+        lines.append(f"<{el.tag}{attrs}>{text}")
+        if len(lines) >= _MAX_MARKUP_LINES:
+            break
+    return "\n".join(lines) or "(no landmark or form elements)"
+
+
+def _page_fields(ctx: PageContext) -> dict[str, Any]:
+    """Template fields shared by the page block and the dimension blocks."""
+    return dict(
+        meta_tags=json.dumps(ctx.meta_tags),
+        headers=json.dumps(ctx.headers),
+        image_stats=json.dumps(ctx.image_stats),
+        json_ld=(
+            summarize(ctx.structured_data) if ctx.structured_data is not None
+            else json.dumps(ctx.json_ld, indent=2)[:_JSON_LD_MAX_CHARS]
+        ),
+        internal_links=ctx.link_analysis["internal_links"],
+        external_links=ctx.link_analysis["external_links"],
+        nofollow_count=ctx.link_analysis["nofollow_count"],
+        word_count=ctx.readability["word_count"],
+        has_skip_nav=ctx.accessibility["has_skip_nav"],
+        aria_landmarks=ctx.accessibility["aria_landmark_count"],
+        form_labels_missing=ctx.accessibility["form_labels_missing"],
+        has_lang=ctx.accessibility["has_lang_attribute"],
+        generic_links=ctx.accessibility["generic_link_text_count"],
+        tabindex_misuse=ctx.accessibility["tabindex_misuse_count"],
+        alt_coverage=ctx.accessibility["image_alt_coverage_pct"],
     )
 
-    timeout_seconds = timeout_seconds if timeout_seconds is not None else LLM_TIMEOUT_SECONDS
-    retry_attempts = retry_attempts if retry_attempts is not None else LLM_RETRY_ATTEMPTS
-    retry_base_delay = retry_base_delay if retry_base_delay is not None else LLM_RETRY_BASE_DELAY_SECONDS
+
+@dataclass
+class _Completion:
+    """Raw completion text plus timings and token usage for one successful call."""
+    text: Optional[str]
+    ttft_ms: Optional[int] = None
+    stream_ms: Optional[int] = None
+    aborted_early: bool = False
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+def _estimate_prompt_tokens(messages: list[dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+async def _complete(
+    endpoint: Endpoint,
+    messages: list[dict[str, str]],
+    *,
+    max_tokens: int,
+    response_format: dict[str, Any] = _JSON_OBJECT_FORMAT,
+    model: Optional[str] = None,
+) -> _Completion:
+    response = await endpoint.get_client().chat.completions.create(
+        model=model or endpoint.model,
+        messages=messages,
+        response_format=response_format,
+        max_tokens=max_tokens,
+        **_provider_options(messages, max_tokens),
+    )
+    usage = response.usage
+    return _Completion(
+        text=response.choices[0].message.content,
+        prompt_tokens=usage.prompt_tokens if usage else None,
+        completion_tokens=usage.completion_tokens if usage else None,
+    )
+
+
+async def _stream_completion(
+    endpoint: Endpoint,
+    messages: list[dict[str, str]],
+    *,
+    max_tokens: int,
+    required_keys: tuple[str, ...],
+    allowed_keys: tuple[str, ...],
+    response_format: dict[str, Any] = _JSON_OBJECT_FORMAT,
+    model: Optional[str] = None,
+) -> _Completion:
+    """Stream a completion through :class:`IncrementalJsonScanner`.
+
+    Raises ``ValueError`` as soon as the output can no longer be a valid
+    object with only ``allowed_keys`` at the top level, and stops reading
+    once every one of ``required_keys`` has a complete value. Usage is only
+    reported in the final chunk, so early-aborted streams have none.
+    """
+    scanner = IncrementalJsonScanner(allowed_keys=allowed_keys, required_keys=required_keys)
+    parts: list[str] = []
+    first_token_at: Optional[float] = None
+    usage: Any = None
+    stream = await endpoint.get_client().chat.completions.create(
+        model=model or endpoint.model,
+        messages=messages,
+        response_format=response_format,
+        max_tokens=max_tokens,
+        stream=True,
+        stream_options={"include_usage": True},
+        **_provider_options(messages, max_tokens),
+    )
+    started = time.monotonic()
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            parts.append(delta)
+            scanner.feed(delta)
+            if scanner.invalid:
+                raise ValueError(f"Aborted stream, output cannot match schema: {scanner.error}")
+            if scanner.satisfied:
+                break
+    finally:
+        finished = time.monotonic()
+        await stream.close()
+
+    completion = _Completion(
+        text="".join(parts),
+        ttft_ms=round((first_token_at - started) * 1000) if first_token_at else None,
+        stream_ms=round((finished - first_token_at) * 1000) if first_token_at else None,
+        aborted_early=scanner.satisfied and not scanner.done,
+        prompt_tokens=usage.prompt_tokens if usage else None,
+        completion_tokens=usage.completion_tokens if usage else None,
+    )
+    if completion.aborted_early:
+        # Drop whatever followed the last complete member and close the object
+        completion.text = completion.text[:scanner.last_member_end] + "}"
+    return completion
+
+
+async def _request_json(
+    messages: list[dict[str, str]],
+    *,
+    label: str,
+    max_tokens: int,
+    timeout_seconds: float,
+    retry_attempts: int,
+    retry_base_delay: float,
+    logger: Optional[logging.Logger],
+    stream: bool = False,
+    required_keys: tuple[str, ...] = _EXPECTED_DIMENSIONS,
+    allowed_keys: tuple[str, ...] = _EXPECTED_DIMENSIONS,
+    meta: Optional[LlmCallMeta] = None,
+    cost: float = 1.0,
+    response_format: dict[str, Any] = _JSON_OBJECT_FORMAT,
+    keep_truncated: bool = False,
+    model: Optional[str] = None,
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """Run a JSON completion with retries on the endpoint pool.
+
+    Returns ``(data, None)`` on success or ``(None, last_error)`` once all
+    attempts are exhausted. With ``stream=True`` the completion is streamed
+    and aborted early (see :func:`_stream_completion`). Output that is not
+    valid JSON goes through :func:`repair_json` before it counts as failed
+    (``keep_truncated`` as there), so ``data`` may lack members that were
+    cut off. ``model`` overrides the endpoints' model (cascade fast tier).
+    Timings, the endpoint that answered, repairs and the number of
+    unusable (non-JSON, off-schema) outputs go to ``meta``. Each attempt
+    holds a slot of the adaptive limiter (``cost`` as in
+    :meth:`AdaptiveLimiter.slot`); retries back off with jitter and honour
+    ``Retry-After``.
+    """
+    pool = _get_pool()
+    limiter = _get_limiter()
+    meta = meta if meta is not None else LlmCallMeta()
+    meta.output_mode = response_format["type"]
     last_error: Optional[Exception] = None
-    data: Optional[dict] = None
-    audit_status = "complete"
-    client = _get_client()
+    call_started = time.monotonic()
+    queue_wait = 0.0
+    usage = _UsageTotals()
+
+    async def attempt_on(endpoint: Endpoint) -> _Completion:
+        if stream:
+            return await _stream_completion(
+                endpoint,
+                messages,
+                max_tokens=max_tokens,
+                required_keys=required_keys,
+                allowed_keys=allowed_keys,
+                response_format=response_format,
+                model=model,
+            )
+        return await _complete(
+            endpoint, messages, max_tokens=max_tokens, response_format=response_format, model=model,
+        )
 
     for attempt in range(retry_attempts + 1):
+        meta.retries = attempt
+        waited_from = time.monotonic()
+        attempt_started: Optional[float] = None
         try:
-            response = await asyncio.wait_for(
-                client.chat.completions.create(
-                    model=LLM_MODEL,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_msg},
-                    ],
-                    response_format={"type": "json_object"},
-                    max_tokens=_LLM_MAX_TOKENS,
-                ),
-                timeout=timeout_seconds,
-            )
+            async with limiter.slot(cost):
+                attempt_started = time.monotonic()
+                queue_wait += attempt_started - waited_from
+                meta.requests += 1
+                completion, endpoint, hedged = await pool.call(attempt_on, timeout=timeout_seconds)
+            meta.latency_ms = round((time.monotonic() - attempt_started) * 1000)
+            meta.endpoint = endpoint.name
+            meta.model = model or endpoint.model
+            meta.hedged = hedged
+            meta.streamed = stream
+            meta.ttft_ms = completion.ttft_ms
+            meta.stream_ms = completion.stream_ms
+            meta.aborted_early = completion.aborted_early
+            usage.add(completion, messages)
 
-            raw_json = response.choices[0].message.content
-            if not raw_json:
+            if not completion.text:
                 raise ValueError("Empty response from LLM")
 
-            data = json.loads(raw_json)
-            break
+            data = _parse_completion(completion.text, meta, keep_truncated)
+            meta.status = "ok"
+            meta.error = None
+            return data, None
         except (
             asyncio.TimeoutError,
             ValueError,
@@ -364,95 +1146,1068 @@ async def analyze_with_llm(
             openai.RateLimitError,
         ) as exc:
             last_error = exc
+            if isinstance(exc, ValueError):  # includes JSONDecodeError
+                meta.invalid_outputs += 1
+            if attempt_started is not None:
+                meta.latency_ms = round((time.monotonic() - attempt_started) * 1000)
             if logger:
                 logger.warning(
                     "LLM request failed on attempt %s/%s for %s: %s",
                     attempt + 1,
                     retry_attempts + 1,
-                    url,
+                    label,
                     exc,
                 )
             if attempt < retry_attempts:
-                await asyncio.sleep(retry_base_delay * (2 ** attempt))
-            else:
-                break
+                await asyncio.sleep(backoff_delay(retry_base_delay, attempt, retry_after_seconds(exc)))
+        finally:
+            meta.queue_wait_ms = round(queue_wait * 1000)
+            meta.total_ms = round((time.monotonic() - call_started) * 1000)
+            usage.apply(meta)
+
+    meta.status = "failed"
+    meta.error = type(last_error).__name__ if last_error is not None else None
+    return None, last_error
 
-    if data is None:
-        audit_status = "failed"
-        fallback_issue = {
-            "severity": "high",
-            "description": f"LLM analysis failed: {last_error}",
-            "suggested_fix": "Retry the audit or inspect the LLM service logs.",
-        }
-        data = {
-            "schema_analysis": {"score": 0, "detected_types": [], "missing_fields": []},
-            "content_analysis": {
-                "score": 0,
-                "answers_user_intent": False,
-                "issues": [fallback_issue],
-            },
-            "link_analysis": {"score": 0, "issues": []},
-            "accessibility": {"llm_score": 0, "issues": []},
-        }
 
-    # Backfill defaults for any top-level fields the LLM omitted
-    _FIELD_DEFAULTS: dict[str, Any] = {
-        "schema_analysis":  {"score": 0, "detected_types": [], "missing_fields": []},
-        "content_analysis": {"score": 0, "answers_user_intent": False, "issues": []},
-        "link_analysis":    {"score": 0, "issues": []},
-        "accessibility":    {"llm_score": 0, "issues": []},
+def _parse_completion(text: str, meta: LlmCallMeta, keep_truncated: bool) -> dict:
+    """The completion's JSON object, repaired if necessary (recorded in ``meta``)."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        repaired = repair_json(text, keep_truncated=keep_truncated)
+        if repaired is None or not repaired.data:
+            raise
+        meta.repaired = True
+        meta.salvaged_dimensions = len(repaired.data)
+        return repaired.data
+    if not isinstance(data, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return data
+
+
+@dataclass
+class _UsageTotals:
+    """Token usage summed over every attempt that produced a completion."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    completions: int = 0
+    estimated: bool = False
+
+    def add(self, completion: _Completion, messages: list[dict[str, str]]) -> None:
+        self.completions += 1
+        if completion.prompt_tokens is None or completion.completion_tokens is None:
+            self.estimated = True
+            self.prompt_tokens += _estimate_prompt_tokens(messages)
+            self.completion_tokens += estimate_tokens(completion.text or "")
+        else:
+            self.prompt_tokens += completion.prompt_tokens
+            self.completion_tokens += completion.completion_tokens
+
+    def apply(self, meta: LlmCallMeta) -> None:
+        if self.completions:
+            meta.prompt_tokens = self.prompt_tokens
+            meta.completion_tokens = self.completion_tokens
+            meta.tokens_estimated = self.estimated
+
+
+# LLM-scored dimensions and the models that validate them at the LLM boundary
+_LLM_DIMENSION_MODELS: dict[str, type] = {
+    "schema_analysis": SchemaScore,
+    "content_analysis": ContentScore,
+    "link_analysis": LinkAnalysis,
+    "accessibility": AccessibilityAnalysis,
+}
+
+# Spider-extracted sub-fields merged into the LLM-scored dimensions
+_SPIDER_LINK_FIELDS = ("internal_links", "external_links", "nofollow_count", "broken_links")
+_SPIDER_A11Y_FIELDS = (
+    "has_skip_nav", "aria_landmark_count", "form_labels_missing", "has_lang_attribute",
+    "image_alt_coverage_pct", "generic_link_text_count", "has_heading_structure",
+    "tabindex_misuse_count", "has_document_title",
+)
+
+
+def _merge_spider_fields(ctx: PageContext, dim: str, value: dict) -> dict:
+    """Add the spider-extracted sub-fields of an LLM-scored dimension (in place)."""
+    if dim == "link_analysis":
+        # LLM provides score+issues; spider provides counts
+        for name in _SPIDER_LINK_FIELDS:
+            value[name] = ctx.link_analysis[name]
+    elif dim == "accessibility":
+        # LLM provides llm_score+issues; spider provides structural data
+        for name in _SPIDER_A11Y_FIELDS:
+            value[name] = ctx.accessibility[name]
+        # Ensure score field exists for the blended calculation validator
+        value.setdefault("score", 0)
+    return value
+
+
+def _valid_dimension(ctx: PageContext, dim: str, value: Any) -> bool:
+    """Whether the model's answer for ``dim`` passes validation."""
+    if not isinstance(value, dict):
+        return False
+    try:
+        _LLM_DIMENSION_MODELS[dim].model_validate(_merge_spider_fields(ctx, dim, copy.deepcopy(value)))
+    except (ValidationError, TypeError, ValueError):
+        return False
+    return True
+
+
+def _build_page_report(
+    ctx: PageContext,
+    data: dict,
+    audit_status: str,
+    meta: Optional[LlmCallMeta] = None,
+    sources: Optional[dict[str, str]] = None,
+) -> PageReport:
+    """Merge spider-computed fields into the LLM dimensions.
+
+    Only the four LLM-scored dimensions are validated here (raising
+    ``ValidationError`` on bad model output); the spider sections are
+    already-scored dicts and are passed through untouched.
+    """
+    # Validate the model's output (also enforces business rules like schema score → 0)
+    for dim, model in _LLM_DIMENSION_MODELS.items():
+        data[dim] = model.model_validate(_merge_spider_fields(ctx, dim, data.get(dim, {}))).model_dump()
+
+    return {
+        "url": ctx.url,
+        "audit_status": audit_status,
+        "meta_tags": ctx.meta_tags,
+        "headers": ctx.headers,
+        "image_stats": ctx.image_stats,
+        "onpage_seo": ctx.onpage_seo,
+        "schema_analysis": data["schema_analysis"],
+        "content_analysis": data["content_analysis"],
+        "link_analysis": data["link_analysis"],
+        "performance": ctx.performance,
+        "readability": ctx.readability,
+        "security": ctx.security,
+        "accessibility": data["accessibility"],
+        "canonical_analysis": ctx.canonical_analysis,
+        "llm_meta": meta.model_dump() if meta is not None else None,
+        "dimension_sources": sources or {},
     }
-    for key, default in _FIELD_DEFAULTS.items():
-        if key not in data:
-            if logger:
-                logger.warning("LLM response missing '%s' for %s — using defaults", key, url)
-            data[key] = default
+
+
+async def analyze_with_llm(
+    url: str,
+    html: str,
+    json_ld: list[dict],
+    text: str,
+    meta_tags: dict[str, Any],
+    headers: dict[str, Any],
+    image_stats: dict[str, Any],
+    onpage_seo: dict[str, Any],
+    link_analysis: dict[str, Any],
+    performance: dict[str, Any],
+    readability: dict[str, Any],
+    security: dict[str, Any],
+    accessibility: dict[str, Any],
+    canonical_analysis: dict[str, Any],
+    timeout_seconds: Optional[float] = None,
+    retry_attempts: Optional[int] = None,
+    retry_base_delay: Optional[float] = None,
+    logger: Optional[logging.Logger] = None,
+    stream: Optional[bool] = None,
+    structured_output: Optional[bool] = None,
+) -> PageReport:
+    """Analyze page content using the configured LLM and return the page report.
+
+    The LLM only produces 4 dimensions: schema_analysis, content_analysis,
+    link_analysis (score+issues), and accessibility (llm_score+issues).
+    All other dimensions are spider-computed and injected post-hoc.
+    """
+    ctx = PageContext(
+        url=url,
+        html=html,
+        json_ld=json_ld,
+        text=text,
+        meta_tags=meta_tags,
+        headers=headers,
+        image_stats=image_stats,
+        onpage_seo=onpage_seo,
+        link_analysis=link_analysis,
+        performance=performance,
+        readability=readability,
+        security=security,
+        accessibility=accessibility,
+        canonical_analysis=canonical_analysis,
+    )
+    return await analyze_page(
+        ctx,
+        timeout_seconds=timeout_seconds,
+        retry_attempts=retry_attempts,
+        retry_base_delay=retry_base_delay,
+        logger=logger,
+        stream=stream,
+        structured_output=structured_output,
+    )
+
+
+async def analyze_page(
+    ctx: PageContext,
+    timeout_seconds: Optional[float] = None,
+    retry_attempts: Optional[int] = None,
+    retry_base_delay: Optional[float] = None,
+    logger: Optional[logging.Logger] = None,
+    stream: Optional[bool] = None,
+    policy: Optional[DimensionPolicy] = None,
+    structured_output: Optional[bool] = None,
+    cascade: Optional[ModelCascade] = None,
+    split_dimensions: bool = False,
+    chunking: Optional[ContentChunking] = None,
+    templates: Optional[TemplateRegistry] = None,
+) -> PageReport:
+    """Single-page analysis for an already-assembled :class:`PageContext`.
+
+    Only the dimensions :func:`plan_dimensions` leaves to the model are
+    requested — the prompt and schema shrink accordingly — and the call is
+    skipped entirely when rules cover all of them. ``structured_output``
+    (default ``LLM_STRUCTURED_OUTPUT``) enforces the schema through the
+    response format instead of the prompt. With a ``cascade`` the fast
+    model answers first (see :class:`ModelCascade`). ``split_dimensions``
+    asks for each dimension in its own, concurrent prompt that carries only
+    the context that dimension needs. With ``chunking``, long pages get
+    their content_analysis from the whole text (see :class:`ContentChunking`),
+    concurrently with the request for the other dimensions. With
+    ``templates``, a page whose structural template already has an exemplar
+    is sent as its differences from it (see :func:`build_template_diff_messages`);
+    a completely analysed page becomes its template's exemplar.
+    """
+    model_dims, rule_data = plan_dimensions(ctx, policy or DEFAULT_DIMENSION_POLICY)
+    if not model_dims:
+        return finalize_page_audit(ctx, model_dims, rule_data, None)
+
+    structured = structured_output if structured_output is not None else LLM_STRUCTURED_OUTPUT
+    request_kwargs: dict[str, Any] = dict(
+        max_tokens=_LLM_MAX_TOKENS,
+        timeout_seconds=timeout_seconds if timeout_seconds is not None else LLM_TIMEOUT_SECONDS,
+        retry_attempts=retry_attempts if retry_attempts is not None else LLM_RETRY_ATTEMPTS,
+        retry_base_delay=retry_base_delay if retry_base_delay is not None else LLM_RETRY_BASE_DELAY_SECONDS,
+        logger=logger,
+        stream=stream if stream is not None else LLM_STREAM,
+    )
+    ask = dict(structured=structured, split=split_dimensions, request_kwargs=request_kwargs, templates=templates)
+    if chunking is not None and "content_analysis" in model_dims and chunking.applies(ctx):
+        return await _analyze_chunked(ctx, model_dims, rule_data, chunking, cascade, ask, logger)
+
+    meta = LlmCallMeta()
+    llm_data, last_error = await _ask_page(ctx, model_dims, meta, cascade, ask)
+    report = finalize_page_audit(ctx, model_dims, rule_data, llm_data, last_error, meta, logger)
+    if templates is not None and report["audit_status"] == "complete" and meta.template_exemplar is None:
+        templates.register(ctx.url, ctx.html, {dim: llm_data[dim] for dim in model_dims})
+    return report
+
+
+async def _ask_page(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    meta: LlmCallMeta,
+    cascade: Optional[ModelCascade],
+    ask: dict[str, Any],
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """Request ``model_dims`` of one page, through the cascade and the
+    repair follow-up where they apply."""
+    split_dimensions = ask["split"]
+    fast_model = cascade.fast_model if cascade is not None and not cascade.is_important(ctx.url) else None
+    llm_data, last_error = await _ask(ctx, model_dims, label=ctx.url, meta=meta, model=fast_model, **ask)
+    meta.prompt_mode = "split" if split_dimensions else "single"
+
+    if fast_model is not None:
+        llm_data, last_error = await _escalate(ctx, model_dims, llm_data, last_error, meta, cascade, ask)
+    elif cascade is not None and llm_data is not None:
+        meta.dimension_tiers = {dim: "strong" for dim in model_dims if dim in llm_data}
+
+    # A repaired (e.g. truncated) answer keeps its complete dimensions; only
+    # the ones it lost are asked for again, in a narrower request
+    missing = tuple(d for d in model_dims if llm_data is not None and d not in llm_data)
+    if meta.repaired and missing and fast_model is None and not split_dimensions:
+        followup_meta = LlmCallMeta()
+        followup, _ = await _ask(
+            ctx, missing, label=f"{ctx.url} (follow-up: {', '.join(missing)})", meta=followup_meta, **ask,
+        )
+        if followup is not None:
+            llm_data.update({dim: followup[dim] for dim in missing if dim in followup})
+        _fold_meta(meta, followup_meta)
+        meta.followup_dimensions = len(missing)
+    return llm_data, last_error
+
+
+async def _analyze_chunked(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    rule_data: dict[str, dict],
+    chunking: ContentChunking,
+    cascade: Optional[ModelCascade],
+    ask: dict[str, Any],
+    logger: Optional[logging.Logger],
+) -> PageReport:
+    """:func:`analyze_page` for a long page: content_analysis map-reduced
+    over the full text while the other dimensions are requested as usual."""
+    other_dims = tuple(d for d in model_dims if d != "content_analysis")
+    started = time.monotonic()
+    meta, content_meta = LlmCallMeta(), LlmCallMeta()
+    if other_dims:
+        (llm_data, last_error), (content, content_error) = await asyncio.gather(
+            _ask_page(ctx, other_dims, meta, cascade, ask),
+            _analyze_long_content(ctx, other_dims, chunking, content_meta, ask),
+        )
+        _fold_meta(meta, content_meta)
+        meta.content_chunks = content_meta.content_chunks
+        meta.content_chunks_skipped = content_meta.content_chunks_skipped
+        meta.total_ms = round((time.monotonic() - started) * 1000)
+        # The page's call failed if either part did
+        if content_meta.status == "failed" and meta.status == "ok":
+            meta.status, meta.error = "failed", content_meta.error
+    else:
+        llm_data, last_error = {}, None
+        content, content_error = await _analyze_long_content(ctx, other_dims, chunking, content_meta, ask)
+        meta = content_meta
+        meta.prompt_mode = "single"
+
+    if content is not None:
+        llm_data = {**(llm_data or {}), "content_analysis": content}
+    elif not llm_data:
+        llm_data, last_error = None, last_error or content_error
+    return finalize_page_audit(ctx, model_dims, rule_data, llm_data, last_error, meta, logger)
+
+
+async def _analyze_long_content(
+    ctx: PageContext,
+    other_dims: tuple[str, ...],
+    chunking: ContentChunking,
+    meta: LlmCallMeta,
+    ask: dict[str, Any],
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """Map: score chunks of the full text concurrently. Reduce: merge the
+    valid answers. Returns ``(content_analysis, None)`` or ``(None, error)``."""
+    structured = ask["structured"]
+    chunks = split_text(ctx.full_text or "", chunking.chunk_tokens * _CHARS_PER_TOKEN)
+    reserved = 0
+    if other_dims:
+        reserved = _estimate_prompt_tokens(build_page_messages(ctx, other_dims, structured)) + _LLM_MAX_TOKENS
+    per_chunk = estimate_tokens(_CHUNK_USER_MSG_TEMPLATE) + chunking.chunk_tokens + chunking.chunk_max_tokens
+    per_chunk += estimate_tokens(_build_system_prompt(("content_analysis",)))
+    selected = select_chunks(len(chunks), max(1, (chunking.page_token_cap - reserved) // per_chunk))
+    meta.content_chunks = len(selected)
+    meta.content_chunks_skipped = len(chunks) - len(selected)
+
+    started = time.monotonic()
+    metas = [LlmCallMeta() for _ in selected]
+    answers = await asyncio.gather(*(
+        _request_json(
+            build_chunk_messages(ctx, chunks[i], i, len(chunks), structured),
+            label=f"{ctx.url} [content {i + 1}/{len(chunks)}]",
+            required_keys=("content_analysis",),
+            meta=chunk_meta,
+            response_format=_get_response_format(("content_analysis",), structured),
+            **{**ask["request_kwargs"], "max_tokens": chunking.chunk_max_tokens},
+        )
+        for i, chunk_meta in zip(selected, metas)
+    ))
+
+    findings: list[tuple[dict, int]] = []
+    last_error: Optional[Exception] = None
+    for i, (answer, error) in zip(selected, answers):
+        try:
+            finding = ContentScore.model_validate((answer or {})["content_analysis"]).model_dump()
+        except (KeyError, ValidationError, TypeError, ValueError) as exc:
+            last_error = error or exc
+            continue
+        findings.append((finding, len(chunks[i])))
+
+    for chunk_meta in metas:
+        _fold_meta(meta, chunk_meta)
+    answered = next((m for m in metas if m.status == "ok"), metas[0])
+    meta.endpoint, meta.model, meta.output_mode = answered.endpoint, answered.model, answered.output_mode
+    meta.retries = max(m.retries for m in metas)
+    meta.latency_ms = max((m.latency_ms or 0) for m in metas)
+    meta.total_ms = round((time.monotonic() - started) * 1000)
+    if not findings:
+        meta.status, meta.error = "failed", type(last_error).__name__ if last_error else None
+        return None, last_error
+    meta.status, meta.error = "ok", None
+    return reduce_findings(findings), None
+
+
+async def _escalate(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    llm_data: Optional[dict],
+    last_error: Optional[Exception],
+    meta: LlmCallMeta,
+    cascade: ModelCascade,
+    ask: dict[str, Any],
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """Send the fast tier's missing, invalid and ambiguous dimensions to the
+    strong model. Returns the merged answer; invalid fast answers that the
+    strong model did not replace are dropped (and later backfilled)."""
+    fast = llm_data or {}
+    invalid = {dim for dim in model_dims if not _valid_dimension(ctx, dim, fast.get(dim))}
+    escalate = tuple(
+        dim for dim in model_dims
+        if dim in invalid
+        or cascade.is_ambiguous(fast[dim].get("llm_score" if dim == "accessibility" else "score"))
+    )
+    merged = {dim: fast[dim] for dim in model_dims if dim not in invalid}
+    meta.dimension_tiers = {dim: "fast" for dim in merged}
+    if not escalate:
+        return merged, last_error
+
+    meta.escalated = list(escalate)
+    strong_meta = LlmCallMeta()
+    strong, strong_error = await _ask(
+        ctx, escalate, label=f"{ctx.url} (escalated: {', '.join(escalate)})", meta=strong_meta, **ask,
+    )
+    _fold_meta(meta, strong_meta)
+    if strong is None:
+        return (merged or None), (strong_error if not merged else None)
+    for dim in escalate:
+        if dim in strong:
+            merged[dim] = strong[dim]
+            meta.dimension_tiers[dim] = "strong"
+    meta.model = strong_meta.model
+    meta.status, meta.error = "ok", None
+    return merged, None
+
+
+async def _ask(
+    ctx: PageContext,
+    dims: tuple[str, ...],
+    *,
+    label: str,
+    meta: LlmCallMeta,
+    structured: bool,
+    split: bool,
+    request_kwargs: dict[str, Any],
+    model: Optional[str] = None,
+    templates: Optional[TemplateRegistry] = None,
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """Request ``dims`` of one page: in a single prompt (a template diff when
+    ``templates`` has the page's exemplar), or with ``split`` one concurrent
+    prompt per dimension (see :func:`_request_split`)."""
+    if split:
+        return await _request_split(
+            ctx, dims, label=label, meta=meta, structured=structured, request_kwargs=request_kwargs, model=model,
+        )
+    messages = build_page_messages(ctx, dims, structured)
+    if templates is not None:
+        messages = _template_diff_messages(ctx, dims, structured, templates, messages, meta)
+    return await _request_json(
+        messages,
+        label=label,
+        required_keys=dims,
+        meta=meta,
+        response_format=_get_response_format(dims, structured),
+        model=model,
+        **request_kwargs,
+    )
+
+
+async def _request_split(
+    ctx: PageContext,
+    dims: tuple[str, ...],
+    *,
+    label: str,
+    meta: LlmCallMeta,
+    structured: bool,
+    request_kwargs: dict[str, Any],
+    model: Optional[str] = None,
+) -> tuple[Optional[dict], Optional[Exception]]:
+    """One concurrent request per dimension, each with only its own context.
+
+    The answers are merged; a dimension whose request failed is simply
+    missing (and later backfilled). The per-request telemetry is folded into
+    ``meta``, with ``total_ms`` the wall-clock time until the last answer.
+    """
+    started = time.monotonic()
+    metas = [LlmCallMeta() for _ in dims]
+    answers = await asyncio.gather(*(
+        _request_json(
+            build_dimension_messages(ctx, dim, structured),
+            label=f"{label} [{dim}]",
+            required_keys=(dim,),
+            meta=sub_meta,
+            response_format=_get_response_format((dim,), structured),
+            model=model,
+            **request_kwargs,
+        )
+        for dim, sub_meta in zip(dims, metas)
+    ))
+
+    data: dict[str, Any] = {}
+    errors: list[Exception] = []
+    for dim, (answer, error) in zip(dims, answers):
+        if answer is not None and dim in answer:
+            data[dim] = answer[dim]
+        elif error is not None:
+            errors.append(error)
+
+    for sub_meta in metas:
+        _fold_meta(meta, sub_meta)
+    answered = next((m for m in metas if m.status == "ok"), metas[0])
+    meta.endpoint, meta.model, meta.output_mode = answered.endpoint, answered.model, answered.output_mode
+    meta.streamed = answered.streamed
+    meta.hedged = any(m.hedged for m in metas)
+    meta.retries = max(m.retries for m in metas)
+    meta.latency_ms = max((m.latency_ms or 0) for m in metas)
+    meta.queue_wait_ms = max((m.queue_wait_ms or 0) for m in metas)
+    meta.total_ms = round((time.monotonic() - started) * 1000)
+    meta.repaired = any(m.repaired for m in metas)
+    meta.salvaged_dimensions = sum(m.salvaged_dimensions for m in metas)
+    if data:
+        meta.status, meta.error = "ok", None
+        return data, None
+    last_error = errors[-1] if errors else ValueError("No dimension answered")
+    meta.status, meta.error = "failed", type(last_error).__name__
+    return None, last_error
+
+
+def _template_diff_messages(
+    ctx: PageContext,
+    dims: tuple[str, ...],
+    structured: bool,
+    templates: TemplateRegistry,
+    full_messages: list[dict[str, str]],
+    meta: LlmCallMeta,
+) -> list[dict[str, str]]:
+    """The diff prompt against the page's template exemplar when there is one
+    covering ``dims`` and its page section is at least ``templates.min_savings``
+    smaller than the full one; ``full_messages`` otherwise. Savings are added
+    to ``meta``."""
+    exemplar = templates.match(ctx.html)
+    if exemplar is None or exemplar.url == ctx.url or any(d not in exemplar.findings for d in dims):
+        return full_messages
+    block = _build_template_diff_block(ctx, dims, exemplar, diff_page(exemplar, ctx.html))
+    full_tokens = estimate_tokens(_build_page_block(ctx))
+    saved = full_tokens - estimate_tokens(block)
+    if saved < full_tokens * templates.min_savings:
+        return full_messages
+    meta.template_exemplar = exemplar.url
+    meta.template_tokens_saved += saved
+    return _build_messages(ctx, dims, structured, block)
+
+
+def _fold_meta(meta: LlmCallMeta, other: LlmCallMeta) -> None:
+    """Fold a second request's time, tokens and failures into the page's meta."""
+    meta.requests += other.requests
+    meta.invalid_outputs += other.invalid_outputs
+    meta.total_ms = (meta.total_ms or 0) + (other.total_ms or 0)
+    meta.queue_wait_ms = (meta.queue_wait_ms or 0) + (other.queue_wait_ms or 0)
+    if other.prompt_tokens is not None:
+        meta.prompt_tokens = (meta.prompt_tokens or 0) + other.prompt_tokens
+        meta.completion_tokens = (meta.completion_tokens or 0) + (other.completion_tokens or 0)
+        meta.tokens_estimated = meta.tokens_estimated or other.tokens_estimated
+
+
+def build_page_messages(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    structured: bool = False,
+) -> list[dict[str, str]]:
+    """System + user messages asking the model for ``model_dims`` of one page.
+    With ``structured`` the schema travels in the response format, not here."""
+    return _build_messages(ctx, model_dims, structured, _build_page_block(ctx))
+
+
+def build_dimension_messages(ctx: PageContext, dim: str, structured: bool = False) -> list[dict[str, str]]:
+    """Split-mode messages for one dimension, with only that dimension's context."""
+    return _build_messages(ctx, (dim,), structured, _build_dimension_block(ctx, dim))
+
+
+def build_template_diff_messages(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    exemplar: TemplateExemplar,
+    diff: PageDiff,
+    structured: bool = False,
+) -> list[dict[str, str]]:
+    """Messages describing a page by its differences from ``exemplar``, whose
+    findings for ``model_dims`` are included for reference."""
+    return _build_messages(ctx, model_dims, structured, _build_template_diff_block(ctx, model_dims, exemplar, diff))
+
+
+def _build_template_diff_block(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    exemplar: TemplateExemplar,
+    diff: PageDiff,
+) -> str:
+    def lines(items: list[str]) -> str:
+        return "\n".join(items[:_MAX_DIFF_LINES]) or "(none)"
+
+    return _TEMPLATE_DIFF_BLOCK_TEMPLATE.format(
+        **_page_fields(ctx),
+        exemplar_url=exemplar.url,
+        findings=json.dumps({dim: exemplar.findings[dim] for dim in model_dims}),
+        markup_added=lines(diff.markup_added),
+        markup_removed=lines(diff.markup_removed),
+        text_added=lines(diff.text_added),
+    )
+
+
+def _build_messages(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    structured: bool,
+    page_block: str,
+) -> list[dict[str, str]]:
+    if structured:
+        output_spec = _ENFORCED_SPEC_TEMPLATE.format(keys=", ".join(model_dims))
+    else:
+        output_spec = _SCHEMA_SPEC_TEMPLATE.format(schema=json.dumps(_get_flat_schema(model_dims), indent=2))
+    user_msg = _USER_MSG_TEMPLATE.format(
+        url=ctx.url,
+        page_block=page_block,
+        output_spec=output_spec,
+        count=len(model_dims),
+        checklist=_build_checklist(model_dims),
+    )
+    return [
+        {"role": "system", "content": _build_system_prompt(model_dims)},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+def build_chunk_messages(
+    ctx: PageContext,
+    chunk: str,
+    index: int,
+    count: int,
+    structured: bool = False,
+) -> list[dict[str, str]]:
+    """Map-step messages scoring one chunk of a long page's text."""
+    dims = ("content_analysis",)
+    if structured:
+        output_spec = _ENFORCED_SPEC_TEMPLATE.format(keys="content_analysis")
+    else:
+        output_spec = _SCHEMA_SPEC_TEMPLATE.format(schema=json.dumps(_get_flat_schema(dims), indent=2))
+    user_msg = _CHUNK_USER_MSG_TEMPLATE.format(
+        url=ctx.url,
+        index=index + 1,
+        count=count,
+        title=ctx.meta_tags.get("title") or "",
+        h1=" | ".join(ctx.headers.get("h1") or []),
+        word_count=len((ctx.full_text or ctx.text).split()),
+        text=chunk,
+        output_spec=output_spec,
+    )
+    return [
+        {"role": "system", "content": _build_system_prompt(dims)},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+def build_page_request(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    structured_output: Optional[bool] = None,
+) -> dict[str, Any]:
+    """Chat-completions request body for one page, as sent in live mode."""
+    structured = structured_output if structured_output is not None else LLM_STRUCTURED_OUTPUT
+    return {
+        "model": _get_pool().endpoints[0].model,
+        "messages": build_page_messages(ctx, model_dims, structured),
+        "response_format": _get_response_format(model_dims, structured),
+        "max_tokens": _LLM_MAX_TOKENS,
+    }
+
+
+def estimate_page_tokens(
+    ctx: PageContext,
+    policy: Optional[DimensionPolicy] = None,
+    structured_output: Optional[bool] = None,
+) -> int:
+    """Estimated prompt plus output tokens of the page's LLM request
+    (0 when rules cover every dimension)."""
+    model_dims, _ = plan_dimensions(ctx, policy or DEFAULT_DIMENSION_POLICY)
+    if not model_dims:
+        return 0
+    structured = structured_output if structured_output is not None else LLM_STRUCTURED_OUTPUT
+    return _estimate_prompt_tokens(build_page_messages(ctx, model_dims, structured)) + _LLM_MAX_TOKENS
+
+
+def deterministic_page_audit(
+    ctx: PageContext,
+    policy: Optional[DimensionPolicy] = None,
+    reason: str = "LLM analysis skipped",
+) -> PageReport:
+    """The page report without any LLM call: rule-filled dimensions, and
+    defaults for the ones that needed the model (``dimension_sources``
+    "skipped", audit ``partial``), e.g. once the session budget is spent."""
+    model_dims, rule_data = plan_dimensions(ctx, policy or DEFAULT_DIMENSION_POLICY)
+    data = copy.deepcopy(rule_data)
+    sources = {dim: "rules" for dim in data}
+    if not model_dims:
+        return _build_page_report(ctx, data, "complete", None, sources)
+    for dim in model_dims:
+        data[dim] = copy.deepcopy(_FIELD_DEFAULTS[dim])
+        sources[dim] = "skipped"
+    target = next((d for d in model_dims if d != "schema_analysis"), "content_analysis")
+    data[target].setdefault("issues", []).append(
+        make_issue("llm_skipped", reason=reason, dimensions=", ".join(model_dims))
+    )
+    return _build_page_report(ctx, data, "partial", None, sources)
+
+
+def finalize_page_audit(
+    ctx: PageContext,
+    model_dims: tuple[str, ...],
+    rule_data: dict[str, dict],
+    llm_data: Optional[dict],
+    error: Optional[Exception] = None,
+    meta: Optional[LlmCallMeta] = None,
+    logger: Optional[logging.Logger] = None,
+) -> PageReport:
+    """Combine rule-filled dimensions with the model's answer (``None`` when
+    the call failed) into the finished page report."""
+    data = copy.deepcopy(rule_data)
+    sources = {dim: "rules" for dim in data}
+    if not model_dims:
+        return _build_page_report(ctx, data, "complete", meta, sources)
+
+    if llm_data is None:
+        for dim in model_dims:
+            data[dim] = copy.deepcopy(_FIELD_DEFAULTS[dim])
+            sources[dim] = "default"
+        _attach_failure_issue(data, model_dims, error)
+        return _build_page_report(ctx, data, "failed", meta, sources)
+
+    # Backfill defaults for any requested dimension the LLM omitted, and mark
+    # the audit partial if any had to be filled in.
+    audit_status = "complete"
+    backfilled: list[str] = []
+    for dim in model_dims:
+        if dim in llm_data:
+            data[dim] = llm_data[dim]
+            sources[dim] = "llm"
         else:
-            # If the LLM returned "partial" data, mark as partial
-            pass
-
-    # Check if any expected dimension was filled with defaults
-    if audit_status == "complete":
-        expected_keys = {"schema_analysis", "content_analysis", "link_analysis", "accessibility"}
-        missing = expected_keys - set(data.keys())
-        if missing:
+            if logger:
+                logger.warning("LLM response missing '%s' for %s — using defaults", dim, ctx.url)
+            data[dim] = copy.deepcopy(_FIELD_DEFAULTS[dim])
+            sources[dim] = "default"
             audit_status = "partial"
+            backfilled.append(dim)
+            if meta is not None:
+                meta.backfilled_dimensions += 1
+    # Dimensions lost to a failed request (e.g. beside a chunked content
+    # analysis) show the failure like a fully failed page does
+    if error is not None and backfilled:
+        _attach_failure_issue(data, tuple(backfilled), error)
+
+    return _build_page_report(ctx, data, audit_status, meta, sources)
+
+
+def _attach_failure_issue(data: dict, model_dims: tuple[str, ...], error: Optional[Exception]) -> None:
+    """Record a failed LLM call as a high-severity issue on the first
+    requested dimension that carries issues (content_analysis otherwise)."""
+    target = next((d for d in model_dims if d != "schema_analysis"), "content_analysis")
+    data[target].setdefault("issues", []).append(make_issue("llm_failed", error=str(error)))
+
+
+# ---------------------------------------------------------------------------
+# Batched analysis — several small pages share one system prompt + schema
+# ---------------------------------------------------------------------------
+
+def _get_batch_schema(dimensions: tuple[str, ...]) -> dict[str, Any]:
+    """Flat per-page schema extended with the ``url`` key batch entries carry."""
+    schema = copy.deepcopy(_get_flat_schema(dimensions))
+    schema.setdefault("properties", {})["url"] = {"type": "string"}
+    schema["required"] = ["url", *schema.get("required", [])]
+    return schema
+
+
+async def analyze_batch_with_llm(
+    pages: list[PageContext],
+    timeout_seconds: Optional[float] = None,
+    retry_attempts: Optional[int] = None,
+    retry_base_delay: Optional[float] = None,
+    logger: Optional[logging.Logger] = None,
+    stream: Optional[bool] = None,
+    policy: Optional[DimensionPolicy] = None,
+    structured_output: Optional[bool] = None,
+    cascade: Optional[ModelCascade] = None,
+    split_dimensions: bool = False,
+    chunking: Optional[ContentChunking] = None,
+    templates: Optional[TemplateRegistry] = None,
+    on_page: Optional[Callable[[int, PageReport], None]] = None,
+) -> list[PageReport]:
+    """Analyze several pages in one completion.
+
+    The batch asks for the union of the dimensions its pages need; each
+    page keeps its rule-based dimensions. Every per-URL result is validated
+    on its own. Pages whose entry is missing, incomplete or fails validation
+    — or every page, if the batched call itself fails — fall back to a
+    single-page :func:`analyze_page` call. The returned list is in the same
+    order as ``pages``. Batches use the endpoints' model and one prompt per
+    batch; ``cascade``, ``split_dimensions``, ``chunking`` and ``templates``
+    apply to the single-page calls only. A single-page call whose answer
+    still does not validate gives that page a failed report. ``on_page``
+    is called with each page's position and report as soon as it is done.
+    """
+    timeout_seconds = timeout_seconds if timeout_seconds is not None else LLM_TIMEOUT_SECONDS
+    retry_attempts = retry_attempts if retry_attempts is not None else LLM_RETRY_ATTEMPTS
+    retry_base_delay = retry_base_delay if retry_base_delay is not None else LLM_RETRY_BASE_DELAY_SECONDS
+    stream = stream if stream is not None else LLM_STREAM
+    policy = policy or DEFAULT_DIMENSION_POLICY
+    structured = structured_output if structured_output is not None else LLM_STRUCTURED_OUTPUT
+    single_kwargs: dict[str, Any] = dict(
+        timeout_seconds=timeout_seconds,
+        retry_attempts=retry_attempts,
+        retry_base_delay=retry_base_delay,
+        logger=logger,
+        stream=stream,
+        policy=policy,
+        structured_output=structured,
+        cascade=cascade,
+        split_dimensions=split_dimensions,
+        chunking=chunking,
+        templates=templates,
+    )
+
+    plans = [plan_dimensions(ctx, policy) for ctx in pages]
+    results: list[Optional[PageReport]] = [None] * len(pages)
+    llm_idx: list[int] = []
+    for i, (ctx, (model_dims, rule_data)) in enumerate(zip(pages, plans)):
+        if model_dims:
+            llm_idx.append(i)
+        else:
+            sources = {dim: "rules" for dim in rule_data}
+            results[i] = _build_page_report(ctx, rule_data, "complete", None, sources)
+
+    if len(llm_idx) == 1:
+        results[llm_idx[0]] = await _analyze_fallback(pages[llm_idx[0]], plans[llm_idx[0]], single_kwargs)
+    elif llm_idx:
+        await _run_batch(
+            [pages[i] for i in llm_idx],
+            [plans[i] for i in llm_idx],
+            llm_idx,
+            results,
+            timeout_seconds=timeout_seconds,
+            retry_attempts=retry_attempts,
+            retry_base_delay=retry_base_delay,
+            logger=logger,
+            stream=stream,
+            structured=structured,
+        )
+
+    fallback_idx = [i for i, audit in enumerate(results) if audit is None]
+    if on_page is not None:
+        for i, audit in enumerate(results):
+            if audit is not None:
+                on_page(i, audit)
+    if fallback_idx and logger:
+        logger.info(
+            "Batch of %s pages: %s page(s) without a valid batched result — retrying individually",
+            len(pages),
+            len(fallback_idx),
+        )
+    for i in fallback_idx:
+        results[i] = await _analyze_fallback(pages[i], plans[i], single_kwargs)
+        if on_page is not None:
+            on_page(i, results[i])
+
+    return [audit for audit in results if audit is not None]
+
+
+async def _analyze_fallback(
+    ctx: PageContext,
+    plan: tuple[tuple[str, ...], dict[str, dict]],
+    single_kwargs: dict[str, Any],
+) -> PageReport:
+    """Single-page :func:`analyze_page` for a page of a batch; an answer that
+    does not validate fails this page only."""
+    try:
+        return await analyze_page(ctx, **single_kwargs)
+    except (ValidationError, TypeError, ValueError) as exc:
+        logger = single_kwargs.get("logger")
+        if logger:
+            logger.warning("LLM answer for %s failed validation: %s", ctx.url, exc)
+        model_dims, rule_data = plan
+        meta = LlmCallMeta(status="failed", error=type(exc).__name__)
+        return finalize_page_audit(ctx, model_dims, rule_data, None, exc, meta, logger)
+
+
+async def _run_batch(
+    pages: list[PageContext],
+    plans: list[tuple[tuple[str, ...], dict[str, dict]]],
+    positions: list[int],
+    results: list[Optional[PageReport]],
+    *,
+    timeout_seconds: float,
+    retry_attempts: int,
+    retry_base_delay: float,
+    logger: Optional[logging.Logger],
+    stream: bool,
+    structured: bool,
+) -> None:
+    """One batched completion; fills ``results[positions[i]]`` for every
+    page whose entry validates and leaves the rest as ``None``."""
+    needed = tuple(d for d in _EXPECTED_DIMENSIONS if any(d in dims for dims, _ in plans))
+    page_blocks = "\n".join(
+        f"=== PAGE {i}: {ctx.url} ===\n{_build_page_block(ctx)}"
+        for i, ctx in enumerate(pages, start=1)
+    )
+    user_msg = _BATCH_USER_MSG_TEMPLATE.format(
+        count=len(pages),
+        page_blocks=page_blocks,
+        entry_spec=_BATCH_ENFORCED_SPEC if structured else _BATCH_SCHEMA_SPEC_TEMPLATE.format(
+            schema=json.dumps(_get_batch_schema(needed), indent=2),
+        ),
+    )
+
+    meta = LlmCallMeta(prompt_mode="batch")
+    data, last_error = await _request_json(
+        [
+            {"role": "system", "content": _build_system_prompt(needed) + _BATCH_SYSTEM_ADDENDUM},
+            {"role": "user", "content": user_msg},
+        ],
+        label=f"batch of {len(pages)} pages",
+        max_tokens=min(_LLM_BATCH_TOKENS_PER_PAGE * len(pages), _LLM_BATCH_MAX_TOKENS),
+        # A batched completion generates several pages' worth of output
+        timeout_seconds=timeout_seconds * len(pages),
+        retry_attempts=retry_attempts,
+        retry_base_delay=retry_base_delay,
+        logger=logger,
+        stream=stream,
+        required_keys=("results",),
+        allowed_keys=("results",),
+        meta=meta,
+        cost=len(pages),
+        response_format=_get_response_format(needed, structured, batched=True),
+        # Entries of a cut-off batch are validated one by one below
+        keep_truncated=True,
+    )
+
+    entries: list[Any] = []
+    if data is not None and isinstance(data.get("results"), list):
+        entries = data["results"]
+    elif logger:
+        logger.warning(
+            "Batched LLM request for %s pages failed (%s) — falling back to single-page requests",
+            len(pages),
+            last_error or "no 'results' array",
+        )
+
+    # Each page carries an even share of the batch's tokens
+    n = len(pages)
+    page_meta = meta.model_copy(update={
+        "batch_size": n,
+        "prompt_tokens": round(meta.prompt_tokens / n) if meta.prompt_tokens is not None else None,
+        "completion_tokens": round(meta.completion_tokens / n) if meta.completion_tokens is not None else None,
+    })
+
+    # Match entries to pages by URL, falling back to position
+    by_url = {e.get("url"): e for e in entries if isinstance(e, dict) and e.get("url")}
+    for i, (ctx, plan) in enumerate(zip(pages, plans)):
+        entry = by_url.get(ctx.url)
+        if entry is None and i < len(entries) and isinstance(entries[i], dict):
+            entry = entries[i]
+        results[positions[i]] = _validate_batch_entry(ctx, entry, plan, page_meta, logger)
+
+
+def _validate_batch_entry(
+    ctx: PageContext,
+    entry: Optional[dict],
+    plan: tuple[tuple[str, ...], dict[str, dict]],
+    meta: LlmCallMeta,
+    logger: Optional[logging.Logger],
+) -> Optional[PageReport]:
+    """Validate one batched result; ``None`` means the page needs a single-page retry."""
+    if entry is None:
+        return None
+    model_dims, rule_data = plan
+    if not all(isinstance(entry.get(dim), dict) for dim in model_dims):
+        return None
+    data = copy.deepcopy(rule_data)
+    data.update({dim: copy.deepcopy(entry[dim]) for dim in model_dims})
+    sources = {dim: ("llm" if dim in model_dims else "rules") for dim in data}
+    try:
+        return _build_page_report(ctx, data, "complete", meta, sources)
+    except (ValidationError, TypeError, ValueError) as exc:
+        if logger:
+            logger.debug("Batched result for %s failed validation: %s", ctx.url, exc)
+        return None
+
+
+class LlmBatcher:
+    """Collects small pages submitted concurrently and analyzes them together.
+
+    Pages whose prompt block exceeds ``page_max_tokens``, and long pages
+    due for chunked content analysis, bypass batching.
+    Small pages wait up to ``linger_seconds`` for company, then are packed
+    greedily until the prompt ``token_budget``, ``max_pages`` or the output
+    token cap is reached — so batches of tiny pages grow large while
+    mid-sized pages travel in pairs or alone.
+
+    ``slot`` is an async context manager factory held around every LLM call
+    (the spider uses it for serialization and rate-limit padding).
+    """
+
+    def __init__(
+        self,
+        slot: Callable[[], AsyncContextManager[Any]],
+        token_budget: int = 6000,
+        max_pages: int = 6,
+        page_max_tokens: int = 1500,
+        linger_seconds: float = 2.0,
+        **analyze_kwargs: Any,
+    ) -> None:
+        self._slot = slot
+        self.token_budget = token_budget
+        self.max_pages = max(1, min(max_pages, _LLM_BATCH_MAX_TOKENS // _LLM_BATCH_TOKENS_PER_PAGE))
+        self.page_max_tokens = page_max_tokens
+        self.linger_seconds = linger_seconds
+        self._analyze_kwargs = analyze_kwargs
+        self._pending: list[tuple[PageContext, int, asyncio.Future[PageReport]]] = []
+        self._drainer: Optional[asyncio.Task[None]] = None
+
+    async def submit(self, ctx: PageContext) -> PageReport:
+        tokens = estimate_tokens(_build_page_block(ctx))
+        chunking = self._analyze_kwargs.get("chunking")
+        if tokens > self.page_max_tokens or (chunking is not None and chunking.applies(ctx)):
+            async with self._slot():
+                return await analyze_page(ctx, **self._analyze_kwargs)
+
+        future: asyncio.Future[PageReport] = asyncio.get_running_loop().create_future()
+        self._pending.append((ctx, tokens, future))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.ensure_future(self._drain())
+        return await future
+
+    def _take_batch(self) -> list[tuple[PageContext, int, asyncio.Future[PageReport]]]:
+        batch: list[tuple[PageContext, int, asyncio.Future[PageReport]]] = []
+        used = 0
+        while self._pending and len(batch) < self.max_pages:
+            tokens = self._pending[0][1]
+            if batch and used + tokens > self.token_budget:
+                break
+            batch.append(self._pending.pop(0))
+            used += tokens
+        return batch
+
+    async def _drain(self) -> None:
+        await asyncio.sleep(self.linger_seconds)
+        while self._pending:
+            async with self._slot():
+                batch = self._take_batch()
+
+                def resolve(i: int, audit: PageReport) -> None:
+                    future = batch[i][2]
+                    if not future.done():
+                        future.set_result(audit)
 
-    # --- Merge spider-extracted sub-fields into LLM-scored dimensions ---
-    # link_analysis: LLM provides score+issues; spider provides counts
-    la = data.get("link_analysis", {})
-    la["internal_links"] = link_analysis.internal_links
-    la["external_links"] = link_analysis.external_links
-    la["nofollow_count"] = link_analysis.nofollow_count
-    la["broken_links"] = link_analysis.broken_links
-    data["link_analysis"] = la
-
-    # accessibility: LLM provides llm_score+issues; spider provides structural data
-    a11y = data.get("accessibility", {})
-    a11y["has_skip_nav"] = accessibility.has_skip_nav
-    a11y["aria_landmark_count"] = accessibility.aria_landmark_count
-    a11y["form_labels_missing"] = accessibility.form_labels_missing
-    a11y["has_lang_attribute"] = accessibility.has_lang_attribute
-    a11y["image_alt_coverage_pct"] = accessibility.image_alt_coverage_pct
-    a11y["generic_link_text_count"] = accessibility.generic_link_text_count
-    a11y["has_heading_structure"] = accessibility.has_heading_structure
-    a11y["tabindex_misuse_count"] = accessibility.tabindex_misuse_count
-    a11y["has_document_title"] = accessibility.has_document_title
-    # Ensure score field exists for the blended calculation validator
-    a11y.setdefault("score", 0)
-    data["accessibility"] = a11y
-
-    # Inject fully spider-computed fields
-    data["url"] = url
-    data["audit_status"] = audit_status
-    data["meta_tags"] = meta_tags.model_dump()
-    data["headers"] = headers.model_dump()
-    data["image_stats"] = image_stats.model_dump()
-    data["onpage_seo"] = onpage_seo.model_dump()
-    data["performance"] = performance.model_dump()
-    data["readability"] = readability.model_dump()
-    data["security"] = security.model_dump()
-    data["canonical_analysis"] = canonical_analysis.model_dump()
-
-    # Validate with Pydantic (also enforces business rules like schema score → 0)
-    return PageAudit.model_validate(data)
+                try:
+                    audits = await analyze_batch_with_llm(
+                        [ctx for ctx, _, _ in batch], on_page=resolve, **self._analyze_kwargs
+                    )
+                except Exception as exc:
+                    # Pages already analysed keep their reports
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+            for i, audit in enumerate(audits):
+                resolve(i, audit)
@@ -0,0 +1,126 @@
+"""Ollama-specific tuning of the OpenAI-compatible endpoints.
+
+Ollama loads a model on its first request and unloads it again once it
+has been idle for the keep-alive (5 minutes by default). Its default
+context window silently truncates long prompts, and a request with a
+different ``num_ctx`` reloads the model. :class:`OllamaProfile` warms the
+model up before the crawl and keeps it loaded while the crawl runs. It
+sizes ``num_ctx`` from the prompts it has to fit, growing in coarse steps
+rather than per request, and probes how many requests the server decodes
+in parallel.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+
+# Tokens kept free on top of prompt + completion (chat template, estimate error)
+_CONTEXT_MARGIN_TOKENS = 256
+# Probe request: short enough to be cheap, long enough for decode time to dominate
+_PROBE_PROMPT = "Count from 1 to 40, separated by spaces."
+_PROBE_TOKENS = 24
+# k concurrent probes running at most this much slower than one means k slots
+_PROBE_SLOWDOWN = 1.6
+
+
+def native_base_url(base_url: str) -> str:
+    """Ollama's native API root for an OpenAI-compatible ``.../v1`` URL."""
+    base = base_url.rstrip("/")
+    return base[: -len("/v1")] if base.endswith("/v1") else base
+
+
+@dataclass
+class OllamaProfile:
+    """Keep-alive, context sizing and parallel-slot detection for Ollama.
+
+    ``num_ctx`` starts at ``min_num_ctx`` and only grows, in multiples of
+    ``ctx_step`` up to ``max_num_ctx``, when a prompt would not fit.
+    ``parallel_slots`` is the server's ``OLLAMA_NUM_PARALLEL``; when unset,
+    :meth:`detect_parallel_slots` measures it.
+    """
+    keep_alive: str = "30m"
+    min_num_ctx: int = 4096
+    max_num_ctx: int = 32768
+    ctx_step: int = 2048
+    parallel_slots: Optional[int] = None
+    max_probe_slots: int = 8
+    num_ctx: int = field(init=False)
+    context_resizes: int = field(default=0, init=False)
+    load_ms: dict[str, dict[str, Optional[int]]] = field(default_factory=dict, init=False)
+    detected_slots: dict[str, int] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        if not 0 < self.min_num_ctx <= self.max_num_ctx:
+            raise ValueError(f"Need 0 < min_num_ctx <= max_num_ctx, got {self.min_num_ctx}, {self.max_num_ctx}")
+        self.num_ctx = self.min_num_ctx
+
+    def fit_context(self, prompt_tokens: int, max_tokens: int) -> int:
+        """Grow ``num_ctx`` so a prompt of ``prompt_tokens`` plus ``max_tokens``
+        of output fits (capped at ``max_num_ctx``); returns the new value."""
+        needed = prompt_tokens + max_tokens + _CONTEXT_MARGIN_TOKENS
+        if needed > self.num_ctx and self.num_ctx < self.max_num_ctx:
+            self.num_ctx = min(self.max_num_ctx, -(-needed // self.ctx_step) * self.ctx_step)
+            self.context_resizes += 1
+        return self.num_ctx
+
+    def request_body(self, prompt_tokens: int, max_tokens: int) -> dict[str, Any]:
+        """Extra body fields for a chat completion of this size."""
+        return {"keep_alive": self.keep_alive, "options": {"num_ctx": self.fit_context(prompt_tokens, max_tokens)}}
+
+    async def warm_up(self, base_url: str, model: str, timeout: float = 300.0) -> Optional[int]:
+        """Load ``model`` with the current ``num_ctx`` and keep-alive; returns
+        the server-reported load time in ms (0 if it was already loaded)."""
+        async with httpx.AsyncClient(base_url=native_base_url(base_url), timeout=timeout) as client:
+            response = await client.post("/api/generate", json={
+                "model": model, "keep_alive": self.keep_alive, "options": {"num_ctx": self.num_ctx},
+            })
+            response.raise_for_status()
+        load_ns = response.json().get("load_duration")
+        load_ms = round(load_ns / 1e6) if isinstance(load_ns, (int, float)) else None
+        self.load_ms.setdefault(base_url, {})[model] = load_ms
+        return load_ms
+
+    async def detect_parallel_slots(self, base_url: str, model: str, timeout: float = 120.0) -> int:
+        """Requests the server decodes at once, measured with short probes.
+
+        One probe gives the baseline time; 2, 4, ... concurrent probes are
+        sent while they finish within ``_PROBE_SLOWDOWN`` times that baseline.
+        A configured ``parallel_slots`` skips the probing.
+        """
+        if self.parallel_slots is not None:
+            return self.parallel_slots
+        async with httpx.AsyncClient(base_url=native_base_url(base_url), timeout=timeout) as client:
+            async def probe() -> None:
+                response = await client.post("/api/generate", json={
+                    "model": model,
+                    "prompt": _PROBE_PROMPT,
+                    "stream": False,
+                    "keep_alive": self.keep_alive,
+                    "options": {"num_ctx": self.num_ctx, "num_predict": _PROBE_TOKENS, "temperature": 0},
+                })
+                response.raise_for_status()
+
+            async def timed(k: int) -> float:
+                started = time.monotonic()
+                await asyncio.gather(*(probe() for _ in range(k)))
+                return time.monotonic() - started
+
+            baseline = await timed(1)
+            slots, k = 1, 2
+            while k <= self.max_probe_slots and await timed(k) <= baseline * _PROBE_SLOWDOWN:
+                slots, k = k, k * 2
+        self.detected_slots[base_url] = slots
+        return slots
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "keep_alive": self.keep_alive,
+            "num_ctx": self.num_ctx,
+            "context_resizes": self.context_resizes,
+            "load_ms": {url: dict(models) for url, models in self.load_ms.items()},
+            "parallel_slots": self.parallel_slots if self.parallel_slots is not None else dict(self.detected_slots),
+        }
@@ -0,0 +1,124 @@
+"""Page input snapshots: re-run the LLM analysis without re-crawling.
+
+The crawl stores each page's extracted inputs — the packed HTML and text,
+the JSON-LD and every spider-computed dimension — as one gzip-compressed
+JSON file in the session's ``_snapshots/`` folder, named like the page's
+report. :func:`reanalyze_session` rebuilds the :class:`PageContext` from
+these snapshots and re-runs only the failed and partial pages (or all
+pages, e.g. with a new model or prompt). It then rewrites their reports and
+the site summary in place.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.llm_service import PageContext
+from ai_seo_auditor.services.session_storage import iter_reports
+
+SNAPSHOT_DIR = "_snapshots"
+_SUFFIX = ".json.gz"
+_SNAPSHOT_VERSION = 1
+# Audit statuses re-run by default
+REANALYZE_STATUSES = frozenset(("failed", "partial"))
+
+
+class SnapshotStore:
+    """One compressed snapshot per page id (the report's file stem)."""
+
+    def __init__(self, session_dir: Path) -> None:
+        self.directory = session_dir / SNAPSHOT_DIR
+
+    def path(self, page_id: str) -> Path:
+        return self.directory / f"{page_id}{_SUFFIX}"
+
+    def write(self, page_id: str, record: Mapping[str, Any]) -> None:
+        """Store a ``PageContext.to_record()`` dict, replacing any older one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(
+            {"version": _SNAPSHOT_VERSION, "page": record}, ensure_ascii=False, separators=(",", ":"), default=str,
+        ).encode("utf-8")
+        target = self.path(page_id)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(gzip.compress(data, compresslevel=6, mtime=0))
+        os.replace(tmp, target)
+
+    def read(self, page_id: str) -> PageContext:
+        with gzip.open(self.path(page_id), "rt", encoding="utf-8") as f:
+            return PageContext.from_record(json.load(f)["page"])
+
+    def page_ids(self) -> list[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(p.name[: -len(_SUFFIX)] for p in self.directory.glob(f"*{_SUFFIX}"))
+
+
+async def reanalyze_session(
+    session_dir: Path,
+    *,
+    all_pages: bool = False,
+    concurrency: int = 16,
+    llm_kwargs: Optional[Mapping[str, Any]] = None,
+    score_weights: Optional[Mapping[str, float]] = None,
+    logger: Optional[logging.Logger] = None,
+) -> dict[str, int]:
+    """Re-run the LLM analysis of a session's pages from their snapshots.
+
+    Pages whose report is failed or partial (every page with ``all_pages``)
+    and snapshot pages without a report are analysed again; ``concurrency``
+    workers keep them queued and the adaptive limiter decides how many
+    calls are in flight. ``llm_kwargs`` are passed to
+    :func:`llm_service.analyze_page`. Reports are rewritten in place and
+    the site summary is rebuilt over all pages. A page whose analysis
+    raises keeps its old report.
+    """
+    from ai_seo_auditor.pipelines import JsonReportPipeline  # the pipeline imports this module
+
+    logger = logger or logging.getLogger(__name__)
+    store = SnapshotStore(session_dir)
+    snapshots = set(store.page_ids())
+    pipeline = JsonReportPipeline()
+    pipeline.open_session(session_dir, logger, score_weights=score_weights)
+
+    stats = {"reanalyzed": 0, "failed": 0, "kept": 0, "without_snapshot": 0}
+    old_reports: dict[str, dict[str, Any]] = {}
+    reported: set[str] = set()
+    for page_id, _, report in iter_reports(session_dir):
+        reported.add(page_id)
+        rerun = all_pages or report.get("audit_status") in REANALYZE_STATUSES
+        if rerun and page_id in snapshots:
+            old_reports[page_id] = report
+            continue
+        stats["without_snapshot"] += rerun
+        stats["kept"] += 1
+        pipeline.record_page(report)
+    selected = sorted(old_reports) + sorted(snapshots - reported)
+    pending = iter(selected)
+
+    async def worker() -> None:
+        for page_id in pending:
+            try:
+                report = await llm_service.analyze_page(store.read(page_id), **(llm_kwargs or {}))
+            except Exception as exc:
+                logger.error("Re-analysis of %s failed: %s", page_id, exc)
+                stats["failed"] += 1
+                if page_id in old_reports:
+                    pipeline.record_page(old_reports[page_id])
+                continue
+            pipeline.write_page(report)
+            stats["failed" if report["audit_status"] == "failed" else "reanalyzed"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    pipeline.write_summary()
+    pipeline.close_session()
+    logger.info(
+        "Re-analyzed %s pages (%s failed); %s kept, %s needed a rerun but have no snapshot",
+        stats["reanalyzed"] + stats["failed"], stats["failed"], stats["kept"], stats["without_snapshot"],
+    )
+    return stats
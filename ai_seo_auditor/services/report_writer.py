@@ -0,0 +1,187 @@
+"""Report writing off the reactor thread.
+
+``JsonReportPipeline`` validates and serializes each page on the reactor
+thread, then hands the bytes to :class:`ReportWriter`. A dedicated thread
+takes them from a bounded queue in batches, writes them (per-page file or
+segment record, plus the page's input snapshot), flushes, and optionally
+fsyncs once per batch. When the queue is full, ``submit`` blocks, so a
+slow disk slows the crawl down instead of growing memory without bound.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
+
+from ai_seo_auditor.services.page_snapshots import SnapshotStore
+from ai_seo_auditor.services.session_storage import SegmentWriter
+from ai_seo_auditor.services.site_summary import percentiles
+
+# Batch write times kept for the latency percentiles
+_LATENCY_WINDOW = 2048
+_STOP = object()
+
+
+@dataclass
+class WriterOptions:
+    """The ``report_writer`` config. ``threaded=False`` writes inline."""
+    threaded: bool = True
+    queue_size: int = 256
+    batch_size: int = 64
+    fsync: bool = False
+
+    def __post_init__(self) -> None:
+        if self.queue_size < 1 or self.batch_size < 1:
+            raise ValueError(
+                f"report_writer queue_size and batch_size must be >= 1, got {self.queue_size}, {self.batch_size}"
+            )
+
+
+class ReportWriter:
+    """Writes serialized page reports and page snapshots for one session."""
+
+    def __init__(
+        self,
+        reports_dir: Path,
+        segments: Optional[SegmentWriter],
+        snapshots: SnapshotStore,
+        options: WriterOptions,
+        logger: Any,
+    ) -> None:
+        self.reports_dir = reports_dir
+        self.segments = segments
+        self.snapshots = snapshots
+        self.options = options
+        self.logger = logger or logging.getLogger(__name__)
+        # Items written, by kind (page reports are what the throughput counts)
+        self.reports_written = 0
+        self.snapshots_written = 0
+        self.tasks_run = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.blocked_ms = 0.0
+        self._latencies: collections.deque[float] = collections.deque(maxlen=_LATENCY_WINDOW)
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        if options.threaded:
+            self._queue = queue.Queue(maxsize=options.queue_size)
+            self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit_report(self, page_id: str, data: bytes) -> None:
+        """Queue a serialized report (see :meth:`encode_report`)."""
+        self._submit(("report", page_id, data))
+
+    def submit_snapshot(self, page_id: str, record: Mapping[str, Any]) -> None:
+        """Queue a page's inputs; they are compressed on the writer thread."""
+        self._submit(("snapshot", page_id, record))
+
+    def submit_task(self, label: str, task: Callable[[], None]) -> None:
+        """Queue other session IO (e.g. a score-table row group)."""
+        self._submit(("task", label, task))
+
+    def encode_report(self, report: dict[str, Any]) -> bytes:
+        """Serialize a validated report for this session's layout."""
+        if self.segments is not None:
+            return self.segments.encode(report)
+        return json.dumps(report, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+    def _submit(self, item: tuple[str, str, Any]) -> None:
+        if self._queue is None:
+            self._write_batch([item])
+            return
+        start = time.perf_counter()
+        self._queue.put(item)
+        self.blocked_ms += (time.perf_counter() - start) * 1000
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.options.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            self._write_batch([item for item in batch if item is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: list[tuple[str, str, Any]]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        for kind, page_id, payload in batch:
+            try:
+                if kind == "snapshot":
+                    self.snapshots.write(page_id, payload)
+                    self.snapshots_written += 1
+                elif kind == "task":
+                    payload()
+                    self.tasks_run += 1
+                else:
+                    if self.segments is not None:
+                        self.segments.append(page_id, payload, flush=False)
+                    else:
+                        self._write_file(page_id, payload)
+                    self.reports_written += 1
+            except Exception as exc:  # keep writing the rest; reported at close
+                self.errors += 1
+                self.logger.error(f"Failed to write {kind} for {page_id}: {exc}")
+        try:
+            if self.segments is not None:
+                self.segments.flush(fsync=self.options.fsync)
+        except OSError as exc:
+            self.errors += 1
+            self.logger.error(f"Failed to flush report segments: {exc}")
+        self.batches += 1
+        self._latencies.append((time.perf_counter() - start) * 1000)
+
+    def _write_file(self, page_id: str, data: bytes) -> None:
+        with open(self.reports_dir / f"{page_id}.json", "wb") as f:
+            f.write(data)
+            if self.options.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def close(self) -> dict[str, Any]:
+        """Drain the queue, stop the thread, close the segments; return :meth:`snapshot`."""
+        if self._thread is not None and self._queue is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        if self.segments is not None:
+            self.segments.close()
+            self.segments = None
+        return self.snapshot()
+
+    def snapshot(self) -> dict[str, Any]:
+        batch_write_ms = percentiles(self._latencies, (50, 90, 99))
+        return {
+            "threaded": self.options.threaded,
+            "reports": self.reports_written,
+            "snapshots": self.snapshots_written,
+            "tasks": self.tasks_run,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "blocked_ms": round(self.blocked_ms, 1),
+            "batch_write_ms": {key: None if ms is None else round(ms, 2) for key, ms in batch_write_ms.items()},
+        }
@@ -0,0 +1,395 @@
+"""Offline re-scoring of a finished session under new weights or thresholds.
+
+A session's sub-metrics are loaded into one pandas column per field. The
+deterministic dimensions, the overall scores and the letter grades are
+recomputed as NumPy array operations, and the result is written as a new
+*derived* session next to the source. Its site summary is accumulated with
+:class:`~ai_seo_auditor.services.site_summary.SiteSummaryBuilder` while the
+pages are rewritten, so it has the crawl-time summary's bounded shape. No page is
+re-crawled and no LLM is called: LLM-scored dimensions (schema, content,
+link quality and the accessibility ``llm_score``) keep their stored scores.
+
+The vectorized scorers mirror :mod:`ai_seo_auditor.models.scoring`; under
+the default weights and thresholds they reproduce the crawl's scores.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from ai_seo_auditor.models.issue_catalog import make_issue
+from ai_seo_auditor.models.schemas import LlmUsageSummary, PageScoreEntry
+from ai_seo_auditor.models.scoring import (
+    DEFAULT_THRESHOLDS,
+    ScoreThresholds,
+    resolve_weights,
+)
+from ai_seo_auditor.services.session_storage import SegmentWriter, StorageOptions, iter_reports
+from ai_seo_auditor.services.site_summary import SiteSummaryBuilder
+
+SUMMARY_FILE = "_site_summary.json"
+# Provenance of a derived session: source, weights and thresholds
+RESCORE_FILE = "_rescore.json"
+
+# Sections whose issues feed the site summary (as in JsonReportPipeline)
+_ISSUE_SECTIONS = ("onpage_seo", "content_analysis", "link_analysis", "readability", "accessibility")
+
+# Loaded column → (section, field, default). Booleans and counts only; list
+# fields are reduced to their length while loading.
+_COLUMNS: dict[str, tuple[str, str, Any]] = {
+    **{
+        f"onpage_seo.{name}": ("onpage_seo", name, default)
+        for name, default in (
+            ("has_title", False), ("title_length_ok", False), ("has_meta_description", False),
+            ("description_length_ok", False), ("single_h1", False), ("has_viewport_meta", False),
+            ("has_lang_attribute", False), ("has_og_tags", False), ("robots_allows_indexing", True),
+            ("image_alt_coverage_pct", 100.0), ("has_canonical", False),
+        )
+    },
+    "schema_analysis.score": ("schema_analysis", "score", 0),
+    "content_analysis.score": ("content_analysis", "score", 0),
+    "link_analysis.score": ("link_analysis", "score", 0),
+    "performance.ttfb_ms": ("performance", "ttfb_ms", 0),
+    "performance.fcp_ms": ("performance", "fcp_ms", None),
+    "performance.page_size_bytes": ("performance", "page_size_bytes", 0),
+    "performance.resource_count": ("performance", "resource_count", 0),
+    "readability.flesch_reading_ease": ("readability", "flesch_reading_ease", 0.0),
+    "readability.word_count": ("readability", "word_count", 0),
+    **{
+        f"security.{name}": ("security", name, False)
+        for name in ("is_https", "has_hsts", "has_csp", "has_x_content_type")
+    },
+    "security.mixed_content_count": ("security", "mixed_content_urls", ()),
+    **{
+        f"accessibility.{name}": ("accessibility", name, default)
+        for name, default in (
+            ("has_skip_nav", False), ("has_lang_attribute", False), ("has_document_title", False),
+            ("has_heading_structure", False), ("image_alt_coverage_pct", 100.0),
+            ("form_labels_missing", 0), ("generic_link_text_count", 0), ("tabindex_misuse_count", 0),
+            ("llm_score", None),
+        )
+    },
+    "canonical_analysis.has_canonical_url": ("canonical_analysis", "canonical_url", None),
+    "canonical_analysis.matches_actual_url": ("canonical_analysis", "matches_actual_url", True),
+    "canonical_analysis.redirect_count": ("canonical_analysis", "redirect_chain", ()),
+    "canonical_analysis.has_hreflang": ("canonical_analysis", "has_hreflang", False),
+}
+
+# Site-summary score column → report section
+_SCORE_COLUMNS = {
+    "onpage_seo_score": "onpage_seo",
+    "schema_score": "schema_analysis",
+    "content_score": "content_analysis",
+    "link_score": "link_analysis",
+    "performance_score": "performance",
+    "readability_score": "readability",
+    "security_score": "security",
+    "accessibility_score": "accessibility",
+    "canonical_score": "canonical_analysis",
+}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _iter_reports(session_dir: Path, logger: logging.Logger) -> Iterator[tuple[str, dict[str, Any]]]:
+    """``(page_id, report)`` in either storage layout, skipping unreadable reports."""
+    def skip(page_id: str, exc: Exception) -> None:
+        logger.warning("Skipping unreadable report %s: %s", page_id, exc)
+
+    for page_id, _, report in iter_reports(session_dir, on_error=skip):
+        yield page_id, report
+
+
+def load_session(session_dir: Path, logger: Optional[logging.Logger] = None) -> pd.DataFrame:
+    """Columns of every page report in ``session_dir``: one row per page
+    (indexed by file stem) with the sub-metrics the scorers need."""
+    logger = logger or logging.getLogger(__name__)
+    columns: dict[str, list[Any]] = {"url": [], "audit_status": [], "issues_count": []}
+    columns.update({name: [] for name in _COLUMNS})
+    stems: list[str] = []
+
+    for page_id, report in _iter_reports(session_dir, logger):
+        stems.append(page_id)
+        columns["url"].append(report.get("url", page_id))
+        columns["audit_status"].append(report.get("audit_status", "complete"))
+        for name, (section, field, default) in _COLUMNS.items():
+            value = (report.get(section) or {}).get(field, default)
+            if isinstance(default, tuple):
+                value = len(value or ())
+            elif name == "canonical_analysis.has_canonical_url":
+                value = bool(value)
+            columns[name].append(value)
+        columns["issues_count"].append(len(_page_issues(report)))
+
+    pages = pd.DataFrame(columns, index=pd.Index(stems, name="page"))
+    # Missing optional values become NaN so they stay distinguishable from 0
+    for name in ("performance.fcp_ms", "accessibility.llm_score"):
+        pages[name] = pd.to_numeric(pages[name], errors="coerce").astype(float)
+    return pages
+
+
+def _page_issues(report: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return [issue for section in _ISSUE_SECTIONS for issue in (report.get(section) or {}).get("issues", [])]
+
+
+# ---------------------------------------------------------------------------
+# Vectorized scorers (mirror models.scoring)
+# ---------------------------------------------------------------------------
+
+def _col(pages: pd.DataFrame, name: str) -> np.ndarray:
+    return pages[name].to_numpy()
+
+
+def _flag(pages: pd.DataFrame, name: str) -> np.ndarray:
+    return pages[name].to_numpy(dtype=bool)
+
+
+def _tiers(values: np.ndarray, upper_bounds: tuple[float, ...], scores: tuple[int, ...], above: int) -> np.ndarray:
+    return np.select([values <= bound for bound in upper_bounds], scores, default=above)
+
+
+def _round(values: np.ndarray) -> np.ndarray:
+    # np.rint rounds halves to even, like the built-in round()
+    return np.rint(values).astype(int)
+
+
+def _score_onpage_seo(pages: pd.DataFrame) -> np.ndarray:
+    points = (
+        ("has_title", 10), ("title_length_ok", 10), ("has_meta_description", 10),
+        ("description_length_ok", 5), ("single_h1", 10), ("has_viewport_meta", 5),
+        ("has_lang_attribute", 10), ("has_og_tags", 5), ("robots_allows_indexing", 10),
+        ("has_canonical", 10),
+    )
+    s = sum(_flag(pages, f"onpage_seo.{name}") * pts for name, pts in points)
+    s = s + _round(_col(pages, "onpage_seo.image_alt_coverage_pct") / 100.0 * 15)
+    return np.minimum(s, 100)
+
+
+def _score_performance(pages: pd.DataFrame, t: ScoreThresholds) -> np.ndarray:
+    ttfb = _tiers(_col(pages, "performance.ttfb_ms"), t.ttfb_ms, (100, 50), 0)
+    fcp_values = _col(pages, "performance.fcp_ms")
+    fcp = np.where(np.isnan(fcp_values), 50, _tiers(fcp_values, t.fcp_ms, (100, 50), 0))
+    size = _tiers(_col(pages, "performance.page_size_bytes"), t.page_size_bytes, (100, 75, 50), 25)
+    resources = _tiers(_col(pages, "performance.resource_count"), t.resource_count, (100, 75, 50), 25)
+    return _round(ttfb * 0.25 + fcp * 0.25 + size * 0.25 + resources * 0.25)
+
+
+def _score_readability(pages: pd.DataFrame, t: ScoreThresholds) -> tuple[np.ndarray, np.ndarray]:
+    fre = _col(pages, "readability.flesch_reading_ease")
+    bands = np.select([fre >= bound for bound in t.flesch_reading_ease], (100, 80, 60, 40), default=20)
+    thin = _col(pages, "readability.word_count") < t.thin_content_words
+    return np.where(thin, np.minimum(bands, 50), bands), thin
+
+
+def _score_security(pages: pd.DataFrame) -> np.ndarray:
+    return (
+        _flag(pages, "security.is_https") * 40
+        + _flag(pages, "security.has_hsts") * 20
+        + _flag(pages, "security.has_csp") * 20
+        + _flag(pages, "security.has_x_content_type") * 10
+        + (_col(pages, "security.mixed_content_count") == 0) * 10
+    )
+
+
+def _score_accessibility(pages: pd.DataFrame) -> np.ndarray:
+    det = (
+        _flag(pages, "accessibility.has_skip_nav") * 15
+        + _flag(pages, "accessibility.has_lang_attribute") * 15
+        + _flag(pages, "accessibility.has_document_title") * 10
+        + _flag(pages, "accessibility.has_heading_structure") * 10
+        + _round(_col(pages, "accessibility.image_alt_coverage_pct") / 100.0 * 20)
+        + (_col(pages, "accessibility.form_labels_missing") == 0) * 10
+        + (_col(pages, "accessibility.generic_link_text_count") == 0) * 10
+        + (_col(pages, "accessibility.tabindex_misuse_count") == 0) * 10
+    )
+    llm = _col(pages, "accessibility.llm_score")
+    llm = np.where(np.isnan(llm), det, llm)
+    return _round(det * 0.5 + llm * 0.5)
+
+
+def _score_canonical(pages: pd.DataFrame) -> np.ndarray:
+    has_url = _flag(pages, "canonical_analysis.has_canonical_url")
+    matches = _flag(pages, "canonical_analysis.matches_actual_url")
+    canonical = np.where(has_url, np.where(matches, 50, 20), 0)
+    redirects = _tiers(_col(pages, "canonical_analysis.redirect_count"), (0, 1), (30, 20), 0)
+    hreflang = _flag(pages, "canonical_analysis.has_hreflang") * 20
+    return np.minimum(canonical + redirects + hreflang, 100)
+
+
+def _letter_grades(scores: np.ndarray, t: ScoreThresholds) -> np.ndarray:
+    return np.select([scores >= bound for bound in t.grades], list("ABCD"), default="F")
+
+
+def score_pages(
+    pages: pd.DataFrame,
+    weights: Optional[Mapping[str, float]] = None,
+    thresholds: ScoreThresholds = DEFAULT_THRESHOLDS,
+) -> pd.DataFrame:
+    """Dimension scores, overall score and letter grade for every page.
+
+    The result is indexed like ``pages`` with the ``PageScoreEntry`` columns
+    (plus ``thin_content``).
+    """
+    weights = resolve_weights(weights)
+    readability, thin = _score_readability(pages, thresholds)
+    scores = pd.DataFrame({
+        "url": pages["url"],
+        "audit_status": pages["audit_status"],
+        "onpage_seo_score": _score_onpage_seo(pages),
+        # Schema, content and link quality are model-scored: kept as stored
+        "schema_score": _col(pages, "schema_analysis.score").astype(int),
+        "content_score": _col(pages, "content_analysis.score").astype(int),
+        "link_score": _col(pages, "link_analysis.score").astype(int),
+        "performance_score": _score_performance(pages, thresholds),
+        "readability_score": readability,
+        "security_score": _score_security(pages),
+        "accessibility_score": _score_accessibility(pages),
+        "canonical_score": _score_canonical(pages),
+        "issues_count": pages["issues_count"],
+        "thin_content": thin,
+    }, index=pages.index)
+
+    by_section = {section: column for column, section in _SCORE_COLUMNS.items()}
+    total = np.zeros(len(scores))
+    for dimension, weight in weights.items():  # same summation order as scoring.overall_score
+        total = total + scores[by_section[dimension]].to_numpy() * weight
+    # The built-in round() (correctly rounded decimal) keeps results identical
+    # to the crawl's scores; np.round can differ by 0.1 on inexact floats.
+    scores["overall_score"] = np.fromiter((round(v, 1) for v in total.tolist()), float, len(total))
+    scores["letter_grade"] = _letter_grades(scores["overall_score"].to_numpy(), thresholds)
+    return scores
+
+
+# ---------------------------------------------------------------------------
+# Site summary entries
+# ---------------------------------------------------------------------------
+
+def _score_entry(row: Mapping[str, Any], issues_count: int) -> PageScoreEntry:
+    """A re-scored page as the site summary lists it."""
+    return PageScoreEntry(
+        url=str(row["url"]),
+        audit_status=str(row["audit_status"]),
+        **{column: int(row[column]) for column in _SCORE_COLUMNS},
+        overall_score=float(row["overall_score"]),
+        letter_grade=str(row["letter_grade"]),
+        issues_count=issues_count,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Derived session
+# ---------------------------------------------------------------------------
+
+def _derived_dir(session_dir: Path) -> Path:
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return session_dir.parent / f"{session_dir.name}_rescored-{timestamp}"
+
+
+def _is_thin_content_issue(issue: Mapping[str, Any]) -> bool:
+    if issue.get("code"):
+        return issue["code"] == "thin_content"
+    return str(issue.get("description", "")).startswith("Thin content:")  # written before issue codes
+
+
+def _patch_report(report: dict[str, Any], row: Mapping[str, Any], thresholds: ScoreThresholds) -> None:
+    for column, section in _SCORE_COLUMNS.items():
+        if isinstance(report.get(section), dict):
+            report[section]["score"] = int(row[column])
+    readability = report.get("readability")
+    if isinstance(readability, dict):
+        # The thin-content issue is added or removed with the flag, and
+        # re-rendered with the threshold it names
+        thin = bool(row["thin_content"])
+        issues = readability.get("issues") or []
+        others = [issue for issue in issues if not _is_thin_content_issue(issue)]
+        if thin != bool(readability.get("thin_content")) or (thin and len(others) < len(issues)):
+            issue = make_issue(
+                "thin_content", words=readability.get("word_count", 0), minimum=thresholds.thin_content_words,
+            )
+            readability["issues"] = [issue, *others] if thin else others
+        readability["thin_content"] = thin
+    report["overall_score"] = float(row["overall_score"])
+    report["letter_grade"] = str(row["letter_grade"])
+
+
+def rescore_session(
+    session_dir: Path,
+    output_dir: Optional[Path] = None,
+    weights: Optional[Mapping[str, float]] = None,
+    thresholds: ScoreThresholds = DEFAULT_THRESHOLDS,
+    logger: Optional[logging.Logger] = None,
+) -> Path:
+    """Re-score ``session_dir`` and write it as a new session.
+
+    The derived session (``<session>_rescored-<timestamp>`` beside the
+    source unless ``output_dir`` is given) gets every page report with its
+    scores replaced, a fresh site summary and a ``_rescore.json`` recording
+    the weights and thresholds. The source session is not modified.
+    """
+    logger = logger or logging.getLogger(__name__)
+    weights = resolve_weights(weights)
+    output_dir = output_dir or _derived_dir(session_dir)
+    if output_dir.resolve() == session_dir.resolve():
+        raise ValueError("The derived session must not overwrite its source")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = load_session(session_dir, logger)
+    scores = score_pages(pages, weights, thresholds)
+
+    # Second pass: rewrite each page with its new scores, in the source's
+    # storage layout, and add it to the site summary. json.dumps without
+    # indent runs entirely in the C encoder (json.dump to a file does not).
+    rows = scores.to_dict("index")
+    storage = StorageOptions.for_session(session_dir)
+    segments = (
+        SegmentWriter(output_dir, storage.compression, storage.segment_max_mb)
+        if storage.layout == "segments" else None
+    )
+    builder = SiteSummaryBuilder()
+    for page_id, report in _iter_reports(session_dir, logger):
+        if page_id not in rows:
+            continue
+        _patch_report(report, rows[page_id], thresholds)
+        issues = _page_issues(report)
+        builder.add(_score_entry(rows[page_id], len(issues)), issues)
+        if segments is not None:
+            segments.write(page_id, report)
+        else:
+            (output_dir / f"{page_id}.json").write_text(
+                json.dumps(report, ensure_ascii=False, separators=(",", ":")), encoding="utf-8",
+            )
+    if segments is not None:
+        segments.close()
+
+    llm_usage = None
+    source_summary = session_dir / SUMMARY_FILE
+    if source_summary.exists():
+        with open(source_summary, encoding="utf-8") as f:
+            llm_usage = json.load(f).get("llm_usage")
+    summary = builder.build(LlmUsageSummary.model_validate(llm_usage) if llm_usage else None)
+    summary.overall_grade = str(_letter_grades(np.array([summary.overall_score]), thresholds)[0])
+    with open(output_dir / SUMMARY_FILE, "w", encoding="utf-8") as f:
+        json.dump(summary.model_dump(), f, indent=2, ensure_ascii=False, default=str)
+    with open(output_dir / RESCORE_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            "source_session": session_dir.name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "pages": len(scores),
+            "score_weights": weights,
+            "score_thresholds": asdict(thresholds),
+        }, f, indent=2)
+
+    logger.info(
+        "Re-scored %d pages into %s (overall %.1f, grade %s)",
+        len(scores), output_dir, summary.overall_score, summary.overall_grade,
+    )
+    return output_dir
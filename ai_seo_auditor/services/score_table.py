@@ -0,0 +1,140 @@
+"""Columnar per-session score table (Parquet).
+
+Next to the page reports, :class:`ScoreTableWriter` writes ``_scores.parquet``.
+It holds one typed row per page: the :class:`PageScoreEntry` fields, key
+sub-metrics (TTFB, FCP, page size, word count, link counts) and the issue
+count of every dimension. Rows are written in row groups as the crawl goes
+and the file appears when the session closes. Analytical readers
+(:func:`read_score_table`) then memory-map the columns they need instead
+of parsing every page JSON.
+
+Parquet support needs ``pyarrow``; without it no table is written and
+readers fall back to the page reports.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+SCORE_TABLE_FILE = "_scores.parquet"
+# Sections whose issues are counted per dimension
+ISSUE_COUNT_SECTIONS = (
+    "onpage_seo", "content_analysis", "link_analysis", "readability", "accessibility", "security",
+)
+# Column → (report section, field) for the sub-metrics
+_METRIC_COLUMNS: dict[str, tuple[str, str]] = {
+    "ttfb_ms": ("performance", "ttfb_ms"),
+    "fcp_ms": ("performance", "fcp_ms"),
+    "dom_content_loaded_ms": ("performance", "dom_content_loaded_ms"),
+    "page_size_bytes": ("performance", "page_size_bytes"),
+    "resource_count": ("performance", "resource_count"),
+    "word_count": ("readability", "word_count"),
+    "flesch_reading_ease": ("readability", "flesch_reading_ease"),
+    "internal_links": ("link_analysis", "internal_links"),
+    "external_links": ("link_analysis", "external_links"),
+    "nofollow_count": ("link_analysis", "nofollow_count"),
+}
+
+
+def _schema() -> Any:
+    scores = [
+        "onpage_seo_score", "schema_score", "content_score", "link_score", "performance_score",
+        "readability_score", "security_score", "accessibility_score", "canonical_score",
+    ]
+    return pa.schema(
+        [
+            pa.field("page_id", pa.string(), nullable=False),
+            pa.field("url", pa.string(), nullable=False),
+            pa.field("audit_status", pa.dictionary(pa.int8(), pa.string())),
+            *(pa.field(name, pa.int16()) for name in scores),
+            pa.field("overall_score", pa.float64()),
+            pa.field("letter_grade", pa.dictionary(pa.int8(), pa.string())),
+            pa.field("issues_count", pa.int32()),
+            pa.field("ttfb_ms", pa.int32()),
+            pa.field("fcp_ms", pa.int32()),  # null when the browser reported no FCP
+            pa.field("dom_content_loaded_ms", pa.int32()),
+            pa.field("page_size_bytes", pa.int64()),
+            pa.field("resource_count", pa.int32()),
+            pa.field("word_count", pa.int32()),
+            pa.field("flesch_reading_ease", pa.float64()),
+            pa.field("internal_links", pa.int32()),
+            pa.field("external_links", pa.int32()),
+            pa.field("nofollow_count", pa.int32()),
+            *(pa.field(f"{section}_issues", pa.int16()) for section in ISSUE_COUNT_SECTIONS),
+        ]
+    )
+
+
+def score_row(page_id: str, report: Mapping[str, Any], entry: Mapping[str, Any]) -> dict[str, Any]:
+    """One table row from a page report and its ``PageScoreEntry`` dump."""
+    row: dict[str, Any] = {"page_id": page_id, **entry}
+    for column, (section, field) in _METRIC_COLUMNS.items():
+        row[column] = (report.get(section) or {}).get(field)
+    for section in ISSUE_COUNT_SECTIONS:
+        row[f"{section}_issues"] = len((report.get(section) or {}).get("issues") or ())
+    return row
+
+
+class ScoreTableWriter:
+    """Buffers score rows and writes them to the session's table in row groups.
+
+    :meth:`add` returns a full row group for the caller to :meth:`write_rows`
+    (the pipeline does that on its writer thread). :meth:`close` writes the
+    remainder and moves the finished file into place.
+    """
+
+    def __init__(self, session_dir: Path, row_group_size: int = 1000) -> None:
+        self.path = session_dir / SCORE_TABLE_FILE
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._writer: Optional[Any] = None
+
+    def add(self, row: dict[str, Any]) -> Optional[list[dict[str, Any]]]:
+        self._buffer.append(row)
+        if len(self._buffer) < self.row_group_size:
+            return None
+        rows, self._buffer = self._buffer, []
+        return rows
+
+    def write_rows(self, rows: Sequence[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        schema = _schema()
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._tmp, schema, compression="zstd")
+        self._writer.write_table(pa.Table.from_pylist(list(rows), schema=schema))
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        rows, self._buffer = self._buffer, []
+        self.write_rows(rows)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self._tmp, self.path)
+
+
+def read_score_table(session_dir: Path, columns: Optional[Sequence[str]] = None) -> Optional[Any]:
+    """The session's score table as a pyarrow Table (memory-mapped), or
+    ``None`` without a table or pyarrow. A page recorded more than once
+    keeps its last row."""
+    path = session_dir / SCORE_TABLE_FILE
+    if pq is None or not path.exists():
+        return None
+    wanted = None if columns is None else list(dict.fromkeys(["page_id", *columns]))
+    table = pq.read_table(path, columns=wanted, memory_map=True)
+    page_ids = table.column("page_id").to_pylist()
+    last = {page_id: i for i, page_id in enumerate(page_ids)}
+    if len(last) < len(page_ids):
+        table = table.take(sorted(last.values()))
+    return table
@@ -0,0 +1,174 @@
+"""Per-session SQLite database of page scores and issues.
+
+Next to the page reports, :class:`SessionDbWriter` keeps ``_session.db``
+(WAL mode, so the API can read it while a crawl is still writing). It has
+three tables:
+
+- ``pages``: one row per page with status, overall score, grade, issue
+  count and risk index; indexed on score, status, risk, issue count and URL.
+- ``dimension_scores``: one row per page and report section
+  (``onpage_seo``, ``schema_analysis``, ...) with its score.
+- ``issues``: one row per issue with its section, severity, catalogue
+  code, description and (for LLM-written issues) suggested fix.
+
+Listing, filtering, sorting and paginating pages then run as indexed
+queries. The page reports stay the source of the full page data. A page
+written again (batch merge, re-analysis) replaces its rows.
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+SESSION_DB_FILE = "_session.db"
+# Report sections stored in dimension_scores
+SCORE_SECTIONS = (
+    "onpage_seo", "schema_analysis", "content_analysis", "link_analysis", "performance",
+    "readability", "security", "accessibility", "canonical_analysis",
+)
+# Report sections whose issues are stored (and counted per page)
+ISSUE_SECTIONS = ("onpage_seo", "content_analysis", "link_analysis", "readability", "accessibility", "security")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    audit_status TEXT NOT NULL,
+    overall_score REAL NOT NULL,
+    letter_grade TEXT NOT NULL,
+    issues_count INTEGER NOT NULL,
+    risk_index REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_overall_score ON pages (overall_score);
+CREATE INDEX IF NOT EXISTS pages_status_score ON pages (audit_status, overall_score);
+CREATE INDEX IF NOT EXISTS pages_risk_index ON pages (risk_index);
+CREATE INDEX IF NOT EXISTS pages_issues_count ON pages (issues_count);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+
+CREATE TABLE IF NOT EXISTS dimension_scores (
+    page_id TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (page_id, dimension)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dimension_scores_score ON dimension_scores (dimension, score);
+
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    description TEXT NOT NULL,
+    suggested_fix TEXT,
+    code TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_page_id ON issues (page_id);
+CREATE INDEX IF NOT EXISTS issues_severity ON issues (severity);
+CREATE INDEX IF NOT EXISTS issues_description ON issues (description);
+"""
+
+
+def risk_index(overall_score: float, issues_count: int) -> float:
+    return round(((100 - max(0.0, min(100.0, overall_score))) * 0.65) + (min(issues_count, 20) * 5 * 0.35), 1)
+
+
+def connect(path: Path, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open (and if needed create) a session database in WAL mode."""
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(_SCHEMA)
+    if "code" not in {row["name"] for row in conn.execute("PRAGMA table_info(issues)")}:
+        conn.execute("ALTER TABLE issues ADD COLUMN code TEXT")  # databases written before issue codes
+    conn.execute("CREATE INDEX IF NOT EXISTS issues_code ON issues (code)")
+    return conn
+
+
+def page_rows(page_id: str, report: Mapping[str, Any]) -> dict[str, Any]:
+    """The rows of one page report, for :meth:`SessionDbWriter.write_pages`."""
+    issues = [
+        (
+            page_id,
+            section,
+            str(issue.get("severity") or "medium").lower(),
+            str(issue.get("description") or ""),
+            issue.get("suggested_fix") or None,
+            issue.get("code"),
+        )
+        for section in ISSUE_SECTIONS
+        for issue in (report.get(section) or {}).get("issues") or ()
+        if isinstance(issue, dict)
+    ]
+    overall = float(report.get("overall_score") or 0)
+    return {
+        "page": (
+            page_id,
+            report.get("url") or page_id,
+            report.get("audit_status") or "complete",
+            overall,
+            report.get("letter_grade") or "F",
+            len(issues),
+            risk_index(overall, len(issues)),
+        ),
+        "scores": [
+            (page_id, section, float((report.get(section) or {}).get("score") or 0))
+            for section in SCORE_SECTIONS
+            if isinstance(report.get(section), dict)
+        ],
+        "issues": issues,
+    }
+
+
+class SessionDbWriter:
+    """Buffers page rows and writes them to the session database in batches.
+
+    :meth:`add` returns a full batch for the caller to :meth:`write_pages`
+    (the pipeline does that on its writer thread); each batch is one
+    transaction. :meth:`close` writes the remainder.
+    """
+
+    def __init__(self, session_dir: Path, batch_size: int = 100) -> None:
+        self.path = session_dir / SESSION_DB_FILE
+        self.batch_size = batch_size
+        self.pages = 0
+        self._buffer: list[dict[str, Any]] = []
+        # Written on the writer thread, closed on the caller's after it stops
+        self._conn: Optional[sqlite3.Connection] = connect(self.path, check_same_thread=False)
+
+    def add(self, rows: dict[str, Any]) -> Optional[list[dict[str, Any]]]:
+        self._buffer.append(rows)
+        if len(self._buffer) < self.batch_size:
+            return None
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def write_pages(self, batch: Sequence[dict[str, Any]]) -> None:
+        if not batch or self._conn is None:
+            return
+        page_ids = [(rows["page"][0],) for rows in batch]
+        with self._conn:
+            self._conn.executemany("DELETE FROM issues WHERE page_id = ?", page_ids)
+            self._conn.executemany("DELETE FROM dimension_scores WHERE page_id = ?", page_ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)", [r["page"] for r in batch],
+            )
+            self._conn.executemany(
+                "INSERT INTO dimension_scores VALUES (?, ?, ?)", [row for r in batch for row in r["scores"]],
+            )
+            self._conn.executemany(
+                "INSERT INTO issues (page_id, section, severity, description, suggested_fix, code) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [row for r in batch for row in r["issues"]],
+            )
+        self.pages += len(batch)
+
+    def close(self) -> None:
+        batch, self._buffer = self._buffer, []
+        try:
+            self.write_pages(batch)
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
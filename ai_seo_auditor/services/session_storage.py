@@ -0,0 +1,287 @@
+"""Page report storage of a session: per-file JSON or append-only segments.
+
+The original layout writes every page as its own ``<page_id>.json``. With
+``layout="segments"`` the reports are appended as compact JSON records to
+``_pages/pages-NNNNN.ndjson`` segments, which rotate once they reach
+``segment_max_mb``. ``_pages/index.ndjson`` records where each record
+starts (segment, offset and length) per ``page_id``. Rewriting a page
+appends a new record, and the last index entry wins.
+
+With ``compression="zstd"`` every record is its own zstd frame in a
+``.ndjson.zst`` segment. Records stay individually addressable, and
+decompressing a whole segment (``zstd -d``) yields plain NDJSON. zstd
+needs Python 3.14's ``compression.zstd`` or the ``backports.zstd``
+package.
+
+:func:`iter_reports`, :func:`read_report` and :func:`page_ids` read both
+layouts, so readers do not need to know how a session was written.
+Readers share a parsed index per session, which only reads the entries
+appended since it was last used.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Container, Iterator, Optional
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+PAGES_DIR = "_pages"
+INDEX_FILE = "index.ndjson"
+_SEGMENT_PREFIX = "pages-"
+_SUFFIXES = {None: ".ndjson", "zstd": ".ndjson.zst"}
+_ZSTD_LEVEL = 3
+# Sessions whose parsed index is kept in memory
+_INDEX_CACHE_SESSIONS = 16
+
+
+@dataclass
+class StorageOptions:
+    """How the pipeline stores page reports (the ``report_storage`` config)."""
+    layout: str = "files"
+    compression: Optional[str] = None
+    segment_max_mb: float = 64.0
+
+    def __post_init__(self) -> None:
+        if self.layout not in ("files", "segments"):
+            raise ValueError(f"report_storage.layout must be 'files' or 'segments', got {self.layout!r}")
+        if self.compression not in _SUFFIXES:
+            raise ValueError(f"report_storage.compression must be null or 'zstd', got {self.compression!r}")
+        if self.compression == "zstd" and zstd is None:
+            raise ValueError("report_storage.compression 'zstd' needs Python 3.14+ or the backports.zstd package")
+        if self.segment_max_mb <= 0:
+            raise ValueError(f"report_storage.segment_max_mb must be > 0, got {self.segment_max_mb}")
+
+    @classmethod
+    def for_session(cls, session_dir: Path) -> "StorageOptions":
+        """The layout an existing session was written with (files if new)."""
+        if not uses_segments(session_dir):
+            return cls()
+        compressed = any((session_dir / PAGES_DIR).glob(f"{_SEGMENT_PREFIX}*{_SUFFIXES['zstd']}"))
+        return cls(layout="segments", compression="zstd" if compressed else None)
+
+
+class SegmentWriter:
+    """Appends page reports to the session's segments and offset index.
+
+    A writer continues the session's last segment, so re-runs (batch
+    merge, re-analysis) extend the same store. :meth:`write` flushes each
+    record; a batching writer appends with ``flush=False`` and flushes once
+    per batch. A record whose index entry was never written (a crash in
+    between) is simply not visible.
+    """
+
+    def __init__(self, session_dir: Path, compression: Optional[str] = None, segment_max_mb: float = 64.0) -> None:
+        self.directory = session_dir / PAGES_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.segment_max_bytes = int(segment_max_mb * 1024 * 1024)
+        self.count = 0
+        self._index = open(self.directory / INDEX_FILE, "a", encoding="utf-8")
+        segments = _segment_paths(self.directory, compression)
+        self._number = int(segments[-1].name[len(_SEGMENT_PREFIX):].split(".")[0]) if segments else 0
+        self._segment = self._open_segment()
+
+    def _open_segment(self) -> Any:
+        return open(self.directory / f"{_SEGMENT_PREFIX}{self._number:05d}{_SUFFIXES[self.compression]}", "ab")
+
+    @staticmethod
+    def encode(report: dict[str, Any]) -> bytes:
+        """One report as a compact NDJSON line."""
+        return (json.dumps(report, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+    def write(self, page_id: str, report: dict[str, Any]) -> None:
+        self.append(page_id, self.encode(report))
+
+    def append(self, page_id: str, data: bytes, flush: bool = True) -> None:
+        """Append an :meth:`encode`-d record (compressed here if configured)."""
+        if self.compression == "zstd":
+            data = zstd.compress(data, level=_ZSTD_LEVEL)
+        offset = self._segment.tell()
+        if offset and offset + len(data) > self.segment_max_bytes:
+            self._segment.close()
+            self._number += 1
+            self._segment = self._open_segment()
+            offset = 0
+        self._segment.write(data)
+        entry = {"page_id": page_id, "segment": Path(self._segment.name).name, "offset": offset, "length": len(data)}
+        self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.count += 1
+        if flush:
+            self.flush()
+
+    def flush(self, fsync: bool = False) -> None:
+        """Flush the segment before the index, so no entry points past the data."""
+        self._segment.flush()
+        if fsync:
+            os.fsync(self._segment.fileno())
+        self._index.flush()
+        if fsync:
+            os.fsync(self._index.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        self._segment.close()
+        self._index.close()
+
+
+def uses_segments(session_dir: Path) -> bool:
+    return (session_dir / PAGES_DIR / INDEX_FILE).exists()
+
+
+@dataclass
+class _ParsedIndex:
+    inode: int
+    consumed: int = 0  # bytes of complete lines parsed so far
+    entries: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+_index_cache: dict[Path, _ParsedIndex] = {}
+_index_lock = threading.Lock()
+
+
+def _parsed_index(session_dir: Path) -> Optional[_ParsedIndex]:
+    """The session's cached index, brought up to date; call with ``_index_lock`` held.
+
+    The index is append-only, so only the lines written since the last call
+    are parsed. A replaced or truncated index file is parsed again from the
+    start. A torn last line is left until it is complete.
+    """
+    path = session_dir / PAGES_DIR / INDEX_FILE
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _index_cache.pop(path, None)
+        return None
+    parsed = _index_cache.get(path)
+    if parsed is None or parsed.inode != stat.st_ino or stat.st_size < parsed.consumed:
+        if parsed is None and len(_index_cache) >= _INDEX_CACHE_SESSIONS:
+            del _index_cache[next(iter(_index_cache))]
+        parsed = _index_cache[path] = _ParsedIndex(stat.st_ino)
+    if stat.st_size > parsed.consumed:
+        with open(path, "rb") as f:
+            f.seek(parsed.consumed)
+            tail = f.read(stat.st_size - parsed.consumed)
+        complete = tail.rfind(b"\n") + 1
+        for line in tail[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            parsed.entries[entry["page_id"]] = entry
+        parsed.consumed += complete
+    return parsed
+
+
+def load_index(session_dir: Path) -> dict[str, dict[str, Any]]:
+    """Latest index entry per page id (skipping a torn last line)."""
+    with _index_lock:
+        parsed = _parsed_index(session_dir)
+        return dict(parsed.entries) if parsed is not None else {}
+
+
+def _segment_paths(directory: Path, compression: Optional[str]) -> list[Path]:
+    suffix = _SUFFIXES[compression]
+    return sorted(p for p in directory.glob(f"{_SEGMENT_PREFIX}*{suffix}") if p.name.count(".") == suffix.count("."))
+
+
+def _legacy_files(session_dir: Path) -> list[Path]:
+    return sorted((p for p in session_dir.glob("*.json") if not p.name.startswith("_")), key=lambda p: p.name)
+
+
+def _decode(segment_name: str, data: bytes) -> dict[str, Any]:
+    if segment_name.endswith(_SUFFIXES["zstd"]):
+        if zstd is None:
+            raise ValueError("zstd-compressed segment; install backports.zstd (or use Python 3.14+) to read it")
+        try:
+            data = zstd.decompress(data)
+        except zstd.ZstdError as exc:
+            raise ValueError(f"Corrupt zstd record: {exc}") from exc
+    return json.loads(data)
+
+
+def page_ids(session_dir: Path) -> list[str]:
+    """Ids of the session's pages in either layout."""
+    return sorted({p.stem for p in _legacy_files(session_dir)} | load_index(session_dir).keys())
+
+
+def has_pages(session_dir: Path) -> bool:
+    index = session_dir / PAGES_DIR / INDEX_FILE
+    if index.exists() and index.stat().st_size:
+        return True
+    return any(not p.name.startswith("_") for p in session_dir.glob("*.json"))
+
+
+def read_report(session_dir: Path, page_id: str) -> dict[str, Any]:
+    """One page report; raises ``FileNotFoundError`` for an unknown page."""
+    with _index_lock:
+        parsed = _parsed_index(session_dir)
+        entry = parsed.entries.get(page_id) if parsed is not None else None
+    if entry is None:
+        path = session_dir / f"{page_id}.json"
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    with open(session_dir / PAGES_DIR / entry["segment"], "rb") as f:
+        f.seek(entry["offset"])
+        return _decode(entry["segment"], f.read(entry["length"]))
+
+
+def iter_reports(
+    session_dir: Path,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+    only: Optional[Container[str]] = None,
+) -> Iterator[tuple[str, Path, dict[str, Any]]]:
+    """``(page_id, source path, report)`` for every page of the session, or
+    for the page ids in ``only``.
+
+    Per-file reports come first (by file name), then segment records in
+    storage order, reading each segment sequentially. A page in both
+    layouts is read from its segment. Unreadable reports are passed to
+    ``on_error`` (if given) and skipped.
+    """
+    index = load_index(session_dir)
+    if only is not None:
+        index = {page_id: entry for page_id, entry in index.items() if page_id in only}
+    for path in _legacy_files(session_dir):
+        if path.stem in index or (only is not None and path.stem not in only):
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError) as exc:
+            if on_error:
+                on_error(path.stem, exc)
+            continue
+        yield path.stem, path, report
+
+    by_segment: dict[str, list[dict[str, Any]]] = {}
+    for entry in index.values():
+        by_segment.setdefault(entry["segment"], []).append(entry)
+    for segment in sorted(by_segment):
+        path = session_dir / PAGES_DIR / segment
+        try:
+            f = open(path, "rb")
+        except OSError as exc:
+            for entry in by_segment[segment]:
+                if on_error:
+                    on_error(entry["page_id"], exc)
+            continue
+        with f:
+            for entry in sorted(by_segment[segment], key=lambda e: e["offset"]):
+                try:
+                    f.seek(entry["offset"])
+                    report = _decode(segment, f.read(entry["length"]))
+                except (OSError, ValueError) as exc:
+                    if on_error:
+                        on_error(entry["page_id"], exc)
+                    continue
+                yield entry["page_id"], path, report
@@ -0,0 +1,217 @@
+"""Streaming site summary.
+
+``JsonReportPipeline`` feeds each recorded page to :class:`SiteSummaryBuilder`,
+which keeps running aggregates instead of every page and issue:
+
+- sums per dimension and of the overall score over the non-failed pages
+  (for the averages);
+- severity counters;
+- the best and worst pages, in two heaps of three;
+- a Space-Saving sketch of the most frequent issues (by catalogue code,
+  or description for LLM-written ones), with up to
+  ``affected_pages_limit`` example URLs each.
+
+The LLM timings behind ``llm_usage``'s percentiles are kept in
+:class:`Reservoir` samples of the same fixed size.
+
+Memory stays bounded however large the crawl, and :meth:`~SiteSummaryBuilder.build`
+costs the same at any point, so the pipeline can checkpoint partial
+summaries. Issue counts are exact while a session has at most
+``issue_capacity`` distinct descriptions. Beyond that a newly tracked
+description inherits the count of the one it evicts, so counts can only
+be over-estimated. The summary's ``pages`` list is kept for sessions of
+up to ``page_list_limit`` pages and left empty for larger ones, whose
+per-page scores live in the session database and score table.
+"""
+from __future__ import annotations
+
+import heapq
+import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from ai_seo_auditor.models.issue_catalog import issue_label
+from ai_seo_auditor.models.schemas import (
+    AggregatedIssue, LlmUsageSummary, PageScoreEntry, SiteSummary, compute_letter_grade,
+)
+
+# PageScoreEntry field -> site summary dimension
+DIMENSION_FIELDS = (
+    ("onpage_seo_score", "onpage_seo"),
+    ("schema_score", "schema_analysis"),
+    ("content_score", "content_analysis"),
+    ("link_score", "link_analysis"),
+    ("performance_score", "performance"),
+    ("readability_score", "readability"),
+    ("security_score", "security"),
+    ("accessibility_score", "accessibility"),
+    ("canonical_score", "canonical_analysis"),
+)
+TOP_ISSUES = 20
+BEST_WORST_PAGES = 3
+
+
+def percentiles(values: Sequence[float], qs: tuple[int, ...]) -> dict[str, Optional[float]]:
+    """Nearest-rank percentiles plus max; None for every key without values."""
+    ordered = sorted(values)
+    result: dict[str, Optional[float]] = {}
+    for q in qs:
+        result[f"p{q}"] = ordered[max(0, -(-q * len(ordered) // 100) - 1)] if ordered else None
+    result["max"] = ordered[-1] if ordered else None
+    return result
+
+
+class Reservoir:
+    """Uniform sample of at most ``capacity`` values (Vitter's algorithm R).
+
+    Percentiles are exact until more than ``capacity`` values were added and
+    estimated from the sample after that; ``count`` and the maximum stay exact.
+    """
+
+    def __init__(self, capacity: int = 10_000, seed: int = 0) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self.max: Optional[float] = None
+        self._sample = array("d")
+        self._random = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self._sample) < self.capacity:
+            self._sample.append(value)
+            return
+        slot = self._random.randrange(self.count)
+        if slot < self.capacity:
+            self._sample[slot] = value
+
+    def percentiles(self, qs: tuple[int, ...]) -> dict[str, Optional[float]]:
+        return {**percentiles(self._sample, qs), "max": self.max}
+
+
+@dataclass
+class _TrackedIssue:
+    count: int
+    severity: str
+    code: Optional[str]
+    seq: int
+    pages: dict[str, None] = field(default_factory=dict)  # insertion-ordered set
+
+
+class IssueSketch:
+    """Space-Saving heavy hitters over issue descriptions.
+
+    Tracks at most ``capacity`` descriptions. A new one arriving when full
+    replaces the least frequent and starts from its count. The min-heap is
+    refreshed lazily: counts only grow, so a popped entry whose count is
+    stale is pushed back with its current count.
+    """
+
+    def __init__(self, capacity: int = 1000, affected_pages_limit: int = 100) -> None:
+        self.capacity = capacity
+        self.affected_pages_limit = affected_pages_limit
+        self.evictions = 0
+        self._tracked: dict[str, _TrackedIssue] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = 0
+
+    def add(self, description: str, severity: str, url: str, code: Optional[str] = None) -> None:
+        tracked = self._tracked.get(description)
+        if tracked is None:
+            count = self._evict() if len(self._tracked) >= self.capacity else 0
+            tracked = self._tracked[description] = _TrackedIssue(count, severity, code, self._seq)
+            self._seq += 1
+            heapq.heappush(self._heap, (count + 1, tracked.seq, description))
+        tracked.count += 1
+        if url not in tracked.pages and len(tracked.pages) < self.affected_pages_limit:
+            tracked.pages[url] = None
+
+    def _evict(self) -> int:
+        while True:
+            count, seq, description = heapq.heappop(self._heap)
+            tracked = self._tracked[description]
+            if tracked.count == count:
+                del self._tracked[description]
+                self.evictions += 1
+                return count
+            heapq.heappush(self._heap, (tracked.count, seq, description))
+
+    def top(self, n: int) -> list[AggregatedIssue]:
+        """The ``n`` most frequent descriptions, first seen first among equal counts."""
+        ranked = heapq.nsmallest(n, self._tracked.items(), key=lambda item: (-item[1].count, item[1].seq))
+        return [
+            AggregatedIssue(
+                description=description,
+                code=tracked.code,
+                severity=tracked.severity,
+                count=tracked.count,
+                affected_pages=list(tracked.pages),
+            )
+            for description, tracked in ranked
+        ]
+
+
+class SiteSummaryBuilder:
+    """Accumulates recorded pages into a :class:`SiteSummary` in bounded memory."""
+
+    def __init__(
+        self, page_list_limit: int = 1000, issue_capacity: int = 1000, affected_pages_limit: int = 100,
+    ) -> None:
+        self.page_list_limit = page_list_limit
+        self.pages = 0
+        self.issues = IssueSketch(issue_capacity, affected_pages_limit)
+        self._valid_pages = 0
+        self._sums = dict.fromkeys([attr for attr, _ in DIMENSION_FIELDS] + ["overall_score"], 0.0)
+        self._severity = {"high": 0, "medium": 0, "low": 0}
+        # (overall score, arrival) keys; _worst negates them to keep the largest out
+        self._best: list[tuple[float, int, PageScoreEntry]] = []
+        self._worst: list[tuple[float, int, PageScoreEntry]] = []
+        self._listed: Optional[list[PageScoreEntry]] = []
+
+    def add(self, entry: PageScoreEntry, issues: Iterable[Mapping[str, Any]]) -> None:
+        """Add one page's score entry and its issue dicts, as stored in the report."""
+        seq = self.pages
+        self.pages += 1
+        if entry.audit_status != "failed":
+            self._valid_pages += 1
+            for attr in self._sums:
+                self._sums[attr] += getattr(entry, attr)
+        _push_bounded(self._best, (entry.overall_score, seq, entry))
+        _push_bounded(self._worst, (-entry.overall_score, -seq, entry))
+        if self._listed is not None:
+            self._listed.append(entry)
+            if len(self._listed) > self.page_list_limit:
+                self._listed = None
+
+        for issue in issues:
+            severity = issue.get("severity", "medium")
+            if severity in self._severity:
+                self._severity[severity] += 1
+            self.issues.add(issue_label(issue), severity, entry.url, issue.get("code"))
+
+    def build(self, llm_usage: Optional[LlmUsageSummary] = None, partial: bool = False) -> SiteSummary:
+        # Only complete/partial audits count towards the averages (failed are excluded)
+        valid_count = self._valid_pages or 1
+        overall_avg = round(self._sums["overall_score"] / valid_count, 1)
+        return SiteSummary(
+            pages_audited=self.pages,
+            partial=partial,
+            overall_grade=compute_letter_grade(overall_avg),
+            overall_score=overall_avg,
+            dimension_averages={label: round(self._sums[attr] / valid_count, 1) for attr, label in DIMENSION_FIELDS},
+            severity_distribution=dict(self._severity),
+            best_pages=[entry for _, _, entry in sorted(self._best, reverse=True)],
+            worst_pages=[entry for _, _, entry in sorted(self._worst, reverse=True)],
+            top_issues=self.issues.top(TOP_ISSUES),
+            pages=sorted(self._listed, key=lambda p: p.overall_score) if self._listed is not None else [],
+            llm_usage=llm_usage,
+        )
+
+
+def _push_bounded(heap: list[tuple[float, int, PageScoreEntry]], item: tuple[float, int, PageScoreEntry]) -> None:
+    if len(heap) < BEST_WORST_PAGES:
+        heapq.heappush(heap, item)
+    else:
+        heapq.heappushpop(heap, item)
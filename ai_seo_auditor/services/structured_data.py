@@ -0,0 +1,236 @@
+"""Rule-based schema.org validation of a page's JSON-LD.
+
+Walks every typed node (top-level items, ``@graph`` members and nested
+values such as a Product's ``offers``), resolves ``@type`` arrays and
+checks each node against a bundled table of required and recommended
+properties for the common rich-result types. The result fills
+``SchemaScore`` directly, so the raw JSON-LD never has to be sent to the
+LLM; :func:`summarize` renders the compact line the model sees instead.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+_SCHEMA_PREFIXES = ("https://schema.org/", "http://schema.org/", "schema:")
+# Deeper nesting than this is not walked (guards against pathological input)
+_MAX_DEPTH = 16
+
+
+@dataclass(frozen=True)
+class TypeRules:
+    """Properties checked for one schema.org type. ``a|b`` means either
+    property satisfies the rule. Rules of ``parent`` apply as well."""
+    required: tuple[str, ...] = ()
+    recommended: tuple[str, ...] = ()
+    parent: Optional[str] = None
+
+
+_LOCAL_BUSINESS_SUBTYPES = (
+    "FoodEstablishment", "Store", "LodgingBusiness", "MedicalBusiness", "ProfessionalService",
+    "AutomotiveBusiness", "HealthAndBeautyBusiness", "HomeAndConstructionBusiness", "LegalService",
+    "FinancialService", "RealEstateAgent", "EntertainmentBusiness", "SportsActivityLocation",
+)
+
+# Based on the Google Search rich-result requirements for each type
+_RULES: dict[str, TypeRules] = {
+    "Article": TypeRules(
+        required=("headline",),
+        recommended=("image", "author", "datePublished", "dateModified", "publisher"),
+    ),
+    "NewsArticle": TypeRules(parent="Article"),
+    "BlogPosting": TypeRules(parent="Article"),
+    "TechArticle": TypeRules(parent="Article"),
+    "Product": TypeRules(
+        required=("name", "offers|review|aggregateRating"),
+        recommended=("image", "description", "brand", "sku"),
+    ),
+    "Offer": TypeRules(
+        required=("price|priceSpecification",),
+        recommended=("priceCurrency", "availability", "url"),
+    ),
+    "AggregateOffer": TypeRules(required=("lowPrice", "priceCurrency"), recommended=("highPrice", "offerCount")),
+    "AggregateRating": TypeRules(required=("ratingValue", "ratingCount|reviewCount"), recommended=("bestRating",)),
+    "Review": TypeRules(required=("author", "reviewRating"), recommended=("datePublished",)),
+    "Rating": TypeRules(required=("ratingValue",), recommended=("bestRating",)),
+    "Organization": TypeRules(required=("name",), recommended=("url", "logo", "sameAs")),
+    "LocalBusiness": TypeRules(
+        required=("name", "address"),
+        recommended=("telephone", "openingHoursSpecification|openingHours", "geo", "url"),
+    ),
+    **{subtype: TypeRules(parent="LocalBusiness") for subtype in _LOCAL_BUSINESS_SUBTYPES},
+    "Restaurant": TypeRules(recommended=("servesCuisine", "menu|hasMenu"), parent="FoodEstablishment"),
+    "PostalAddress": TypeRules(recommended=("streetAddress", "addressLocality", "postalCode", "addressCountry")),
+    "BreadcrumbList": TypeRules(required=("itemListElement",)),
+    "ListItem": TypeRules(required=("position", "name|item")),
+    "FAQPage": TypeRules(required=("mainEntity",)),
+    "Question": TypeRules(required=("name", "acceptedAnswer|suggestedAnswer")),
+    "Answer": TypeRules(required=("text",)),
+    "WebSite": TypeRules(required=("url",), recommended=("name", "potentialAction")),
+    "WebPage": TypeRules(recommended=("name", "description")),
+    "Person": TypeRules(required=("name",), recommended=("url", "sameAs")),
+    "Event": TypeRules(
+        required=("name", "startDate", "location"),
+        recommended=("endDate", "eventStatus", "image", "description", "offers", "organizer"),
+    ),
+    "Recipe": TypeRules(
+        required=("name", "image"),
+        recommended=("author", "datePublished", "description", "recipeIngredient", "recipeInstructions",
+                     "totalTime|cookTime"),
+    ),
+    "HowTo": TypeRules(required=("name", "step"), recommended=("image", "totalTime", "supply", "tool")),
+    "VideoObject": TypeRules(
+        required=("name", "thumbnailUrl", "uploadDate"),
+        recommended=("description", "duration", "contentUrl|embedUrl"),
+    ),
+    "JobPosting": TypeRules(
+        required=("title", "description", "datePosted", "hiringOrganization",
+                  "jobLocation|applicantLocationRequirements"),
+        recommended=("validThrough", "employmentType", "baseSalary"),
+    ),
+    "SoftwareApplication": TypeRules(
+        required=("name", "offers", "aggregateRating|review"),
+        recommended=("applicationCategory", "operatingSystem"),
+    ),
+    "Course": TypeRules(required=("name", "description"), recommended=("provider",)),
+    "ImageObject": TypeRules(required=("contentUrl|url",)),
+}
+
+
+def node_types(node: dict[str, Any]) -> list[str]:
+    """The node's ``@type`` values without schema.org prefixes."""
+    raw = node.get("@type")
+    values = raw if isinstance(raw, list) else [raw]
+    types: list[str] = []
+    for value in values:
+        if not isinstance(value, str) or not value:
+            continue
+        for prefix in _SCHEMA_PREFIXES:
+            if value.startswith(prefix):
+                value = value[len(prefix):]
+                break
+        types.append(value)
+    return types
+
+
+def iter_nodes(data: Any, depth: int = 0) -> Iterator[dict[str, Any]]:
+    """Every typed node in ``data`` — top-level items, ``@graph`` members and
+    nested property values — in document order."""
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(data, list):
+        for item in data:
+            yield from iter_nodes(item, depth + 1)
+        return
+    if not isinstance(data, dict):
+        return
+    if node_types(data):
+        yield data
+    for key, value in data.items():
+        if key != "@context" and isinstance(value, (dict, list)):
+            yield from iter_nodes(value, depth + 1)
+
+
+def _rules_for(type_name: str) -> list[TypeRules]:
+    """Rules of ``type_name`` and its ancestors (empty for unknown types)."""
+    chain: list[TypeRules] = []
+    while type_name in _RULES and len(chain) < 8:
+        rules = _RULES[type_name]
+        chain.append(rules)
+        if rules.parent is None:
+            break
+        type_name = rules.parent
+    return chain
+
+
+def _has(node: dict[str, Any], rule: str) -> bool:
+    for prop in rule.split("|"):
+        value = node.get(prop)
+        if value not in (None, "", [], {}):
+            return True
+    return False
+
+
+def _check_node(node: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Missing properties of one node, or None when no type has rules."""
+    ruled = [t for t in node_types(node) if t in _RULES]
+    if not ruled:
+        return None
+    required: list[str] = []
+    recommended: list[str] = []
+    for type_name in ruled:
+        for rules in _rules_for(type_name):
+            required += [r for r in rules.required if r not in required]
+            recommended += [r for r in rules.recommended if r not in recommended]
+    return {
+        "type": ruled[0],
+        "required": len(required),
+        "recommended": len(recommended),
+        "missing_required": [r for r in required if not _has(node, r)],
+        "missing_recommended": [r for r in recommended if not _has(node, r)],
+    }
+
+
+def _node_score(check: dict[str, Any]) -> float:
+    """Rubric-aligned: all required properties → 75-100 (by recommended
+    coverage); otherwise below 50 in proportion to the required ones found."""
+    if check["missing_required"]:
+        return 50 * (1 - len(check["missing_required"]) / check["required"])
+    if not check["recommended"]:
+        return 100.0
+    return 75 + 25 * (1 - len(check["missing_recommended"]) / check["recommended"])
+
+
+def validate_json_ld(json_ld: list[Any]) -> dict[str, Any]:
+    """Validate a page's parsed JSON-LD blocks.
+
+    Returns the ``SchemaScore`` fields (``score``, ``detected_types``,
+    ``missing_fields``) plus ``nodes``, the per-node findings. Missing
+    required properties are listed as ``Type.prop (required)``, missing
+    recommended ones as ``Type.prop``. Structured data of types without
+    rules scores a neutral 50; no structured data scores 0.
+    """
+    detected: list[str] = []
+    checks: list[dict[str, Any]] = []
+    for node in iter_nodes(json_ld):
+        detected += [t for t in node_types(node) if t not in detected]
+        check = _check_node(node)
+        if check is not None:
+            checks.append(check)
+
+    missing: list[str] = []
+    for check in checks:
+        fields = [f"{check['type']}.{r} (required)" for r in check["missing_required"]]
+        fields += [f"{check['type']}.{r}" for r in check["missing_recommended"]]
+        missing += [f for f in fields if f not in missing]
+
+    if not detected:
+        score = 0
+    elif not checks:
+        score = 50
+    else:
+        score = round(sum(_node_score(c) for c in checks) / len(checks))
+    return {"score": score, "detected_types": detected, "missing_fields": missing, "nodes": checks}
+
+
+def schema_score(result: dict[str, Any]) -> dict[str, Any]:
+    """The ``SchemaScore`` fields of a :func:`validate_json_ld` result."""
+    return {
+        "score": result["score"],
+        "detected_types": list(result["detected_types"]),
+        "missing_fields": list(result["missing_fields"]),
+    }
+
+
+def summarize(result: dict[str, Any]) -> str:
+    """One compact line describing the structured data, for the LLM prompt."""
+    if not result["detected_types"]:
+        return "none"
+    parts: list[str] = []
+    for check in result["nodes"]:
+        gaps = [f"{r} (required)" for r in check["missing_required"]] + check["missing_recommended"]
+        parts.append(f"{check['type']} (missing: {', '.join(gaps)})" if gaps else f"{check['type']} (complete)")
+    unruled = [t for t in result["detected_types"] if not any(c["type"] == t for c in result["nodes"])]
+    if unruled:
+        parts.append(f"also: {', '.join(unruled)}")
+    return f"validated locally, score {result['score']} — " + "; ".join(parts)
@@ -0,0 +1,133 @@
+"""Template exemplars for diff-only prompts.
+
+Pages built from the same template (product pages, blog posts, category
+listings) share most of their markup. :class:`TemplateRegistry` keeps the
+first fully analysed page of each structural template as its exemplar.
+Later pages of that template are described to the model by what differs:
+the markup and text that only they have, next to the exemplar's findings.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Element paths deeper than this do not add to the structural signature
+_MAX_SIGNATURE_DEPTH = 8
+_DIGITS = re.compile(r"\d+")
+# Attributes shown on markup lines; the rest is presentation noise
+_MARKUP_ATTRS = frozenset(("id", "class", "href", "src", "alt", "role", "type", "name", "for", "lang", "rel"))
+_MAX_TEXT_CHARS = 200
+
+
+@dataclass
+class PageDiff:
+    """What a page has (or lacks) compared with its template exemplar."""
+    markup_added: list[str]
+    markup_removed: list[str]
+    text_added: list[str]
+
+
+@dataclass
+class TemplateExemplar:
+    signature: str
+    url: str
+    markup: Counter[str]
+    texts: frozenset[str]
+    findings: dict[str, Any]
+
+
+@dataclass
+class TemplateRegistry:
+    """One exemplar per structural template signature.
+
+    ``min_savings`` is the share of the page section (HTML and text) a
+    diff must save to be used; pages that differ more get the full prompt.
+    """
+    min_savings: float = 0.3
+    exemplars: dict[str, TemplateExemplar] = field(default_factory=dict)
+
+    def match(self, html: str) -> Optional[TemplateExemplar]:
+        return self.exemplars.get(template_signature(html))
+
+    def register(self, url: str, html: str, findings: dict[str, Any]) -> TemplateExemplar:
+        """Make ``url`` its template's exemplar unless the template has one."""
+        signature = template_signature(html)
+        if signature not in self.exemplars:
+            root = _parse(html)
+            self.exemplars[signature] = TemplateExemplar(
+                signature=signature,
+                url=url,
+                markup=Counter(_markup_lines(root)),
+                texts=frozenset(_text_blocks(root)),
+                findings=findings,
+            )
+        return self.exemplars[signature]
+
+
+def template_signature(html: str) -> str:
+    """Hash of the page's distinct element paths. Tag names and classes
+    (digits removed) count; ids, text and how often a path repeats do not."""
+    paths: set[str] = set()
+
+    def walk(el: Any, prefix: str, depth: int) -> None:
+        for child in el:
+            if not isinstance(child.tag, str):
+                continue
+            classes = ".".join(sorted(_DIGITS.sub("", c) for c in (child.get("class") or "").split()))
+            path = f"{prefix}/{child.tag}{'.' + classes if classes else ''}"
+            paths.add(path)
+            if depth < _MAX_SIGNATURE_DEPTH:
+                walk(child, path, depth + 1)
+
+    root = _parse(html)
+    if root is not None:
+        walk(root, "", 1)
+    return hashlib.sha1("\n".join(sorted(paths)).encode("utf-8")).hexdigest()[:16]
+
+
+def diff_page(exemplar: TemplateExemplar, html: str) -> PageDiff:
+    """Markup lines and text blocks of ``html`` that its exemplar lacks,
+    and the exemplar's markup lines missing from it."""
+    root = _parse(html)
+    markup = Counter(_markup_lines(root))
+    return PageDiff(
+        markup_added=list((markup - exemplar.markup).elements()),
+        markup_removed=list((exemplar.markup - markup).elements()),
+        text_added=[t for t in dict.fromkeys(_text_blocks(root)) if t not in exemplar.texts],
+    )
+
+
+def _parse(html: str) -> Optional[Any]:
+    if not html.strip():
+        return None
+    try:
+        return lxml_html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _markup_lines(root: Optional[Any]) -> list[str]:
+    """Each element as its bare opening tag (selected attributes only)."""
+    lines = []
+    for el in root.iter() if root is not None else ():
+        if not isinstance(el.tag, str) or el is root:
+            continue
+        attrs = "".join(f' {k}="{v}"' for k, v in el.attrib.items() if k in _MARKUP_ATTRS)
+        lines.append(f"<{el.tag}{attrs}>")
+    return lines
+
+
+def _text_blocks(root: Optional[Any]) -> list[str]:
+    """Whitespace-normalized text nodes in document order."""
+    blocks = []
+    for node in root.itertext() if root is not None else ():
+        text = " ".join(node.split())
+        if text:
+            blocks.append(text[:_MAX_TEXT_CHARS])
+    return blocks
@@ -5,22 +5,44 @@ import time
 
 import scrapy
 import yaml
+from collections import Counter
+from contextlib import asynccontextmanager
 from lxml import etree
 from lxml.html import fromstring as html_fromstring
 from pathlib import Path
+from scrapy import signals
 from scrapy.http import TextResponse
 from scrapy.linkextractors import LinkExtractor
+from scrapy.utils.sitemap import Sitemap
 from scrapy_playwright.page import PageMethod
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, AsyncIterator
 from urllib.parse import urlparse
-from ai_seo_auditor.services.llm_service import analyze_with_llm
-from ai_seo_auditor.models.schemas import (
-    Issue,
-    MetaTags, HeaderStructure, ImageStats, PageAudit,
-    OnPageSeoChecklist,
-    LinkAnalysis, PerformanceMetrics, ReadabilityAnalysis,
-    SecurityCheck, AccessibilityAnalysis, CanonicalAnalysis,
+from ai_seo_auditor.models.issue_catalog import make_issue
+from ai_seo_auditor.services.batch_inference import build_deferred_request
+from ai_seo_auditor.services.llm_budget import LlmBudget, importance_score
+from ai_seo_auditor.services.report_writer import WriterOptions
+from ai_seo_auditor.services.session_storage import StorageOptions
+from ai_seo_auditor.services.llm_service import (
+    LlmBatcher, PageContext, analyze_page, configure_endpoints, configure_limiter, configure_ollama,
+    deterministic_page_audit, estimate_page_tokens, get_endpoint_stats, get_limiter_stats, get_ollama_stats,
+    llm_kwargs_from_config, prepare_ollama,
 )
+from ai_seo_auditor.services.structured_data import validate_json_ld
+from ai_seo_auditor.models.scoring import (
+    THIN_CONTENT_WORDS,
+    resolve_weights, score_accessibility, score_canonical, score_onpage_seo,
+    score_performance, score_readability, score_security,
+)
+
+
+def _strip(value: str | None) -> str | None:
+    """Trim surrounding whitespace from an extracted meta value."""
+    return value.strip() if isinstance(value, str) else value
+
+
+def _url_key(url: str) -> str:
+    """URL without fragment and trailing slash, for counting links to a page."""
+    return url.split("#", 1)[0].rstrip("/")
 
 
 # ---------------------------------------------------------------------------
@@ -148,12 +170,75 @@ class AuditSpider(scrapy.Spider):
         if self.max_depth < 0 or self.max_pages < 1:
             raise ValueError(f"max_depth must be >= 0 and max_pages >= 1, got {self.max_depth}, {self.max_pages}")
 
+        # Overall-score weights, read by JsonReportPipeline (raises ValueError if invalid)
+        self.score_weights: dict[str, float] = resolve_weights(audit_config.get("score_weights"))
+        # Report storage layout, read by JsonReportPipeline (raises ValueError if invalid)
+        self.report_storage = StorageOptions(**(audit_config.get("report_storage") or {}))
+        self.report_writer = WriterOptions(**(audit_config.get("report_writer") or {}))
+
         self.pages_analyzed: int = 0
         self._pages_lock = asyncio.Lock()
-        self._llm_semaphore = asyncio.Semaphore(1)  # serialize LLM calls
+        self._llm_semaphore = asyncio.Semaphore(1)  # serialize rate-limit padding
         self._last_llm_call: float = 0.0  # monotonic timestamp of last LLM call
         self._stop_requested: bool = False
 
+        # LLM call options shared by single-page and batched analysis
+        self._rate_limit_delay = float(audit_config.get("llm_rate_limit_delay", 0))
+        self._llm_kwargs = llm_kwargs_from_config(audit_config, self.logger)
+
+        # LLM endpoint pool (one or more OpenAI-compatible hosts)
+        configure_endpoints(
+            audit_config.get("llm_endpoints") or None,
+            hedge=bool(audit_config.get("llm_hedge_enabled", False)),
+            hedge_min_samples=int(audit_config.get("llm_hedge_min_samples", 20)),
+            breaker_failure_threshold=int(audit_config.get("llm_breaker_failure_threshold", 3)),
+            breaker_cooldown_seconds=float(audit_config.get("llm_breaker_cooldown_seconds", 30)),
+        )
+
+        # Adaptive (AIMD) limit on in-flight LLM requests
+        configure_limiter(**(audit_config.get("llm_concurrency") or {}))
+
+        # Ollama profile: keep-alive, num_ctx sized to our prompts, model warm-up
+        # and parallel-slot detection at spider open (see _prepare_llm)
+        ollama_config = dict(audit_config.get("llm_ollama") or {})
+        self._ollama = configure_ollama(
+            ollama_config.pop("enabled", None),
+            html_max_chars=self.html_max_chars,
+            text_max_chars=self.text_max_chars,
+            batch_token_budget=(
+                int(audit_config.get("llm_batch_token_budget", 6000))
+                if audit_config.get("llm_batch_enabled", False) else None
+            ),
+            **ollama_config,
+        )
+
+        # Session LLM budget: pages are admitted to the LLM in importance order
+        # until max_calls / max_tokens are spent, the rest get rule-only audits
+        budget_config = audit_config.get("llm_budget")
+        self._budget: LlmBudget | None = LlmBudget(**budget_config) if budget_config else None
+        self._inbound_links: Counter[str] = Counter()
+        self._sitemap_priority: dict[str, float] = {}
+
+        # Page input snapshots, for `reanalyze` without re-crawling
+        self._page_snapshots = bool(audit_config.get("page_snapshots", True))
+
+        # Deferred mode: write prompts to a work file for the offline batch runner
+        self._defer_llm = str(kwargs.get("defer_llm", audit_config.get("llm_defer", False))).lower() in (
+            "1", "true", "yes",
+        )
+
+        # Optional batching: pack several small pages into one LLM completion
+        self._batcher: LlmBatcher | None = None
+        if audit_config.get("llm_batch_enabled", False):
+            self._batcher = LlmBatcher(
+                slot=self._llm_slot,
+                token_budget=int(audit_config.get("llm_batch_token_budget", 6000)),
+                max_pages=int(audit_config.get("llm_batch_max_pages", 6)),
+                page_max_tokens=int(audit_config.get("llm_batch_page_max_tokens", 1500)),
+                linger_seconds=float(audit_config.get("llm_batch_linger_seconds", 2.0)),
+                **self._llm_kwargs,
+            )
+
         # Initialize start_urls
         self.start_urls = audit_config.get('start_urls', ["https://books.toscrape.com/"])
         if not isinstance(self.start_urls, list) or not self.start_urls:
@@ -165,6 +250,75 @@ class AuditSpider(scrapy.Spider):
         # Set allowed_domains dynamically based on input URLs, normalizing ports
         self.allowed_domains = list({urlparse(url).hostname for url in self.start_urls if urlparse(url).hostname})
 
+    @classmethod
+    def from_crawler(cls, crawler: Any, *args: Any, **kwargs: Any) -> "AuditSpider":
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider._prepare_llm, signal=signals.spider_opened)
+        return spider
+
+    async def _prepare_llm(self, spider: scrapy.Spider) -> None:
+        """Load the Ollama model and size LLM concurrency before the first page."""
+        if self._ollama is None or self._defer_llm:
+            return
+        cascade = self._llm_kwargs["cascade"]
+        await prepare_ollama((cascade.fast_model,) if cascade else (), logger=self.logger)
+
+    @asynccontextmanager
+    async def _llm_slot(self) -> AsyncIterator[None]:
+        """Space LLM calls by the rate-limit padding. How many run at once is
+        decided by the adaptive limiter in the LLM service."""
+        async with self._llm_semaphore:
+            if self._rate_limit_delay > 0:
+                now = time.monotonic()
+                wait = self._last_llm_call + self._rate_limit_delay - now
+                if wait > 0:
+                    self.logger.debug(f"Rate-limit: sleeping {wait:.2f}s before LLM call")
+                    await asyncio.sleep(wait)
+            self._last_llm_call = time.monotonic()
+        yield
+
+    def closed(self, reason: str) -> None:
+        """Export LLM endpoint health, latency histograms and the concurrency
+        limit history to the crawl stats."""
+        if self.crawler and self.crawler.stats:
+            self.crawler.stats.set_value("llm/endpoints", get_endpoint_stats())
+            limiter = get_limiter_stats()
+            self.crawler.stats.set_value("llm/concurrency_limit", limiter["limit"])
+            self.crawler.stats.set_value("llm/concurrency_limit_peak", limiter["peak_limit"])
+            self.crawler.stats.set_value("llm/concurrency", limiter)
+            if self._ollama is not None:
+                self.crawler.stats.set_value("llm/ollama", get_ollama_stats())
+            if self._budget is not None:
+                self.crawler.stats.set_value("llm/budget", self._budget.snapshot())
+
+    async def _analyze(self, page_ctx: PageContext) -> dict[str, Any]:
+        """LLM analysis of one page, batched with others when batching is on."""
+        if self._batcher is not None:
+            return await self._batcher.submit(page_ctx)
+        async with self._llm_slot():
+            return await analyze_page(page_ctx, **self._llm_kwargs)
+
+    def _record_llm_stats(self, report: dict[str, Any]) -> None:
+        """Add one page's LLM time, tokens and retries to the crawl stats."""
+        if not (self.crawler and self.crawler.stats):
+            return
+        stats = self.crawler.stats
+        meta = report.get("llm_meta")
+        if meta is None:
+            stats.inc_value("llm/pages_rules_only")
+            return
+        stats.inc_value("llm/pages")
+        stats.inc_value(f"llm/status/{meta['status']}")
+        stats.inc_value("llm/retries", meta["retries"])
+        stats.inc_value("llm/prompt_tokens", meta["prompt_tokens"] or 0)
+        stats.inc_value("llm/completion_tokens", meta["completion_tokens"] or 0)
+        stats.inc_value("llm/time_ms", round((meta["total_ms"] or 0) / meta["batch_size"]))
+        stats.inc_value("llm/queue_wait_ms", meta["queue_wait_ms"] or 0)
+        if meta["latency_ms"] is not None:
+            stats.max_value("llm/latency_ms_max", meta["latency_ms"])
+        if meta["model"]:
+            stats.inc_value(f"llm/model/{meta['model']}")
+
     def start_requests(self) -> Any:
         self.logger.info(f"Starting audit with max_depth={self.max_depth}, max_pages={self.max_pages}")
 
@@ -180,6 +334,43 @@ class AuditSpider(scrapy.Spider):
                 }
             )
 
+        # Sitemap priorities rank pages for a limited LLM budget
+        if self._budget is not None:
+            for origin in dict.fromkeys(f"{p.scheme}://{p.netloc}" for p in map(urlparse, self.start_urls)):
+                yield scrapy.Request(
+                    f"{origin}/sitemap.xml", callback=self.parse_sitemap, errback=self._sitemap_failed,
+                    dont_filter=True, priority=10,
+                )
+
+    def parse_sitemap(self, response: TextResponse) -> Any:
+        """Record ``<priority>`` per URL; follow sitemap indexes."""
+        try:
+            sitemap = Sitemap(response.body)
+        except Exception as e:
+            self.logger.info(f"Unreadable sitemap {response.url}: {e}")
+            return
+        for entry in sitemap:
+            if sitemap.type == "sitemapindex":
+                yield scrapy.Request(entry["loc"], callback=self.parse_sitemap, dont_filter=True, priority=10)
+                continue
+            try:
+                self._sitemap_priority[_url_key(entry["loc"])] = float(entry.get("priority", 0.5))
+            except ValueError:
+                continue
+
+    def _sitemap_failed(self, failure: Any) -> None:
+        self.logger.info(f"No sitemap: {failure.request.url}")
+
+    def _importance(self, ctx: PageContext, depth: int) -> float:
+        """Current importance of a page waiting for the LLM budget."""
+        key = _url_key(ctx.url)
+        return importance_score(
+            depth,
+            self._inbound_links[key],
+            self._sitemap_priority.get(key),
+            {name: getattr(ctx, name)["score"] for name in ("onpage_seo", "performance", "security", "canonical_analysis", "readability")},
+        )
+
     async def parse(self, response: TextResponse) -> AsyncGenerator[dict, None]:
         async with self._pages_lock:
             if self.pages_analyzed >= self.max_pages:
@@ -224,18 +415,19 @@ class AuditSpider(scrapy.Spider):
         # Single truncation point — no further truncation in llm_service
         html_snippet = html_snippet[:self.html_max_chars]
 
-        # Extract Meta Tags (whitespace stripping handled by Pydantic validator)
-        meta_tags = MetaTags(
-            title=response.xpath('//title/text()').get(),
-            description=response.xpath('//meta[@name="description"]/@content').get(),
-            canonical=response.xpath('//link[@rel="canonical"]/@href').get(),
-            og_title=response.xpath('//meta[@property="og:title"]/@content').get(),
-            og_description=response.xpath('//meta[@property="og:description"]/@content').get(),
-            robots=response.xpath('//meta[@name="robots"]/@content').get(),
-            viewport=response.xpath('//meta[@name="viewport"]/@content').get(),
-            og_image=response.xpath('//meta[@property="og:image"]/@content').get(),
-            twitter_card=response.xpath('//meta[@name="twitter:card"]/@content').get(),
-        )
+        # Extract Meta Tags. Each page section below is a plain dict shaped
+        # like its schema model; the pipeline validates the whole report once.
+        meta_tags = {
+            "title": _strip(response.xpath('//title/text()').get()),
+            "description": _strip(response.xpath('//meta[@name="description"]/@content').get()),
+            "canonical": response.xpath('//link[@rel="canonical"]/@href').get(),
+            "og_title": _strip(response.xpath('//meta[@property="og:title"]/@content').get()),
+            "og_description": _strip(response.xpath('//meta[@property="og:description"]/@content').get()),
+            "robots": response.xpath('//meta[@name="robots"]/@content').get(),
+            "viewport": response.xpath('//meta[@name="viewport"]/@content').get(),
+            "og_image": response.xpath('//meta[@property="og:image"]/@content').get(),
+            "twitter_card": response.xpath('//meta[@name="twitter:card"]/@content').get(),
+        }
 
         # Extract Header Structure (use //text() to capture nested text like <h1><a>Title</a></h1>)
         def extract_header_texts(tag: str) -> list[str]:
@@ -244,21 +436,19 @@ class AuditSpider(scrapy.Spider):
                 for h in response.xpath(f'//{tag}')
             ]
 
-        headers = HeaderStructure(
-            h1=extract_header_texts('h1'),
-            h2=extract_header_texts('h2'),
-            h3=extract_header_texts('h3'),
-            h4_h6_count=len(response.xpath('//h4 | //h5 | //h6'))
-        )
+        headers = {
+            "h1": extract_header_texts('h1'),
+            "h2": extract_header_texts('h2'),
+            "h3": extract_header_texts('h3'),
+            "h4_h6_count": len(response.xpath('//h4 | //h5 | //h6')),
+        }
 
         # Extract Image Stats — distinguish truly missing alt from empty alt=""
         images = response.xpath('//img')
         total_images = len(images)
         missing_alt = len(response.xpath('//img[not(@alt)]'))
         empty_alt = len(response.xpath('//img[@alt=""]'))
-        image_stats = ImageStats(
-            total_images=total_images, missing_alt=missing_alt, empty_alt=empty_alt
-        )
+        image_stats = {"total_images": total_images, "missing_alt": missing_alt, "empty_alt": empty_alt}
 
         # Extract JSON-LD — parse raw strings into dicts so the LLM sees real JSON
         raw_json_ld = response.xpath('//script[@type="application/ld+json"]/text()').getall()
@@ -268,22 +458,29 @@ class AuditSpider(scrapy.Spider):
                 json_ld.append(json.loads(raw))
             except (json.JSONDecodeError, TypeError):
                 self.logger.warning(f"Invalid JSON-LD on {response.url}: {raw[:120]}")
+        # Checked against the bundled schema.org rules; the LLM gets a summary
+        structured_data = validate_json_ld(json_ld) if self._llm_kwargs["policy"].validate_json_ld else None
 
         # Extract text content
         text_content = " ".join(text.strip() for text in body.itertext() if text and text.strip())
+        # Long pages keep their whole main content for chunked content analysis
+        full_text: str | None = None
+        if self._llm_kwargs["chunking"] is not None and len(text_content) > self.text_max_chars:
+            content_root = (cleaned_root.xpath("//main") or cleaned_root.xpath("//article") or [body])[0]
+            full_text = " ".join(t.strip() for t in content_root.itertext() if t and t.strip())
         text_content = text_content[:self.text_max_chars]
 
         # -------------------------------------------------------------------
         # On-Page SEO Checklist (fully deterministic)
         # -------------------------------------------------------------------
-        title_text = meta_tags.title or ""
+        title_text = meta_tags["title"] or ""
         title_len = len(title_text)
-        desc_text = meta_tags.description or ""
+        desc_text = meta_tags["description"] or ""
         desc_len = len(desc_text)
-        h1_count = len(headers.h1)
-        robots_val = (meta_tags.robots or "").lower()
+        h1_count = len(headers["h1"])
+        robots_val = (meta_tags["robots"] or "").lower()
         robots_allows = "noindex" not in robots_val
-        has_og = bool(meta_tags.og_title and meta_tags.og_description)
+        has_og = bool(meta_tags["og_title"] and meta_tags["og_description"])
         has_lang = bool(response.xpath('//html/@lang').get())
 
         # Image alt coverage
@@ -292,52 +489,52 @@ class AuditSpider(scrapy.Spider):
 
         onpage_issues: list[dict] = []
         if not title_text:
-            onpage_issues.append({"severity": "high", "description": "Missing <title> tag", "suggested_fix": "Add a descriptive <title> element in the <head>."})
+            onpage_issues.append(make_issue("title_missing"))
         elif title_len < 30:
-            onpage_issues.append({"severity": "medium", "description": f"Title too short ({title_len} chars, recommended 30-60)", "suggested_fix": "Expand the title with relevant keywords."})
+            onpage_issues.append(make_issue("title_too_short", length=title_len))
         elif title_len > 60:
-            onpage_issues.append({"severity": "medium", "description": f"Title too long ({title_len} chars, recommended 30-60)", "suggested_fix": "Shorten the title to avoid SERP truncation."})
+            onpage_issues.append(make_issue("title_too_long", length=title_len))
         if not desc_text:
-            onpage_issues.append({"severity": "high", "description": "Missing meta description", "suggested_fix": "Add a <meta name=\"description\"> tag with a compelling 70-160 char summary."})
+            onpage_issues.append(make_issue("meta_description_missing"))
         elif desc_len < 70:
-            onpage_issues.append({"severity": "low", "description": f"Meta description short ({desc_len} chars, recommended 70-160)", "suggested_fix": "Expand to better summarize page content."})
+            onpage_issues.append(make_issue("meta_description_short", length=desc_len))
         elif desc_len > 160:
-            onpage_issues.append({"severity": "low", "description": f"Meta description long ({desc_len} chars, recommended 70-160)", "suggested_fix": "Shorten to avoid SERP truncation."})
+            onpage_issues.append(make_issue("meta_description_long", length=desc_len))
         if h1_count == 0:
-            onpage_issues.append({"severity": "high", "description": "No H1 heading found", "suggested_fix": "Add a single H1 heading that describes the page topic."})
+            onpage_issues.append(make_issue("h1_missing"))
         elif h1_count > 1:
-            onpage_issues.append({"severity": "medium", "description": f"Multiple H1 tags ({h1_count})", "suggested_fix": "Use a single H1 per page."})
-        if not meta_tags.viewport:
-            onpage_issues.append({"severity": "high", "description": "Missing viewport meta tag", "suggested_fix": 'Add <meta name="viewport" content="width=device-width, initial-scale=1">.'})
+            onpage_issues.append(make_issue("h1_multiple", count=h1_count))
+        if not meta_tags["viewport"]:
+            onpage_issues.append(make_issue("viewport_missing"))
         if not has_lang:
-            onpage_issues.append({"severity": "medium", "description": "Missing lang attribute on <html>", "suggested_fix": 'Add lang="en" (or appropriate language) to the <html> tag.'})
+            onpage_issues.append(make_issue("html_lang_missing"))
         if not has_og:
-            onpage_issues.append({"severity": "low", "description": "Missing Open Graph tags", "suggested_fix": "Add og:title and og:description meta tags for social sharing."})
+            onpage_issues.append(make_issue("open_graph_missing"))
         if not robots_allows:
-            onpage_issues.append({"severity": "high", "description": "Page set to noindex", "suggested_fix": "Remove noindex from the robots meta tag if this page should be indexed."})
+            onpage_issues.append(make_issue("noindex"))
         if missing_alt > 0:
-            onpage_issues.append({"severity": "medium", "description": f"{missing_alt} image(s) missing alt attribute", "suggested_fix": "Add descriptive alt text to all images."})
-        if not meta_tags.canonical:
-            onpage_issues.append({"severity": "low", "description": "No canonical URL specified", "suggested_fix": "Add a <link rel=\"canonical\"> to prevent duplicate content issues."})
-
-        onpage_seo = OnPageSeoChecklist(
-            score=0,  # auto-computed by model_validator
-            has_title=bool(title_text),
-            title_length_ok=30 <= title_len <= 60,
-            title_length=title_len,
-            has_meta_description=bool(desc_text),
-            description_length_ok=70 <= desc_len <= 160,
-            description_length=desc_len,
-            single_h1=(h1_count == 1),
-            h1_count=h1_count,
-            has_viewport_meta=bool(meta_tags.viewport),
-            has_lang_attribute=has_lang,
-            has_og_tags=has_og,
-            robots_allows_indexing=robots_allows,
-            image_alt_coverage_pct=round(alt_pct, 1),
-            has_canonical=bool(meta_tags.canonical),
-            issues=[Issue(**i) for i in onpage_issues],
-        )
+            onpage_issues.append(make_issue("images_missing_alt", count=missing_alt))
+        if not meta_tags["canonical"]:
+            onpage_issues.append(make_issue("canonical_missing"))
+
+        onpage_seo = {
+            "has_title": bool(title_text),
+            "title_length_ok": 30 <= title_len <= 60,
+            "title_length": title_len,
+            "has_meta_description": bool(desc_text),
+            "description_length_ok": 70 <= desc_len <= 160,
+            "description_length": desc_len,
+            "single_h1": h1_count == 1,
+            "h1_count": h1_count,
+            "has_viewport_meta": bool(meta_tags["viewport"]),
+            "has_lang_attribute": has_lang,
+            "has_og_tags": has_og,
+            "robots_allows_indexing": robots_allows,
+            "image_alt_coverage_pct": round(alt_pct, 1),
+            "has_canonical": bool(meta_tags["canonical"]),
+            "issues": onpage_issues,
+        }
+        onpage_seo["score"] = score_onpage_seo(onpage_seo)
 
         # -------------------------------------------------------------------
         # Link Analysis
@@ -359,13 +556,14 @@ class AuditSpider(scrapy.Spider):
             else:
                 external_count += 1
 
-        link_analysis = LinkAnalysis(
-            score=0,  # LLM will override
-            internal_links=internal_count,
-            external_links=external_count,
-            nofollow_count=nofollow_count,
-            broken_links=[],
-        )
+        link_analysis = {
+            "score": 0,  # LLM will override
+            "internal_links": internal_count,
+            "external_links": external_count,
+            "nofollow_count": nofollow_count,
+            "broken_links": [],
+            "issues": [],
+        }
 
         # -------------------------------------------------------------------
         # Performance Metrics (Playwright timing)
@@ -391,45 +589,38 @@ class AuditSpider(scrapy.Spider):
         stylesheet_count = len(response.xpath('//link[@rel="stylesheet"]'))
         resource_count = script_count + stylesheet_count + total_images
 
-        performance = PerformanceMetrics(
-            score=0,  # auto-computed by model_validator
-            ttfb_ms=ttfb_ms,
-            fcp_ms=fcp_ms,
-            dom_content_loaded_ms=dcl_ms,
-            page_size_bytes=page_size_bytes,
-            resource_count=resource_count,
-        )
+        performance = {
+            "ttfb_ms": ttfb_ms,
+            "fcp_ms": fcp_ms,
+            "dom_content_loaded_ms": dcl_ms,
+            "page_size_bytes": page_size_bytes,
+            "resource_count": resource_count,
+        }
+        performance["score"] = score_performance(performance)
 
         # -------------------------------------------------------------------
         # Readability (fully deterministic — Flesch-Kincaid)
         # -------------------------------------------------------------------
         fk = _compute_flesch_kincaid(text_content)
         readability_issues: list[dict] = []
-        if fk["word_count"] < 300:
-            readability_issues.append({
-                "severity": "medium",
-                "description": f"Thin content: only {fk['word_count']} words (recommended ≥300)",
-                "suggested_fix": "Expand page content with substantive, original text.",
-            })
+        if fk["word_count"] < THIN_CONTENT_WORDS:
+            readability_issues.append(make_issue("thin_content", words=fk["word_count"], minimum=THIN_CONTENT_WORDS))
         if fk["flesch_reading_ease"] < 30:
-            readability_issues.append({
-                "severity": "medium",
-                "description": f"Very difficult reading level (FRE {fk['flesch_reading_ease']})",
-                "suggested_fix": "Simplify sentence structure and vocabulary for web audiences.",
-            })
-
-        readability = ReadabilityAnalysis(
-            score=0,  # auto-computed by model_validator
-            word_count=fk["word_count"],
-            sentence_count=fk["sentence_count"],
-            syllable_count=fk["syllable_count"],
-            avg_sentence_length=fk["avg_sentence_length"],
-            avg_syllables_per_word=fk["avg_syllables_per_word"],
-            flesch_reading_ease=fk["flesch_reading_ease"],
-            flesch_kincaid_grade=fk["flesch_kincaid_grade"],
-            reading_level=fk["reading_level"],
-            issues=[Issue(**i) for i in readability_issues],
-        )
+            readability_issues.append(make_issue("reading_level_difficult", flesch=fk["flesch_reading_ease"]))
+
+        readability = {
+            "word_count": fk["word_count"],
+            "sentence_count": fk["sentence_count"],
+            "syllable_count": fk["syllable_count"],
+            "avg_sentence_length": fk["avg_sentence_length"],
+            "avg_syllables_per_word": fk["avg_syllables_per_word"],
+            "flesch_reading_ease": fk["flesch_reading_ease"],
+            "flesch_kincaid_grade": fk["flesch_kincaid_grade"],
+            "reading_level": fk["reading_level"],
+            "thin_content": fk["word_count"] < THIN_CONTENT_WORDS,
+            "issues": readability_issues,
+        }
+        readability["score"] = score_readability(readability)
 
         # -------------------------------------------------------------------
         # Security headers
@@ -448,14 +639,14 @@ class AuditSpider(scrapy.Spider):
                     if val.startswith('http://'):
                         mixed.append(val)
 
-        security = SecurityCheck(
-            score=0,  # auto-computed by model_validator
-            is_https=is_https,
-            has_hsts=has_hsts,
-            has_csp=has_csp,
-            has_x_content_type=has_x_ct,
-            mixed_content_urls=mixed[:20],  # cap to avoid huge lists
-        )
+        security = {
+            "is_https": is_https,
+            "has_hsts": has_hsts,
+            "has_csp": has_csp,
+            "has_x_content_type": has_x_ct,
+            "mixed_content_urls": mixed[:20],  # cap to avoid huge lists
+        }
+        security["score"] = score_security(security)
 
         # -------------------------------------------------------------------
         # Accessibility (deterministic base + LLM qualitative)
@@ -498,26 +689,29 @@ class AuditSpider(scrapy.Spider):
             except ValueError:
                 pass
 
-        has_heading = bool(headers.h1 or headers.h2 or headers.h3 or headers.h4_h6_count > 0)
-        has_doc_title = bool(meta_tags.title)
-
-        accessibility = AccessibilityAnalysis(
-            score=0,  # blended score computed by model_validator
-            has_skip_nav=has_skip_nav,
-            aria_landmark_count=aria_landmarks,
-            form_labels_missing=labels_missing,
-            has_lang_attribute=has_lang,
-            image_alt_coverage_pct=round(alt_pct, 1),
-            generic_link_text_count=generic_count,
-            has_heading_structure=has_heading,
-            tabindex_misuse_count=tabindex_misuse,
-            has_document_title=has_doc_title,
-        )
+        has_heading = bool(headers["h1"] or headers["h2"] or headers["h3"] or headers["h4_h6_count"] > 0)
+        has_doc_title = bool(meta_tags["title"])
+
+        accessibility = {
+            "has_skip_nav": has_skip_nav,
+            "aria_landmark_count": aria_landmarks,
+            "form_labels_missing": labels_missing,
+            "has_lang_attribute": has_lang,
+            "image_alt_coverage_pct": round(alt_pct, 1),
+            "generic_link_text_count": generic_count,
+            "has_heading_structure": has_heading,
+            "tabindex_misuse_count": tabindex_misuse,
+            "has_document_title": has_doc_title,
+            "issues": [],
+            "llm_score": None,
+        }
+        # Checklist-only until the LLM adds its qualitative llm_score
+        accessibility["score"] = score_accessibility(accessibility)
 
         # -------------------------------------------------------------------
         # Canonical / redirect analysis
         # -------------------------------------------------------------------
-        canonical_url = meta_tags.canonical
+        canonical_url = meta_tags["canonical"]
         redirect_urls = response.meta.get("redirect_urls", [])
         matches_actual = (
             canonical_url is not None
@@ -525,93 +719,26 @@ class AuditSpider(scrapy.Spider):
         )
         has_hreflang = bool(response.xpath('//link[@rel="alternate" and @hreflang]'))
 
-        canonical_analysis = CanonicalAnalysis(
-            score=0,  # auto-computed by model_validator
-            canonical_url=canonical_url,
-            matches_actual_url=matches_actual if canonical_url else True,
-            redirect_chain=[str(u) for u in redirect_urls],
-            has_hreflang=has_hreflang,
-        )
-
-        # 2. Call AI Service (Async) — only for schema, content, link quality, accessibility quality
-        audit_config = self.config.get("audit", {})
-        timeout_seconds = float(audit_config.get("llm_timeout_seconds", 60))
-        retry_attempts = int(audit_config.get("llm_retry_attempts", 2))
-        retry_base_delay = float(audit_config.get("llm_retry_base_delay", 1.0))
-        rate_limit_delay = float(audit_config.get("llm_rate_limit_delay", 0))
-
-        # Serialize LLM calls: only one runs at a time, with rate-limit padding
-        async with self._llm_semaphore:
-            if rate_limit_delay > 0:
-                now = time.monotonic()
-                wait = self._last_llm_call + rate_limit_delay - now
-                if wait > 0:
-                    self.logger.debug(f"Rate-limit: sleeping {wait:.2f}s before LLM call")
-                    await asyncio.sleep(wait)
-
-            try:
-                self._last_llm_call = time.monotonic()
-                audit_result = await analyze_with_llm(
-                    url=response.url,
-                    html=html_snippet,
-                    json_ld=json_ld,
-                    text=text_content,
-                    meta_tags=meta_tags,
-                    headers=headers,
-                    image_stats=image_stats,
-                    onpage_seo=onpage_seo,
-                    link_analysis=link_analysis,
-                    performance=performance,
-                    readability=readability,
-                    security=security,
-                    accessibility=accessibility,
-                    canonical_analysis=canonical_analysis,
-                    timeout_seconds=timeout_seconds,
-                    retry_attempts=retry_attempts,
-                    retry_base_delay=retry_base_delay,
-                    logger=self.logger,
-                )
-            except Exception as e:
-                audit_result = None
-                llm_error = e
-            else:
-                llm_error = None
-
-        if llm_error is not None:
-            self.logger.error(f"Error auditing {response.url}: {llm_error}")
-            # Yield a validated error report so schema compliance is guaranteed
-            error_report = PageAudit.model_validate({
-                "url": response.url,
-                "audit_status": "failed",
-                "meta_tags": meta_tags.model_dump(),
-                "headers": headers.model_dump(),
-                "image_stats": image_stats.model_dump(),
-                "onpage_seo": onpage_seo.model_dump(),
-                "schema_analysis": {"score": 0, "detected_types": [], "missing_fields": []},
-                "content_analysis": {
-                    "score": 0,
-                    "answers_user_intent": False,
-                    "issues": [{"severity": "high", "description": f"Audit failed: {llm_error}", "suggested_fix": "Retry or check logs."}],
-                },
-                "link_analysis": link_analysis.model_dump(),
-                "performance": performance.model_dump(),
-                "readability": readability.model_dump(),
-                "security": security.model_dump(),
-                "accessibility": accessibility.model_dump(),
-                "canonical_analysis": canonical_analysis.model_dump(),
-            })
-            yield error_report.model_dump()
-        else:
-            # 3. Yield the validated Pydantic model
-            yield audit_result.model_dump()
+        canonical_analysis = {
+            "canonical_url": canonical_url,
+            "matches_actual_url": matches_actual if canonical_url else True,
+            "redirect_chain": [str(u) for u in redirect_urls],
+            "has_hreflang": has_hreflang,
+        }
+        canonical_analysis["score"] = score_canonical(canonical_analysis)
 
-        # 4. Crawl: Extract and follow links if depth allows
+        # 2. Crawl: follow links before the LLM call, so discovery goes on
+        # while this page waits for its analysis
         current_depth = response.meta.get('depth', 0)
-        if current_depth < self.max_depth and self.pages_analyzed < self.max_pages:
+        follow = current_depth < self.max_depth and self.pages_analyzed < self.max_pages
+        if follow or self._budget is not None:
             le = LinkExtractor(allow_domains=self.allowed_domains)
             links = le.extract_links(response)
+            # Inbound internal links rank pages for the LLM budget
+            for key in {_url_key(link.url) for link in links} - {_url_key(response.url)}:
+                self._inbound_links[key] += 1
 
-            for link in links:
+            for link in links if follow else ():
                 if self.pages_analyzed >= self.max_pages:
                     break
                 yield scrapy.Request(
@@ -625,3 +752,84 @@ class AuditSpider(scrapy.Spider):
                         ],
                     }
                 )
+
+        # 3. Call AI Service (Async) — only for schema, content, link quality, accessibility quality
+        page_ctx = PageContext(
+            url=response.url,
+            html=html_snippet,
+            json_ld=json_ld,
+            text=text_content,
+            meta_tags=meta_tags,
+            headers=headers,
+            image_stats=image_stats,
+            onpage_seo=onpage_seo,
+            link_analysis=link_analysis,
+            performance=performance,
+            readability=readability,
+            security=security,
+            accessibility=accessibility,
+            canonical_analysis=canonical_analysis,
+            structured_data=structured_data,
+            full_text=full_text,
+        )
+
+        deferred = build_deferred_request(
+            page_ctx, self._llm_kwargs["policy"], self._llm_kwargs["structured_output"],
+        ) if self._defer_llm else None
+        try:
+            estimated_tokens = estimate_page_tokens(
+                page_ctx, self._llm_kwargs["policy"], self._llm_kwargs["structured_output"],
+            ) if self._budget is not None and deferred is None else 0
+            if deferred is not None:
+                audit_result = None  # finished later by the batch merge step
+            elif estimated_tokens:
+                async with self._budget.admit(lambda: self._importance(page_ctx, current_depth), estimated_tokens) as granted:
+                    if granted:
+                        audit_result = await self._analyze(page_ctx)
+                        self._budget.record(audit_result.get("llm_meta"))
+                    else:
+                        audit_result = deterministic_page_audit(
+                            page_ctx, self._llm_kwargs["policy"], "Session LLM budget exhausted",
+                        )
+            else:
+                audit_result = await self._analyze(page_ctx)
+        except Exception as e:
+            audit_result = None
+            llm_error = e
+        else:
+            llm_error = None
+
+        if llm_error is not None:
+            self.logger.error(f"Error auditing {response.url}: {llm_error}")
+            # Error report in the PageAudit shape; the pipeline validates it on write
+            report = {
+                "url": response.url,
+                "audit_status": "failed",
+                "meta_tags": meta_tags,
+                "headers": headers,
+                "image_stats": image_stats,
+                "onpage_seo": onpage_seo,
+                "schema_analysis": {"score": 0, "detected_types": [], "missing_fields": []},
+                "content_analysis": {
+                    "score": 0,
+                    "answers_user_intent": False,
+                    "issues": [make_issue("audit_failed", error=str(llm_error))],
+                },
+                "link_analysis": link_analysis,
+                "performance": performance,
+                "readability": readability,
+                "security": security,
+                "accessibility": accessibility,
+                "canonical_analysis": canonical_analysis,
+            }
+        elif deferred is not None:
+            report = {"url": response.url, "deferred_llm": deferred}
+        else:
+            self._record_llm_stats(audit_result)
+            report = audit_result
+
+        # 4. Yield the page report (validated once, by the pipeline), with the
+        # page's inputs for the snapshot store
+        if self._page_snapshots:
+            report["page_snapshot"] = page_ctx.to_record()
+        yield report
@@ -43,6 +43,7 @@ class SeverityDistribution(BaseModel):
 
 class TopIssue(BaseModel):
     description: str
+    code: str | None = None
     severity: Literal["high", "medium", "low"] = "medium"
     count: int
     affected_pages: list[str] = Field(default_factory=list)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from collections import defaultdict
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Literal, Optional
 
+from ai_seo_auditor.models.issue_catalog import issue_label, suggested_fix
+from ai_seo_auditor.services.score_table import read_score_table
+from ai_seo_auditor.services.session_db import SESSION_DB_FILE, risk_index
+from ai_seo_auditor.services.session_storage import PAGES_DIR, iter_reports, page_ids, read_report
 from backend.models import (
     PageSummary,
     SessionInfo,
@@ -46,6 +52,62 @@ SUMMARY_DIMENSION_MAP = {
     "accessibility_score": "accessibility",
 }
 
+# Session database section -> PageSummary field
+DB_DIMENSION_MAP = {section: key for key, section in SUMMARY_DIMENSION_MAP.items()} | {
+    "canonical_analysis": "canonical_score",
+}
+
+SortKey = Literal[
+    "risk_desc",
+    "risk_asc",
+    "score_desc",
+    "score_asc",
+    "issues_desc",
+    "issues_asc",
+    "url_asc",
+    "url_desc",
+]
+
+SORT_MAP: dict[str, tuple[str, bool]] = {
+    "risk_desc": ("risk_index", True),
+    "risk_asc": ("risk_index", False),
+    "score_desc": ("overall_score", True),
+    "score_asc": ("overall_score", False),
+    "issues_desc": ("issues_count", True),
+    "issues_asc": ("issues_count", False),
+    "url_asc": ("url", False),
+    "url_desc": ("url", True),
+}
+
+
+def sort_pages(pages: list[PageSummary], sort: SortKey) -> list[PageSummary]:
+    key, reverse = SORT_MAP[sort]
+    return sorted(pages, key=lambda p: getattr(p, key), reverse=reverse)
+
+
+def apply_filters(
+    pages: list[PageSummary],
+    *,
+    q: str | None,
+    score_min: float,
+    score_max: float,
+    statuses: list[str] | None,
+    issues_min: int,
+) -> list[PageSummary]:
+    filtered = pages
+    if q:
+        needle = q.lower()
+        filtered = [p for p in filtered if needle in p.url.lower()]
+
+    filtered = [p for p in filtered if score_min <= p.overall_score <= score_max]
+    filtered = [p for p in filtered if p.issues_count >= issues_min]
+
+    if statuses:
+        status_set = set(statuses)
+        filtered = [p for p in filtered if p.audit_status in status_set]
+
+    return filtered
+
 
 def grade_from_score(score: float) -> str:
     if score >= 90:
@@ -88,15 +150,15 @@ class ReportStore:
             if not folder.is_dir():
                 continue
 
-            page_files = [p for p in folder.glob("*.json") if not p.name.startswith("_")]
-            if not page_files:
+            pages_count = len(page_ids(folder))
+            if not pages_count:
                 continue
 
             sessions.append(
                 SessionInfo(
                     id=folder.name,
                     created_at=datetime.fromtimestamp(folder.stat().st_mtime),
-                    pages_count=len(page_files),
+                    pages_count=pages_count,
                     has_summary=(folder / "_site_summary.json").exists(),
                 )
             )
@@ -111,22 +173,136 @@ class ReportStore:
     def load_pages(self, session_id: str) -> list[PageRecord]:
         session_path = self.get_session_path(session_id)
         records: list[PageRecord] = []
-        for page_file in sorted(session_path.glob("*.json")):
-            if page_file.name.startswith("_"):
-                continue
-
-            try:
-                with open(page_file, "r", encoding="utf-8") as handle:
-                    raw = json.load(handle)
-            except Exception:
-                continue
-
+        # Per-file and segment-stored sessions alike; unreadable reports are skipped
+        for page_id, source_path, raw in iter_reports(session_path):
             raw = self._migrate_legacy_shape(raw)
-            summary = self._normalize_page(page_file, raw)
-            records.append(PageRecord(page_id=summary.page_id, source_path=page_file, raw_data=raw, summary=summary))
+            summary = self._normalize_page(page_id, raw)
+            records.append(PageRecord(page_id=page_id, source_path=source_path, raw_data=raw, summary=summary))
 
         return records
 
+    def load_page_summaries(self, session_id: str) -> list[PageSummary]:
+        """Page summaries from the session's score table (a column scan),
+        or from the page reports when the session has no table."""
+        table = read_score_table(
+            self.get_session_path(session_id),
+            ["url", "audit_status", *DIMENSION_KEYS, "canonical_score", "overall_score", "letter_grade",
+             *(f"{section}_issues" for section in ISSUE_SECTIONS)],
+        )
+        if table is None:
+            return [record.summary for record in self.load_pages(session_id)]
+
+        summaries: list[PageSummary] = []
+        for row in table.to_pylist():
+            issues_count = sum(row[f"{section}_issues"] or 0 for section in ISSUE_SECTIONS)
+            overall = float(row["overall_score"] or 0)
+            summaries.append(
+                PageSummary(
+                    page_id=row["page_id"],
+                    url=row["url"],
+                    audit_status=row["audit_status"] or "complete",
+                    **{key: float(row[key] or 0) for key in (*DIMENSION_KEYS, "canonical_score")},
+                    overall_score=overall,
+                    letter_grade=row["letter_grade"] or grade_from_score(overall),
+                    issues_count=issues_count,
+                    risk_index=risk_index(overall, issues_count),
+                )
+            )
+        return summaries
+
+    def query_pages(
+        self,
+        session_id: str,
+        *,
+        q: str | None = None,
+        score_min: float = 0,
+        score_max: float = 100,
+        statuses: list[str] | None = None,
+        issues_min: int = 0,
+        sort: SortKey = "risk_desc",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> tuple[int, list[PageSummary]]:
+        """Filtered and sorted page summaries (``limit`` of them from ``offset``)
+        plus the number of pages matching the filters.
+
+        Runs as indexed queries on the session database; sessions without
+        one filter and sort :meth:`load_page_summaries` in Python.
+        """
+        db_path = self.get_session_path(session_id) / SESSION_DB_FILE
+        if not db_path.exists():
+            filtered = apply_filters(
+                self.load_page_summaries(session_id),
+                q=q, score_min=score_min, score_max=score_max, statuses=statuses, issues_min=issues_min,
+            )
+            end = None if limit is None else offset + limit
+            return len(filtered), sort_pages(filtered, sort)[offset:end]
+
+        where = ["overall_score BETWEEN ? AND ?", "issues_count >= ?"]
+        params: list[Any] = [score_min, score_max, issues_min]
+        if q:
+            needle = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("url LIKE ? ESCAPE '\\'")
+            params.append(f"%{needle}%")
+        if statuses:
+            where.append(f"audit_status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        column, descending = SORT_MAP[sort]
+        direction = "DESC" if descending else "ASC"
+        condition = " AND ".join(where)
+        selected = (
+            f"SELECT * FROM pages WHERE {condition} "
+            f"ORDER BY {column} {direction}, page_id {direction} LIMIT ? OFFSET ?"
+        )
+        selected_params = [*params, -1 if limit is None else limit, offset]
+
+        scores: dict[str, dict[str, float]] = defaultdict(dict)
+        with closing(self._connect(db_path)) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM pages WHERE {condition}", params).fetchone()[0]
+            rows = conn.execute(selected, selected_params).fetchall()
+            for row in conn.execute(
+                "SELECT page_id, dimension, score FROM dimension_scores "
+                f"WHERE page_id IN (SELECT page_id FROM ({selected}))",
+                selected_params,
+            ):
+                if row["dimension"] in DB_DIMENSION_MAP:
+                    scores[row["page_id"]][DB_DIMENSION_MAP[row["dimension"]]] = row["score"]
+        return total, [PageSummary(**dict(row), **scores[row["page_id"]]) for row in rows]
+
+    def load_page(self, session_id: str, page_id: str) -> PageRecord:
+        """One page with its raw report, read without scanning the session."""
+        session_path = self.get_session_path(session_id)
+        if not page_id or page_id.startswith(("_", ".")) or "/" in page_id or "\\" in page_id:
+            raise FileNotFoundError(f"Page not found: {page_id}")
+        try:
+            raw = read_report(session_path, page_id)
+        except (OSError, ValueError) as exc:
+            raise FileNotFoundError(f"Page not found: {page_id}") from exc
+
+        source_path = session_path / f"{page_id}.json"
+        if not source_path.exists():
+            source_path = session_path / PAGES_DIR
+        raw = self._migrate_legacy_shape(raw)
+        summary = self._normalize_page(page_id, raw)
+        return PageRecord(page_id=page_id, source_path=source_path, raw_data=raw, summary=summary)
+
+    def load_raw_reports(self, session_id: str, page_ids: list[str]) -> list[dict[str, Any]]:
+        """The raw reports of ``page_ids``, in that order, read in one pass
+        over the session (pages that cannot be read are left out)."""
+        session_path = self.get_session_path(session_id)
+        raw = {
+            page_id: self._migrate_legacy_shape(report)
+            for page_id, _, report in iter_reports(session_path, only=set(page_ids))
+        }
+        return [raw[page_id] for page_id in page_ids if page_id in raw]
+
+    @staticmethod
+    def _connect(db_path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
     @staticmethod
     def _migrate_legacy_shape(report: dict[str, Any]) -> dict[str, Any]:
         if "semantic_analysis" in report and "onpage_seo" not in report:
@@ -139,17 +315,20 @@ class ReportStore:
             perf.setdefault("dom_content_loaded_ms", None)
 
         report.setdefault("audit_status", "complete")
+        # Coded issues take their fix text from the issue catalogue
+        for issue in iter_issues(report):
+            if issue.get("code") and not issue.get("suggested_fix"):
+                issue["suggested_fix"] = suggested_fix(issue)
         return report
 
     @staticmethod
-    def _normalize_page(page_path: Path, report: dict[str, Any]) -> PageSummary:
+    def _normalize_page(page_id: str, report: dict[str, Any]) -> PageSummary:
         issues_count = sum(len(report.get(section, {}).get("issues", [])) for section in ISSUE_SECTIONS)
         overall = float(report.get("overall_score", 0))
-        risk_index = round(((100 - max(0.0, min(100.0, overall))) * 0.65) + (min(issues_count, 20) * 5 * 0.35), 1)
 
         return PageSummary(
-            page_id=page_path.stem,
-            url=report.get("url", page_path.stem),
+            page_id=page_id,
+            url=report.get("url", page_id),
             audit_status=report.get("audit_status", "complete"),
             onpage_seo_score=float(report.get("onpage_seo", {}).get("score", 0)),
             schema_score=float(report.get("schema_analysis", {}).get("score", 0)),
@@ -163,30 +342,50 @@ class ReportStore:
             overall_score=overall,
             letter_grade=report.get("letter_grade", grade_from_score(overall)),
             issues_count=issues_count,
-            risk_index=risk_index,
+            risk_index=risk_index(overall, issues_count),
         )
 
+    def session_summary(self, session_id: str) -> SessionSummary:
+        """The session summary. With a summary file and a session database
+        the best and worst pages come from indexed queries; otherwise the
+        page reports are loaded."""
+        session_path = self.get_session_path(session_id)
+        summary_path = session_path / "_site_summary.json"
+        if not summary_path.exists() or not (session_path / SESSION_DB_FILE).exists():
+            return self.load_summary(session_id, self.load_pages(session_id))
+
+        with open(summary_path, "r", encoding="utf-8") as handle:
+            loaded = json.load(handle)
+        _, best_pages = self.query_pages(session_id, sort="score_desc", limit=3)
+        _, worst_pages = self.query_pages(session_id, sort="score_asc", limit=3)
+        return self._summary_from_file(loaded, best_pages, worst_pages)
+
     def load_summary(self, session_id: str, pages: list[PageRecord]) -> SessionSummary:
         session_path = self.get_session_path(session_id)
         summary_path = session_path / "_site_summary.json"
         if summary_path.exists():
             with open(summary_path, "r", encoding="utf-8") as handle:
                 loaded = json.load(handle)
-            return self._summary_from_file(loaded, pages)
+            return self._summary_from_file(
+                loaded,
+                self._best_or_worst_pages(pages, reverse=True),
+                self._best_or_worst_pages(pages, reverse=False),
+            )
         return self._summary_from_pages(pages)
 
-    def _summary_from_file(self, loaded: dict[str, Any], pages: list[PageRecord]) -> SessionSummary:
+    def _summary_from_file(
+        self, loaded: dict[str, Any], best_pages: list[PageSummary], worst_pages: list[PageSummary]
+    ) -> SessionSummary:
         top_issues = [
             TopIssue(
                 description=item.get("description", ""),
+                code=item.get("code"),
                 severity=item.get("severity", "medium"),
                 count=int(item.get("count", 0)),
                 affected_pages=item.get("affected_pages", []),
             )
             for item in loaded.get("top_issues", [])
         ]
-        best_pages = self._best_or_worst_pages(pages, reverse=True)
-        worst_pages = self._best_or_worst_pages(pages, reverse=False)
         return SessionSummary(
             overall_score=float(loaded.get("overall_score", 0)),
             overall_grade=loaded.get("overall_grade", grade_from_score(float(loaded.get("overall_score", 0)))),
@@ -223,12 +422,16 @@ class ReportStore:
 
         severity_counts = defaultdict(int)
         issue_map: dict[tuple[str, str], set[str]] = defaultdict(set)
+        issue_codes: dict[str, str] = {}
         for rec in pages:
             for issue in iter_issues(rec.raw_data):
                 severity = issue.get("severity", "medium").lower()
                 if severity not in ("high", "medium", "low"):
                     severity = "medium"
-                description = issue.get("description", "")
+                # Coded issues group by their catalogue title, whatever their params
+                description = issue_label(issue)
+                if issue.get("code"):
+                    issue_codes.setdefault(description, issue["code"])
                 severity_counts[severity] += 1
                 issue_map[(description, severity)].add(rec.summary.url)
 
@@ -241,6 +444,7 @@ class ReportStore:
             top_issues.append(
                 TopIssue(
                     description=description,
+                    code=issue_codes.get(description),
                     severity=severity,
                     count=len(affected_pages),
                     affected_pages=sorted(affected_pages),
@@ -0,0 +1,172 @@
+"""Micro-benchmark: per-page CPU of the crawl's report data path.
+
+Compares the previous model round trips (spider models → dump → whole
+``PageAudit`` re-validation → item dump → ``ItemAdapter`` → ``PageScoreEntry``)
+with the validate-once path (raw dicts scored by ``models.scoring``, the LLM
+dimensions validated at the LLM boundary, one ``PageAudit`` validation at
+persistence). File I/O is left out; both paths write the same JSON.
+
+    python -m benchmarks.page_path [--pages 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+from typing import Any, Callable
+
+from itemadapter import ItemAdapter
+
+from ai_seo_auditor.models import scoring
+from ai_seo_auditor.models.schemas import (
+    AccessibilityAnalysis, CanonicalAnalysis, HeaderStructure, ImageStats, Issue,
+    LinkAnalysis, MetaTags, OnPageSeoChecklist, PageAudit, PageScoreEntry,
+    PerformanceMetrics, ReadabilityAnalysis, SecurityCheck,
+)
+from ai_seo_auditor.services.llm_service import PageContext, _build_page_report
+
+_ISSUE = {"severity": "medium", "description": "Title too short", "suggested_fix": "Expand the title."}
+
+# What the spider extracts for a typical page
+_EXTRACTED: dict[str, dict[str, Any]] = {
+    "meta_tags": {"title": " Houseplant care guide ", "description": "How to keep plants alive.",
+                  "canonical": "https://example.com/plants", "viewport": "width=device-width"},
+    "headers": {"h1": ["Houseplant care"], "h2": ["Light", "Water", "Soil"], "h3": [], "h4_h6_count": 2},
+    "image_stats": {"total_images": 12, "missing_alt": 2, "empty_alt": 1},
+    "onpage_seo": {"has_title": True, "title_length": 22, "has_meta_description": True,
+                   "description_length": 25, "single_h1": True, "h1_count": 1, "has_viewport_meta": True,
+                   "has_lang_attribute": True, "image_alt_coverage_pct": 83.3, "has_canonical": True,
+                   "issues": [_ISSUE, _ISSUE]},
+    "link_analysis": {"score": 0, "internal_links": 40, "external_links": 6, "nofollow_count": 1,
+                      "broken_links": [], "issues": []},
+    "performance": {"ttfb_ms": 420, "fcp_ms": 1300, "dom_content_loaded_ms": 900,
+                    "page_size_bytes": 640_000, "resource_count": 38},
+    "readability": {"word_count": 850, "sentence_count": 48, "syllable_count": 1250,
+                    "avg_sentence_length": 17.7, "avg_syllables_per_word": 1.47,
+                    "flesch_reading_ease": 58.2, "flesch_kincaid_grade": 9.1, "reading_level": "Grade 9",
+                    "issues": []},
+    "security": {"is_https": True, "has_hsts": True, "has_csp": False, "has_x_content_type": True,
+                 "mixed_content_urls": []},
+    "accessibility": {"has_skip_nav": False, "aria_landmark_count": 3, "form_labels_missing": 1,
+                      "has_lang_attribute": True, "image_alt_coverage_pct": 83.3,
+                      "generic_link_text_count": 2, "has_heading_structure": True,
+                      "tabindex_misuse_count": 0, "has_document_title": True, "issues": []},
+    "canonical_analysis": {"canonical_url": "https://example.com/plants", "matches_actual_url": True,
+                           "redirect_chain": [], "has_hreflang": False},
+}
+
+# What the model answers for the LLM-scored dimensions
+_LLM_DATA: dict[str, dict[str, Any]] = {
+    "schema_analysis": {"score": 70, "detected_types": ["Article"], "missing_fields": ["author"]},
+    "content_analysis": {"score": 75, "answers_user_intent": True, "issues": [_ISSUE]},
+    "link_analysis": {"score": 65, "issues": [_ISSUE]},
+    "accessibility": {"llm_score": 60, "issues": [_ISSUE]},
+}
+
+_MODELS = {
+    "meta_tags": MetaTags, "headers": HeaderStructure, "image_stats": ImageStats,
+    "onpage_seo": OnPageSeoChecklist, "link_analysis": LinkAnalysis, "performance": PerformanceMetrics,
+    "readability": ReadabilityAnalysis, "security": SecurityCheck, "accessibility": AccessibilityAnalysis,
+    "canonical_analysis": CanonicalAnalysis,
+}
+
+_SCORERS: dict[str, Callable[[dict[str, Any]], int]] = {
+    "onpage_seo": scoring.score_onpage_seo,
+    "performance": scoring.score_performance,
+    "readability": scoring.score_readability,
+    "security": scoring.score_security,
+    "accessibility": scoring.score_accessibility,
+    "canonical_analysis": scoring.score_canonical,
+}
+
+
+def _score_entry(report: dict[str, Any], overall: float) -> PageScoreEntry:
+    return PageScoreEntry(
+        url=report["url"],
+        onpage_seo_score=report["onpage_seo"]["score"],
+        schema_score=report["schema_analysis"]["score"],
+        content_score=report["content_analysis"]["score"],
+        link_score=report["link_analysis"]["score"],
+        performance_score=report["performance"]["score"],
+        readability_score=report["readability"]["score"],
+        security_score=report["security"]["score"],
+        accessibility_score=report["accessibility"]["score"],
+        canonical_score=report["canonical_analysis"]["score"],
+        overall_score=overall,
+        letter_grade=scoring.compute_letter_grade(overall),
+    )
+
+
+def round_trip_path(url: str) -> PageScoreEntry:
+    """The pre-refactor path, reproduced stage by stage."""
+    # Spider: one model per section (score=0 placeholders, Issue models)
+    sections = {}
+    for name, model in _MODELS.items():
+        fields = copy.deepcopy(_EXTRACTED[name])
+        if "issues" in fields:
+            fields["issues"] = [Issue(**i) for i in fields["issues"]]
+        if name not in ("meta_tags", "headers", "image_stats"):
+            fields.setdefault("score", 0)
+        sections[name] = model(**fields)
+    # analyze_with_llm: dump every section and re-validate the whole PageAudit
+    data = copy.deepcopy(_LLM_DATA)
+    data["link_analysis"].update(
+        {k: v for k, v in sections["link_analysis"].model_dump().items() if k not in ("score", "issues")}
+    )
+    data["accessibility"].update(
+        {k: v for k, v in sections["accessibility"].model_dump().items() if k not in ("score", "issues", "llm_score")}
+    )
+    data["accessibility"]["score"] = 0
+    audit = PageAudit.model_validate({
+        "url": url,
+        **{name: section.model_dump() for name, section in sections.items() if name not in data},
+        **data,
+    })
+    # Spider: the validated model is dumped again as the item
+    item = audit.model_dump()
+    # Pipeline: ItemAdapter over the item, then the summary entry
+    adapter = ItemAdapter(item)
+    report = {key: adapter.get(key) for key in item}
+    overall = scoring.overall_score({k: report[k]["score"] for k in scoring.DEFAULT_SCORE_WEIGHTS})
+    return _score_entry(report, overall)
+
+
+def validate_once_path(url: str) -> PageScoreEntry:
+    """Raw dicts through the crawl; validated at the LLM boundary and at persistence."""
+    sections = copy.deepcopy(_EXTRACTED)
+    sections["readability"]["thin_content"] = sections["readability"]["word_count"] < scoring.THIN_CONTENT_WORDS
+    for name, scorer in _SCORERS.items():
+        sections[name]["score"] = scorer(sections[name])
+    ctx = PageContext(url=url, html="", json_ld=[], text="", **sections)
+    report = _build_page_report(ctx, copy.deepcopy(_LLM_DATA), "complete")
+    # JsonReportPipeline.write_page: the one full validation, then the summary entry
+    report = PageAudit.model_validate(report).model_dump(mode="json")
+    return _score_entry(report, report["overall_score"])
+
+
+def _bench(fn: Callable[[str], PageScoreEntry], pages: int) -> float:
+    start = time.process_time()
+    for i in range(pages):
+        fn(f"https://example.com/page-{i}")
+    return (time.process_time() - start) / pages * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    args = parser.parse_args()
+
+    old, new = round_trip_path("https://example.com/"), validate_once_path("https://example.com/")
+    assert old.model_dump() == new.model_dump(), "paths disagree on the page scores"
+
+    _bench(round_trip_path, 200)  # warm-up
+    _bench(validate_once_path, 200)
+    old_us = _bench(round_trip_path, args.pages)
+    new_us = _bench(validate_once_path, args.pages)
+    print(f"round trips   : {old_us:8.1f} µs CPU/page")
+    print(f"validate once : {new_us:8.1f} µs CPU/page")
+    print(f"saved         : {old_us - new_us:8.1f} µs CPU/page ({(1 - new_us / old_us) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ import plotly.graph_objects as go
 import streamlit as st
 import streamlit.components.v1 as components
 
+from ai_seo_auditor.models.issue_catalog import suggested_fix
+from ai_seo_auditor.services.session_storage import has_pages, iter_reports
+
 st.set_page_config(
     page_title="AI SEO Auditor",
     page_icon="\U0001f50d",
@@ -359,13 +362,13 @@ if not reports_dir.exists():
 @st.cache_data(ttl=300)
 def load_data(folder_path: str) -> pd.DataFrame:
     rows: list[dict[str, Any]] = []
-    for file_path in Path(folder_path).glob("*.json"):
-        if file_path.name.startswith("_"):
-            continue
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                report: dict[str, Any] = json.load(f)
 
+    def unreadable(page_id: str, exc: Exception) -> None:
+        st.warning(f"Failed to parse {page_id}: {exc}")
+
+    # Per-file and segment-stored sessions alike
+    for page_id, _, report in iter_reports(Path(folder_path), on_error=unreadable):
+        try:
             if "semantic_analysis" in report and "onpage_seo" not in report:
                 report["onpage_seo"] = report.pop("semantic_analysis")
 
@@ -378,7 +381,7 @@ def load_data(folder_path: str) -> pd.DataFrame:
             report.setdefault("audit_status", "complete")
 
             row = {
-                "url": report.get("url", file_path.stem),
+                "url": report.get("url", page_id),
                 "audit_status": report.get("audit_status", "complete"),
                 "onpage_seo_score": report.get("onpage_seo", {}).get("score", 0),
                 "schema_score": report.get("schema_analysis", {}).get("score", 0),
@@ -399,7 +402,7 @@ def load_data(folder_path: str) -> pd.DataFrame:
             }
             rows.append(row)
         except Exception as exc:
-            st.warning(f"Failed to parse {file_path.name}: {exc}")
+            st.warning(f"Failed to parse {page_id}: {exc}")
 
     df = pd.DataFrame(rows)
     if df.empty:
@@ -436,7 +439,7 @@ def collect_issues(df: pd.DataFrame) -> pd.DataFrame:
                         "section": section,
                         "severity": issue.get("severity", "medium").lower(),
                         "description": issue.get("description", ""),
-                        "suggested_fix": issue.get("suggested_fix", ""),
+                        "suggested_fix": suggested_fix(issue),
                     }
                 )
     return pd.DataFrame(items)
@@ -447,7 +450,7 @@ report_folders = sorted(
     key=lambda x: x.stat().st_mtime,
     reverse=True,
 )
-report_folders = [f for f in report_folders if any(not p.name.startswith("_") for p in f.glob("*.json"))]
+report_folders = [f for f in report_folders if has_pages(f)]
 
 if not report_folders:
     st.warning("No report sessions found in reports/.")
@@ -860,7 +863,7 @@ with page_tabs[0]:
                 {
                     "severity": sev,
                     "description": issue.get("description", ""),
-                    "fix": issue.get("suggested_fix", ""),
+                    "fix": suggested_fix(issue),
                     "section": section,
                 }
             )
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import batch_inference, llm_service
+from ai_seo_auditor.services.llm_endpoints import Endpoint, EndpointPool
+from tests.test_llm_service import dimensions, make_context
+
+
+class StandInServer:
+    """Local OpenAI-compatible chat-completions endpoint returning canned dimensions.
+
+    The first ``fail_first`` requests get an HTTP 400.
+    """
+
+    def __init__(self, fail_first: int = 0) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.fail_first = fail_first
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append(body)
+                if len(server.requests) <= server.fail_first:
+                    self._reply(400, {"error": {"message": "bad request", "type": "invalid_request_error"}})
+                    return
+                completion = {
+                    "id": f"chatcmpl-{len(server.requests)}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": json.dumps(dimensions(66))},
+                    }],
+                }
+                self._reply(200, completion)
+
+            def _reply(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "StandInServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def use_endpoint(base_url: str) -> Any:
+    pool = EndpointPool([Endpoint(name="stand-in", base_url=base_url, api_key="x", model="stand-in-model")])
+    return mock.patch.object(llm_service, "_get_pool", return_value=pool)
+
+
+class OfflineBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.session_dir = Path(tmp.name)
+
+    def crawl(self, pages: list[Any]) -> None:
+        """Feed spider items through the pipeline as a deferred crawl would."""
+        pipeline = JsonReportPipeline()
+        spider = mock.MagicMock()
+        pipeline.open_session(self.session_dir, spider.logger)
+        for ctx in pages:
+            deferred = batch_inference.build_deferred_request(ctx)
+            pipeline.process_item({"url": ctx.url, "deferred_llm": deferred}, spider)
+        pipeline.close_spider(spider)
+
+    def run_requests(self, base_url: str) -> dict[str, int]:
+        with use_endpoint(base_url):
+            return asyncio.run(batch_inference.run_requests(
+                self.session_dir, concurrency=4, retry_attempts=0, retry_base_delay=0,
+            ))
+
+    def test_deferred_crawl_runs_resumes_and_merges(self) -> None:
+        with use_endpoint("http://unused/v1"):
+            self.crawl([make_context("https://example.com/a"), make_context("https://example.com/b")])
+
+        requests = [json.loads(l) for l in (self.session_dir / batch_inference.REQUESTS_FILE).read_text().splitlines()]
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]["url"], "/v1/chat/completions")
+        self.assertEqual(requests[0]["body"]["messages"][0]["role"], "system")
+        self.assertFalse((self.session_dir / "_site_summary.json").exists())
+
+        with StandInServer(fail_first=1) as server:
+            first = self.run_requests(server.base_url)
+            second = self.run_requests(server.base_url)
+            third = self.run_requests(server.base_url)
+
+        self.assertEqual(first, {"skipped": 0, "succeeded": 1, "failed": 1})
+        self.assertEqual(second, {"skipped": 1, "succeeded": 1, "failed": 0})
+        self.assertEqual(third, {"skipped": 2, "succeeded": 0, "failed": 0})
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(server.requests[0]["model"], "stand-in-model")
+
+        stats = batch_inference.merge_results(self.session_dir)
+
+        self.assertEqual(stats, {"merged": 2, "failed": 0, "missing": 0})
+        summary = json.loads((self.session_dir / "_site_summary.json").read_text())
+        self.assertEqual(summary["pages_audited"], 2)
+        reports = [json.loads(p.read_text()) for p in self.session_dir.glob("*.json") if not p.name.startswith("_")]
+        self.assertEqual(sorted(r["content_analysis"]["score"] for r in reports), [66, 66])
+        self.assertEqual(reports[0]["link_analysis"]["internal_links"], 3)
+
+    def test_pages_without_results_are_merged_as_failed(self) -> None:
+        with use_endpoint("http://unused/v1"):
+            self.crawl([make_context("https://example.com/a")])
+
+        stats = batch_inference.merge_results(self.session_dir)
+
+        self.assertEqual(stats, {"merged": 0, "failed": 1, "missing": 1})
+        report = next(p for p in self.session_dir.glob("*.json") if not p.name.startswith("_"))
+        self.assertEqual(json.loads(report.read_text())["audit_status"], "failed")
+
+    def test_malformed_answer_fails_only_its_page(self) -> None:
+        with use_endpoint("http://unused/v1"):
+            self.crawl([make_context("https://example.com/a"), make_context("https://example.com/b")])
+        bad = dimensions(66)
+        bad["content_analysis"]["score"] = "not a number"
+        with open(self.session_dir / batch_inference.RESULTS_FILE, "w", encoding="utf-8") as f:
+            for line, data in zip((self.session_dir / batch_inference.REQUESTS_FILE).read_text().splitlines(),
+                                  (dimensions(66), bad)):
+                response = {"status_code": 200, "body": {"choices": [{"message": {"content": json.dumps(data)}}]}}
+                f.write(json.dumps({"custom_id": json.loads(line)["custom_id"], "response": response, "error": None}))
+                f.write("\n")
+
+        stats = batch_inference.merge_results(self.session_dir)
+
+        self.assertEqual(stats, {"merged": 1, "failed": 1, "missing": 0})
+        reports = {r["url"]: r for r in (json.loads(p.read_text()) for p in self.session_dir.glob("https_*.json"))}
+        self.assertEqual(reports["https://example.com/a"]["audit_status"], "complete")
+        self.assertEqual(reports["https://example.com/b"]["audit_status"], "failed")
+        self.assertEqual(reports["https://example.com/b"]["llm_meta"]["status"], "failed")
+        summary = json.loads((self.session_dir / "_site_summary.json").read_text())
+        self.assertEqual(summary["pages_audited"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
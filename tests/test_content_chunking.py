@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.content_chunking import reduce_findings, select_chunks, split_text
+
+from tests.test_llm_service import FakeClient, dimensions, make_context, use_client
+
+LONG_TEXT = " ".join(f"Section {i} explains watering, light and soil for houseplant number {i}." for i in range(600))
+
+
+def issue(severity: str, description: str) -> dict:
+    return {"severity": severity, "description": description, "suggested_fix": "Fix it."}
+
+
+class ChunkingHelperTests(unittest.TestCase):
+    def test_split_text_respects_the_bound_at_sentence_boundaries(self) -> None:
+        chunks = split_text(LONG_TEXT, 1000)
+
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertTrue(all(chunk.endswith(".") for chunk in chunks))
+        self.assertEqual(" ".join(chunks), LONG_TEXT)
+        self.assertEqual(split_text("x" * 25, 10), ["x" * 10, "x" * 10, "x" * 5])
+
+    def test_select_chunks_spreads_over_the_whole_page(self) -> None:
+        self.assertEqual(select_chunks(10, 4), [0, 3, 6, 9])
+        self.assertEqual(select_chunks(3, 5), [0, 1, 2])
+        self.assertEqual(select_chunks(10, 1), [0])
+
+    def test_reduce_weighs_scores_and_merges_issues(self) -> None:
+        merged = reduce_findings([
+            ({"score": 80, "answers_user_intent": False, "answer_snippet": None,
+              "issues": [issue("low", "Few  internal links")]}, 3000),
+            ({"score": 40, "answers_user_intent": True, "answer_snippet": "Water weekly.",
+              "content_uniqueness_note": "Mostly original.",
+              "issues": [issue("medium", "few internal links"), issue("high", "Outdated advice")]}, 1000),
+        ])
+
+        self.assertEqual(merged["score"], 70)
+        self.assertTrue(merged["answers_user_intent"])
+        self.assertEqual(merged["answer_snippet"], "Water weekly.")
+        self.assertEqual(merged["content_uniqueness_note"], "Mostly original.")
+        self.assertEqual(
+            [(i["severity"], i["description"]) for i in merged["issues"]],
+            [("high", "Outdated advice"), ("medium", "few internal links")],
+        )
+
+
+class ChunkedAnalysisTests(unittest.TestCase):
+    def long_context(self):
+        ctx = make_context("https://example.com/guide")
+        ctx.full_text = LONG_TEXT
+        return ctx
+
+    def test_content_is_map_reduced_over_the_whole_text(self) -> None:
+        chunking = llm_service.ContentChunking(threshold_chars=5000, chunk_tokens=2000, page_token_cap=60000)
+        count = len(split_text(LONG_TEXT, 2000 * 4))
+        client = FakeClient([dimensions(60) for _ in range(count + 1)])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(self.long_context(), retry_attempts=0, chunking=chunking))
+
+        prompts = [call["messages"][1]["content"] for call in client.calls]
+        main = [p for p in prompts if "part " not in p]
+        self.assertEqual(len(main), 1)
+        self.assertNotIn('"content_analysis"', main[0])
+        self.assertEqual(sum(f"part {i + 1} of {count}" in p for p in prompts for i in range(count)), count)
+        self.assertTrue(any("houseplant number 599." in p for p in prompts))
+
+        meta = audit["llm_meta"]
+        self.assertEqual((meta["content_chunks"], meta["content_chunks_skipped"]), (count, 0))
+        self.assertEqual(meta["prompt_tokens"], 1000 * (count + 1))
+        self.assertEqual(audit["content_analysis"]["score"], 60)
+        self.assertEqual(audit["audit_status"], "complete")
+
+    def test_failed_main_prompt_keeps_the_failed_status(self) -> None:
+        chunking = llm_service.ContentChunking(threshold_chars=5000, chunk_tokens=2000, page_token_cap=60000)
+        client = FakeClient([])
+
+        async def create(**kwargs):
+            # Chunk prompts get an answer, the other dimensions' prompt prose
+            chunk = "part " in kwargs["messages"][1]["content"]
+            client.payloads.append(dimensions(60) if chunk else "No JSON here.")
+            return await FakeClient._create(client, **kwargs)
+
+        client.chat.completions.create = create
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(self.long_context(), retry_attempts=0, chunking=chunking))
+
+        self.assertEqual(audit["content_analysis"]["score"], 60)
+        self.assertEqual(audit["audit_status"], "partial")
+        self.assertEqual(audit["llm_meta"]["status"], "failed")
+        self.assertIsNotNone(audit["llm_meta"]["error"])
+        self.assertEqual(audit["dimension_sources"]["link_analysis"], "default")
+        self.assertIn("llm_failed", [issue.get("code") for issue in audit["link_analysis"]["issues"]])
+        self.assertNotIn("llm_failed", [issue.get("code") for issue in audit["content_analysis"]["issues"]])
+
+    def test_token_cap_bounds_the_chunks_sent(self) -> None:
+        chunking = llm_service.ContentChunking(threshold_chars=5000, chunk_tokens=500, page_token_cap=9000)
+        client = FakeClient([dimensions(60) for _ in range(20)])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(self.long_context(), retry_attempts=0, chunking=chunking))
+
+        meta = audit["llm_meta"]
+        self.assertGreater(meta["content_chunks_skipped"], 0)
+        self.assertEqual(len(client.calls), meta["content_chunks"] + 1)
+        self.assertTrue(any("houseplant number 599." in call["messages"][1]["content"] for call in client.calls))
+
+    def test_short_pages_keep_the_single_prompt(self) -> None:
+        client = FakeClient([dimensions()])
+        ctx = make_context("https://example.com/")
+        ctx.full_text = "Short text."
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                ctx, retry_attempts=0, chunking=llm_service.ContentChunking(),
+            ))
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(audit["llm_meta"]["content_chunks"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
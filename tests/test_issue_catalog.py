@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.models.issue_catalog import ISSUE_CATALOG, issue_label, make_issue, suggested_fix
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.session_db import SESSION_DB_FILE, connect
+from backend.report_store import ReportStore
+from tests.test_llm_service import dimensions, make_context
+
+LLM_ISSUE = {"severity": "low", "description": "Generic anchor text", "suggested_fix": "Describe the target."}
+
+
+def page(url: str, title_length: int) -> dict:
+    data = dimensions()
+    data["link_analysis"]["issues"] = [dict(LLM_ISSUE)]
+    report = llm_service.finalize_page_audit(make_context(url), tuple(data), {}, data)
+    report["onpage_seo"]["issues"] = [make_issue("title_too_short", length=title_length), make_issue("noindex")]
+    return report
+
+
+class IssueCatalogTests(unittest.TestCase):
+    def test_issue_is_rendered_from_the_catalogue(self) -> None:
+        issue = make_issue("images_missing_alt", count=3)
+
+        self.assertEqual(issue, {
+            "severity": "medium", "description": "3 image(s) missing alt attribute",
+            "code": "images_missing_alt", "params": {"count": 3},
+        })
+        self.assertEqual(suggested_fix(issue), ISSUE_CATALOG["images_missing_alt"].fix)
+        self.assertEqual(issue_label(issue), "Images missing alt attribute")
+        self.assertEqual(suggested_fix(LLM_ISSUE), "Describe the target.")
+        self.assertEqual(issue_label(LLM_ISSUE), "Generic anchor text")
+
+    def test_llm_schema_has_no_issue_codes(self) -> None:
+        schema = json.dumps(llm_service._get_flat_schema())
+
+        self.assertNotIn('"code"', schema)
+        self.assertNotIn('"params"', schema)
+        self.assertIn('"required": ["severity", "description", "suggested_fix"]', schema)
+
+
+class CodedIssueStorageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.session_dir = self.root / "reports" / "example.com_20260101-000000"
+        self.pipeline = JsonReportPipeline()
+        self.pipeline.open_session(self.session_dir, mock.MagicMock())
+        for i, length in enumerate((12, 25, 12)):
+            self.pipeline.write_page(page(f"https://example.com/{i}", length))
+        self.pipeline.write_summary()
+        self.pipeline.close_session()
+
+    def test_reports_store_code_and_params_without_fix_text(self) -> None:
+        report = json.loads(next(self.session_dir.glob("https_*.json")).read_text())
+
+        self.assertEqual(report["onpage_seo"]["issues"][1], {
+            "severity": "high", "description": "Page set to noindex", "code": "noindex", "params": {},
+        })
+        self.assertEqual(report["link_analysis"]["issues"], [LLM_ISSUE])
+
+    def test_top_issues_group_by_code(self) -> None:
+        summary = json.loads((self.session_dir / "_site_summary.json").read_text())
+        top = {issue["description"]: issue for issue in summary["top_issues"]}
+
+        self.assertEqual(set(top), {"Title too short", "Page set to noindex", "Generic anchor text"})
+        self.assertEqual((top["Title too short"]["code"], top["Title too short"]["count"]), ("title_too_short", 3))
+        self.assertIsNone(top["Generic anchor text"]["code"])
+
+        store = ReportStore(self.root)
+        from_pages = store._summary_from_pages(store.load_pages(self.session_dir.name))
+        self.assertEqual({(i.description, i.code, i.count) for i in from_pages.top_issues}, {
+            ("Title too short", "title_too_short", 3), ("Page set to noindex", "noindex", 3),
+            ("Generic anchor text", None, 3),
+        })
+
+    def test_api_detail_takes_fix_text_from_the_catalogue(self) -> None:
+        store = ReportStore(self.root)
+        page_id = store.query_pages(self.session_dir.name, limit=1)[1][0].page_id
+
+        issues = store.load_page(self.session_dir.name, page_id).raw_data["onpage_seo"]["issues"]
+
+        self.assertEqual(
+            [i["suggested_fix"] for i in issues], [ISSUE_CATALOG["title_too_short"].fix, ISSUE_CATALOG["noindex"].fix],
+        )
+
+    def test_session_database_keeps_codes(self) -> None:
+        with sqlite3.connect(self.session_dir / SESSION_DB_FILE) as conn:
+            rows = conn.execute("SELECT code, COUNT(*), COUNT(suggested_fix) FROM issues GROUP BY code ORDER BY code")
+            self.assertEqual(rows.fetchall(), [(None, 3, 3), ("noindex", 3, 0), ("title_too_short", 3, 0)])
+
+    def test_older_session_database_gains_the_code_column(self) -> None:
+        path = self.root / "old.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE issues (id INTEGER PRIMARY KEY, page_id TEXT NOT NULL, section TEXT NOT NULL, "
+                "severity TEXT NOT NULL, description TEXT NOT NULL, suggested_fix TEXT)"
+            )
+        conn.close()
+
+        conn = connect(path)
+        self.addCleanup(conn.close)
+        self.assertIn("code", {row["name"] for row in conn.execute("PRAGMA table_info(issues)")})
+
+
+if __name__ == "__main__":
+    unittest.main()
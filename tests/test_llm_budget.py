@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.llm_budget import LlmBudget, importance_score
+
+from tests.test_llm_service import make_context
+
+
+class ImportanceScoreTests(unittest.TestCase):
+    def test_shallow_linked_and_risky_pages_rank_first(self) -> None:
+        home = importance_score(0, 30, 1.0, {"onpage_seo": 90})
+        archive = importance_score(4, 1, 0.1, {"onpage_seo": 90})
+        risky = importance_score(4, 1, 0.1, {"onpage_seo": 10})
+
+        self.assertGreater(home, archive)
+        self.assertGreater(risky, archive)
+        self.assertEqual(importance_score(0, 0, None, {}), importance_score(0, 0, 0.5, {}))
+
+
+class LlmBudgetTests(unittest.TestCase):
+    def test_most_important_waiting_page_is_admitted_first(self) -> None:
+        budget = LlmBudget(concurrency=1)
+        order: list[str] = []
+        importance = {"archive": 0.1, "landing": 0.9, "blog": 0.5}
+
+        async def page(name: str) -> None:
+            async with budget.admit(lambda: importance[name], 100) as granted:
+                self.assertTrue(granted)
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async def crawl() -> None:
+            async with budget.admit(lambda: 1.0, 100):
+                waiting = [asyncio.create_task(page(name)) for name in importance]
+                await asyncio.sleep(0)
+                self.assertEqual(budget.gate.waiting, 3)
+            await asyncio.gather(*waiting)
+
+        asyncio.run(crawl())
+
+        self.assertEqual(order, ["landing", "blog", "archive"])
+
+    def test_pages_are_refused_once_the_budget_is_spent(self) -> None:
+        budget = LlmBudget(max_calls=4, max_tokens=5000)
+
+        async def page(tokens: int, meta: dict) -> bool:
+            async with budget.admit(lambda: 0.5, tokens) as granted:
+                if granted:
+                    budget.record(meta)
+                return granted
+
+        async def crawl() -> list[bool]:
+            return [
+                await page(1500, {"requests": 1, "prompt_tokens": 1000, "completion_tokens": 200}),
+                await page(1500, {"requests": 2, "prompt_tokens": 2000, "completion_tokens": 400}),
+                await page(4000, {}),
+                await page(1000, {"requests": 4, "batch_size": 4, "prompt_tokens": 300, "completion_tokens": 50}),
+                await page(100, {}),
+            ]
+
+        self.assertEqual(asyncio.run(crawl()), [True, True, False, True, False])
+        self.assertTrue(budget.exhausted)
+        self.assertEqual(budget.snapshot(), {
+            "max_calls": 4, "max_tokens": 5000, "calls": 4, "tokens": 3950,
+            "granted_pages": 3, "skipped_pages": 2,
+        })
+
+
+class DeterministicAuditTests(unittest.TestCase):
+    def test_skipped_pages_get_a_partial_rule_only_report(self) -> None:
+        ctx = make_context("https://example.com/archive/7")
+
+        self.assertGreater(llm_service.estimate_page_tokens(ctx), 0)
+        report = llm_service.deterministic_page_audit(ctx, reason="Session LLM budget exhausted")
+
+        self.assertEqual(report["audit_status"], "partial")
+        self.assertIsNone(report["llm_meta"])
+        self.assertIn("skipped", report["dimension_sources"].values())
+        issues = [i["description"] for dim in report["dimension_sources"]
+                  if isinstance(report.get(dim), dict) for i in report[dim].get("issues", [])]
+        self.assertTrue(any(d.startswith("Session LLM budget exhausted") for d in issues))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,725 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import httpx
+import openai
+
+from ai_seo_auditor.models.schemas import (
+    AccessibilityAnalysis,
+    CanonicalAnalysis,
+    HeaderStructure,
+    ImageStats,
+    LinkAnalysis,
+    MetaTags,
+    OnPageSeoChecklist,
+    PerformanceMetrics,
+    ReadabilityAnalysis,
+    SecurityCheck,
+)
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.llm_endpoints import Endpoint, EndpointPool
+from ai_seo_auditor.services.llm_limiter import AdaptiveLimiter, backoff_delay, retry_after_seconds
+from ai_seo_auditor.services.llm_service import PageContext
+
+
+PAGE_TEXT = "This page explains how to choose and care for houseplants in small flats. " * 8
+
+
+def make_context(url: str, text: str = PAGE_TEXT, json_ld: list[dict] | None = None) -> PageContext:
+    return PageContext(
+        url=url,
+        html="<body><h1>Title</h1></body>",
+        json_ld=[{"@type": "Article"}] if json_ld is None else json_ld,
+        text=text,
+        meta_tags=MetaTags(title="Title").model_dump(),
+        headers=HeaderStructure(h1=["Title"], h2=[], h3=[], h4_h6_count=0).model_dump(),
+        image_stats=ImageStats(total_images=0, missing_alt=0).model_dump(),
+        onpage_seo=OnPageSeoChecklist(score=0).model_dump(),
+        link_analysis=LinkAnalysis(score=0, internal_links=3).model_dump(),
+        performance=PerformanceMetrics(score=0).model_dump(),
+        readability=ReadabilityAnalysis(score=0, word_count=len(text.split())).model_dump(),
+        security=SecurityCheck(score=0).model_dump(),
+        accessibility=AccessibilityAnalysis(score=0).model_dump(),
+        canonical_analysis=CanonicalAnalysis(score=0).model_dump(),
+    )
+
+
+def dimensions(content_score: int = 70) -> dict[str, Any]:
+    return {
+        "schema_analysis": {"score": 0, "detected_types": [], "missing_fields": []},
+        "content_analysis": {"score": content_score, "answers_user_intent": True, "issues": []},
+        "link_analysis": {"score": 60, "issues": []},
+        "accessibility": {"llm_score": 50, "issues": []},
+    }
+
+
+class FakeStream:
+    """Async iterator of completion chunks, recording how much was consumed."""
+
+    def __init__(self, content: str, chunk_size: int = 7) -> None:
+        self.pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self) -> "FakeStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self.consumed >= len(self.pieces):
+            raise StopAsyncIteration
+        piece = self.pieces[self.consumed]
+        self.consumed += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeClient:
+    """Minimal stand-in for AsyncOpenAI returning queued JSON payloads."""
+
+    def __init__(self, payloads: list[Any]) -> None:
+        self.payloads = list(payloads)
+        self.calls: list[dict[str, Any]] = []
+        self.streams: list[FakeStream] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs: Any) -> Any:
+        self.calls.append(kwargs)
+        payload = self.payloads.pop(0)
+        content = payload if isinstance(payload, str) else json.dumps(payload)
+        if kwargs.get("stream"):
+            self.streams.append(FakeStream(content))
+            return self.streams[-1]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=200),
+        )
+
+
+def use_client(client: Any) -> Any:
+    """Patch the endpoint pool so every request goes to ``client``."""
+    pool = EndpointPool([Endpoint(name="fake", base_url="", api_key="", model="m", client=client)])
+    return mock.patch.object(llm_service, "_get_pool", return_value=pool)
+
+
+class BatchAnalysisTests(unittest.TestCase):
+    def run_batch(self, client: FakeClient, pages: list[PageContext]) -> list[Any]:
+        with use_client(client):
+            return asyncio.run(
+                llm_service.analyze_batch_with_llm(pages, retry_attempts=0, retry_base_delay=0)
+            )
+
+    def test_batch_results_are_validated_per_url(self) -> None:
+        pages = [make_context("https://example.com/a"), make_context("https://example.com/b")]
+        client = FakeClient([
+            {"results": [
+                {"url": "https://example.com/b", **dimensions(40)},
+                {"url": "https://example.com/a", **dimensions(80)},
+            ]},
+        ])
+
+        audits = self.run_batch(client, pages)
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual([a["url"] for a in audits], ["https://example.com/a", "https://example.com/b"])
+        self.assertEqual(audits[0]["content_analysis"]["score"], 80)
+        self.assertEqual(audits[1]["content_analysis"]["score"], 40)
+        self.assertEqual(audits[0]["link_analysis"]["internal_links"], 3)
+
+    def test_invalid_entry_falls_back_to_single_page_request(self) -> None:
+        pages = [make_context("https://example.com/a"), make_context("https://example.com/b")]
+        broken = dimensions()
+        del broken["link_analysis"]
+        client = FakeClient([
+            {"results": [
+                {"url": "https://example.com/a", **dimensions(80)},
+                {"url": "https://example.com/b", **broken},
+            ]},
+            dimensions(55),
+        ])
+
+        audits = self.run_batch(client, pages)
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertIn("https://example.com/b", client.calls[1]["messages"][1]["content"])
+        self.assertEqual(audits[1]["content_analysis"]["score"], 55)
+        self.assertEqual(audits[1]["audit_status"], "complete")
+
+    def test_non_numeric_score_falls_back_for_that_page_only(self) -> None:
+        pages = [make_context("https://example.com/a"), make_context("https://example.com/b")]
+        bad = dimensions()
+        bad["content_analysis"]["score"] = "high"
+        client = FakeClient([
+            {"results": [
+                {"url": "https://example.com/a", **dimensions(80)},
+                {"url": "https://example.com/b", **bad},
+            ]},
+            dimensions(55),
+        ])
+
+        audits = self.run_batch(client, pages)
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertIn("https://example.com/b", client.calls[1]["messages"][1]["content"])
+        self.assertEqual([a["content_analysis"]["score"] for a in audits], [80, 55])
+
+
+    def test_invalid_fallback_answer_fails_only_its_page(self) -> None:
+        bad = dimensions()
+        bad["content_analysis"]["score"] = "high"
+        client = FakeClient([
+            {"results": [
+                {"url": "https://example.com/a", **dimensions(80)},
+                {"url": "https://example.com/b", **bad},
+            ]},
+            bad,
+        ])
+
+        async def run() -> list[Any]:
+            batcher = llm_service.LlmBatcher(
+                slot=contextlib.nullcontext, linger_seconds=0, retry_attempts=0, retry_base_delay=0,
+            )
+            return await asyncio.gather(
+                batcher.submit(make_context("https://example.com/a")),
+                batcher.submit(make_context("https://example.com/b")),
+            )
+
+        with use_client(client):
+            first, second = asyncio.run(run())
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertEqual((first["audit_status"], first["content_analysis"]["score"]), ("complete", 80))
+        self.assertEqual(second["audit_status"], "failed")
+        self.assertEqual(second["llm_meta"]["status"], "failed")
+        self.assertIn("llm_failed", [i.get("code") for i in second["content_analysis"]["issues"]])
+
+
+class StreamingTests(unittest.TestCase):
+    def analyze(self, client: FakeClient) -> Any:
+        with use_client(client):
+            return asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/"), retry_attempts=1, retry_base_delay=0, stream=True,
+            ))
+
+    def test_prose_output_is_aborted_and_retried(self) -> None:
+        prose = "Sure! Here is the SEO analysis of the page you provided. " * 20
+        client = FakeClient([prose, dimensions(72)])
+
+        audit = self.analyze(client)
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertLessEqual(client.streams[0].consumed, 1)
+        self.assertTrue(client.streams[0].closed)
+        self.assertEqual(audit["content_analysis"]["score"], 72)
+        self.assertTrue(audit["llm_meta"]["streamed"])
+        self.assertIsNotNone(audit["llm_meta"]["ttft_ms"])
+
+    def test_stream_stops_once_all_dimensions_are_complete(self) -> None:
+        content = json.dumps(dimensions(64))[:-1] + ', "trailing": "' + "x" * 500 + '"}'
+        client = FakeClient([content])
+
+        audit = self.analyze(client)
+
+        stream = client.streams[0]
+        self.assertLess(stream.consumed, len(stream.pieces))
+        self.assertEqual(audit["audit_status"], "complete")
+        self.assertEqual(audit["content_analysis"]["score"], 64)
+        self.assertTrue(audit["llm_meta"]["aborted_early"])
+        self.assertIsNotNone(audit["llm_meta"]["stream_ms"])
+
+
+class DimensionPolicyTests(unittest.TestCase):
+    def test_thin_page_without_json_ld_only_asks_for_remaining_dimensions(self) -> None:
+        client = FakeClient([{k: v for k, v in dimensions().items() if k in ("link_analysis", "accessibility")}])
+        ctx = make_context("https://example.com/", text="Tiny page.", json_ld=[])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0))
+
+        schema_text = client.calls[0]["messages"][1]["content"]
+        self.assertNotIn('"content_analysis"', schema_text)
+        self.assertNotIn('"schema_analysis"', schema_text)
+        self.assertEqual(audit["audit_status"], "complete")
+        self.assertEqual(audit["dimension_sources"], {
+            "schema_analysis": "rules",
+            "content_analysis": "rules",
+            "link_analysis": "llm",
+            "accessibility": "llm",
+        })
+        self.assertLess(audit["content_analysis"]["score"], 30)
+
+    def test_empty_page_leaves_only_accessibility_to_the_model(self) -> None:
+        ctx = make_context("https://example.com/", text="", json_ld=[])
+        ctx.link_analysis = LinkAnalysis(score=0).model_dump()
+
+        model_dims, rule_data = llm_service.plan_dimensions(ctx)
+
+        self.assertEqual(model_dims, ("accessibility",))
+        self.assertEqual(rule_data["content_analysis"]["score"], 0)
+        self.assertEqual(rule_data["link_analysis"]["score"], 0)
+
+
+class BatcherTests(unittest.TestCase):
+    def test_batch_packing_respects_token_budget(self) -> None:
+        small = make_context("https://example.com/small")
+        block_tokens = llm_service.estimate_tokens(llm_service._build_page_block(small))
+
+        async def run() -> list[list[str]]:
+            batches: list[list[str]] = []
+
+            async def fake_batch(pages: list[PageContext], **_: Any) -> list[Any]:
+                batches.append([p.url for p in pages])
+                return [p.url for p in pages]
+
+            slot = mock.MagicMock()
+            slot.return_value.__aenter__ = mock.AsyncMock()
+            slot.return_value.__aexit__ = mock.AsyncMock(return_value=False)
+            batcher = llm_service.LlmBatcher(
+                slot=slot, token_budget=block_tokens * 2, max_pages=8,
+                page_max_tokens=block_tokens * 2, linger_seconds=0,
+            )
+            with mock.patch.object(llm_service, "analyze_batch_with_llm", fake_batch):
+                await asyncio.gather(*(
+                    batcher.submit(make_context(f"https://example.com/{i}")) for i in range(5)
+                ))
+            return batches
+
+        batches = asyncio.run(run())
+        self.assertEqual([len(b) for b in batches], [2, 2, 1])
+
+
+class EndpointPoolTests(unittest.TestCase):
+    def make_pool(self, *clients: Any, hedge: bool = False) -> EndpointPool:
+        return EndpointPool(
+            [Endpoint(name=f"e{i}", base_url="", api_key="", model="m", client=c) for i, c in enumerate(clients)],
+            hedge=hedge,
+            hedge_min_samples=1,
+        )
+
+    def test_picks_least_outstanding_healthy_endpoint(self) -> None:
+        pool = self.make_pool(None, None, None)
+        pool.endpoints[0].outstanding = 2
+        pool.endpoints[1].outstanding = 1
+        pool.endpoints[2].outstanding = 0
+        pool.endpoints[2].breaker.failure_threshold = 1
+        pool.endpoints[2].breaker.record_failure()
+
+        self.assertEqual(pool.pick().name, "e1")
+
+    def test_open_breaker_after_consecutive_failures(self) -> None:
+        pool = self.make_pool(None, None)
+
+        async def fail(endpoint: Endpoint) -> None:
+            raise asyncio.TimeoutError()
+
+        async def run() -> None:
+            for _ in range(3):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await pool.call(fail, timeout=1)
+
+        pool.endpoints[1].outstanding = 10  # force traffic onto e0
+        asyncio.run(run())
+        self.assertEqual(pool.endpoints[0].breaker.state, "open")
+        self.assertEqual(pool.pick().name, "e1")
+
+    def test_hedged_request_wins_when_primary_is_slow(self) -> None:
+        pool = self.make_pool(None, None, hedge=True)
+        pool.latency.observe(10)  # observed p95 = 10 ms
+
+        async def work(endpoint: Endpoint) -> str:
+            await asyncio.sleep(1.0 if endpoint.name == "e0" else 0.01)
+            return endpoint.name
+
+        result, endpoint, hedged = asyncio.run(pool.call(work, timeout=5))
+
+        self.assertEqual((result, endpoint.name, hedged), ("e1", "e1", True))
+        self.assertEqual(pool.hedges_won, 1)
+        self.assertEqual(pool.endpoints[0].outstanding, 0)
+        self.assertEqual(pool.endpoints[1].latency.total, 1)
+
+
+class TelemetryTests(unittest.TestCase):
+    def test_retries_and_usage_are_recorded(self) -> None:
+        client = FakeClient(["not json", dimensions(70)])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/"), retry_attempts=1, retry_base_delay=0,
+            ))
+
+        meta = audit["llm_meta"]
+        self.assertEqual((meta["status"], meta["retries"], meta["model"], meta["endpoint"]), ("ok", 1, "m", "fake"))
+        # Both attempts produced a completion, so both count towards usage
+        self.assertEqual((meta["prompt_tokens"], meta["completion_tokens"]), (2000, 400))
+        self.assertFalse(meta["tokens_estimated"])
+        self.assertIsNotNone(meta["latency_ms"])
+        self.assertGreaterEqual(meta["total_ms"], meta["latency_ms"])
+
+    def test_batched_pages_split_the_token_usage(self) -> None:
+        pages = [make_context("https://example.com/a"), make_context("https://example.com/b")]
+        client = FakeClient([{"results": [
+            {"url": "https://example.com/a", **dimensions()},
+            {"url": "https://example.com/b", **dimensions()},
+        ]}])
+
+        with use_client(client):
+            audits = asyncio.run(llm_service.analyze_batch_with_llm(pages, retry_attempts=0))
+
+        self.assertEqual([a["llm_meta"]["prompt_tokens"] for a in audits], [500, 500])
+        self.assertEqual(audits[0]["llm_meta"]["batch_size"], 2)
+
+    def test_failed_call_and_site_summary_usage(self) -> None:
+        client = FakeClient(["not json"])
+        with use_client(client):
+            failed = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/x"), retry_attempts=0,
+            ))
+        self.assertEqual((failed["llm_meta"]["status"], failed["llm_meta"]["error"]), ("failed", "JSONDecodeError"))
+
+        pipeline = JsonReportPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.open_session(Path(tmp), mock.MagicMock())
+            ok = {**failed["llm_meta"], "status": "ok", "error": None, "latency_ms": 900}
+            pipeline.record_page(failed)
+            pipeline.record_page({**failed, "llm_meta": ok})
+            usage = pipeline._build_llm_usage()
+
+        self.assertEqual((usage.pages, usage.failed), (2, 1))
+        self.assertEqual(usage.prompt_tokens, 2000)
+        self.assertEqual(usage.latency_ms["max"], 900)
+        self.assertEqual(usage.by_model, {"m": 2})
+
+
+class StructuredOutputTests(unittest.TestCase):
+    def test_schema_is_enforced_through_response_format_not_prompt(self) -> None:
+        client = FakeClient([dimensions()])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/"), retry_attempts=0, structured_output=True,
+            ))
+
+        call = client.calls[0]
+        self.assertEqual(call["response_format"]["type"], "json_schema")
+        self.assertTrue(call["response_format"]["json_schema"]["strict"])
+        schema = call["response_format"]["json_schema"]["schema"]
+        self.assertFalse(schema["additionalProperties"])
+        content = schema["properties"]["content_analysis"]
+        self.assertFalse(content["additionalProperties"])
+        self.assertEqual(content["required"], list(content["properties"]))
+        self.assertEqual(content["properties"]["answer_snippet"]["type"], ["string", "null"])
+        self.assertNotIn('"default"', json.dumps(schema))
+        self.assertNotIn('"anyOf"', json.dumps(schema))
+        self.assertNotIn('"properties"', call["messages"][1]["content"])
+        self.assertEqual(audit["llm_meta"]["output_mode"], "json_schema")
+
+    def test_fallback_rate_is_reported_per_mode(self) -> None:
+        missing_content = {k: v for k, v in dimensions().items() if k != "content_analysis"}
+        client = FakeClient(["not json", dimensions(), dimensions(), missing_content])
+        with use_client(client):
+            retried = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/a"), retry_attempts=1, retry_base_delay=0,
+            ))
+            clean = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/b"), retry_attempts=0, structured_output=True,
+            ))
+            partial = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/c"), retry_attempts=0,
+            ))
+        self.assertEqual(retried["llm_meta"]["invalid_outputs"], 1)
+        self.assertEqual(partial["llm_meta"]["backfilled_dimensions"], 1)
+
+        pipeline = JsonReportPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.open_session(Path(tmp), mock.MagicMock())
+            for audit in (retried, clean, partial):
+                pipeline.record_page(audit)
+            usage = pipeline._build_llm_usage()
+
+        self.assertEqual(usage.by_output_mode["json_object"], {
+            "pages": 2, "invalid_outputs": 1, "backfilled_pages": 1, "failed": 0, "fallback_rate": 1.0,
+        })
+        self.assertEqual(usage.by_output_mode["json_schema"]["fallback_rate"], 0.0)
+
+
+class OutputRepairTests(unittest.TestCase):
+    def test_fenced_output_with_trailing_comma_is_repaired_without_retry(self) -> None:
+        payload = json.dumps(dimensions(), indent=2)
+        client = FakeClient(["```json\n" + payload[:-2] + ",\n}\n```"])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(make_context("https://example.com/"), retry_attempts=1))
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(audit["audit_status"], "complete")
+        self.assertTrue(audit["llm_meta"]["repaired"])
+        self.assertEqual(audit["llm_meta"]["retries"], 0)
+
+    def test_truncated_output_keeps_complete_dimensions_and_asks_for_the_rest(self) -> None:
+        full = dimensions(content_score=81)
+        truncated = json.dumps(full)[:-40]  # cut inside the accessibility dimension
+        client = FakeClient([truncated, {"accessibility": full["accessibility"]}])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(make_context("https://example.com/"), retry_attempts=1))
+
+        followup_prompt = client.calls[1]["messages"][1]["content"]
+        self.assertIn("Evaluate exactly these 1 dimension(s)", followup_prompt)
+        self.assertNotIn('"content_analysis"', followup_prompt)
+        self.assertEqual(audit["audit_status"], "complete")
+        self.assertEqual(audit["content_analysis"]["score"], 81)
+        self.assertEqual(audit["accessibility"]["llm_score"], 50)
+        meta = audit["llm_meta"]
+        self.assertEqual((meta["salvaged_dimensions"], meta["followup_dimensions"]), (3, 1))
+        self.assertEqual(meta["prompt_tokens"], 2000)
+
+        pipeline = JsonReportPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.open_session(Path(tmp), mock.MagicMock())
+            pipeline.record_page(audit)
+            usage = pipeline._build_llm_usage()
+        self.assertEqual((usage.repaired_outputs, usage.salvaged_dimensions, usage.followup_requests), (1, 3, 1))
+
+
+class ModelCascadeTests(unittest.TestCase):
+    cascade = llm_service.ModelCascade(
+        fast_model="small", ambiguous_band=(40, 65), important_url_patterns=[r"/pricing$"],
+    )
+
+    def test_confident_fast_answer_is_kept(self) -> None:
+        client = FakeClient([{**dimensions(80), "link_analysis": {"score": 90, "issues": []},
+                              "accessibility": {"llm_score": 85, "issues": []}}])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/"), retry_attempts=0, cascade=self.cascade,
+            ))
+
+        self.assertEqual([call["model"] for call in client.calls], ["small"])
+        self.assertEqual(set(audit["llm_meta"]["dimension_tiers"].values()), {"fast"})
+        self.assertEqual(audit["llm_meta"]["escalated"], [])
+
+    def test_invalid_and_ambiguous_dimensions_escalate(self) -> None:
+        fast = {**dimensions(80), "link_analysis": {"score": 55, "issues": []},
+                "accessibility": {"llm_score": 90, "issues": [{"severity": "urgent"}]}}
+        strong = {"link_analysis": {"score": 30, "issues": []}, "accessibility": {"llm_score": 60, "issues": []}}
+        client = FakeClient([fast, strong])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/"), retry_attempts=0, cascade=self.cascade,
+            ))
+
+        self.assertEqual([call["model"] for call in client.calls], ["small", "m"])
+        meta = audit["llm_meta"]
+        self.assertEqual(meta["escalated"], ["link_analysis", "accessibility"])
+        self.assertEqual(meta["dimension_tiers"], {
+            "schema_analysis": "fast", "content_analysis": "fast",
+            "link_analysis": "strong", "accessibility": "strong",
+        })
+        self.assertEqual((meta["model"], meta["prompt_tokens"]), ("m", 2000))
+        self.assertEqual(audit["link_analysis"]["score"], 30)
+        self.assertEqual(audit["audit_status"], "complete")
+
+    def test_important_pages_skip_the_fast_tier(self) -> None:
+        client = FakeClient([dimensions(50)])
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/pricing"), retry_attempts=0, cascade=self.cascade,
+            ))
+
+        self.assertEqual([call["model"] for call in client.calls], ["m"])
+        self.assertEqual(set(audit["llm_meta"]["dimension_tiers"].values()), {"strong"})
+
+
+class SplitPromptTests(unittest.TestCase):
+    HTML = (
+        '<body><nav role="navigation"><a href="/care">Plant care</a></nav>'
+        '<main><form id="q"><label for="s">Search</label><input id="s" type="search" class="x"></form>'
+        "<p>Some paragraph</p></main></body>"
+    )
+
+    def test_each_dimension_gets_only_its_own_context(self) -> None:
+        client = FakeClient([dimensions(80) for _ in range(4)])
+        ctx = make_context("https://example.com/")
+        ctx.html = self.HTML
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0, split_dimensions=True))
+
+        prompts = {}
+        for call in client.calls:
+            user = call["messages"][1]["content"]
+            dim = next(d for d in dimensions() if f'"{d}"' in user)
+            self.assertEqual([d for d in dimensions() if f'"{d}"' in user], [dim])
+            prompts[dim] = user
+        self.assertEqual(set(prompts), set(dimensions()))
+        self.assertIn('"@type": "Article"', prompts["schema_analysis"])
+        self.assertNotIn(PAGE_TEXT[:40], prompts["schema_analysis"])
+        self.assertIn(PAGE_TEXT[:40], prompts["content_analysis"])
+        self.assertIn("Plant care -> /care", prompts["link_analysis"])
+        self.assertNotIn(PAGE_TEXT[:40], prompts["link_analysis"])
+        self.assertIn('<label for="s">Search', prompts["accessibility"])
+        self.assertIn('<nav role="navigation">', prompts["accessibility"])
+        self.assertNotIn("Some paragraph", prompts["accessibility"])
+        self.assertNotIn('class="x"', prompts["accessibility"])
+
+        meta = audit["llm_meta"]
+        self.assertEqual((meta["prompt_mode"], meta["prompt_tokens"]), ("split", 4000))
+        self.assertEqual(audit["content_analysis"]["score"], 80)
+        self.assertEqual(audit["audit_status"], "complete")
+
+    def test_failed_dimension_is_backfilled_and_latency_reported_per_mode(self) -> None:
+        client = FakeClient(["not json"] + [dimensions() for _ in range(4)])
+        ctx = make_context("https://example.com/")
+
+        with use_client(client):
+            split = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0, split_dimensions=True))
+            single = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0))
+
+        self.assertEqual(split["llm_meta"]["status"], "ok")
+        self.assertEqual(split["audit_status"], "partial")
+        self.assertEqual(single["llm_meta"]["prompt_mode"], "single")
+
+        pipeline = JsonReportPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.open_session(Path(tmp), mock.MagicMock())
+            pipeline.record_page({**split, "llm_meta": {**split["llm_meta"], "total_ms": 400}})
+            pipeline.record_page({**single, "llm_meta": {**single["llm_meta"], "total_ms": 900}})
+            usage = pipeline._build_llm_usage()
+        self.assertEqual(usage.latency_by_prompt_mode, {
+            "split": {"pages": 1, "p50": 400, "p90": 400, "max": 400},
+            "single": {"pages": 1, "p50": 900, "p90": 900, "max": 900},
+        })
+
+
+class OllamaProfileTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        llm_service.configure_ollama(False)
+        llm_service.configure_limiter()
+
+    def test_requests_carry_keep_alive_and_a_context_that_only_grows(self) -> None:
+        profile = llm_service.configure_ollama(True, html_max_chars=8000, text_max_chars=2000, keep_alive="1h")
+        initial = profile.num_ctx
+        self.assertEqual(initial % 2048, 0)
+        self.assertGreater(initial, (8000 + 2000) // 4 + llm_service._LLM_MAX_TOKENS)
+        client = FakeClient([dimensions(), dimensions()])
+
+        with use_client(client):
+            asyncio.run(llm_service.analyze_page(make_context("https://example.com/"), retry_attempts=0))
+            asyncio.run(llm_service.analyze_page(
+                make_context("https://example.com/long", text="word " * 20000), retry_attempts=0,
+            ))
+
+        bodies = [call["extra_body"] for call in client.calls]
+        self.assertEqual(bodies[0], {"keep_alive": "1h", "options": {"num_ctx": initial}})
+        self.assertGreater(bodies[1]["options"]["num_ctx"], initial)
+        self.assertEqual(bodies[1]["options"]["num_ctx"] % 2048, 0)
+        self.assertEqual(profile.context_resizes, 1)
+
+    def test_warm_up_and_slot_detection_cap_concurrency(self) -> None:
+        server_slots = asyncio.Semaphore(2)
+        requests: list[dict[str, Any]] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            requests.append(body)
+            if "prompt" not in body:
+                return httpx.Response(200, json={"done": True, "load_duration": 1_500_000_000})
+            async with server_slots:
+                await asyncio.sleep(0.1)
+            return httpx.Response(200, json={"response": "1 2 3", "done": True})
+
+        transport = httpx.MockTransport(handler)
+        llm_service.configure_ollama(True)
+        limiter = llm_service.configure_limiter(initial_limit=1, max_limit=8)
+        pool = EndpointPool([Endpoint(name="gpu", base_url="http://gpu:11434/v1", api_key="", model="m")])
+        real_client = httpx.AsyncClient
+
+        with mock.patch.object(llm_service, "_get_pool", return_value=pool), mock.patch(
+            "ai_seo_auditor.services.ollama_profile.httpx.AsyncClient",
+            lambda **kwargs: real_client(transport=transport, **kwargs),
+        ):
+            capacity = asyncio.run(llm_service.prepare_ollama(extra_models=("small",)))
+
+        self.assertEqual(capacity, 2)
+        self.assertEqual((limiter.current_limit, limiter.max_limit), (2, 2))
+        self.assertEqual([r["model"] for r in requests[:2]], ["m", "small"])
+        self.assertEqual(requests[0]["keep_alive"], "30m")
+        stats = llm_service.get_ollama_stats()
+        self.assertEqual(stats["load_ms"], {"http://gpu:11434/v1": {"m": 1500, "small": 1500}})
+        self.assertEqual(stats["parallel_slots"], {"http://gpu:11434/v1": 2})
+
+
+def rate_limited(retry_after: str) -> openai.RateLimitError:
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class AdaptiveLimiterTests(unittest.TestCase):
+    def test_limit_grows_while_latency_is_flat_and_halves_on_429(self) -> None:
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=8)
+        for _ in range(20):
+            limiter.record_success(100, started=time.monotonic())
+        grown = limiter.current_limit
+
+        limiter.record_error(rate_limited("0"), started=time.monotonic())
+
+        self.assertGreater(grown, 2)
+        self.assertEqual(limiter.current_limit, max(1, grown // 2))
+        self.assertEqual(limiter.history[-1]["reason"], "429")
+
+    def test_one_congestion_episode_cuts_the_limit_once(self) -> None:
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+        sent = time.monotonic()
+        for _ in range(3):
+            limiter.record_error(asyncio.TimeoutError(), started=sent)
+        self.assertEqual(limiter.current_limit, 4)
+
+    def test_latency_spike_reduces_limit(self) -> None:
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=4)
+        for _ in range(10):
+            limiter.record_success(100, started=time.monotonic())
+        limiter.record_success(1000, started=time.monotonic())
+        self.assertEqual(limiter.current_limit, 2)
+
+    def test_in_flight_requests_never_exceed_limit(self) -> None:
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def request() -> None:
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        async def run() -> None:
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_backoff_honours_retry_after(self) -> None:
+        exc = rate_limited("7")
+        self.assertEqual(retry_after_seconds(exc), 7.0)
+        self.assertEqual(backoff_delay(1.0, 0, retry_after_seconds(exc)), 7.0)
+        self.assertTrue(2.0 <= backoff_delay(1.0, 2) <= 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
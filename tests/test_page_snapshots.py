@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.page_snapshots import SnapshotStore, reanalyze_session
+
+from tests.test_llm_service import FakeClient, dimensions, make_context, use_client
+
+
+class PageSnapshotTests(unittest.TestCase):
+    def crawl(self, session_dir: Path, client: FakeClient) -> JsonReportPipeline:
+        """Two crawled pages: the first audit succeeds, the second fails."""
+        pipeline = JsonReportPipeline()
+        pipeline.open_session(session_dir, mock.MagicMock())
+        with use_client(client):
+            for url in ("https://example.com/", "https://example.com/guide"):
+                ctx = make_context(url)
+                ctx.full_text = "Full guide text."
+                report = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0))
+                pipeline.process_item({**report, "page_snapshot": ctx.to_record()}, mock.MagicMock())
+        pipeline.write_summary()
+        return pipeline
+
+    def reports(self, session_dir: Path) -> dict[str, dict]:
+        return {
+            json.loads(p.read_text())["url"]: json.loads(p.read_text())
+            for p in session_dir.glob("*.json") if not p.name.startswith("_")
+        }
+
+    def test_pipeline_stores_the_inputs_apart_from_the_report(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            self.crawl(session_dir, FakeClient([dimensions(), "not json"]))
+            store = SnapshotStore(session_dir)
+            page_id = store.page_ids()[1]
+
+            self.assertEqual(len(store.page_ids()), 2)
+            self.assertTrue((session_dir / f"{page_id}.json").exists())
+            self.assertNotIn("page_snapshot", (session_dir / f"{page_id}.json").read_text())
+            ctx = store.read(page_id)
+        self.assertEqual(ctx.url, "https://example.com/guide")
+        self.assertEqual(ctx.full_text, "Full guide text.")
+        self.assertEqual(ctx.to_record(), make_context(ctx.url).to_record() | {"full_text": "Full guide text."})
+
+    def test_reanalyze_reruns_failed_pages_and_rewrites_the_summary(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            self.crawl(session_dir, FakeClient([dimensions(80), "not json"]))
+            self.assertEqual(self.reports(session_dir)["https://example.com/guide"]["audit_status"], "failed")
+
+            client = FakeClient([dimensions(55)])
+            with use_client(client):
+                stats = asyncio.run(reanalyze_session(session_dir, llm_kwargs={"retry_attempts": 0}))
+
+            self.assertEqual(len(client.calls), 1)
+            self.assertEqual(stats, {"reanalyzed": 1, "failed": 0, "kept": 1, "without_snapshot": 0})
+            reports = self.reports(session_dir)
+            self.assertEqual(reports["https://example.com/guide"]["audit_status"], "complete")
+            self.assertEqual(reports["https://example.com/guide"]["content_analysis"]["score"], 55)
+            self.assertEqual(reports["https://example.com/"]["content_analysis"]["score"], 80)
+            summary = json.loads((session_dir / "_site_summary.json").read_text())
+            self.assertEqual(summary["pages_audited"], 2)
+            self.assertEqual({p["audit_status"] for p in summary["pages"]}, {"complete"})
+
+            client = FakeClient([dimensions(40), dimensions(40)])
+            with use_client(client):
+                stats = asyncio.run(reanalyze_session(session_dir, all_pages=True, llm_kwargs={"retry_attempts": 0}))
+            self.assertEqual(stats["reanalyzed"], 2)
+            self.assertEqual({r["content_analysis"]["score"] for r in self.reports(session_dir).values()}, {40})
+
+
+if __name__ == "__main__":
+    unittest.main()
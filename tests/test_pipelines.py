@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from scrapy.statscollectors import StatsCollector
+
+from ai_seo_auditor.models.scoring import overall_score
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.page_snapshots import SnapshotStore
+from ai_seo_auditor.services.report_writer import WriterOptions
+from ai_seo_auditor.services.session_storage import StorageOptions, page_ids
+from tests.test_llm_service import dimensions, make_context
+
+
+class WritePageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.session_dir = Path(tmp.name)
+        self.pipeline = JsonReportPipeline()
+        self.logger = mock.MagicMock()
+        self.pipeline.open_session(self.session_dir, self.logger)
+
+    def page_files(self) -> list[Path]:
+        return [p for p in self.session_dir.glob("*.json") if not p.name.startswith("_")]
+
+    def test_raw_report_is_validated_once_on_write(self) -> None:
+        report = llm_service.finalize_page_audit(make_context("https://example.com/"), tuple(dimensions()), {}, dimensions(80))
+        # A stale spider score is recomputed by the persistence validation
+        report["security"] = {"score": 0, "is_https": True, "has_hsts": True}
+
+        self.pipeline.write_page(report)
+
+        written = json.loads(self.page_files()[0].read_text())
+        self.assertEqual(written["security"]["score"], 70)
+        self.assertEqual(written["content_analysis"]["score"], 80)
+        self.assertIn("letter_grade", written)
+        entry = self.pipeline._summary.build().pages[0]
+        self.assertEqual((entry.security_score, entry.overall_score), (70, written["overall_score"]))
+
+    def test_configured_score_weights_set_the_overall_score(self) -> None:
+        self.pipeline.open_session(self.session_dir, self.logger, score_weights={"onpage_seo": 0.05, "content_analysis": 0.30})
+        report = llm_service.finalize_page_audit(make_context("https://example.com/"), tuple(dimensions()), {}, dimensions(90))
+
+        self.pipeline.write_page(report)
+
+        written = json.loads(self.page_files()[0].read_text())
+        scores = {k: written[k]["score"] for k in self.pipeline.score_weights}
+        self.assertEqual(written["overall_score"], overall_score(scores, self.pipeline.score_weights))
+        self.assertEqual(self.pipeline._summary.build().pages[0].overall_score, written["overall_score"])
+
+    def test_invalid_report_is_logged_and_skipped(self) -> None:
+        report = llm_service.finalize_page_audit(make_context("https://example.com/"), tuple(dimensions()), {}, dimensions())
+        report["performance"]["ttfb_ms"] = "slow"
+
+        self.pipeline.write_page(report)
+
+        self.assertEqual(self.page_files(), [])
+        self.assertEqual(self.pipeline._summary.pages, 0)
+        self.logger.error.assert_called_once()
+
+
+class ReportWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.session_dir = Path(tmp.name)
+        self.pipeline = JsonReportPipeline()
+        self.spider = mock.MagicMock()
+        self.spider.crawler.stats = StatsCollector(mock.MagicMock())
+
+    def crawl(self, pages: int, storage: StorageOptions) -> None:
+        self.pipeline.open_session(
+            self.session_dir, mock.MagicMock(), storage=storage,
+            writer=WriterOptions(queue_size=2, batch_size=4, fsync=True),
+        )
+        for i in range(pages):
+            ctx = make_context(f"https://example.com/{i}")
+            report = llm_service.finalize_page_audit(ctx, tuple(dimensions()), {}, dimensions(50 + i))
+            self.pipeline.process_item({**report, "page_snapshot": ctx.to_record()}, self.spider)
+        self.pipeline.close_spider(self.spider)
+
+    def test_writer_thread_writes_every_report_before_the_summary(self) -> None:
+        self.crawl(12, StorageOptions())
+
+        reports = [json.loads(p.read_text()) for p in self.session_dir.glob("*.json") if not p.name.startswith("_")]
+        self.assertEqual(sorted(r["content_analysis"]["score"] for r in reports), list(range(50, 62)))
+        self.assertEqual(len(SnapshotStore(self.session_dir).page_ids()), 12)
+        self.assertEqual(json.loads((self.session_dir / "_site_summary.json").read_text())["pages_audited"], 12)
+        stats = self.spider.crawler.stats
+        self.assertEqual(
+            [stats.get_value(f"report_writer/{key}") for key in ("reports", "snapshots", "tasks")], [12, 12, 0],
+        )
+        self.assertEqual(stats.get_value("report_writer/errors"), 0)
+        self.assertLessEqual(stats.get_value("report_writer/max_queue_depth"), 2)
+        self.assertIsNotNone(stats.get_value("report_writer/batch_write_ms")["p90"])
+
+    def test_writer_thread_appends_segment_records(self) -> None:
+        self.crawl(12, StorageOptions(layout="segments"))
+
+        self.assertEqual(len(page_ids(self.session_dir)), 12)
+        self.assertEqual(list(self.session_dir.glob("[!_]*.json")), [])
+        self.assertEqual(self.spider.crawler.stats.get_value("report_writer/reports"), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from ai_seo_auditor.models import scoring
+from ai_seo_auditor.models.issue_catalog import make_issue
+from ai_seo_auditor.models.schemas import (
+    AccessibilityAnalysis,
+    CanonicalAnalysis,
+    OnPageSeoChecklist,
+    PerformanceMetrics,
+    ReadabilityAnalysis,
+    SecurityCheck,
+)
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service, rescoring
+from ai_seo_auditor.services.site_summary import SiteSummaryBuilder
+from tests.test_llm_service import dimensions, make_context
+
+
+def random_report(rng: random.Random, i: int) -> dict[str, Any]:
+    """A page report with every deterministic sub-metric drawn at random."""
+    flag = lambda: rng.random() < 0.5  # noqa: E731
+    alt_pct = round(rng.uniform(0, 100), 1)
+    llm_data = dimensions(rng.randint(0, 100))
+    llm_data["accessibility"]["llm_score"] = rng.choice([None, rng.randint(0, 100)])
+    words = rng.randint(0, 900)
+    report = llm_service.finalize_page_audit(
+        make_context(f"https://example.com/{i}"), tuple(llm_data), {}, llm_data,
+    )
+    report.update(
+        audit_status=rng.choice(["complete", "complete", "partial", "failed"]),
+        onpage_seo=OnPageSeoChecklist(
+            score=0, has_title=flag(), title_length_ok=flag(), has_meta_description=flag(),
+            description_length_ok=flag(), single_h1=flag(), has_viewport_meta=flag(),
+            has_lang_attribute=flag(), has_og_tags=flag(), robots_allows_indexing=flag(),
+            image_alt_coverage_pct=alt_pct, has_canonical=flag(),
+            issues=[{"severity": "low", "description": f"Issue {rng.randint(0, 4)}", "suggested_fix": "Fix it."}],
+        ).model_dump(),
+        performance=PerformanceMetrics(
+            score=0, ttfb_ms=rng.randint(0, 3000), fcp_ms=rng.choice([None, rng.randint(0, 4000)]),
+            page_size_bytes=rng.randint(0, 3_000_000), resource_count=rng.randint(0, 150),
+        ).model_dump(),
+        readability=ReadabilityAnalysis(
+            score=0, word_count=words, flesch_reading_ease=round(rng.uniform(0, 100), 1),
+            # As the spider raises it
+            issues=[make_issue("thin_content", words=words, minimum=300)] if words < 300 else [],
+        ).model_dump(),
+        security=SecurityCheck(
+            score=0, is_https=flag(), has_hsts=flag(), has_csp=flag(), has_x_content_type=flag(),
+            mixed_content_urls=["http://x"] if flag() else [],
+        ).model_dump(),
+        accessibility=AccessibilityAnalysis(
+            score=0, has_skip_nav=flag(), has_lang_attribute=flag(), has_document_title=flag(),
+            has_heading_structure=flag(), image_alt_coverage_pct=alt_pct,
+            form_labels_missing=rng.randint(0, 2), generic_link_text_count=rng.randint(0, 2),
+            tabindex_misuse_count=rng.randint(0, 2), llm_score=llm_data["accessibility"]["llm_score"],
+        ).model_dump(),
+        canonical_analysis=CanonicalAnalysis(
+            score=0, canonical_url=rng.choice([None, "https://example.com/c"]), matches_actual_url=flag(),
+            redirect_chain=["https://example.com/r"] * rng.randint(0, 3), has_hreflang=flag(),
+        ).model_dump(),
+    )
+    return report
+
+
+class RescoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.session_dir = self.root / "example.com_20260101-000000"
+        pipeline = JsonReportPipeline()
+        pipeline.open_session(self.session_dir, mock.MagicMock())
+        rng = random.Random(7)
+        for i in range(300):
+            pipeline.write_page(random_report(rng, i))
+        pipeline.write_summary()
+
+    def read_session(self, path: Path) -> tuple[dict[str, dict[str, Any]], dict[str, Any]]:
+        pages = {p.name: json.loads(p.read_text()) for p in path.glob("*.json") if not p.name.startswith("_")}
+        return pages, json.loads((path / "_site_summary.json").read_text())
+
+    def test_default_weights_reproduce_the_crawl_scores(self) -> None:
+        derived = rescoring.rescore_session(self.session_dir, self.root / "derived")
+
+        source_pages, source_summary = self.read_session(self.session_dir)
+        pages, summary = self.read_session(derived)
+        self.assertEqual(pages, source_pages)
+        for key in ("pages_audited", "overall_score", "overall_grade", "dimension_averages",
+                    "severity_distribution"):
+            self.assertEqual(summary[key], source_summary[key], key)
+        # Pages are re-read in file order, not crawl order, so a capped list
+        # of affected pages can hold different examples
+        unordered = lambda issues: [  # noqa: E731
+            {**i, "affected_pages": sorted(i["affected_pages"]) if i["count"] < 100 else len(i["affected_pages"])}
+            for i in issues
+        ]
+        self.assertEqual(unordered(summary["top_issues"]), unordered(source_summary["top_issues"]))
+        self.assertEqual(
+            sorted((p["url"], p["overall_score"]) for p in summary["pages"]),
+            sorted((p["url"], p["overall_score"]) for p in source_summary["pages"]),
+        )
+
+    def test_new_weights_and_thresholds_write_a_derived_session(self) -> None:
+        weights = {**scoring.DEFAULT_SCORE_WEIGHTS, "performance": 0.3, "onpage_seo": 0.1, "content_analysis": 0.05}
+        thresholds = scoring.resolve_thresholds({"ttfb_ms": [300, 600], "thin_content_words": 500, "grades": [80, 70, 60, 50]})
+        before = {p.name: p.read_bytes() for p in self.session_dir.iterdir()}
+
+        derived = rescoring.rescore_session(self.session_dir, weights=weights, thresholds=thresholds)
+
+        self.assertEqual({p.name: p.read_bytes() for p in self.session_dir.iterdir()}, before)
+        self.assertTrue(derived.name.startswith(f"{self.session_dir.name}_rescored-"))
+        pages, summary = self.read_session(derived)
+        for page in pages.values():
+            # Scalar scorers with the same thresholds agree with the vectorized ones
+            self.assertEqual(page["performance"]["score"], scoring.score_performance(page["performance"], thresholds))
+            self.assertEqual(page["readability"]["score"], scoring.score_readability(page["readability"], thresholds))
+            expected = scoring.overall_score({k: page[k]["score"] for k in weights}, weights)
+            self.assertEqual(page["overall_score"], expected)
+            self.assertEqual(page["letter_grade"], scoring.compute_letter_grade(expected, thresholds))
+        self.assertEqual(summary["pages_audited"], 300)
+        # The thin-content issue follows the new threshold
+        thin_pages = 0
+        for page in pages.values():
+            thin = [i for i in page["readability"]["issues"] if i.get("code") == "thin_content"]
+            expected_issue = make_issue("thin_content", words=page["readability"]["word_count"], minimum=500)
+            self.assertEqual(thin, [expected_issue] if page["readability"]["thin_content"] else [])
+            thin_pages += bool(thin)
+        top = {issue["code"]: issue["count"] for issue in summary["top_issues"]}
+        self.assertEqual(top["thin_content"], thin_pages)
+        provenance = json.loads((derived / rescoring.RESCORE_FILE).read_text())
+        self.assertEqual(provenance["score_weights"], weights)
+        self.assertEqual(provenance["score_thresholds"]["ttfb_ms"], [300, 600])
+
+    def test_summary_has_the_bounded_crawl_shape(self) -> None:
+        with mock.patch.object(rescoring, "SiteSummaryBuilder", lambda: SiteSummaryBuilder(page_list_limit=100)):
+            derived = rescoring.rescore_session(self.session_dir, self.root / "derived")
+
+        _, source_summary = self.read_session(self.session_dir)
+        _, summary = self.read_session(derived)
+        self.assertEqual(set(summary), set(source_summary))
+        self.assertEqual((summary["pages_audited"], summary["pages"]), (300, []))
+        self.assertEqual(len(summary["best_pages"]), 3)
+
+    def test_weights_must_sum_to_one(self) -> None:
+        with self.assertRaises(ValueError):
+            rescoring.rescore_session(self.session_dir, weights={"security": 0.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service, score_table
+from ai_seo_auditor.services.score_table import SCORE_TABLE_FILE, ScoreTableWriter, read_score_table
+from backend.report_store import ReportStore
+from tests.test_llm_service import dimensions, make_context
+
+
+@unittest.skipIf(score_table.pa is None, "pyarrow not installed")
+class ScoreTableTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.session_dir = self.root / "reports" / "example.com_20260101-000000"
+        pipeline = JsonReportPipeline()
+        pipeline.open_session(self.session_dir, mock.MagicMock())
+        pipeline._score_table = ScoreTableWriter(self.session_dir, row_group_size=4)
+        for i in range(10):
+            ctx = make_context(f"https://example.com/{i}")
+            ctx.performance = {**ctx.performance, "ttfb_ms": 100 * i, "fcp_ms": None if i % 2 else 900}
+            data = dimensions(40 + 5 * i)
+            data["content_analysis"]["issues"] = [
+                {"severity": "low", "description": f"Issue {n}", "suggested_fix": "Fix."} for n in range(i % 3)
+            ]
+            pipeline.write_page(llm_service.finalize_page_audit(ctx, tuple(data), {}, data))
+        pipeline.write_summary()
+        self.assertFalse((self.session_dir / SCORE_TABLE_FILE).exists())  # appears when the session closes
+        pipeline.close_session()
+
+    def test_table_is_written_in_row_groups_with_typed_columns(self) -> None:
+        metadata = score_table.pq.ParquetFile(self.session_dir / SCORE_TABLE_FILE).metadata
+        self.assertEqual((metadata.num_rows, metadata.num_row_groups), (10, 3))
+
+        table = read_score_table(self.session_dir, ["content_score", "ttfb_ms", "fcp_ms", "content_analysis_issues"])
+
+        self.assertEqual(table.column_names, ["page_id", "content_score", "ttfb_ms", "fcp_ms", "content_analysis_issues"])
+        self.assertEqual(str(table.schema.field("content_score").type), "int16")
+        self.assertEqual(table.column("content_score").to_pylist(), [40 + 5 * i for i in range(10)])
+        self.assertEqual(table.column("ttfb_ms").to_pylist(), [100 * i for i in range(10)])
+        self.assertEqual(table.column("fcp_ms").null_count, 5)
+        self.assertEqual(table.column("content_analysis_issues").to_pylist(), [i % 3 for i in range(10)])
+        overall = read_score_table(self.session_dir, ["overall_score"]).to_pydict()
+        self.assertEqual(
+            dict(zip(overall["page_id"], overall["overall_score"])),
+            {p.stem: json.loads(p.read_text())["overall_score"] for p in self.session_dir.glob("https_*.json")},
+        )
+
+    def test_backend_summaries_come_from_the_table(self) -> None:
+        store = ReportStore(self.root)
+        from_reports = {r.page_id: r.summary for r in store.load_pages(self.session_dir.name)}
+
+        with mock.patch.object(store, "load_pages", side_effect=AssertionError("page reports parsed")):
+            from_table = store.load_page_summaries(self.session_dir.name)
+
+        self.assertEqual({s.page_id: s for s in from_table}, from_reports)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.session_db import SESSION_DB_FILE, SessionDbWriter
+from backend.main import app
+from backend.report_store import ReportStore, apply_filters, sort_pages
+from tests.test_llm_service import dimensions, make_context
+
+
+def crawl(session_dir: Path, pages: int, batch_size: int = 3) -> JsonReportPipeline:
+    pipeline = JsonReportPipeline()
+    pipeline.open_session(session_dir, mock.MagicMock())
+    pipeline._session_db.close()
+    pipeline._session_db = SessionDbWriter(session_dir, batch_size=batch_size)
+    for i in range(pages):
+        data = dimensions(30 + 7 * i)
+        data["content_analysis"]["issues"] = [
+            {"severity": "high" if n else "low", "description": f"Issue {n}", "suggested_fix": "Fix."}
+            for n in range(i % 4)
+        ]
+        report = llm_service.finalize_page_audit(make_context(f"https://example.com/p{i}"), tuple(data), {}, data)
+        if i == 2:
+            report["audit_status"] = "partial"
+        pipeline.write_page(report)
+    pipeline.write_summary()
+    pipeline.close_session()
+    return pipeline
+
+
+class SessionDbTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.session_dir = self.root / "reports" / "example.com_20260101-000000"
+        crawl(self.session_dir, 8)
+        self.store = ReportStore(self.root)
+
+    def test_pipeline_writes_pages_scores_and_issues(self) -> None:
+        with sqlite3.connect(self.session_dir / SESSION_DB_FILE) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0], 8)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM dimension_scores").fetchone()[0], 8 * 9)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0], sum(i % 4 for i in range(8)))
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM pages WHERE audit_status = ? ORDER BY overall_score", ("complete",)
+            ))
+        self.assertIn("pages_status_score", plan)
+
+    def test_rewritten_pages_replace_their_rows(self) -> None:
+        crawl(self.session_dir, 2)
+
+        with sqlite3.connect(self.session_dir / SESSION_DB_FILE) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0], 8)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0], sum(i % 4 for i in range(8)))
+
+    def test_queries_match_filtering_the_page_reports(self) -> None:
+        summaries = [record.summary for record in self.store.load_pages(self.session_dir.name)]
+        queries = [
+            {"sort": "score_asc"},
+            {"sort": "url_desc", "q": "EXAMPLE.com/p1"},
+            {"sort": "score_desc", "score_min": 40, "score_max": 70},
+            {"sort": "risk_desc", "statuses": ["partial", "failed"]},
+            {"sort": "score_desc", "issues_min": 2},
+        ]
+        for query in queries:
+            with self.subTest(**query):
+                sort = query.pop("sort")
+                expected = sort_pages(
+                    apply_filters(summaries, **{"q": None, "score_min": 0, "score_max": 100, "statuses": None,
+                                                "issues_min": 0, **query}),
+                    sort,
+                )
+                total, items = self.store.query_pages(self.session_dir.name, sort=sort, **query)
+                self.assertEqual((total, items), (len(expected), expected))
+
+        total, items = self.store.query_pages(self.session_dir.name, sort="score_asc", limit=3, offset=2)
+        self.assertEqual((total, items), (8, sort_pages(summaries, "score_asc")[2:5]))
+
+    def test_api_reads_the_database_and_single_reports(self) -> None:
+        import backend.main as backend_main
+
+        backend_main.store = self.store
+        client = TestClient(app)
+        with mock.patch.object(self.store, "load_pages", side_effect=AssertionError("session scanned")):
+            listed = client.get(
+                f"/api/sessions/{self.session_dir.name}/pages", params={"sort": "score_desc", "limit": 2}
+            )
+            page_id = listed.json()["items"][0]["page_id"]
+            detail = client.get(f"/api/sessions/{self.session_dir.name}/pages/{page_id}")
+            summary = client.get(f"/api/sessions/{self.session_dir.name}/summary")
+            missing = client.get(f"/api/sessions/{self.session_dir.name}/pages/_site_summary")
+
+        self.assertEqual(listed.json()["total"], 8)
+        self.assertEqual(detail.json()["raw_data"]["url"], "https://example.com/p7")
+        self.assertEqual(detail.json()["summary"], listed.json()["items"][0])
+        self.assertEqual(summary.json()["best_pages"][:2], listed.json()["items"])
+        self.assertEqual(missing.status_code, 404)
+
+    def test_json_export_reads_the_selected_reports_in_one_pass(self) -> None:
+        import backend.main as backend_main
+
+        backend_main.store = self.store
+        client = TestClient(app)
+        params = {"sort": "score_asc", "issues_min": 1}
+        with mock.patch.object(self.store, "load_page", side_effect=AssertionError("read page by page")):
+            exported = client.get(f"/api/sessions/{self.session_dir.name}/exports.json", params=params)
+
+        _, items = self.store.query_pages(self.session_dir.name, sort="score_asc", issues_min=1)
+        self.assertEqual([report["url"] for report in exported.json()], [item.url for item in items])
+        self.assertEqual(len(items), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
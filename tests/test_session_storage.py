@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service, rescoring, session_storage
+from ai_seo_auditor.services.session_storage import (
+    PAGES_DIR, SegmentWriter, StorageOptions, iter_reports, page_ids, read_report,
+)
+from backend.report_store import ReportStore
+from tests.test_llm_service import dimensions, make_context
+
+
+def page(i: int, size: int = 10) -> dict:
+    return {"url": f"https://example.com/{i}", "audit_status": "complete", "body": "x" * size}
+
+
+class SegmentWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.session_dir = Path(tmp.name)
+
+    def write_pages(self, compression: str | None) -> None:
+        writer = SegmentWriter(self.session_dir, compression, segment_max_mb=2000 / 1024 / 1024)
+        for i in range(10):
+            writer.write(f"page-{i}", page(i, 500))
+        writer.write("page-3", {**page(3), "audit_status": "failed"})
+        writer.close()
+
+    def test_segments_rotate_and_the_last_record_of_a_page_wins(self) -> None:
+        self.write_pages(None)
+
+        segments = sorted(p.name for p in (self.session_dir / PAGES_DIR).glob("pages-*"))
+        self.assertEqual(len(segments), 4)
+        self.assertEqual(page_ids(self.session_dir), [f"page-{i}" for i in range(10)])
+        self.assertEqual(read_report(self.session_dir, "page-3")["audit_status"], "failed")
+        reports = {page_id: report for page_id, _, report in iter_reports(self.session_dir)}
+        self.assertEqual(len(reports), 10)
+        self.assertEqual(reports["page-7"], page(7, 500))
+        # Segments are plain NDJSON
+        first = (self.session_dir / PAGES_DIR / segments[0]).read_text().splitlines()
+        self.assertEqual(json.loads(first[0]), page(0, 500))
+
+    @unittest.skipIf(session_storage.zstd is None, "zstd not available")
+    def test_zstd_records_are_individually_readable(self) -> None:
+        self.write_pages("zstd")
+
+        segments = list((self.session_dir / PAGES_DIR).glob("pages-*"))
+        self.assertTrue(all(p.name.endswith(".ndjson.zst") for p in segments))
+        self.assertLess(sum(p.stat().st_size for p in segments), 10 * 500)
+        self.assertEqual(StorageOptions.for_session(self.session_dir).compression, "zstd")
+        self.assertEqual(read_report(self.session_dir, "page-9"), page(9, 500))
+        self.assertEqual(len(list(iter_reports(self.session_dir))), 10)
+
+    def test_lookups_parse_only_new_index_entries(self) -> None:
+        self.write_pages(None)
+        self.assertEqual(read_report(self.session_dir, "page-0"), page(0, 500))
+        writer = SegmentWriter(self.session_dir)
+        writer.write("page-10", page(10))
+        with open(self.session_dir / PAGES_DIR / "index.ndjson", "a", encoding="utf-8") as f:
+            f.write('{"page_id": "page-11", "seg')  # a record still being written
+
+        with mock.patch.object(session_storage.json, "loads", wraps=json.loads) as loads:
+            self.assertEqual(read_report(self.session_dir, "page-10"), page(10))
+        # One index line and the record itself
+        self.assertEqual(loads.call_count, 2)
+        self.assertEqual(len(page_ids(self.session_dir)), 11)
+
+        writer.close()
+        (self.session_dir / PAGES_DIR / "index.ndjson").unlink()
+        self.assertEqual(page_ids(self.session_dir), [])
+
+    def test_invalid_options_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            StorageOptions(layout="sqlite")
+        with self.assertRaises(ValueError):
+            StorageOptions(segment_max_mb=0)
+
+
+class SegmentSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.session_dir = self.root / "reports" / "example.com_20260101-000000"
+        pipeline = JsonReportPipeline()
+        pipeline.open_session(self.session_dir, mock.MagicMock(), storage=StorageOptions(layout="segments"))
+        for i, score in enumerate((80, 40, 65)):
+            ctx = make_context(f"https://example.com/{i}")
+            pipeline.write_page(llm_service.finalize_page_audit(ctx, tuple(dimensions()), {}, dimensions(score)))
+        pipeline.write_summary()
+        pipeline.close_session()
+
+    def test_pipeline_writes_no_per_page_files(self) -> None:
+        self.assertEqual([p.name for p in self.session_dir.glob("*.json")], ["_site_summary.json"])
+        self.assertEqual(len(page_ids(self.session_dir)), 3)
+        # A later writer on the session (batch merge, reanalyze) keeps its layout
+        self.assertEqual(StorageOptions.for_session(self.session_dir).layout, "segments")
+
+    def test_report_store_reads_segments_and_legacy_files(self) -> None:
+        (self.session_dir / "legacy-page.json").write_text(json.dumps({"url": "https://example.com/old", "overall_score": 50}))
+        store = ReportStore(self.root)
+
+        pages = store.load_pages(self.session_dir.name)
+
+        self.assertEqual(store.list_sessions()[0].pages_count, 4)
+        by_url = {p.summary.url: p for p in pages}
+        self.assertEqual(by_url["https://example.com/1"].summary.content_score, 40)
+        self.assertEqual(by_url["https://example.com/old"].page_id, "legacy-page")
+
+    def test_rescore_keeps_the_segment_layout(self) -> None:
+        derived = rescoring.rescore_session(self.session_dir, self.root / "derived")
+
+        self.assertEqual([p.name for p in derived.glob("*.json") if not p.name.startswith("_")], [])
+        source = {page_id: report for page_id, _, report in iter_reports(self.session_dir)}
+        self.assertEqual({page_id: report for page_id, _, report in iter_reports(derived)}, source)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.models.schemas import PageScoreEntry
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.site_summary import IssueSketch, Reservoir, SiteSummaryBuilder, percentiles
+from tests.test_llm_service import dimensions, make_context
+
+
+def entry(i: int, score: float, status: str = "complete") -> PageScoreEntry:
+    return PageScoreEntry(
+        url=f"https://example.com/{i}", audit_status=status, content_score=int(score), overall_score=score,
+    )
+
+
+class SiteSummaryBuilderTests(unittest.TestCase):
+    def test_matches_sorting_and_counting_every_page(self) -> None:
+        scores = [70, 50, 90, 50, 90, 20, 70]
+        builder = SiteSummaryBuilder()
+        for i, score in enumerate(scores):
+            issues = [{"description": f"Issue {n}", "severity": "high" if n else "low"} for n in range(i % 3)]
+            builder.add(entry(i, score, "failed" if score == 20 else "complete"), issues)
+
+        summary = builder.build()
+
+        ordered = sorted((entry(i, s, "failed" if s == 20 else "complete") for i, s in enumerate(scores)),
+                         key=lambda p: p.overall_score)
+        self.assertEqual(summary.pages_audited, 7)
+        self.assertEqual(summary.overall_score, round(sum(s for s in scores if s != 20) / 6, 1))
+        self.assertEqual(summary.dimension_averages["content_analysis"], summary.overall_score)
+        self.assertEqual(summary.best_pages, ordered[-3:][::-1])
+        self.assertEqual(summary.worst_pages, ordered[:3])
+        self.assertEqual(summary.pages, ordered)
+        self.assertEqual(summary.severity_distribution, {"high": 2, "medium": 0, "low": 4})
+        self.assertEqual(
+            [(i.description, i.count, i.affected_pages[:2]) for i in summary.top_issues],
+            [("Issue 0", 4, ["https://example.com/1", "https://example.com/2"]),
+             ("Issue 1", 2, ["https://example.com/2", "https://example.com/5"])],
+        )
+
+    def test_page_list_is_dropped_past_its_limit(self) -> None:
+        builder = SiteSummaryBuilder(page_list_limit=3)
+        for i in range(4):
+            builder.add(entry(i, 10 * i), [])
+
+        summary = builder.build()
+        self.assertEqual((summary.pages_audited, summary.pages), (4, []))
+        self.assertEqual([p.overall_score for p in summary.best_pages], [30, 20, 10])
+
+
+class IssueSketchTests(unittest.TestCase):
+    def test_heavy_hitters_survive_a_stream_of_rare_issues(self) -> None:
+        sketch = IssueSketch(capacity=8, affected_pages_limit=5)
+        for page in range(300):
+            url = f"https://example.com/{page}"
+            sketch.add("Missing meta description", "medium", url)
+            if page % 3 == 0:
+                sketch.add("Thin content", "high", url)
+            sketch.add(f"Broken link {page}", "low", url)
+
+        top = sketch.top(2)
+
+        self.assertEqual([i.description for i in top], ["Missing meta description", "Thin content"])
+        self.assertEqual(top[0].count, 300)
+        self.assertGreaterEqual(top[1].count, 100)  # Space-Saving never under-counts
+        self.assertEqual(len(top[0].affected_pages), 5)
+        self.assertGreater(sketch.evictions, 0)
+        self.assertLessEqual(len(sketch.top(100)), 8)
+
+
+class ReservoirTests(unittest.TestCase):
+    def test_exact_until_full_then_a_bounded_sample(self) -> None:
+        reservoir = Reservoir(capacity=100)
+        for value in range(100):
+            reservoir.add(value)
+        self.assertEqual(reservoir.percentiles((50, 90)), percentiles(range(100), (50, 90)))
+
+        for value in range(100, 10_000):
+            reservoir.add(value)
+
+        estimate = reservoir.percentiles((50, 90))
+        self.assertEqual((reservoir.count, len(reservoir._sample), estimate["max"]), (10_000, 100, 9999))
+        self.assertAlmostEqual(estimate["p50"], 5000, delta=1500)
+        self.assertAlmostEqual(estimate["p90"], 9000, delta=1000)
+
+
+class SummaryCheckpointTests(unittest.TestCase):
+    def test_partial_summary_is_checkpointed_until_the_final_one(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            summary_path = session_dir / "_site_summary.json"
+            pipeline = JsonReportPipeline()
+            pipeline.summary_checkpoint_pages = 2
+            pipeline.open_session(session_dir, mock.MagicMock())
+            for i in range(3):
+                data = dimensions(60 + i)
+                pipeline.write_page(llm_service.finalize_page_audit(
+                    make_context(f"https://example.com/{i}"), tuple(data), {}, data,
+                ))
+
+            checkpoint = json.loads(summary_path.read_text())
+            self.assertEqual((checkpoint["partial"], checkpoint["pages_audited"]), (True, 2))
+
+            pipeline.write_summary()
+            pipeline._checkpoint_summary()  # a late checkpoint does not replace the final summary
+            pipeline.close_session()
+
+            final = json.loads(summary_path.read_text())
+            self.assertEqual((final["partial"], final["pages_audited"]), (False, 3))
+            self.assertEqual(list(session_dir.glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
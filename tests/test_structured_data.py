@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import unittest
+
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.structured_data import summarize, validate_json_ld
+
+from tests.test_llm_service import FakeClient, dimensions, make_context, use_client
+
+PRODUCT_GRAPH = {
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "Organization", "name": "Plant Shop", "url": "https://example.com/", "logo": "logo.png",
+         "sameAs": ["https://social.example/plants"]},
+        {
+            "@type": ["Product", "schema:Thing"],
+            "name": "Monstera",
+            "image": "monstera.jpg",
+            "offers": {"@type": "Offer", "priceCurrency": "EUR", "availability": "InStock"},
+        },
+    ],
+}
+
+
+class ValidateJsonLdTests(unittest.TestCase):
+    def test_graph_nested_nodes_and_type_arrays(self) -> None:
+        result = validate_json_ld([PRODUCT_GRAPH])
+
+        self.assertEqual(result["detected_types"], ["Organization", "Product", "Thing", "Offer"])
+        self.assertEqual(result["missing_fields"], [
+            "Product.description", "Product.brand", "Product.sku",
+            "Offer.price|priceSpecification (required)", "Offer.url",
+        ])
+        # Organization complete (100), Product missing 3/4 recommended (81),
+        # Offer missing its required price (0)
+        self.assertEqual(result["score"], 60)
+
+    def test_subtypes_inherit_rules_and_alternatives_satisfy(self) -> None:
+        result = validate_json_ld([{
+            "@type": "Restaurant",
+            "name": "Green Bistro",
+            "address": {"@type": "PostalAddress", "streetAddress": "1 Leaf St", "addressLocality": "Lyon",
+                        "postalCode": "69001", "addressCountry": "FR"},
+            "telephone": "+33 1", "openingHours": "Mo-Su 12:00-22:00", "geo": {"latitude": 45.7},
+            "url": "https://example.com/", "servesCuisine": "French", "hasMenu": "https://example.com/menu",
+        }])
+
+        self.assertEqual(result["missing_fields"], [])
+        self.assertEqual(result["score"], 100)
+
+    def test_unknown_types_are_neutral_and_no_data_scores_zero(self) -> None:
+        self.assertEqual(validate_json_ld([{"@type": "Dataset", "name": "x"}])["score"], 50)
+        self.assertEqual(validate_json_ld([{"@context": "https://schema.org"}])["score"], 0)
+        self.assertEqual(summarize(validate_json_ld([])), "none")
+
+
+class LocalSchemaScoringTests(unittest.TestCase):
+    def test_validated_schema_is_not_sent_to_the_model(self) -> None:
+        client = FakeClient([{k: v for k, v in dimensions().items() if k != "schema_analysis"}])
+        ctx = make_context("https://example.com/", json_ld=[PRODUCT_GRAPH])
+        ctx.structured_data = validate_json_ld(ctx.json_ld)
+
+        with use_client(client):
+            audit = asyncio.run(llm_service.analyze_page(ctx, retry_attempts=0))
+
+        prompt = "\n".join(m["content"] for m in client.calls[0]["messages"])
+        self.assertNotIn('"schema_analysis"', prompt)
+        self.assertNotIn(json.dumps(PRODUCT_GRAPH, indent=2)[:40], prompt)
+        self.assertIn("Offer (missing: price|priceSpecification (required), url)", prompt)
+        self.assertEqual(audit["dimension_sources"]["schema_analysis"], "rules")
+        self.assertEqual(audit["schema_analysis"]["score"], 60)
+        self.assertIn("Product.brand", audit["schema_analysis"]["missing_fields"])
+
+
+if __name__ == "__main__":
+    unittest.main()
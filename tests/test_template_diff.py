@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_seo_auditor.pipelines import JsonReportPipeline
+from ai_seo_auditor.services import llm_service
+from ai_seo_auditor.services.template_diff import TemplateRegistry, diff_page, template_signature
+
+from tests.test_llm_service import FakeClient, dimensions, make_context, use_client
+
+NAV = "".join(f'<li class="nav-item"><a href="/c/{i}">Category {i} of plants</a></li>' for i in range(40))
+FOOTER = "<footer><p>Plant Shop ships indoor plants across Europe. Free returns within 30 days.</p></footer>"
+
+
+def product_page(name: str, price: str, reviews: int) -> str:
+    items = "".join(f'<li class="review review-{i}">Review {i} of {name}</li>' for i in range(reviews))
+    return (
+        f'<body><nav><ul class="menu">{NAV}</ul></nav>'
+        f'<main id="product-{name}"><h1>{name}</h1><p class="price">{price}</p>'
+        f'<ul class="reviews">{items}</ul></main>{FOOTER}</body>'
+    )
+
+
+class TemplateSignatureTests(unittest.TestCase):
+    def test_same_template_despite_text_ids_and_list_lengths(self) -> None:
+        self.assertEqual(
+            template_signature(product_page("Monstera", "29 EUR", 2)),
+            template_signature(product_page("Ficus", "19 EUR", 5)),
+        )
+        self.assertNotEqual(
+            template_signature(product_page("Monstera", "29 EUR", 2)),
+            template_signature(f"<body><nav><ul class='menu'>{NAV}</ul></nav><article><h2>Blog</h2></article></body>"),
+        )
+
+    def test_diff_keeps_only_page_specific_markup_and_text(self) -> None:
+        registry = TemplateRegistry()
+        exemplar = registry.register("https://shop.example/monstera", product_page("Monstera", "29 EUR", 2), {})
+
+        diff = diff_page(exemplar, product_page("Ficus", "19 EUR", 3))
+
+        self.assertEqual(diff.markup_added, ['<main id="product-Ficus">', '<li class="review review-2">'])
+        self.assertEqual(diff.markup_removed, ['<main id="product-Monstera">'])
+        self.assertEqual(diff.text_added, ["Ficus", "19 EUR", "Review 0 of Ficus", "Review 1 of Ficus",
+                                           "Review 2 of Ficus"])
+
+
+class TemplateDiffPromptTests(unittest.TestCase):
+    def test_later_pages_send_the_diff_and_report_savings(self) -> None:
+        registry = TemplateRegistry()
+        first = make_context("https://shop.example/monstera")
+        first.html = product_page("Monstera", "29 EUR", 2)
+        second = make_context("https://shop.example/ficus")
+        second.html = product_page("Ficus", "19 EUR", 3)
+        client = FakeClient([dimensions(80), dimensions(75)])
+
+        with use_client(client):
+            exemplar = asyncio.run(llm_service.analyze_page(first, retry_attempts=0, templates=registry))
+            audit = asyncio.run(llm_service.analyze_page(second, retry_attempts=0, templates=registry))
+
+        first_prompt, second_prompt = (call["messages"][1]["content"] for call in client.calls)
+        self.assertIn("Category 39 of plants", first_prompt)
+        self.assertNotIn("Category 39 of plants", second_prompt)
+        self.assertIn("shares its template with https://shop.example/monstera", second_prompt)
+        self.assertIn('"score": 80', second_prompt)
+        self.assertIn("Review 2 of Ficus", second_prompt)
+        self.assertIsNone(exemplar["llm_meta"]["template_exemplar"])
+        meta = audit["llm_meta"]
+        self.assertEqual(meta["template_exemplar"], "https://shop.example/monstera")
+        self.assertGreater(meta["template_tokens_saved"], 0)
+
+        pipeline = JsonReportPipeline()
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.open_session(Path(tmp), mock.MagicMock())
+            pipeline.record_page(exemplar)
+            pipeline.record_page(audit)
+            usage = pipeline._build_llm_usage()
+        self.assertEqual(usage.template_savings, {
+            "https://shop.example/monstera": {"pages": 1, "tokens_saved": meta["template_tokens_saved"]},
+        })
+
+    def test_pages_that_differ_too_much_get_the_full_prompt(self) -> None:
+        registry = TemplateRegistry(min_savings=0.99)
+        first = make_context("https://shop.example/monstera")
+        first.html = product_page("Monstera", "29 EUR", 2)
+        second = make_context("https://shop.example/ficus")
+        second.html = product_page("Ficus", "19 EUR", 3)
+        client = FakeClient([dimensions(), dimensions()])
+
+        with use_client(client):
+            asyncio.run(llm_service.analyze_page(first, retry_attempts=0, templates=registry))
+            audit = asyncio.run(llm_service.analyze_page(second, retry_attempts=0, templates=registry))
+
+        self.assertIn("Category 39 of plants", client.calls[1]["messages"][1]["content"])
+        self.assertIsNone(audit["llm_meta"]["template_exemplar"])
+
+
+if __name__ == "__main__":
+    unittest.main()